@@ -0,0 +1,92 @@
+"""
+Micro-benchmark of the DOM extraction script.
+
+Compares sending the full `buildDomNode.js` source with every snapshot (legacy behaviour) with
+calling the functions installed once per document (`call_dom_function`).
+
+Usage:
+    uv run python examples/dom_script_benchmark.py --url https://www.allrecipes.com --steps 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any
+
+from patchright.async_api import BrowserContext, async_playwright
+
+from notte.pipe.preprocessing.dom.parsing import DomParsingConfig
+from notte.pipe.preprocessing.dom.scripts import (
+    CALL_DOM_FUNCTION_JS,
+    DOM_TREE_JS_PATH,
+    PAGE_METADATA_JS,
+    call_dom_function,
+    install_and_call_dom_function_js,
+)
+
+
+def legacy_capture_js() -> str:
+    # the file used to be read (and sent to the browser) for each snapshot
+    return f"""(args) => {{
+        const metadata = ({PAGE_METADATA_JS})();
+        const dom = ({DOM_TREE_JS_PATH.read_text()})(args);
+        return {{ metadata, dom }};
+    }}"""
+
+
+def summary(name: str, timings: list[float]) -> str:
+    ms = sorted(t * 1000 for t in timings)
+    p95 = ms[min(len(ms) - 1, int(0.95 * len(ms)))]
+    return f"{name:<12} mean={statistics.mean(ms):7.2f}ms p50={statistics.median(ms):7.2f}ms p95={p95:7.2f}ms"
+
+
+async def run(context: BrowserContext, url: str, steps: int, preloaded: bool) -> tuple[float, list[float]]:
+    args: dict[str, Any] = DomParsingConfig().model_dump()
+    start = time.perf_counter()
+    page = await context.new_page()
+    _ = await page.goto(url)
+    startup = 0.0
+    timings: list[float] = []
+    for step in range(steps + 1):
+        step_start = time.perf_counter()
+        if preloaded:
+            _ = await call_dom_function(page, "capture", args)
+        else:
+            _ = await page.evaluate(legacy_capture_js(), args)
+        if step == 0:
+            # startup = navigation + first snapshot (which installs the scripts)
+            startup = time.perf_counter() - start
+        else:
+            timings.append(time.perf_counter() - step_start)
+    await page.close()
+    return startup, timings
+
+
+async def main(url: str, steps: int, headless: bool) -> None:
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=headless)
+        for preloaded in (False, True):
+            context = await browser.new_context()
+            startup, timings = await run(context, url, steps, preloaded)
+            await context.close()
+            name = "preloaded" if preloaded else "legacy"
+            print(f"{name:<12} startup={startup * 1000:7.2f}ms")
+            print(summary(name, timings))
+        await browser.close()
+    print(
+        (
+            f"script sent per snapshot: legacy={len(legacy_capture_js())} bytes, "
+            f"preloaded={len(CALL_DOM_FUNCTION_JS)} bytes "
+            f"(install: {len(install_and_call_dom_function_js())} bytes, once per document)"
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    _ = parser.add_argument("--url", type=str, default="https://www.allrecipes.com")
+    _ = parser.add_argument("--steps", type=int, default=20)
+    _ = parser.add_argument("--headful", action="store_true")
+    cli_args = parser.parse_args()
+    asyncio.run(main(url=cli_args.url, steps=cli_args.steps, headless=not cli_args.headful))
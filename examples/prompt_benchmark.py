@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of the prompt materialization.
+
+Compares reading and parsing the prompt templates on each call (legacy behaviour) with the
+precompiled `PromptLibrary` (templates read and parsed once).
+
+Usage:
+    uv run python examples/prompt_benchmark.py --prompt action-listing/optim --calls 1000
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import chevron
+
+from notte.llms.prompt import PromptLibrary
+from notte.llms.service import PROMPT_DIR
+
+Materialize = Callable[[str, dict[str, str]], list[dict[str, str]]]
+
+
+def legacy_materialize(prompt_id: str, variables: dict[str, str]) -> list[dict[str, str]]:
+    # the prompt files used to be globbed, read and tokenized for each call
+    messages: list[dict[str, str]] = []
+    for prompt_file in (PROMPT_DIR / prompt_id).glob("*.md"):
+        content = prompt_file.read_text()
+        messages.append({"role": prompt_file.name.split(".")[0], "content": chevron.render(content, variables)})
+    return messages
+
+
+def summary(name: str, timings: list[float]) -> str:
+    us = sorted(t * 1_000_000 for t in timings)
+    p95 = us[min(len(us) - 1, int(0.95 * len(us)))]
+    return f"{name:<12} mean={statistics.mean(us):8.1f}us p50={statistics.median(us):8.1f}us p95={p95:8.1f}us"
+
+
+def run(materialize: Materialize, prompt_id: str, variables: dict[str, str], calls: int) -> list[float]:
+    timings: list[float] = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        _ = materialize(prompt_id, variables)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    _ = parser.add_argument("--prompt", default="action-listing/optim")
+    _ = parser.add_argument("--calls", type=int, default=1000)
+    _ = parser.add_argument("--document-size", type=int, default=20_000, help="characters of the rendered document")
+    args = parser.parse_args()
+
+    variables = {"document": "x" * args.document_size, "previous_action_list": ""}
+    library = PromptLibrary(Path(PROMPT_DIR), dev_mode=False)
+    start = time.perf_counter()
+    library.warm_up()
+    print(f"warm up of {len(library.prompt_ids())} prompts: {(time.perf_counter() - start) * 1000:.2f}ms")
+    assert library.materialize(args.prompt, variables) == legacy_materialize(args.prompt, variables)
+
+    print(summary("legacy", run(legacy_materialize, args.prompt, variables, args.calls)))
+    print(summary("precompiled", run(library.materialize, args.prompt, variables, args.calls)))
+    dev_library = PromptLibrary(Path(PROMPT_DIR), dev_mode=True)
+    print(summary("dev mode", run(dev_library.materialize, args.prompt, variables, args.calls)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import time
+from array import array
+from bisect import bisect_left
 from collections.abc import Sequence
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass
 from typing import Callable, ClassVar, Required, TypeAlias, TypeVar
 
 from loguru import logger
@@ -331,6 +333,137 @@ class ComputedDomAttributes:
         object.__setattr__(self, "selectors", selectors)
 
 
+class DomTreeIndex:
+    """
+    Struct-of-arrays view of a `DomNode` tree, built once (iteratively) in DFS pre-order.
+
+    Each node is identified by its position in the traversal. Since a subtree is stored contiguously,
+    the subtree of the node at position `p` spans positions `[p, subtree_end[p])`: subtree queries
+    become range checks and node lookups by ID are constant time.
+    """
+
+    def __init__(self, root: "DomNode") -> None:
+        self.nodes: list[DomNode] = []
+        self.parent: array[int] = array("i")
+        self.first_child: array[int] = array("i")
+        self.next_sibling: array[int] = array("i")
+        self.subtree_end: array[int] = array("i")
+        # number of nodes with an ID before each position (i.e. `len(subtree_ids)` in O(1))
+        self.id_count: array[int] = array("i", [0])
+        self.positions: dict[str, int] = {}
+        self.interaction_positions: list[int] = []
+        self.image_positions: list[int] = []
+        self._interaction_nodes: dict[int, InteractionDomNode] = {}
+
+        stack: list[tuple[DomNode, int]] = [(root, -1)]
+        while stack:
+            node, parent = stack.pop()
+            position = len(self.nodes)
+            self.nodes.append(node)
+            self.parent.append(parent)
+            self.first_child.append(position + 1 if len(node.children) > 0 else -1)
+            self.next_sibling.append(-1)
+            self.subtree_end.append(-1)
+            self.id_count.append(self.id_count[-1] + (node.id is not None))
+            if node.id is not None:
+                _ = self.positions.setdefault(node.id, position)
+            if node.is_interaction():
+                self.interaction_positions.append(position)
+            if node.is_image():
+                self.image_positions.append(position)
+            # nodes shared with another tree (e.g. by `filter`) keep the index they were first reached from:
+            # it spans the same subtree, and overwriting it would rebind the node to whichever tree came last
+            if "_tree" not in vars(node):
+                object.__setattr__(node, "_tree", self)
+                object.__setattr__(node, "_position", position)
+            stack.extend((child, position) for child in reversed(node.children))
+
+        # subtree ends and siblings in a single backward pass: the subtree of a node ends where the subtree
+        # of its last child ends (or right after the node itself for leaves) and is followed by its next sibling
+        nb_nodes = len(self.nodes)
+        last_child: dict[int, int] = {}
+        for position in range(nb_nodes - 1, -1, -1):
+            child = last_child.get(position)
+            end = position + 1 if child is None else self.subtree_end[child]
+            self.subtree_end[position] = end
+            parent = self.parent[position]
+            if end < nb_nodes and parent >= 0 and self.parent[end] == parent:
+                self.next_sibling[position] = end
+            if parent >= 0:
+                _ = last_child.setdefault(parent, position)
+
+    def contains(self, position: int, id: str) -> bool:
+        target = self.positions.get(id)
+        return target is not None and position <= target < self.subtree_end[position]
+
+    def subtree_ids(self, position: int) -> list[str]:
+        return [node.id for node in self.nodes[position : self.subtree_end[position]] if node.id is not None]
+
+    def nb_subtree_ids(self, position: int) -> int:
+        return self.id_count[self.subtree_end[position]] - self.id_count[position]
+
+    def find(self, position: int, id: str) -> "InteractionDomNode | None":
+        if not self.contains(position, id):
+            return None
+        return self.interaction_node(self.positions[id])
+
+    def interaction_node(self, position: int) -> "InteractionDomNode":
+        if position not in self._interaction_nodes:
+            self._interaction_nodes[position] = self.nodes[position].to_interaction_node()
+        return self._interaction_nodes[position]
+
+    def filter(self, position: int, ft: Callable[["DomNode"], bool]) -> "DomNode | None":
+        """
+        Filter the subtree of the node at `position` with structural sharing.
+
+        `ft` is only evaluated on nodes whose ancestors are kept (i.e. the cost is O(visited nodes)).
+        Kept subtrees that are left unchanged by the filter are reused as is: only their ancestors
+        up to the root are re-allocated.
+        """
+        # pre-order pass: mask of the nodes kept by `ft`, rejected subtrees are skipped altogether
+        kept: list[int] = []
+        current, end = position, self.subtree_end[position]
+        while current < end:
+            if ft(self.nodes[current]):
+                kept.append(current)
+                current += 1
+            else:
+                current = self.subtree_end[current]
+
+        # post-order pass (reversed pre-order): children are always filtered before their parent
+        filtered: dict[int, DomNode] = {}
+        for current in reversed(kept):
+            node = self.nodes[current]
+            children: list[DomNode] = []
+            child = self.first_child[current]
+            while child >= 0:
+                if child in filtered:
+                    children.append(filtered[child])
+                child = self.next_sibling[child]
+            if node.id is None and len(children) == 0 and node.text.strip() == "":
+                continue
+            if len(children) == len(node.children) and all(a is b for a, b in zip(children, node.children)):
+                filtered[current] = node
+            else:
+                filtered[current] = DomNode(
+                    id=node.id,
+                    type=node.type,
+                    role=node.role,
+                    text=node.text,
+                    children=children,
+                    attributes=node.attributes,
+                    computed_attributes=node.computed_attributes,
+                    parent=node.parent,
+                )
+        return filtered.get(position)
+
+    def in_subtree(self, positions: list[int], position: int) -> list[int]:
+        """Subset of (sorted) `positions` that belong to the subtree of the node at `position`."""
+        start = bisect_left(positions, position)
+        end = bisect_left(positions, self.subtree_end[position], lo=start)
+        return positions[start:end]
+
+
 @dataclass(frozen=True)
 class DomNode:
     id: str | None
@@ -340,10 +473,13 @@ class DomNode:
     children: list["DomNode"]
     attributes: DomAttributes | None
     computed_attributes: ComputedDomAttributes
-    subtree_ids: list[str] = field(init=False, default_factory=list)
     # parents cannot be set in the constructor because it is a recursive structure
     # we need to set it after the constructor
     parent: "DomNode | None" = None
+    # lazily built index of the (sub)tree containing this node and position of the node in it
+    # (set on the instance by `DomTreeIndex`, not dataclass fields)
+    _tree: ClassVar[DomTreeIndex | None] = None
+    _position: ClassVar[int] = 0
 
     @override
     def __repr__(self) -> str:
@@ -353,16 +489,64 @@ class DomNode:
         return f"{self.__class__.__name__}(id={self.id}, role={self.get_role_str()}, text={self.text[:40]}...)\n{children_repr}"
 
     def __post_init__(self) -> None:
-        subtree_ids: list[str] = [] if self.id is None else [self.id]
-        for child in self.children:
-            subtree_ids.extend(child.subtree_ids)
-        object.__setattr__(self, "subtree_ids", subtree_ids)
         if isinstance(self.role, str):
             object.__setattr__(self, "role", NodeRole.from_value(self.role))
 
+    def tree_index(self) -> tuple[DomTreeIndex, int]:
+        """
+        Index of the tree containing this node and position of the node in it.
+
+        The index is built on first use for the subtree rooted at this node and is never rebound
+        afterwards. Nodes are immutable: a subtree shared between several trees spans the same IDs
+        in any index that contains it, so subtree queries answer the same from either tree.
+        """
+        if self._tree is None:
+            _ = DomTreeIndex(self)
+        assert self._tree is not None
+        return self._tree, self._position
+
+    @property
+    def subtree_ids(self) -> list[str]:
+        tree, position = self.tree_index()
+        return tree.subtree_ids(position)
+
+    def nb_subtree_ids(self) -> int:
+        tree, position = self.tree_index()
+        return tree.nb_subtree_ids(position)
+
+    def subtree_contains(self, *ids: str) -> bool:
+        """Whether any of `ids` belongs to the subtree of this node (one range check per ID)."""
+        tree, position = self.tree_index()
+        return any(tree.contains(position, id) for id in ids)
+
     def set_parent(self, parent: "DomNode | None") -> None:
         object.__setattr__(self, "parent", parent)
 
+    def copy_subtree(self) -> "DomNode":
+        """Copy of the subtree rooted at this node with its own parent links (attributes are shared, not copied)."""
+        # post-order walk with an explicit stack: pages can be deeper than the recursion limit
+        copies: dict[int, DomNode] = {}
+        stack: list[tuple[DomNode, bool]] = [(self, False)]
+        while len(stack) > 0:
+            node, expanded = stack.pop()
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children)
+                continue
+            copy = DomNode(
+                id=node.id,
+                type=node.type,
+                role=node.role,
+                text=node.text,
+                children=[copies.pop(id(child)) for child in node.children],
+                attributes=node.attributes,
+                computed_attributes=node.computed_attributes,
+            )
+            for child in copy.children:
+                child.set_parent(copy)
+            copies[id(node)] = copy
+        return copies[id(self)]
+
     def inner_text(self, depth: int = 3) -> str:
         if self.attributes is not None and self.attributes.tag_name.lower() == "input":
             return self.text or self.attributes.placeholder or ""
@@ -428,13 +612,8 @@ class DomNode:
         return attr.notte_selector.split(":")[0]
 
     def find(self, id: str) -> "InteractionDomNode | None":
-        if self.id == id:
-            return self.to_interaction_node()
-        for child in self.children:
-            found = child.find(id)
-            if found:
-                return found
-        return None
+        tree, position = self.tree_index()
+        return tree.find(position, id)
 
     def is_interaction(self) -> bool:
         if isinstance(self.role, str):
@@ -453,14 +632,10 @@ class DomNode:
         return self.role.category().value == NodeCategory.IMAGE.value
 
     def flatten(self, only_interaction: bool = False) -> list["DomNode"]:
-        def inner(node: DomNode, acc: list["DomNode"]) -> list["DomNode"]:
-            if not only_interaction or node.is_interaction():
-                acc.append(node)
-            for child in node.children:
-                _ = inner(child, acc)
-            return acc
-
-        return inner(self, [])
+        tree, position = self.tree_index()
+        if only_interaction:
+            return [tree.nodes[i] for i in tree.in_subtree(tree.interaction_positions, position)]
+        return tree.nodes[position : tree.subtree_end[position]]
 
     @staticmethod
     def find_all_matching_subtrees_with_parents(
@@ -493,39 +668,17 @@ class DomNode:
         return dialogs
 
     def interaction_nodes(self) -> Sequence["InteractionDomNode"]:
-        inodes = self.flatten(only_interaction=True)
-        return [inode.to_interaction_node() for inode in inodes]
+        tree, position = self.tree_index()
+        return [tree.interaction_node(i) for i in tree.in_subtree(tree.interaction_positions, position)]
 
     def image_nodes(self) -> list["DomNode"]:
-        return [node for node in self.flatten() if node.is_image()]
+        tree, position = self.tree_index()
+        return [tree.nodes[i] for i in tree.in_subtree(tree.image_positions, position)]
 
     def subtree_filter(self, ft: Callable[["DomNode"], bool], verbose: bool = False) -> "DomNode | None":
-        def inner(node: DomNode) -> DomNode | None:
-            children = node.children
-            if not ft(node):
-                return None
-
-            filtered_children: list[DomNode] = []
-            for child in children:
-                filtered_child = inner(child)
-                if filtered_child is not None:
-                    filtered_children.append(filtered_child)
-                    # need copy the parent
-            if node.id is None and len(filtered_children) == 0 and node.text.strip() == "":
-                return None
-            return DomNode(
-                id=node.id,
-                type=node.type,
-                role=node.role,
-                text=node.text,
-                children=filtered_children,
-                attributes=node.attributes,
-                computed_attributes=node.computed_attributes,
-                parent=node.parent,
-            )
-
         start = time.time()
-        snode = inner(self)
+        tree, position = self.tree_index()
+        snode = tree.filter(position, ft)
         end = time.time()
         if verbose:
             logger.info(f"🔍 Filtering subtree of full graph done in {end - start:.2f} seconds")
@@ -0,0 +1,115 @@
+import asyncio
+from collections import Counter, deque
+
+from pydantic import BaseModel
+
+from notte.errors.browser import BrowserPoolTimeoutError, BrowserResourceLimitError
+
+
+class PoolPressure(BaseModel):
+    """Backpressure signal of a browser pool: callers should shed load when `saturated` is set."""
+
+    active: int
+    waiting: int
+    capacity: int | None
+    max_waiting: int | None
+
+    @property
+    def utilization(self) -> float:
+        if self.capacity is None or self.capacity == 0:
+            return 0.0
+        return self.active / self.capacity
+
+    @property
+    def saturated(self) -> bool:
+        if self.max_waiting is not None:
+            return self.waiting >= self.max_waiting
+        return self.capacity is not None and self.active >= self.capacity and self.waiting > 0
+
+
+class AdmissionQueue:
+    """
+    Limits the number of concurrent sessions of a pool (globally and per tenant).
+
+    Sessions over the limits wait in a first-come first-served queue. A waiter blocked by its tenant limit
+    does not block the waiters of other tenants.
+    """
+
+    def __init__(
+        self,
+        max_active: int | None = None,
+        max_per_tenant: int | None = None,
+        max_waiting: int | None = None,
+    ) -> None:
+        self.max_active: int | None = max_active
+        self.max_per_tenant: int | None = max_per_tenant
+        self.max_waiting: int | None = max_waiting
+        self.active: int = 0
+        self.active_per_tenant: Counter[str | None] = Counter()
+        self._waiters: deque[tuple[str | None, asyncio.Future[None]]] = deque()
+
+    def _fits(self, tenant: str | None) -> bool:
+        if self.max_active is not None and self.active >= self.max_active:
+            return False
+        return tenant is None or self.max_per_tenant is None or self.active_per_tenant[tenant] < self.max_per_tenant
+
+    def _grant(self, tenant: str | None) -> None:
+        self.active += 1
+        self.active_per_tenant[tenant] += 1
+
+    def _wake(self) -> None:
+        for entry in list(self._waiters):
+            tenant, future = entry
+            if future.done():
+                self._waiters.remove(entry)
+                continue
+            if self._fits(tenant):
+                self._waiters.remove(entry)
+                self._grant(tenant)
+                future.set_result(None)
+
+    @property
+    def nb_waiting(self) -> int:
+        return sum(1 for _, future in self._waiters if not future.done())
+
+    def pressure(self) -> PoolPressure:
+        return PoolPressure(
+            active=self.active, waiting=self.nb_waiting, capacity=self.max_active, max_waiting=self.max_waiting
+        )
+
+    async def acquire(self, tenant: str | None = None, timeout: float | None = None) -> None:
+        """
+        Wait for a session slot.
+
+        Raises `BrowserResourceLimitError` if the waiting queue is full and `BrowserPoolTimeoutError`
+        if no slot is available within `timeout` seconds.
+        """
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        entry = (tenant, future)
+        self._waiters.append(entry)
+        # earlier waiters that fit are granted first
+        self._wake()
+        if future.done():
+            return
+        if self.max_waiting is not None and self.nb_waiting > self.max_waiting:
+            self._waiters.remove(entry)
+            raise BrowserResourceLimitError(f"Too many sessions waiting for a browser resource ({self.nb_waiting})")
+        try:
+            async with asyncio.timeout(timeout):
+                await future
+        except (TimeoutError, asyncio.CancelledError) as e:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+            if future.done() and not future.cancelled():
+                # the slot was granted concurrently
+                self.release(tenant)
+            if isinstance(e, TimeoutError):
+                raise BrowserPoolTimeoutError(timeout=timeout or 0.0, nb_waiting=self.nb_waiting) from e
+            raise
+
+    def release(self, tenant: str | None = None) -> None:
+        self.active -= 1
+        self.active_per_tenant[tenant] -= 1
+        if self.active_per_tenant[tenant] <= 0:
+            del self.active_per_tenant[tenant]
+        self._wake()
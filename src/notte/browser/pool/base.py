@@ -1,9 +1,10 @@
 import asyncio
 import datetime as dt
+import time
 import uuid
 from abc import ABC, abstractmethod
-from dataclasses import asdict, dataclass
-from typing import ClassVar
+from dataclasses import asdict, dataclass, replace
+from typing import Any, ClassVar
 
 from loguru import logger
 from openai import BaseModel
@@ -13,6 +14,9 @@ from patchright.async_api import (
 from patchright.async_api import (
     BrowserContext as PlaywrightBrowserContext,
 )
+from patchright.async_api import (
+    Error as PlaywrightError,
+)
 from patchright.async_api import (
     Page as PlaywrightPage,
 )
@@ -20,13 +24,22 @@ from patchright.async_api import (
     Playwright,
     async_playwright,
 )
+from patchright.async_api import (
+    Request as PlaywrightRequest,
+)
 from pydantic import Field, PrivateAttr
 
 from notte.browser import ProxySettings
+from notte.browser.pool.admission import AdmissionQueue, PoolPressure
+from notte.browser.pool.metrics import MetricFamily, PoolMetrics, Sample, histogram_family, render_prometheus
+from notte.browser.pool.network import NetworkInterceptor, NetworkProfile, NetworkStats
 from notte.browser.pool.ports import get_port_manager
+from notte.browser.pool.recycle import CONTEXT_PERMISSIONS, request_origin, reset_context
 from notte.common.config import FrozenConfig
 from notte.errors.browser import (
     BrowserPoolNotStartedError,
+    BrowserPoolTimeoutError,
+    BrowserResourceLimitError,
     BrowserResourceNotFoundError,
 )
 
@@ -38,11 +51,19 @@ class BrowserResourceOptions:
     proxy: ProxySettings | None = None
     debug: bool = False
     debug_port: int | None = None
+    # requests blocked in the browser context (e.g. images, fonts or trackers)
+    network: NetworkProfile | None = None
+    # sessions of the same tenant are limited by `BaseBrowserPoolConfig.max_sessions_per_tenant`
+    tenant: str | None = None
 
     def set_port(self, port: int) -> "BrowserResourceOptions":
         options = dict(asdict(self), debug_port=port, debug=True)
         return BrowserResourceOptions(**options)
 
+    def context_options(self) -> "BrowserResourceOptions":
+        """Options that determine how a context is created (i.e. contexts are shared between tenants)"""
+        return replace(self, tenant=None)
+
 
 class BrowserResource(BaseModel):
     model_config = {  # pyright: ignore[reportUnannotatedClassAttribute]
@@ -53,6 +74,8 @@ class BrowserResource(BaseModel):
     browser_id: str
     context_id: str
     resource_options: BrowserResourceOptions
+    # requests blocked in the context of the resource (if `resource_options.network` blocks requests)
+    network_stats: NetworkStats | None = None
 
 
 class TimeContext(BaseModel):
@@ -62,6 +85,25 @@ class TimeContext(BaseModel):
     context_id: str
     context: PlaywrightBrowserContext = Field(exclude=True)
     timestamp: dt.datetime = Field(default_factory=lambda: dt.datetime.now())
+    # options requested for the context (i.e. before the debug port of the browser is set)
+    resource_options: BrowserResourceOptions | None = None
+    # number of sessions served by the context (see `BaseBrowserPoolConfig.recycle_contexts`)
+    uses: int = 1
+    # origins visited by the context, their storage is cleared when the context is recycled
+    origins: set[str] = Field(default_factory=set)
+    # latest activity of the session using the context (see `BaseBrowserPoolConfig.context_idle_ttl`)
+    last_activity: dt.datetime = Field(default_factory=lambda: dt.datetime.now())
+
+    def record_request(self, url: str) -> None:
+        origin = request_origin(url)
+        if origin is not None:
+            self.origins.add(origin)
+
+    def touch(self) -> None:
+        self.last_activity = dt.datetime.now()
+
+    def idle_for(self) -> float:
+        return (dt.datetime.now() - self.last_activity).total_seconds()
 
 
 class BrowserWithContexts(BaseModel):
@@ -75,6 +117,16 @@ class BrowserWithContexts(BaseModel):
     resource_options: BrowserResourceOptions
     timestamp: dt.datetime = Field(default_factory=lambda: dt.datetime.now())
     cdp_url: str | None = None
+    # pid of the browser process (when known, see `LocalBrowserPool`)
+    pid: int | None = None
+    # draining browsers do not accept new contexts and are closed once their last context is released
+    draining: bool = False
+    # contexts being created on the browser
+    reserved: int = 0
+
+    @property
+    def nb_contexts(self) -> int:
+        return len(self.contexts) + self.reserved
 
 
 class BaseBrowserPoolConfig(FrozenConfig):
@@ -82,6 +134,56 @@ class BaseBrowserPoolConfig(FrozenConfig):
     viewport_width: int = 1280
     viewport_height: int = 1020
     verbose: bool = False
+    # idle contexts kept ready for `get_browser_resource` and replenished in the background (0 disables the warm pool)
+    warm_contexts: int = 0
+    # browsers launched ahead of time (by the warm pool) when all the browsers are full
+    warm_browsers: int = 0
+    # released contexts are reset and handed out again instead of being closed
+    recycle_contexts: bool = False
+    # number of sessions served by a context before it is closed (bounds the memory leaked by pages)
+    max_context_reuse: int = 20
+    # maximum number of idle (recycled or warm) contexts kept by the pool
+    max_idle_contexts: int = 4
+    # seconds a browser without any context in use is kept alive (0 closes it as soon as it is released)
+    browser_idle_ttl: float = 0.0
+    # concurrent sessions (i.e. resources handed out by `get_browser_resource`), others wait in a fair queue
+    max_sessions: int | None = None
+    max_sessions_per_tenant: int | None = None
+    # sessions allowed to wait for a resource, others are refused immediately
+    max_waiting_sessions: int | None = None
+    # seconds a session waits for a resource (None waits forever)
+    acquisition_timeout: float | None = None
+    # seconds between two passes of the supervisor (idle context reaper + browser health checks, None disables it)
+    supervisor_interval: float | None = None
+    # seconds a context in use can go without activity (requests, snapshots) before it is reaped (None never reaps)
+    context_idle_ttl: float | None = None
+    # seconds a browser has to answer a health check before it is considered crashed
+    health_check_timeout: float = 5.0
+
+
+class WarmPoolStats(BaseModel):
+    # resources handed out from the warm pool
+    hits: int = 0
+    # resources created on demand because no warm context matched the requested options
+    misses: int = 0
+    # contexts created by the background replenishment
+    created: int = 0
+    failures: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class SupervisorStats(BaseModel):
+    # contexts in use closed because their session was idle for more than `context_idle_ttl` (e.g. leaked sessions)
+    reaped_contexts: int = 0
+    # browsers found disconnected or unresponsive by the health checks
+    crashed_browsers: int = 0
+    # passes of the supervisor
+    checks: int = 0
+    last_check: dt.datetime | None = None
 
 
 class BaseBrowserPool(ABC, BaseModel):
@@ -92,6 +194,23 @@ class BaseBrowserPool(ABC, BaseModel):
     _playwright: Playwright | None = PrivateAttr(default=None)
     browsers: dict[str, BrowserWithContexts] = Field(default_factory=dict)
     headless_browsers: dict[str, BrowserWithContexts] = Field(default_factory=dict)
+    # requests blocked in all the contexts created by the pool
+    network_stats: NetworkStats = Field(default_factory=NetworkStats)
+    warm_stats: WarmPoolStats = Field(default_factory=WarmPoolStats)
+    supervisor_stats: SupervisorStats = Field(default_factory=SupervisorStats)
+    metrics: PoolMetrics = Field(default_factory=PoolMetrics)
+    # idle contexts (with the options they were created for) handed out by `get_browser_resource`
+    _warm: list[tuple[BrowserResourceOptions, BrowserResource]] = PrivateAttr(default_factory=list)
+    _warm_options: BrowserResourceOptions | None = PrivateAttr(default=None)
+    _replenish_task: "asyncio.Task[None] | None" = PrivateAttr(default=None)
+    # delayed closing of the browsers without any context in use (see `BaseBrowserPoolConfig.browser_idle_ttl`)
+    _idle_browser_tasks: "dict[str, asyncio.Task[None]]" = PrivateAttr(default_factory=dict)
+    # browser selection and launches are serialized so that concurrent sessions do not over-launch browsers
+    _placement_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+    _admission: AdmissionQueue | None = PrivateAttr(default=None)
+    # tenant of each session, by context id
+    _sessions: dict[str, str | None] = PrivateAttr(default_factory=dict)
+    _supervisor_task: "asyncio.Task[None] | None" = PrivateAttr(default=None)
 
     def available_browsers(self, headless: bool | None = None) -> dict[str, BrowserWithContexts]:
         if headless is None:
@@ -105,9 +224,19 @@ class BaseBrowserPool(ABC, BaseModel):
         """Initialize the playwright instance"""
         if self._playwright is None:
             self._playwright = await async_playwright().start()
+        self.start_supervisor()
 
     async def stop(self) -> None:
         """Stop the playwright instance"""
+        self.stop_supervisor()
+        if self._replenish_task is not None:
+            _ = self._replenish_task.cancel()
+            self._replenish_task = None
+        for task in self._idle_browser_tasks.values():
+            _ = task.cancel()
+        self._idle_browser_tasks = {}
+        # warm contexts are closed with their browser
+        self._warm = []
         if self._playwright is not None:
             await self._playwright.stop()
             self._playwright = None
@@ -151,13 +280,14 @@ class BaseBrowserPool(ABC, BaseModel):
         )
         # Store browser reference
         self.available_browsers(resource_options.headless)[browser_id] = _browser
+        self.metrics.browsers_launched += 1
         return _browser
 
     async def get_or_create_browser(self, resource_options: BrowserResourceOptions) -> BrowserWithContexts:
         """Find a browser with available space for a new context"""
         browsers = self.available_browsers(resource_options.headless)
         for browser in browsers.values():
-            if len(browser.contexts) < self.config.contexts_per_browser:
+            if not browser.draining and browser.nb_contexts < self.config.contexts_per_browser:
                 return browser
         # Create a new browser
         if self.config.verbose:
@@ -167,14 +297,181 @@ class BaseBrowserPool(ABC, BaseModel):
         browser = await self.create_browser(resource_options)
         return browser
 
-    def create_context(self, browser: BrowserWithContexts, context: PlaywrightBrowserContext) -> str:
+    def create_context(
+        self,
+        browser: BrowserWithContexts,
+        context: PlaywrightBrowserContext,
+        resource_options: BrowserResourceOptions | None = None,
+    ) -> str:
         context_id = str(uuid.uuid4())
-        browser.contexts[context_id] = TimeContext(context_id=context_id, context=context)
+        time_context = TimeContext(context_id=context_id, context=context, resource_options=resource_options)
+        browser.contexts[context_id] = time_context
+        self.metrics.contexts_created += 1
+
+        # requests are not activity of the session (a leaked page polling its server would never be reaped):
+        # activity is only recorded by the API calls, see `touch`
+        if self.config.recycle_contexts:
+
+            def on_request(request: PlaywrightRequest) -> None:
+                time_context.record_request(request.url)
+
+            context.on("request", on_request)
         return context_id
 
+    @property
+    def admission(self) -> AdmissionQueue:
+        if self._admission is None:
+            self._admission = AdmissionQueue(
+                max_active=self.config.max_sessions,
+                max_per_tenant=self.config.max_sessions_per_tenant,
+                max_waiting=self.config.max_waiting_sessions,
+            )
+        return self._admission
+
+    def pressure(self) -> PoolPressure:
+        """Backpressure signal: number of sessions in use and waiting for a resource."""
+        return self.admission.pressure()
+
     async def get_browser_resource(self, resource_options: BrowserResourceOptions) -> BrowserResource:
-        browser = await self.get_or_create_browser(resource_options)
+        """
+        Hand out a browser context for a new session.
+
+        Waits (at most `config.acquisition_timeout` seconds) in a fair queue when `config.max_sessions`
+        or `config.max_sessions_per_tenant` is reached.
+        """
+        tenant = resource_options.tenant
+        start = time.monotonic()
+        try:
+            await self.admission.acquire(tenant, timeout=self.config.acquisition_timeout)
+        except (BrowserResourceLimitError, BrowserPoolTimeoutError):
+            self.metrics.acquisition_failures += 1
+            raise
+        try:
+            resource = await self._get_browser_resource(resource_options.context_options())
+        except BaseException:
+            self.admission.release(tenant)
+            raise
+        self._sessions[resource.context_id] = tenant
+        self.touch(resource)
+        self.metrics.acquisition_wait.observe(time.monotonic() - start)
+        return resource
+
+    def touch(self, resource: BrowserResource) -> None:
+        """Record activity on the session of `resource`, which postpones its reaping by the supervisor."""
+        browser = self.available_browsers(resource.resource_options.headless).get(resource.browser_id)
+        if browser is not None and resource.context_id in browser.contexts:
+            browser.contexts[resource.context_id].touch()
+
+    def _release_session(self, context_id: str) -> None:
+        if context_id in self._sessions:
+            self.admission.release(self._sessions.pop(context_id))
+
+    async def _get_browser_resource(self, resource_options: BrowserResourceOptions) -> BrowserResource:
+        if self.config.warm_contexts <= 0 and not self.config.recycle_contexts:
+            return await self.create_browser_resource(resource_options)
+        resource = self._pop_warm_resource(resource_options)
+        if resource is None:
+            self.warm_stats.misses += 1
+            if self.config.verbose:
+                logger.info("No warm context available for the requested options. Creating one on demand...")
+        else:
+            self.warm_stats.hits += 1
+            self._cancel_idle_browser_close(resource.browser_id)
+        # the warm pool follows the options of the latest request
+        self._warm_options = resource_options
+        self.replenish()
+        if resource is None:
+            resource = await self.create_browser_resource(resource_options)
+        return resource
+
+    def _is_open(self, resource: BrowserResource) -> bool:
+        browser = self.available_browsers(resource.resource_options.headless).get(resource.browser_id)
+        return browser is not None and resource.context_id in browser.contexts
+
+    def _is_draining(self, resource: BrowserResource) -> bool:
+        browser = self.available_browsers(resource.resource_options.headless).get(resource.browser_id)
+        return browser is not None and browser.draining
+
+    def _pop_warm_resource(self, resource_options: BrowserResourceOptions) -> BrowserResource | None:
+        # contexts closed in the meantime (e.g. by `cleanup`) are dropped
+        self._warm = [(options, resource) for options, resource in self._warm if self._is_open(resource)]
+        for i, (options, resource) in enumerate(self._warm):
+            if options == resource_options and not self._is_draining(resource):
+                del self._warm[i]
+                return resource
+        return None
 
+    @property
+    def nb_warm_contexts(self) -> int:
+        return len(self._warm)
+
+    def replenish(self) -> None:
+        """Refill the warm pool in the background (no-op if a replenishment is already running)."""
+        if self._warm_options is None or self.config.warm_contexts <= 0:
+            return
+        if self._replenish_task is not None and not self._replenish_task.done():
+            return
+        self._replenish_task = asyncio.create_task(self._replenish(self._warm_options))
+
+    async def warm_up(self, resource_options: BrowserResourceOptions) -> None:
+        """Fill the warm pool with contexts for `resource_options`, e.g. before the first session starts."""
+        self._warm_options = resource_options
+        self.replenish()
+        if self._replenish_task is not None:
+            await self._replenish_task
+
+    async def _replenish(self, resource_options: BrowserResourceOptions) -> None:
+        # warm contexts created for previous options would never be handed out
+        stale = [resource for options, resource in self._warm if options != resource_options]
+        self._warm = [(options, resource) for options, resource in self._warm if options == resource_options]
+        for resource in stale:
+            try:
+                await self.release_browser_resource(resource, recycle=False)
+            except BrowserResourceNotFoundError:
+                pass
+        while len(self._warm) < self.config.warm_contexts:
+            try:
+                resource = await self.create_browser_resource(resource_options)
+            except Exception as e:
+                self.warm_stats.failures += 1
+                logger.error(f"Failed to create warm browser context: {e}")
+                return
+            self._warm.append((resource_options, resource))
+            self.warm_stats.created += 1
+        await self._launch_spare_browsers(resource_options)
+
+    async def _launch_spare_browsers(self, resource_options: BrowserResourceOptions) -> None:
+        browsers = self.available_browsers(resource_options.headless)
+        nb_spare = sum(1 for browser in browsers.values() if browser.nb_contexts < self.config.contexts_per_browser)
+        for _ in range(self.config.warm_browsers - nb_spare):
+            try:
+                async with self._placement_lock:
+                    _ = await self.create_browser(resource_options)
+            except Exception as e:
+                # e.g. maximum number of browsers reached
+                if self.config.verbose:
+                    logger.info(f"Stopped launching spare browsers: {e}")
+                return
+
+    async def _reserve_browser(self, resource_options: BrowserResourceOptions) -> BrowserWithContexts:
+        async with self._placement_lock:
+            try:
+                browser = await self.get_or_create_browser(resource_options)
+            except BrowserResourceLimitError:
+                # idle contexts (created for other options) make room for the ones in use
+                if len(self._warm) == 0:
+                    raise
+                _, idle = self._warm.pop(0)
+                await self.release_browser_resource(idle, recycle=False)
+                browser = await self.get_or_create_browser(resource_options)
+            browser.reserved += 1
+        self._cancel_idle_browser_close(browser.browser_id)
+        return browser
+
+    async def create_browser_resource(self, resource_options: BrowserResourceOptions) -> BrowserResource:
+        """Create a new context (and page) on a browser with available space"""
+        browser = await self._reserve_browser(resource_options)
+        context_id: str | None = None
         try:
             async with asyncio.timeout(self.BROWSER_OPERATION_TIMEOUT_SECONDS):
                 context = await browser.browser.new_context(
@@ -183,14 +480,19 @@ class BaseBrowserPool(ABC, BaseModel):
                         "width": self.config.viewport_width,
                         "height": self.config.viewport_height,
                     },
-                    permissions=[
-                        "clipboard-read",
-                        "clipboard-write",
-                    ],  # Needed for clipboard copy/paste to respect tabs / new lines
+                    permissions=CONTEXT_PERMISSIONS,
                     proxy=resource_options.proxy,  # already specified at browser level, but might as well
                     user_agent=resource_options.user_agent,
                 )
-                context_id = self.create_context(browser, context)
+                context_id = self.create_context(browser, context, resource_options)
+                network_stats = None
+                if resource_options.network is not None and resource_options.network.blocks_requests:
+                    # routes are installed before the first page is created so that no request slips through
+                    network_stats = NetworkStats()
+                    interceptor = NetworkInterceptor(
+                        resource_options.network, network_stats, self.network_stats, verbose=self.config.verbose
+                    )
+                    await interceptor.install(context)
                 if len(context.pages) == 0:
                     page = await context.new_page()
                 else:
@@ -202,17 +504,20 @@ class BaseBrowserPool(ABC, BaseModel):
                     context_id=context_id,
                     browser_id=browser.browser_id,
                     resource_options=resource_options,
+                    network_stats=network_stats,
                 )
         except Exception as e:
             logger.error(f"Failed to create browser resource: {e}")
-            # Cleanup on failure
-            for context_id, context in browser.contexts.items():
+            # Cleanup on failure (only the context being created: the other ones are used by concurrent sessions)
+            if context_id is not None:
+                time_context = browser.contexts.pop(context_id)
                 try:
-                    await context.context.close()
-                    del browser.contexts[context_id]
+                    await time_context.context.close()
                 except Exception:
                     pass
             raise
+        finally:
+            browser.reserved -= 1
 
     async def release_browser(self, browser: BrowserWithContexts) -> None:
         if self.config.verbose:
@@ -229,8 +534,91 @@ class BaseBrowserPool(ABC, BaseModel):
         if port_manager is not None and browser.resource_options.debug_port is not None:
             port_manager.release_port(browser.resource_options.debug_port)
         del browsers[browser.browser_id]
-
-    async def release_browser_resource(self, resource: BrowserResource) -> None:
+        self.metrics.browsers_closed += 1
+        self._cancel_idle_browser_close(browser.browser_id)
+        for context_id in browser.contexts:
+            self._release_session(context_id)
+
+    async def drain_browser(self, browser: BrowserWithContexts) -> None:
+        """
+        Stop placing new contexts on `browser` and close it once its last context is released
+        (new browsers are launched on demand instead).
+        """
+        if browser.draining:
+            return
+        if self.config.verbose:
+            logger.info(f"Draining browser {browser.browser_id}...")
+        browser.draining = True
+        self.metrics.browsers_drained += 1
+        idle = [resource for _, resource in self._warm if resource.browser_id == browser.browser_id]
+        self._warm = [
+            (options, resource) for options, resource in self._warm if resource.browser_id != browser.browser_id
+        ]
+        for resource in idle:
+            await self.release_browser_resource(resource, recycle=False)
+        browsers = self.available_browsers(headless=browser.resource_options.headless)
+        if browser.browser_id in browsers and len(browser.contexts) == 0:
+            await self.release_browser(browser)
+        self.replenish()
+
+    def _is_idle(self, browser: BrowserWithContexts) -> bool:
+        """Whether no context of `browser` is in use (i.e. all of them are idle in the warm pool)."""
+        idle_context_ids = {
+            resource.context_id for _, resource in self._warm if resource.browser_id == browser.browser_id
+        }
+        return all(context_id in idle_context_ids for context_id in browser.contexts)
+
+    def _cancel_idle_browser_close(self, browser_id: str) -> None:
+        task = self._idle_browser_tasks.pop(browser_id, None)
+        if task is not None:
+            _ = task.cancel()
+
+    def _schedule_idle_browser_close(self, browser: BrowserWithContexts) -> None:
+        # the idle TTL starts over from the latest release
+        self._cancel_idle_browser_close(browser.browser_id)
+        self._idle_browser_tasks[browser.browser_id] = asyncio.create_task(self._close_idle_browser(browser))
+
+    async def _close_idle_browser(self, browser: BrowserWithContexts) -> None:
+        await asyncio.sleep(self.config.browser_idle_ttl)
+        _ = self._idle_browser_tasks.pop(browser.browser_id, None)
+        browsers = self.available_browsers(headless=browser.resource_options.headless)
+        if browser.browser_id not in browsers or not self._is_idle(browser):
+            return
+        if self.config.verbose:
+            logger.info(f"Closing browser {browser.browser_id} idle for more than {self.config.browser_idle_ttl}s")
+        self._warm = [
+            (options, resource) for options, resource in self._warm if resource.browser_id != browser.browser_id
+        ]
+        await self.release_browser(browser)
+        # the warm pool is refilled on a new browser
+        self.replenish()
+
+    async def _recycle_context(self, resource: BrowserResource, time_context: TimeContext) -> bool:
+        """Reset the context of `resource` and put it back in the warm pool. Returns whether it was recycled."""
+        if time_context.uses >= self.config.max_context_reuse:
+            if self.config.verbose:
+                logger.info(f"Context {resource.context_id} served {time_context.uses} sessions. Closing it...")
+            return False
+        if len(self._warm) >= max(self.config.max_idle_contexts, self.config.warm_contexts):
+            return False
+        try:
+            async with asyncio.timeout(self.BROWSER_OPERATION_TIMEOUT_SECONDS):
+                resource.page = await reset_context(time_context.context, time_context.origins)
+        except Exception as e:
+            logger.error(f"Failed to reset playwright context {resource.context_id}, closing it instead: {e}")
+            return False
+        time_context.uses += 1
+        self._warm.append((time_context.resource_options or resource.resource_options, resource))
+        return True
+
+    async def release_browser_resource(self, resource: BrowserResource, recycle: bool = True) -> None:
+        """
+        Release the context of `resource`.
+
+        If `config.recycle_contexts` is set (and `recycle` is True), the context is reset and kept for another session.
+        Otherwise it is closed, as well as its browser once the browser has no context left
+        (after `config.browser_idle_ttl` seconds).
+        """
         browsers = self.available_browsers(resource.resource_options.headless)
         if resource.browser_id not in browsers:
             raise BrowserResourceNotFoundError(
@@ -244,12 +632,228 @@ class BaseBrowserPool(ABC, BaseModel):
                     f"contexts (i.e {list(resource_browser.contexts.keys())})"
                 )
             )
+        time_context = resource_browser.contexts[resource.context_id]
+        # the session ends even if closing the context fails
+        self._release_session(resource.context_id)
+        if (
+            recycle
+            and self.config.recycle_contexts
+            and not resource_browser.draining
+            and await self._recycle_context(resource, time_context)
+        ):
+            if self.config.browser_idle_ttl > 0 and self._is_idle(resource_browser):
+                self._schedule_idle_browser_close(resource_browser)
+            return
         try:
             async with asyncio.timeout(self.BROWSER_OPERATION_TIMEOUT_SECONDS):
-                await resource_browser.contexts[resource.context_id].context.close()
+                await time_context.context.close()
         except Exception as e:
             logger.error(f"Failed to close playright context: {e}")
             return
         del resource_browser.contexts[resource.context_id]
-        if len(resource_browser.contexts) == 0:
+        if len(resource_browser.contexts) == 0 and (resource_browser.draining or self.config.browser_idle_ttl <= 0):
             await self.release_browser(resource_browser)
+        elif self.config.browser_idle_ttl > 0 and self._is_idle(resource_browser):
+            self._schedule_idle_browser_close(resource_browser)
+
+    def start_supervisor(self) -> None:
+        """Run `supervise` every `config.supervisor_interval` seconds in the background (no-op if disabled)."""
+        if self.config.supervisor_interval is None:
+            return
+        if self._supervisor_task is not None and not self._supervisor_task.done():
+            return
+        self._supervisor_task = asyncio.create_task(self._supervise_forever(self.config.supervisor_interval))
+
+    def stop_supervisor(self) -> None:
+        if self._supervisor_task is not None:
+            _ = self._supervisor_task.cancel()
+            self._supervisor_task = None
+
+    async def _supervise_forever(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.supervise()
+            except Exception as e:
+                logger.error(f"Browser pool supervisor failed: {e}")
+
+    async def supervise(self) -> None:
+        """
+        One pass of the supervisor: remove the crashed browsers, then reap the contexts in use
+        that have been idle for more than `config.context_idle_ttl` seconds.
+
+        The warm pool is refilled afterwards, other sessions get a new browser on demand.
+        """
+        self.supervisor_stats.checks += 1
+        self.supervisor_stats.last_check = dt.datetime.now()
+        for browser in list(self.available_browsers().values()):
+            if not await self.is_alive(browser):
+                await self._remove_crashed_browser(browser)
+        if self.config.context_idle_ttl is not None:
+            _ = await self.reap_idle_contexts(self.config.context_idle_ttl)
+        self.replenish()
+
+    async def is_alive(self, browser: BrowserWithContexts) -> bool:
+        """Whether `browser` is connected and answers a CDP command within `config.health_check_timeout` seconds."""
+        if not browser.browser.is_connected():
+            return False
+        try:
+            async with asyncio.timeout(self.config.health_check_timeout):
+                session = await browser.browser.new_browser_cdp_session()
+                try:
+                    _: Any = await session.send(  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+                        "Browser.getVersion"
+                    )
+                finally:
+                    await session.detach()
+        except TimeoutError:
+            return False
+        except PlaywrightError:
+            # disconnected in the meantime (CDP is always available on chromium)
+            return browser.browser.is_connected()
+        return True
+
+    async def _remove_crashed_browser(self, browser: BrowserWithContexts) -> None:
+        logger.warning(
+            f"Browser {browser.browser_id} crashed or is unresponsive. Removing it ({len(browser.contexts)} contexts)..."
+        )
+        self.supervisor_stats.crashed_browsers += 1
+        self._warm = [
+            (options, resource) for options, resource in self._warm if resource.browser_id != browser.browser_id
+        ]
+        browsers = self.available_browsers(headless=browser.resource_options.headless)
+        if browser.browser_id in browsers:
+            # also kills the process of an unresponsive browser, frees its port and ends its sessions
+            await self.release_browser(browser)
+
+    async def reap_idle_contexts(self, ttl: float) -> int:
+        """Close the contexts in use without any activity for more than `ttl` seconds. Returns the number reaped."""
+        nb_reaped = 0
+        for browser in list(self.available_browsers().values()):
+            for context_id, time_context in list(browser.contexts.items()):
+                if context_id not in self._sessions or time_context.idle_for() <= ttl:
+                    # idle contexts of the warm pool are not reaped
+                    continue
+                logger.warning(
+                    (
+                        f"Reaping context {context_id} of browser {browser.browser_id}: "
+                        f"no activity for {time_context.idle_for():.0f}s (session leaked?)"
+                    )
+                )
+                pages = time_context.context.pages
+                if len(pages) == 0:
+                    pages = [await time_context.context.new_page()]
+                try:
+                    await self.release_browser_resource(
+                        BrowserResource(
+                            page=pages[0],
+                            browser_id=browser.browser_id,
+                            context_id=context_id,
+                            resource_options=time_context.resource_options or browser.resource_options,
+                        ),
+                        recycle=False,
+                    )
+                except BrowserResourceNotFoundError:
+                    # released concurrently
+                    continue
+                nb_reaped += 1
+        self.supervisor_stats.reaped_contexts += nb_reaped
+        return nb_reaped
+
+    def metric_families(self) -> list[MetricFamily]:
+        """Current metrics of the pool (see `export_prometheus`)."""
+        in_use = sum(
+            1
+            for browser in self.available_browsers().values()
+            for context_id in browser.contexts
+            if context_id in self._sessions
+        )
+        nb_contexts = sum(len(browser.contexts) for browser in self.available_browsers().values())
+        pressure = self.pressure()
+        families = [
+            MetricFamily(
+                name="notte_pool_browsers",
+                type="gauge",
+                help="Open browsers.",
+                samples=[
+                    Sample(value=len(self.headless_browsers), labels={"headless": "true"}),
+                    Sample(value=len(self.browsers), labels={"headless": "false"}),
+                ],
+            ),
+            MetricFamily(
+                name="notte_pool_contexts",
+                type="gauge",
+                help="Open browser contexts, in use by a session or idle (warm or recycled).",
+                samples=[
+                    Sample(value=in_use, labels={"state": "in_use"}),
+                    Sample(value=nb_contexts - in_use, labels={"state": "idle"}),
+                ],
+            ),
+            MetricFamily(
+                name="notte_pool_sessions",
+                type="gauge",
+                help="Sessions holding a browser resource or waiting for one.",
+                samples=[
+                    Sample(value=pressure.active, labels={"state": "active"}),
+                    Sample(value=pressure.waiting, labels={"state": "waiting"}),
+                ],
+            ),
+            histogram_family(
+                "notte_pool_acquisition_wait_seconds",
+                "Time to get a browser resource (waiting for a slot and creating the context).",
+                self.metrics.acquisition_wait,
+            ),
+            MetricFamily(
+                name="notte_pool_acquisition_failures_total",
+                type="counter",
+                help="Sessions refused or timed out while waiting for a browser resource.",
+                samples=[Sample(value=self.metrics.acquisition_failures)],
+            ),
+            histogram_family(
+                "notte_pool_snapshot_latency_seconds",
+                "Time to take a snapshot of a page.",
+                self.metrics.snapshot_latency,
+            ),
+            MetricFamily(
+                name="notte_pool_browser_events_total",
+                type="counter",
+                help="Browsers launched, closed, crashed (see the supervisor) or restarted because of their memory.",
+                samples=[
+                    Sample(value=self.metrics.browsers_launched, labels={"event": "launched"}),
+                    Sample(value=self.metrics.browsers_closed, labels={"event": "closed"}),
+                    Sample(value=self.supervisor_stats.crashed_browsers, labels={"event": "crashed"}),
+                    Sample(value=self.metrics.browsers_drained, labels={"event": "drained"}),
+                ],
+            ),
+            MetricFamily(
+                name="notte_pool_context_events_total",
+                type="counter",
+                help="Contexts created, reaped (idle sessions) and handed out from the warm pool.",
+                samples=[
+                    Sample(value=self.metrics.contexts_created, labels={"event": "created"}),
+                    Sample(value=self.supervisor_stats.reaped_contexts, labels={"event": "reaped"}),
+                    Sample(value=self.warm_stats.hits, labels={"event": "warm_hit"}),
+                    Sample(value=self.warm_stats.misses, labels={"event": "warm_miss"}),
+                ],
+            ),
+            MetricFamily(
+                name="notte_pool_blocked_requests_total",
+                type="counter",
+                help="Requests blocked by the network profiles of the contexts.",
+                samples=[Sample(value=self.network_stats.requests_blocked)],
+            ),
+        ]
+        if pressure.capacity is not None:
+            families.append(
+                MetricFamily(
+                    name="notte_pool_sessions_capacity",
+                    type="gauge",
+                    help="Maximum number of concurrent sessions.",
+                    samples=[Sample(value=pressure.capacity)],
+                )
+            )
+        return families
+
+    def export_prometheus(self, labels: dict[str, str] | None = None) -> str:
+        """Metrics of the pool in the Prometheus text format (`labels` are added to every sample)."""
+        return render_prometheus(self.metric_families(), labels=labels)
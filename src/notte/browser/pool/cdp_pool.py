@@ -3,7 +3,7 @@ from enum import StrEnum
 
 from loguru import logger
 from patchright.async_api import Browser as PatchrightBrowser
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing_extensions import override
 
 from notte.browser.pool.base import (
@@ -12,6 +12,7 @@ from notte.browser.pool.base import (
     BrowserResourceOptions,
     BrowserWithContexts,
 )
+from notte.browser.pool.connections import CDPConnectionManager
 
 
 class CDPSession(BaseModel):
@@ -27,6 +28,12 @@ class BrowserEnum(StrEnum):
 class CDPBrowserPool(BaseBrowserPool, ABC):
     sessions: dict[str, CDPSession] = Field(default_factory=dict)
     last_session: CDPSession | None = Field(default=None)
+    # one connection per remote browser, shared by its contexts and reopened if it drops
+    _connections: CDPConnectionManager = PrivateAttr(default_factory=CDPConnectionManager)
+
+    @property
+    def connections(self) -> CDPConnectionManager:
+        return self._connections
 
     @property
     @abstractmethod
@@ -41,12 +48,14 @@ class CDPBrowserPool(BaseBrowserPool, ABC):
     async def create_playwright_browser(self, resource_options: BrowserResourceOptions) -> PatchrightBrowser:
         cdp_session = self.create_session_cdp(resource_options)
         self.last_session = cdp_session
+        return await self.connections.connect(cdp_session.cdp_url, lambda: self.open_connection(cdp_session.cdp_url))
 
+    async def open_connection(self, cdp_url: str) -> PatchrightBrowser:
         match self.browser_type:
             case BrowserEnum.CHROMIUM:
-                return await self.playwright.chromium.connect_over_cdp(cdp_session.cdp_url)
+                return await self.playwright.chromium.connect_over_cdp(cdp_url)
             case BrowserEnum.FIREFOX:
-                return await self.playwright.firefox.connect(cdp_session.cdp_url)
+                return await self.playwright.firefox.connect(cdp_url)
 
     @override
     async def create_browser(self, resource_options: BrowserResourceOptions) -> BrowserWithContexts:
@@ -54,8 +63,21 @@ class CDPBrowserPool(BaseBrowserPool, ABC):
         if self.last_session is None:
             raise ValueError("Last session is not set")
         self.sessions[browser.browser_id] = self.last_session
+        browser.cdp_url = self.last_session.cdp_url
         return browser
 
+    async def disconnect_browser(self, browser: BrowserWithContexts) -> None:
+        """Close the connection to the remote browser of `browser` (and stop reconnecting to it)."""
+        if browser.cdp_url is not None:
+            await self.connections.disconnect(browser.cdp_url)
+        else:
+            await browser.browser.close()
+
+    @override
+    async def stop(self) -> None:
+        await self.connections.close()
+        await super().stop()
+
 
 class SingleCDPBrowserPool(CDPBrowserPool):
     cdp_url: str | None = None
@@ -81,7 +103,7 @@ class SingleCDPBrowserPool(CDPBrowserPool):
     async def close_playwright_browser(self, browser: BrowserWithContexts, force: bool = True) -> bool:
         if self.config.verbose:
             logger.info(f"Closing CDP session for URL {browser.cdp_url}")
-        self.cdp_url = None
+        # the connection is kept open: the next session (e.g. after a reset of the window) attaches to it
+        # without a new handshake. It is closed with the pool (see `stop`).
         del self.sessions[browser.browser_id]
-        await self.stop()
         return True
@@ -0,0 +1,178 @@
+# Reuse of the (CDP) connections to remote browsers and of the CDP sessions of pages:
+# attaching to a remote browser or to a page costs a handshake that should only be paid once.
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from loguru import logger
+from patchright.async_api import Browser, CDPSession, Page
+from patchright.async_api import Error as PlaywrightError
+from pydantic import BaseModel
+
+BrowserOpener = Callable[[], Awaitable[Browser]]
+
+
+class ConnectionStats(BaseModel):
+    # new connections (including the reconnections)
+    connects: int = 0
+    # connections handed out again instead of connecting
+    reuses: int = 0
+    # connections dropped by the remote browser
+    drops: int = 0
+    reconnects: int = 0
+    # failed connection attempts
+    failures: int = 0
+
+
+class CDPConnectionManager:
+    """
+    Keeps one playwright connection per remote browser (by CDP url), shared by all the contexts created on it.
+
+    Connections are opened with retries (and exponential backoff). Connections dropped by the remote browser
+    are reopened in the background until `disconnect` is called.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        auto_reconnect: bool = True,
+        verbose: bool = False,
+    ) -> None:
+        self.max_retries: int = max_retries
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+        self.auto_reconnect: bool = auto_reconnect
+        self.verbose: bool = verbose
+        self.stats: ConnectionStats = ConnectionStats()
+        self._browsers: dict[str, Browser] = {}
+        # how to (re)open the connection of each url, until it is disconnected on purpose
+        self._openers: dict[str, BrowserOpener] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._reconnect_tasks: dict[str, asyncio.Task[None]] = {}
+
+    def is_connected(self, cdp_url: str) -> bool:
+        browser = self._browsers.get(cdp_url)
+        return browser is not None and browser.is_connected()
+
+    async def connect(self, cdp_url: str, opener: BrowserOpener) -> Browser:
+        """The connection to `cdp_url`, opened with `opener` if there is no live connection yet."""
+        self._openers[cdp_url] = opener
+        async with self._locks.setdefault(cdp_url, asyncio.Lock()):
+            browser = self._browsers.get(cdp_url)
+            if browser is not None and browser.is_connected():
+                self.stats.reuses += 1
+                return browser
+            browser = await self._open(cdp_url, opener)
+            self._browsers[cdp_url] = browser
+            browser.on("disconnected", lambda _: self._on_disconnected(cdp_url, browser))
+            return browser
+
+    async def _open(self, cdp_url: str, opener: BrowserOpener) -> Browser:
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                browser = await opener()
+                self.stats.connects += 1
+                return browser
+            except Exception as e:
+                self.stats.failures += 1
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(
+                    (
+                        f"Failed to connect to {cdp_url} (attempt {attempt + 1}/{self.max_retries + 1}): {e}. "
+                        f"Retrying in {delay:.1f}s..."
+                    )
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+        raise AssertionError("unreachable")
+
+    def _on_disconnected(self, cdp_url: str, browser: Browser) -> None:
+        if self._browsers.get(cdp_url) is not browser:
+            # replaced or disconnected on purpose
+            return
+        del self._browsers[cdp_url]
+        self.stats.drops += 1
+        logger.warning(f"Connection to {cdp_url} dropped")
+        if self.auto_reconnect and cdp_url in self._openers and cdp_url not in self._reconnect_tasks:
+            self._reconnect_tasks[cdp_url] = asyncio.create_task(self._reconnect(cdp_url))
+
+    async def _reconnect(self, cdp_url: str) -> None:
+        try:
+            opener = self._openers.get(cdp_url)
+            if opener is None:
+                return
+            _ = await self.connect(cdp_url, opener)
+            self.stats.reconnects += 1
+            if self.verbose:
+                logger.info(f"Reconnected to {cdp_url}")
+        except Exception as e:
+            logger.error(f"Failed to reconnect to {cdp_url}: {e}")
+        finally:
+            _ = self._reconnect_tasks.pop(cdp_url, None)
+
+    async def disconnect(self, cdp_url: str) -> None:
+        """Close the connection to `cdp_url` (contexts created on it are closed, the remote browser is not)."""
+        _ = self._openers.pop(cdp_url, None)
+        task = self._reconnect_tasks.pop(cdp_url, None)
+        if task is not None:
+            _ = task.cancel()
+        browser = self._browsers.pop(cdp_url, None)
+        if browser is not None and browser.is_connected():
+            try:
+                await browser.close()
+            except PlaywrightError as e:
+                logger.error(f"Failed to close connection to {cdp_url}: {e}")
+
+    async def close(self) -> None:
+        for cdp_url in list({*self._browsers, *self._openers}):
+            await self.disconnect(cdp_url)
+
+
+# CDP sessions (and target ids) of the pages, created once per page
+_page_sessions: WeakKeyDictionary[Page, CDPSession] = WeakKeyDictionary()
+_page_target_ids: WeakKeyDictionary[Page, str] = WeakKeyDictionary()
+
+
+def forget_page_cdp_session(page: Page) -> None:
+    _ = _page_sessions.pop(page, None)
+
+
+async def page_cdp_session(page: Page) -> CDPSession:
+    """CDP session attached to `page` (created on first use and reused until the page is closed)."""
+    session = _page_sessions.get(page)
+    if session is None:
+        session = await page.context.new_cdp_session(page)
+        page.on("close", forget_page_cdp_session)
+        _page_sessions[page] = session
+    return session
+
+
+async def send_page_command(page: Page, method: str, params: dict[str, Any] | None = None) -> Any:
+    """Send a CDP command to `page`, with a new session if the cached one was detached."""
+    session = await page_cdp_session(page)
+    try:
+        result: Any = await session.send(  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+            method, params
+        )
+    except PlaywrightError:
+        if page.is_closed():
+            raise
+        forget_page_cdp_session(page)
+        session = await page_cdp_session(page)
+        result = await session.send(method, params)  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+    return result
+
+
+async def page_target_id(page: Page) -> str:
+    """Id of the CDP target of `page` (stable for the lifetime of the page)."""
+    target_id = _page_target_ids.get(page)
+    if target_id is None:
+        info = await send_page_command(page, "Target.getTargetInfo")
+        target_id = str(info["targetInfo"]["targetId"])
+        _page_target_ids[page] = target_id
+    return target_id
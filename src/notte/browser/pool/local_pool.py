@@ -1,11 +1,13 @@
 import asyncio
 import datetime as dt
+import math
 import os
-from typing import Any, Self
+import time
+from typing import Any, ClassVar, Self
 
 from loguru import logger
 from patchright.async_api import Browser as PatchrightBrowser
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 from typing_extensions import override
 
 from notte.browser.pool.base import (
@@ -15,6 +17,15 @@ from notte.browser.pool.base import (
     BrowserResourceOptions,
     BrowserWithContexts,
 )
+from notte.browser.pool.memory import (
+    chromium_browser_pids,
+    is_chromium_browser_process,
+    kill_process_tree,
+    parent_pids,
+    proc_available,
+    process_tree_memory_mb,
+)
+from notte.browser.pool.metrics import MetricFamily, Sample, summary_family
 from notte.browser.pool.ports import PortManager
 from notte.common.config import FrozenConfig
 from notte.errors.browser import (
@@ -39,6 +50,18 @@ class MemoryBrowserPoolConfig(FrozenConfig):
         default_factory=lambda: float(os.getenv("MEMORY_SAFETY_MARGIN", "0.2"))
     )  # 20% by default
 
+    # Admission control on the measured memory of the browsers (see `LocalBrowserPool.admit`)
+    # no new context is created above this fraction of the available memory
+    high_water_mark: float = Field(default_factory=lambda: float(os.getenv("MEMORY_HIGH_WATER_MARK", "0.85")))
+    # seconds to wait for memory to be freed before refusing a new context (0 refuses immediately)
+    admission_timeout: float = Field(default_factory=lambda: float(os.getenv("MEMORY_ADMISSION_TIMEOUT", "0")))
+    # browsers using more memory (in MB) are drained and restarted (None disables the limit)
+    max_browser_memory: int | None = Field(
+        default_factory=lambda: int(value) if (value := os.getenv("MAX_BROWSER_MEMORY_MB")) is not None else None
+    )
+    # seconds during which a memory sample is reused
+    sample_interval: float = 1.0
+
     def get_available_memory(self) -> int:
         """Calculate total available memory for Playwright"""
         return self.container_memory - self.system_reserved
@@ -58,6 +81,9 @@ class MemoryBrowserPoolConfig(FrozenConfig):
     def calculate_contexts_per_browser(self) -> int:
         return int(self.calculate_max_contexts() / self.calculate_max_browsers())
 
+    def get_high_water_memory(self) -> float:
+        return self.get_available_memory() * self.high_water_mark
+
 
 class BrowserPoolConfig(FrozenConfig):
     memory: MemoryBrowserPoolConfig = MemoryBrowserPoolConfig()
@@ -68,6 +94,82 @@ class BrowserPoolConfig(FrozenConfig):
     viewport_width: int = 1280
     viewport_height: int = 1020  # Default in playright is 720
     custom_devtools_frontend: str | None = None
+    # see `BaseBrowserPoolConfig`
+    warm_contexts: int = 0
+    warm_browsers: int = 0
+    recycle_contexts: bool = False
+    max_context_reuse: int = 20
+    max_idle_contexts: int = 4
+    browser_idle_ttl: float = 0.0
+    max_sessions_per_tenant: int | None = None
+    max_waiting_sessions: int | None = None
+    acquisition_timeout: float | None = 30.0
+    supervisor_interval: float | None = None
+    context_idle_ttl: float | None = None
+    health_check_timeout: float = 5.0
+
+    def set_warm_pool(self: Self, contexts: int, browsers: int = 0) -> Self:
+        if contexts < 0 or browsers < 0:
+            raise ValueError("Warm pool sizes must be positive")
+        return self._copy_and_validate(warm_contexts=contexts, warm_browsers=browsers)
+
+    def set_recycle_contexts(
+        self: Self, value: bool = True, max_reuse: int = 20, browser_idle_ttl: float | None = None
+    ) -> Self:
+        if max_reuse <= 0:
+            raise ValueError("Maximum context reuse must be greater than 0")
+        return self._copy_and_validate(
+            recycle_contexts=value,
+            max_context_reuse=max_reuse,
+            browser_idle_ttl=browser_idle_ttl if browser_idle_ttl is not None else self.browser_idle_ttl,
+        )
+
+    def set_session_limits(
+        self: Self,
+        max_per_tenant: int | None = None,
+        max_waiting: int | None = None,
+        acquisition_timeout: float | None = 30.0,
+    ) -> Self:
+        return self._copy_and_validate(
+            max_sessions_per_tenant=max_per_tenant,
+            max_waiting_sessions=max_waiting,
+            acquisition_timeout=acquisition_timeout,
+        )
+
+    def set_supervisor(
+        self: Self,
+        interval: float | None = 30.0,
+        context_idle_ttl: float | None = None,
+        health_check_timeout: float = 5.0,
+    ) -> Self:
+        if interval is not None and interval <= 0:
+            raise ValueError("Supervisor interval must be greater than 0")
+        if context_idle_ttl is not None and context_idle_ttl <= 0:
+            raise ValueError("Context idle TTL must be greater than 0")
+        return self._copy_and_validate(
+            supervisor_interval=interval,
+            context_idle_ttl=context_idle_ttl,
+            health_check_timeout=health_check_timeout,
+        )
+
+    def shard(self: Self, index: int, nb_shards: int) -> Self:
+        """
+        Configuration of the `index`-th of `nb_shards` pools splitting the memory, browsers and debug ports
+        of this configuration (see `ShardedBrowserPool`).
+        """
+        if nb_shards <= 0 or not 0 <= index < nb_shards:
+            raise ValueError(f"Invalid shard {index} of {nb_shards} shards")
+        max_browsers = math.ceil(self.get_max_browsers() / nb_shards)
+        return self._copy_and_validate(
+            memory=self.memory._copy_and_validate(
+                container_memory=self.memory.container_memory // nb_shards,
+                system_reserved=self.memory.system_reserved // nb_shards,
+            ),
+            max_browsers=max_browsers,
+            max_total_contexts=max_browsers * self.get_contexts_per_browser(),
+            # disjoint port ranges: shards do not compete for the same ports
+            base_debug_port=self.base_debug_port + index * max_browsers,
+        )
 
     def disable_web_security(self: Self) -> Self:
         return self._copy_and_validate(web_security=False)
@@ -134,7 +236,12 @@ class BrowserPoolConfig(FrozenConfig):
 
 
 class LocalBrowserPool(BaseBrowserPool):
+    ADMISSION_POLL_INTERVAL_SECONDS: ClassVar[float] = 0.5
+
     local_config: BrowserPoolConfig = Field(default_factory=BrowserPoolConfig)
+    # launches are serialized to identify the process of each browser
+    _launch_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+    _memory_sample: tuple[float, dict[str, float]] | None = PrivateAttr(default=None)
 
     @override
     def model_post_init(self, __context: Any):
@@ -147,6 +254,20 @@ class LocalBrowserPool(BaseBrowserPool):
             viewport_width=self.local_config.viewport_width,
             viewport_height=self.local_config.viewport_height,
             verbose=self.local_config.verbose,
+            warm_contexts=self.local_config.warm_contexts,
+            warm_browsers=self.local_config.warm_browsers,
+            recycle_contexts=self.local_config.recycle_contexts,
+            max_context_reuse=self.local_config.max_context_reuse,
+            max_idle_contexts=self.local_config.max_idle_contexts,
+            browser_idle_ttl=self.local_config.browser_idle_ttl,
+            # sessions over the capacity of the browsers wait instead of failing
+            max_sessions=self.local_config.get_max_browsers() * self.local_config.get_contexts_per_browser(),
+            max_sessions_per_tenant=self.local_config.max_sessions_per_tenant,
+            max_waiting_sessions=self.local_config.max_waiting_sessions,
+            acquisition_timeout=self.local_config.acquisition_timeout,
+            supervisor_interval=self.local_config.supervisor_interval,
+            context_idle_ttl=self.local_config.context_idle_ttl,
+            health_check_timeout=self.local_config.health_check_timeout,
         )
         if self.local_config.verbose:
             logger.info(
@@ -169,6 +290,99 @@ class LocalBrowserPool(BaseBrowserPool):
             "open_contexts": sum(len(browser.contexts) for browser in self.available_browsers().values()),
         }
 
+    def estimate_browser_memory(self, browser: BrowserWithContexts) -> float:
+        return self.local_config.estimate_memory_usage(n_contexts=len(browser.contexts), n_browsers=1)
+
+    def measure_memory(self, refresh: bool = False) -> dict[str, float]:
+        """
+        Memory (in MB) used by each browser, i.e. by its whole process tree (renderers, gpu, ...).
+
+        Browsers whose process is unknown (e.g. without /proc) fall back to the static estimates of `MemoryBrowserPoolConfig`.
+        """
+        now = time.monotonic()
+        # samples are reused until they expire or browsers are launched / closed
+        if (
+            not refresh
+            and self._memory_sample is not None
+            and now - self._memory_sample[0] < self.local_config.memory.sample_interval
+            and self._memory_sample[1].keys() == self.available_browsers().keys()
+        ):
+            return self._memory_sample[1]
+        parents = parent_pids() if proc_available() else None
+        usage: dict[str, float] = {}
+        for browser_id, browser in self.available_browsers().items():
+            if browser.pid is not None and parents is not None and browser.pid in parents:
+                usage[browser_id] = process_tree_memory_mb(browser.pid, parents)
+            else:
+                usage[browser_id] = self.estimate_browser_memory(browser)
+        self._memory_sample = (now, usage)
+        return usage
+
+    async def drain_oversized_browsers(self, usage: dict[str, float]) -> None:
+        max_memory = self.local_config.memory.max_browser_memory
+        if max_memory is None:
+            return
+        for browser_id, browser in list(self.available_browsers().items()):
+            if not browser.draining and usage.get(browser_id, 0.0) > max_memory:
+                logger.warning(
+                    f"Browser {browser_id} uses {usage[browser_id]:.0f}MB (limit: {max_memory}MB). Draining it..."
+                )
+                await self.drain_browser(browser)
+
+    async def admit(self) -> None:
+        """
+        Wait until the measured memory of the browsers is below the high-water mark.
+
+        Raises `BrowserResourceLimitError` if it is still above after `memory.admission_timeout` seconds.
+        """
+        deadline = time.monotonic() + self.local_config.memory.admission_timeout
+        high_water = self.local_config.memory.get_high_water_memory()
+        while True:
+            usage = self.measure_memory()
+            await self.drain_oversized_browsers(usage)
+            total = sum(usage.values())
+            if total < high_water:
+                return
+            if time.monotonic() >= deadline:
+                raise BrowserResourceLimitError(
+                    f"Browsers use {total:.0f}MB of memory, above the high-water mark ({high_water:.0f}MB)"
+                )
+            if self.local_config.verbose:
+                logger.info(f"Browsers use {total:.0f}MB of memory (high-water mark: {high_water:.0f}MB). Waiting...")
+            await asyncio.sleep(self.ADMISSION_POLL_INTERVAL_SECONDS)
+            _ = self.measure_memory(refresh=True)
+
+    @override
+    async def create_browser_resource(self, resource_options: BrowserResourceOptions) -> BrowserResource:
+        await self.admit()
+        return await super().create_browser_resource(resource_options)
+
+    @override
+    async def get_or_create_browser(self, resource_options: BrowserResourceOptions) -> BrowserWithContexts:
+        """Place new contexts on the browser using the least memory"""
+        browsers = [
+            browser
+            for browser in self.available_browsers(resource_options.headless).values()
+            if not browser.draining and browser.nb_contexts < self.config.contexts_per_browser
+        ]
+        if len(browsers) == 0:
+            return await super().get_or_create_browser(resource_options)
+        usage = self.measure_memory()
+        return min(browsers, key=lambda browser: usage.get(browser.browser_id, 0.0))
+
+    @override
+    async def create_browser(self, resource_options: BrowserResourceOptions) -> BrowserWithContexts:
+        async with self._launch_lock:
+            before = chromium_browser_pids() if proc_available() else set[int]()
+            browser = await super().create_browser(resource_options)
+            if proc_available():
+                launched = chromium_browser_pids() - before
+                if len(launched) == 1:
+                    browser.pid = launched.pop()
+                elif self.local_config.verbose:
+                    logger.warning(f"Could not identify the process of browser {browser.browser_id}")
+        return browser
+
     def check_memory_usage(self) -> dict[str, float]:
         """Monitor memory usage of browser contexts"""
         stats = self.check_sessions()
@@ -185,10 +399,35 @@ class LocalBrowserPool(BaseBrowserPool):
             "container_memory_mb": self.local_config.memory.container_memory,
             "available_memory_mb": available_memory,
             "estimated_memory_mb": estimated_memory,
+            "measured_memory_mb": sum(self.measure_memory().values()),
+            "high_water_memory_mb": self.local_config.memory.get_high_water_memory(),
             "memory_usage_percentage": (estimated_memory / available_memory) * 100,
             "contexts_remaining": self.local_config.get_max_contexts() - stats["open_contexts"],
         }
 
+    @override
+    def metric_families(self) -> list[MetricFamily]:
+        memory = self.measure_memory()
+        return [
+            *super().metric_families(),
+            # browser ids are not used as labels: each restarted browser would create a new series
+            summary_family(
+                name="notte_pool_browser_memory_mb",
+                help="Memory used by the process tree of the browsers (static estimate if the process is unknown).",
+                values=list(memory.values()),
+            ),
+            MetricFamily(
+                name="notte_pool_memory_mb",
+                type="gauge",
+                help="Memory used by all the browsers, available to them and admission threshold.",
+                samples=[
+                    Sample(value=sum(memory.values()), labels={"kind": "used"}),
+                    Sample(value=self.local_config.memory.get_available_memory(), labels={"kind": "available"}),
+                    Sample(value=self.local_config.memory.get_high_water_memory(), labels={"kind": "high_water"}),
+                ],
+            ),
+        ]
+
     @override
     async def create_playwright_browser(self, resource_options: BrowserResourceOptions) -> PatchrightBrowser:
         """Get an existing browser or create a new one if needed"""
@@ -239,7 +478,16 @@ class LocalBrowserPool(BaseBrowserPool):
                 return True
         except Exception as e:
             logger.error(f"Failed to close window: {e}")
-        return False
+        return self.kill_browser(browser)
+
+    def kill_browser(self, browser: BrowserWithContexts) -> bool:
+        """Kill the process tree of a browser that could not be closed (e.g. hung). Returns whether it was killed."""
+        # the pid is checked first: the process could have exited (and its pid been reused)
+        if browser.pid is None or not is_chromium_browser_process(browser.pid):
+            return False
+        killed = kill_process_tree(browser.pid)
+        logger.warning(f"Killed browser {browser.browser_id} ({len(killed)} processes)")
+        return len(killed) > 0
 
     async def cleanup(self, except_resources: list[BrowserResource] | None = None, force: bool = True) -> None:
         """Cleanup all browser instances"""
@@ -288,7 +536,8 @@ class LocalBrowserPool(BaseBrowserPool):
                                 browser_id=browser.browser_id,
                                 context_id=context_id,
                                 resource_options=browser.resource_options,
-                            )
+                            ),
+                            recycle=False,
                         )
                 if len(browser.contexts) == 0:
                     await self.release_browser(browser)
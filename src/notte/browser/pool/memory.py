@@ -0,0 +1,107 @@
+# memory usage of the chromium processes launched by the pool, sampled from /proc (i.e. Linux only)
+import os
+import signal
+from pathlib import Path
+
+PROC = Path("/proc")
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text()
+    except OSError:
+        # the process exited or /proc is not available
+        return None
+
+
+def proc_available() -> bool:
+    return (PROC / "self" / "stat").exists()
+
+
+def parent_pids() -> dict[int, int]:
+    """Parent pid of every running process."""
+    parents: dict[int, int] = {}
+    for entry in PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        stat = _read(entry / "stat")
+        if stat is None:
+            continue
+        # the command name (2nd field) may contain spaces and parentheses
+        fields = stat[stat.rfind(")") + 2 :].split()
+        parents[int(entry.name)] = int(fields[1])
+    return parents
+
+
+def descendants(pid: int, parents: dict[int, int] | None = None) -> list[int]:
+    """`pid` and all its (recursive) children."""
+    parents = parents if parents is not None else parent_pids()
+    children: dict[int, list[int]] = {}
+    for child, parent in parents.items():
+        children.setdefault(parent, []).append(child)
+    tree: list[int] = []
+    stack = [pid]
+    while len(stack) > 0:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def is_chromium_browser_process(pid: int) -> bool:
+    """Whether `pid` is the main process of a chromium browser (renderer, gpu, ... processes have a `--type` flag)."""
+    cmdline = _read(PROC / str(pid) / "cmdline")
+    if cmdline is None:
+        return False
+    args = cmdline.split("\0")
+    executable = os.path.basename(args[0]).lower()
+    if "chrom" not in executable and "headless_shell" not in executable:
+        return False
+    return not any(arg.startswith("--type=") for arg in args)
+
+
+def chromium_browser_pids(root: int | None = None) -> set[int]:
+    """Pids of the chromium browsers launched (directly or not) by `root` (defaults to the current process)."""
+    parents = parent_pids()
+    root = root if root is not None else os.getpid()
+    return {pid for pid in descendants(root, parents) if pid != root and is_chromium_browser_process(pid)}
+
+
+def process_memory_mb(pid: int) -> float:
+    """
+    Memory used by `pid` in MB.
+
+    Uses the proportional set size when available so that pages shared between the chromium processes are not
+    counted multiple times, the resident set size otherwise.
+    """
+    rollup = _read(PROC / str(pid) / "smaps_rollup")
+    key = "Pss:"
+    content = rollup
+    if content is None:
+        content = _read(PROC / str(pid) / "status")
+        key = "VmRSS:"
+    if content is None:
+        return 0.0
+    for line in content.splitlines():
+        if line.startswith(key):
+            return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def process_tree_memory_mb(pid: int, parents: dict[int, int] | None = None) -> float:
+    """Memory used by `pid` and all its children in MB."""
+    return sum(process_memory_mb(child) for child in descendants(pid, parents))
+
+
+def kill_process_tree(pid: int) -> list[int]:
+    """SIGKILL `pid` and all its children (e.g. a hung browser). Returns the pids that were killed."""
+    # children are listed before `pid` is killed (they are re-parented afterwards)
+    tree = descendants(pid) if proc_available() else [pid]
+    killed: list[int] = []
+    for process in tree:
+        try:
+            os.kill(process, signal.SIGKILL)
+            killed.append(process)
+        except (ProcessLookupError, PermissionError):
+            pass
+    return killed
@@ -0,0 +1,140 @@
+# Metrics of the browser pools, exported in the Prometheus text format (see `BaseBrowserPool.export_prometheus`)
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+# in seconds: from a warm context handed out immediately to sessions waiting for a full pool
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PROMETHEUS_CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+MetricType = Literal["counter", "gauge", "histogram"]
+
+
+class Histogram(BaseModel):
+    buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    # observations per bucket (not cumulative), the last one counts the observations above all the buckets
+    counts: list[int] = Field(default_factory=list)
+    sum: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        if len(self.counts) == 0:
+            self.counts = [0] * (len(self.buckets) + 1)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> list[tuple[float, int]]:
+        """Number of observations lower than each bucket bound (the last bound is +inf)."""
+        counts = self.counts or [0] * (len(self.buckets) + 1)
+        total = 0
+        cumulative: list[tuple[float, int]] = []
+        for bound, count in zip([*self.buckets, math.inf], counts):
+            total += count
+            cumulative.append((bound, total))
+        return cumulative
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count > 0 else 0.0
+
+
+class PoolMetrics(BaseModel):
+    # seconds spent in `get_browser_resource` (waiting for a slot and creating / taking the context)
+    acquisition_wait: Histogram = Field(default_factory=Histogram)
+    # sessions refused (queue full) or timed out while waiting for a resource
+    acquisition_failures: int = 0
+    # seconds taken by `BrowserWindow.snapshot`
+    snapshot_latency: Histogram = Field(default_factory=Histogram)
+    browsers_launched: int = 0
+    browsers_closed: int = 0
+    # browsers restarted because they used too much memory (see `BaseBrowserPool.drain_browser`)
+    browsers_drained: int = 0
+    contexts_created: int = 0
+
+
+@dataclass
+class Sample:
+    value: float
+    labels: dict[str, str] = field(default_factory=dict)
+    # e.g. `_bucket`, `_sum` and `_count` for histograms
+    suffix: str = ""
+
+
+@dataclass
+class MetricFamily:
+    name: str
+    type: MetricType
+    help: str
+    samples: list[Sample] = field(default_factory=list)
+
+
+def histogram_family(name: str, help: str, histogram: Histogram, labels: dict[str, str] | None = None) -> MetricFamily:
+    labels = labels or {}
+    samples = [
+        Sample(value=count, labels={**labels, "le": format_value(bound)}, suffix="_bucket")
+        for bound, count in histogram.cumulative_counts()
+    ]
+    samples.append(Sample(value=histogram.sum, labels=labels, suffix="_sum"))
+    samples.append(Sample(value=histogram.count, labels=labels, suffix="_count"))
+    return MetricFamily(name=name, type="histogram", help=help, samples=samples)
+
+
+def quantile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank `q`-quantile of `values` (0 if empty)."""
+    if len(values) == 0:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def summary_family(name: str, help: str, values: Sequence[float]) -> MetricFamily:
+    """Distribution of `values` as a gauge per statistic (i.e. bounded cardinality, unlike a series per value)."""
+    return MetricFamily(
+        name=name,
+        type="gauge",
+        help=help,
+        samples=[
+            Sample(value=min(values, default=0.0), labels={"stat": "min"}),
+            Sample(value=quantile(values, 0.5), labels={"stat": "p50"}),
+            Sample(value=quantile(values, 0.95), labels={"stat": "p95"}),
+            Sample(value=max(values, default=0.0), labels={"stat": "max"}),
+        ],
+    )
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    if len(labels) == 0:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def render_prometheus(families: Sequence[MetricFamily], labels: dict[str, str] | None = None) -> str:
+    """Prometheus text exposition format of `families` (`labels` are added to every sample)."""
+    lines: list[str] = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help.replace(chr(10), ' ')}")
+        lines.append(f"# TYPE {family.name} {family.type}")
+        for sample in family.samples:
+            sample_labels = {**(labels or {}), **sample.labels}
+            lines.append(f"{family.name}{sample.suffix}{format_labels(sample_labels)} {format_value(sample.value)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,226 @@
+from enum import StrEnum
+from typing import ClassVar, Self
+from urllib.parse import urlparse
+
+from loguru import logger
+from patchright.async_api import BrowserContext, Response, Route
+from patchright.async_api import Error as PlaywrightError
+from pydantic import BaseModel, Field, computed_field
+
+from notte.common.config import FrozenConfig
+
+# analytics, ads and session-replay providers (subdomains are matched as well)
+TRACKER_DOMAINS: frozenset[str] = frozenset(
+    {
+        "google-analytics.com",
+        "googletagmanager.com",
+        "googleadservices.com",
+        "googlesyndication.com",
+        "doubleclick.net",
+        "adservice.google.com",
+        "connect.facebook.net",
+        "analytics.tiktok.com",
+        "ads-twitter.com",
+        "bat.bing.com",
+        "clarity.ms",
+        "hotjar.com",
+        "fullstory.com",
+        "segment.io",
+        "segment.com",
+        "mixpanel.com",
+        "amplitude.com",
+        "heap.io",
+        "scorecardresearch.com",
+        "quantserve.com",
+        "criteo.com",
+        "criteo.net",
+        "taboola.com",
+        "outbrain.com",
+        "adnxs.com",
+        "amazon-adsystem.com",
+    }
+)
+
+
+def match_domain(host: str, domains: frozenset[str]) -> bool:
+    """Whether `host` is one of `domains` or one of their subdomains."""
+    host = host.lower().rstrip(".")
+    while True:
+        if host in domains:
+            return True
+        _, dot, parent = host.partition(".")
+        if not dot:
+            return False
+        host = parent
+
+
+class NetworkProfileName(StrEnum):
+    FULL = "full"
+    NO_MEDIA = "no-media"
+    TEXT_ONLY = "text-only"
+    BLOCK_TRACKERS = "block-trackers"
+
+
+class NetworkProfile(FrozenConfig):
+    """
+    Requests that the browser should not perform.
+
+    Domains in `allow_domains` are never blocked, domains in `deny_domains` are always blocked
+    (both include their subdomains). Other requests are blocked by resource type
+    (see playwright's `Request.resource_type`) and, if `block_trackers` is set, by `TRACKER_DOMAINS`.
+    """
+
+    name: str = NetworkProfileName.FULL.value
+    blocked_resource_types: frozenset[str] = frozenset()
+    block_trackers: bool = False
+    allow_domains: frozenset[str] = frozenset()
+    deny_domains: frozenset[str] = frozenset()
+
+    @classmethod
+    def full(cls) -> Self:
+        return cls()
+
+    @classmethod
+    def no_media(cls) -> Self:
+        return cls(name=NetworkProfileName.NO_MEDIA.value, blocked_resource_types=frozenset({"image", "media"}))
+
+    @classmethod
+    def text_only(cls) -> Self:
+        # stylesheets are blocked as well: visibility of the DOM nodes might differ from the rendered page
+        return cls(
+            name=NetworkProfileName.TEXT_ONLY.value,
+            blocked_resource_types=frozenset({"image", "media", "font", "stylesheet"}),
+            block_trackers=True,
+        )
+
+    @classmethod
+    def trackers(cls) -> Self:
+        return cls(name=NetworkProfileName.BLOCK_TRACKERS.value, block_trackers=True)
+
+    @classmethod
+    def from_name(cls, name: NetworkProfileName | str) -> Self:
+        match NetworkProfileName(name):
+            case NetworkProfileName.FULL:
+                return cls.full()
+            case NetworkProfileName.NO_MEDIA:
+                return cls.no_media()
+            case NetworkProfileName.TEXT_ONLY:
+                return cls.text_only()
+            case NetworkProfileName.BLOCK_TRACKERS:
+                return cls.trackers()
+
+    def set_allow_domains(self: Self, *domains: str) -> Self:
+        return self._copy_and_validate(allow_domains=frozenset(domain.lower() for domain in domains))
+
+    def set_deny_domains(self: Self, *domains: str) -> Self:
+        return self._copy_and_validate(deny_domains=frozenset(domain.lower() for domain in domains))
+
+    @property
+    def blocks_requests(self) -> bool:
+        return len(self.blocked_resource_types) > 0 or self.block_trackers or len(self.deny_domains) > 0
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        host = urlparse(url).hostname
+        if host is None:
+            # data:, blob:, about: urls
+            return False
+        if match_domain(host, self.allow_domains):
+            return False
+        if match_domain(host, self.deny_domains):
+            return True
+        if resource_type in self.blocked_resource_types:
+            return True
+        return self.block_trackers and match_domain(host, TRACKER_DOMAINS)
+
+
+class NetworkStats(BaseModel):
+    """
+    Requests blocked by a `NetworkProfile`.
+
+    Blocked responses are never downloaded, so the bytes they would have cost can only be estimated: the estimate
+    of a resource type is the mean `content-length` of the responses of this type that were allowed (i.e. measured
+    on the same pages), or a typical transfer size if none was measured (e.g. images with the `no-media` profile).
+    """
+
+    # typical transfer size (in bytes) of a response per resource type
+    ESTIMATED_RESOURCE_BYTES: ClassVar[dict[str, int]] = {
+        "image": 20_000,
+        "media": 500_000,
+        "font": 30_000,
+        "stylesheet": 15_000,
+        "script": 25_000,
+        "xhr": 5_000,
+        "fetch": 5_000,
+        "document": 30_000,
+    }
+    DEFAULT_RESOURCE_BYTES: ClassVar[int] = 5_000
+
+    requests_allowed: int = 0
+    requests_blocked: int = 0
+    blocked_by_type: dict[str, int] = Field(default_factory=dict)
+    # `content-length` of the allowed responses (and number of responses with one) per resource type
+    measured_bytes_by_type: dict[str, int] = Field(default_factory=dict)
+    measured_responses_by_type: dict[str, int] = Field(default_factory=dict)
+
+    def record(self, resource_type: str, blocked: bool) -> None:
+        if not blocked:
+            self.requests_allowed += 1
+            return
+        self.requests_blocked += 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+
+    def record_response(self, resource_type: str, content_length: int) -> None:
+        self.measured_bytes_by_type[resource_type] = self.measured_bytes_by_type.get(resource_type, 0) + content_length
+        self.measured_responses_by_type[resource_type] = self.measured_responses_by_type.get(resource_type, 0) + 1
+
+    def estimated_bytes_per_request(self, resource_type: str) -> int:
+        responses = self.measured_responses_by_type.get(resource_type, 0)
+        if responses > 0:
+            return self.measured_bytes_by_type[resource_type] // responses
+        return self.ESTIMATED_RESOURCE_BYTES.get(resource_type, self.DEFAULT_RESOURCE_BYTES)
+
+    @computed_field
+    def estimated_bytes_saved(self) -> int:
+        """Estimate (not a measure) of the bytes not downloaded thanks to the blocked requests."""
+        return sum(
+            count * self.estimated_bytes_per_request(resource_type)
+            for resource_type, count in self.blocked_by_type.items()
+        )
+
+
+class NetworkInterceptor:
+    """Applies a `NetworkProfile` to every request of a browser context."""
+
+    def __init__(self, profile: NetworkProfile, *stats: NetworkStats, verbose: bool = False) -> None:
+        self.profile: NetworkProfile = profile
+        # per context stats, followed by the aggregated stats of the pool
+        self.stats: tuple[NetworkStats, ...] = stats if len(stats) > 0 else (NetworkStats(),)
+        self.verbose: bool = verbose
+
+    async def install(self, context: BrowserContext) -> None:
+        # note: routing disables the http cache of the context
+        _ = await context.route("**/*", self.handle)
+        context.on("response", self.on_response)
+
+    def on_response(self, response: Response) -> None:
+        # transfer size of the allowed responses (calibrates the estimate of the blocked ones)
+        content_length = response.headers.get("content-length")
+        if content_length is None or not content_length.isdigit():
+            return
+        for stats in self.stats:
+            stats.record_response(response.request.resource_type, int(content_length))
+
+    async def handle(self, route: Route) -> None:
+        request = route.request
+        blocked = self.profile.should_block(request.url, request.resource_type)
+        for stats in self.stats:
+            stats.record(request.resource_type, blocked)
+        try:
+            if blocked:
+                await route.abort("blockedbyclient")
+            else:
+                await route.continue_()
+        except PlaywrightError as e:
+            # the page (or context) was closed while the request was intercepted
+            if self.verbose:
+                logger.debug(f"Failed to route request '{request.url}': {e}")
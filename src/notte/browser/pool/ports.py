@@ -1,6 +1,10 @@
+import os
+import sys
+import tempfile
 import threading
 from collections import deque
 from dataclasses import dataclass
+from pathlib import Path
 from typing import final
 
 from notte.utils.singleton import Singleton
@@ -12,9 +16,20 @@ class PortRange:
     end: int
 
 
+def default_lock_dir() -> Path:
+    return Path(os.getenv("NOTTE_PORT_LOCK_DIR", str(Path(tempfile.gettempdir()) / "notte-ports")))
+
+
 @final
 class PortManager(metaclass=Singleton):
-    def reset(self, start: int, nb: int) -> None:
+    """
+    Debug ports of the browsers launched by the pools.
+
+    Ports are also locked (with one lock file per port) for the other processes of the machine, e.g. the shards of a
+    `ShardedBrowserPool`. The locks are released by the OS if the process dies.
+    """
+
+    def reset(self, start: int, nb: int, lock_dir: Path | None = None) -> None:
         if nb <= 0:
             raise ValueError("Number of ports must be greater than 0")
         if start < 0:
@@ -24,6 +39,8 @@ class PortManager(metaclass=Singleton):
             raise ValueError("Port range already set. PortManager is already initialized.")
         self.port_range = port_range
         self._available_ports = deque(range(self.port_range.start, self.port_range.end + 1))
+        self._lock_dir = lock_dir or default_lock_dir()
+        self._lock_dir.mkdir(parents=True, exist_ok=True)
 
     def __init__(self) -> None:
         """Initialize the port manager with a range of ports.
@@ -35,6 +52,30 @@ class PortManager(metaclass=Singleton):
         self._available_ports: deque[int] = deque()
         self._lock: threading.Lock = threading.Lock()
         self.port_range: PortRange | None = None
+        self._lock_dir: Path = default_lock_dir()
+        # file descriptors of the lock files of the ports used by this process
+        self._port_locks: dict[int, int] = {}
+
+    def _lock_port(self, port: int) -> bool:
+        """Lock `port` for the other processes. Returns False if another process uses it."""
+        fd = os.open(self._lock_dir / f"port-{port}.lock", os.O_CREAT | os.O_RDWR, 0o666)
+        if sys.platform != "win32":
+            import fcntl
+
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        # no file locks on windows: ports are only managed within the process
+        self._port_locks[port] = fd
+        return True
+
+    def _unlock_port(self, port: int) -> None:
+        fd = self._port_locks.pop(port, None)
+        if fd is not None:
+            # closing the file releases the lock
+            os.close(fd)
 
     def acquire_port(self) -> int | None:
         """Get next available port from the pool.
@@ -45,12 +86,14 @@ class PortManager(metaclass=Singleton):
         if self.port_range is None:
             raise ValueError("PortManager is not initialized. Call reset() first.")
         with self._lock:
-            if not self._available_ports:
-                return None
-
-            port = self._available_ports.popleft()
-            self._used_ports.add(port)
-            return port
+            for _ in range(len(self._available_ports)):
+                port = self._available_ports.popleft()
+                if self._lock_port(port):
+                    self._used_ports.add(port)
+                    return port
+                # used by another process: tried again after the other ports
+                self._available_ports.append(port)
+            return None
 
     def release_port(self, port: int) -> None:
         """Release a port back to the pool.
@@ -66,11 +109,13 @@ class PortManager(metaclass=Singleton):
         if not (self.port_range.start <= port <= self.port_range.end):
             raise ValueError(f"Port {port} is outside valid range {self.port_range}")
 
-        if port not in self._used_ports:
-            raise ValueError(f"Port {port} is not currently in use")
+        with self._lock:
+            if port not in self._used_ports:
+                raise ValueError(f"Port {port} is not currently in use")
 
-        self._used_ports.remove(port)
-        self._available_ports.append(port)
+            self._used_ports.remove(port)
+            self._unlock_port(port)
+            self._available_ports.append(port)
 
     def is_initialized(self) -> bool:
         return self.port_range is not None
@@ -94,7 +139,14 @@ class PortManager(metaclass=Singleton):
         Returns:
             True if the port is available, False otherwise
         """
-        return port in self._available_ports
+        with self._lock:
+            if port not in self._available_ports:
+                return False
+            # not used by another process either
+            if not self._lock_port(port):
+                return False
+            self._unlock_port(port)
+            return True
 
 
 def get_port_manager() -> PortManager | None:
@@ -0,0 +1,57 @@
+from typing import Any
+from urllib.parse import urlparse
+
+from loguru import logger
+from patchright.async_api import BrowserContext, Page
+from patchright.async_api import Error as PlaywrightError
+
+from notte.browser.pool.connections import page_cdp_session
+
+# permissions granted to every context created by the pool
+# (needed for clipboard copy/paste to respect tabs / new lines)
+CONTEXT_PERMISSIONS: list[str] = ["clipboard-read", "clipboard-write"]
+
+
+def request_origin(url: str) -> str | None:
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or parsed.netloc == "":
+        return None
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+async def clear_origins_storage(page: Page, origins: set[str]) -> None:
+    """Clear the storage (local / session storage, indexedDB, cache storage, service workers) of `origins`."""
+    if len(origins) == 0:
+        return
+    try:
+        session = await page_cdp_session(page)
+    except PlaywrightError:
+        # not a chromium browser
+        logger.warning("CDP is not available: the storage of the recycled context is not cleared")
+        return
+    for origin in origins:
+        _: Any = await session.send(  # pyright: ignore[reportUnknownMemberType, reportUnknownVariableType]
+            "Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"}
+        )
+
+
+async def reset_context(context: BrowserContext, origins: set[str]) -> Page:
+    """
+    Reset `context` in place so that it can be handed out to another session.
+
+    Cookies, permissions and the storage of the visited `origins` are cleared. All the pages are closed and
+    replaced by a new (blank) page, returned: a recycled page would keep the navigation history of the previous
+    session (e.g. reachable with `page.go_back()`).
+    """
+    old_pages = context.pages
+    # opened first: the context is never left without page
+    page = await context.new_page()
+    # leave the visited documents first: scripts could otherwise write the storage again
+    for old_page in old_pages:
+        await old_page.close()
+    await clear_origins_storage(page, origins)
+    origins.clear()
+    await context.clear_cookies()
+    await context.clear_permissions()
+    await context.grant_permissions(CONTEXT_PERMISSIONS)
+    return page
@@ -0,0 +1,440 @@
+# Sharded browser pool: sessions are spread over worker processes that each own a `LocalBrowserPool`
+# (with its playwright driver) and an event loop, so that the python-side work of the sessions
+# (DOM parsing, snapshot processing, LLM response parsing, ...) does not contend on a single core.
+import asyncio
+import itertools
+import multiprocessing
+import os
+import pickle
+import threading
+import uuid
+from collections.abc import Callable
+from multiprocessing.connection import Connection
+from multiprocessing.context import SpawnContext, SpawnProcess
+from typing import TYPE_CHECKING, Any, Self, Unpack, cast
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from notte.browser.observation import Observation
+from notte.browser.pool.base import BaseBrowserPool
+from notte.browser.pool.local_pool import BrowserPoolConfig, LocalBrowserPool
+from notte.common.config import FrozenConfig
+from notte.common.resource import AsyncResource
+from notte.controller.actions import BaseAction
+from notte.errors.browser import BrowserPoolNotStartedError, BrowserShardError
+from notte.sdk.types import PaginationParamsDict, ScrapeParamsDict
+
+if TYPE_CHECKING:
+    # the environment (and its LLM stack) is only imported by the worker processes that run it
+    from notte.env import NotteEnvConfig, ScrapeAndObserveParamsDict
+
+PoolFactory = Callable[[BrowserPoolConfig], BaseBrowserPool]
+EnvFactory = Callable[["NotteEnvConfig | None", BaseBrowserPool], AsyncResource]
+
+# methods of the environments that can be called through a `ShardedEnv`
+PROXIED_METHODS: frozenset[str] = frozenset({"goto", "observe", "execute", "act", "step", "scrape", "god", "reset"})
+# id of the message sent by a worker once its pool is started
+READY_REQUEST_ID: int = 0
+
+
+def local_pool_factory(config: BrowserPoolConfig) -> BaseBrowserPool:
+    return LocalBrowserPool(local_config=config)
+
+
+def notte_env_factory(config: "NotteEnvConfig | None", pool: BaseBrowserPool) -> AsyncResource:
+    from notte.env import NotteEnv
+
+    return NotteEnv(config=config, pool=pool)
+
+
+def dump_error(error: Exception) -> tuple[str, Any]:
+    try:
+        return ("pickled", pickle.dumps(error))
+    except Exception:
+        return ("message", f"{type(error).__name__}: {error}")
+
+
+def load_error(shard_id: int, payload: tuple[str, Any]) -> Exception:
+    kind, value = payload
+    if kind == "pickled":
+        try:
+            error = pickle.loads(value)
+            if isinstance(error, Exception):
+                return error
+        except Exception:
+            pass
+        return BrowserShardError(shard_id, "unreadable error raised by the worker process")
+    return BrowserShardError(shard_id, str(value))
+
+
+class ShardWorker:
+    """Serves the sessions of one shard, in its own process (see `run_shard`)."""
+
+    def __init__(self, shard_id: int, conn: Connection, pool: BaseBrowserPool, env_factory: EnvFactory) -> None:
+        self.shard_id: int = shard_id
+        self.conn: Connection = conn
+        self.pool: BaseBrowserPool = pool
+        self.env_factory: EnvFactory = env_factory
+        self.envs: dict[str, AsyncResource] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def serve(self) -> None:
+        await self.pool.start()
+        self.conn.send((READY_REQUEST_ID, True, os.getpid()))
+        try:
+            while True:
+                try:
+                    message = await asyncio.to_thread(self.conn.recv)
+                except EOFError:
+                    # the dispatcher exited
+                    break
+                if message is None:
+                    break
+                # requests of different sessions run concurrently on the event loop of the shard
+                task = asyncio.create_task(self.handle(*message))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        finally:
+            for session_id, env in list(self.envs.items()):
+                try:
+                    await env.close()
+                except Exception as e:
+                    logger.error(f"Failed to close session {session_id} of shard {self.shard_id}: {e}")
+            self.envs = {}
+            await self.pool.stop()
+
+    async def handle(
+        self, request_id: int, command: str, session_id: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> None:
+        try:
+            result = await self.run(command, session_id, args, kwargs)
+        except Exception as e:
+            self.reply(request_id, False, dump_error(e))
+            return
+        self.reply(request_id, True, result)
+
+    async def run(self, command: str, session_id: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+        match command:
+            case "open":
+                env = self.env_factory(args[0], self.pool)
+                await env.start()
+                self.envs[session_id] = env
+                return None
+            case "close":
+                await self.envs.pop(session_id).close()
+                return None
+            case _:
+                if command not in PROXIED_METHODS:
+                    raise ValueError(f"Unknown command '{command}'")
+                if session_id not in self.envs:
+                    raise BrowserShardError(self.shard_id, f"session '{session_id}' not found")
+                return await getattr(self.envs[session_id], command)(*args, **kwargs)
+
+    def reply(self, request_id: int, ok: bool, payload: Any) -> None:
+        try:
+            self.conn.send((request_id, ok, payload))
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            # the result cannot be sent to the dispatcher
+            self.conn.send((request_id, False, dump_error(e)))
+
+
+def run_shard(
+    shard_id: int, config: BrowserPoolConfig, conn: Connection, pool_factory: PoolFactory, env_factory: EnvFactory
+) -> None:
+    """Entry point of the worker processes."""
+    worker = ShardWorker(shard_id, conn, pool_factory(config), env_factory)
+    asyncio.run(worker.serve())
+
+
+class ShardLoad(BaseModel):
+    shard_id: int
+    pid: int | None
+    alive: bool
+    sessions: int
+    # requests being processed by the shard
+    inflight: int
+
+
+class Shard:
+    """Dispatcher side of a worker process: sends the requests and resolves their responses."""
+
+    def __init__(self, shard_id: int) -> None:
+        self.shard_id: int = shard_id
+        self.process: SpawnProcess | None = None
+        self.conn: Connection | None = None
+        self.pid: int | None = None
+        self.sessions: set[str] = set()
+        self.inflight: int = 0
+        self.exited: bool = False
+        self._pending: dict[int, asyncio.Future[Any]] = {}
+        self._ids: itertools.count[int] = itertools.count(READY_REQUEST_ID + 1)
+
+    @property
+    def started(self) -> bool:
+        return self.process is not None
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and not self.exited and self.process.is_alive()
+
+    def load(self) -> ShardLoad:
+        return ShardLoad(
+            shard_id=self.shard_id,
+            pid=self.pid,
+            alive=self.alive,
+            sessions=len(self.sessions),
+            inflight=self.inflight,
+        )
+
+    async def start(
+        self,
+        context: SpawnContext,
+        config: BrowserPoolConfig,
+        pool_factory: PoolFactory,
+        env_factory: EnvFactory,
+        timeout: float,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        # (`PipeConnection` on windows, with the same interface)
+        conn, child_conn = cast(tuple[Connection, Connection], context.Pipe())
+        self.process = context.Process(
+            target=run_shard,
+            args=(self.shard_id, config, child_conn, pool_factory, env_factory),
+            name=f"notte-shard-{self.shard_id}",
+            daemon=True,
+        )
+        self.conn = conn
+        self.exited = False
+        self.sessions = set()
+        ready: asyncio.Future[Any] = loop.create_future()
+        self._pending = {READY_REQUEST_ID: ready}
+        self.process.start()
+        child_conn.close()
+        # a dedicated thread per shard: blocking reads must not starve the default executor
+        threading.Thread(
+            target=self._read, args=(conn, loop), name=f"notte-shard-{self.shard_id}-reader", daemon=True
+        ).start()
+        async with asyncio.timeout(timeout):
+            self.pid = await ready
+
+    def _read(self, conn: Connection, loop: asyncio.AbstractEventLoop) -> None:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                message = None
+            try:
+                if message is None:
+                    _ = loop.call_soon_threadsafe(self._fail, conn, "worker process exited")
+                    return
+                _ = loop.call_soon_threadsafe(self._resolve, *message)
+            except RuntimeError:
+                # the event loop of the dispatcher is closed
+                return
+
+    def _resolve(self, request_id: int, ok: bool, payload: Any) -> None:
+        future = self._pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(load_error(self.shard_id, payload))
+
+    def _fail(self, conn: Connection, reason: str) -> None:
+        if conn is not self.conn:
+            # reader of a previous process of the shard
+            return
+        if not self.exited and len(self.sessions) > 0:
+            logger.error(f"Shard {self.shard_id} {reason}: {len(self.sessions)} sessions lost")
+        self.exited = True
+        self.sessions = set()
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(BrowserShardError(self.shard_id, reason))
+        self._pending = {}
+
+    async def request(self, command: str, session_id: str, *args: Any, **kwargs: Any) -> Any:
+        if not self.alive or self.conn is None:
+            raise BrowserShardError(self.shard_id, "worker process is not running")
+        request_id = next(self._ids)
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.inflight += 1
+        try:
+            self.conn.send((request_id, command, session_id, args, kwargs))
+            return await future
+        finally:
+            self.inflight -= 1
+            _ = self._pending.pop(request_id, None)
+
+    async def stop(self, timeout: float) -> None:
+        if self.process is None or self.conn is None:
+            return
+        if not self.exited:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+            # the sessions are closed by the worker
+            self.exited = True
+            self.sessions = set()
+        await asyncio.to_thread(self.process.join, timeout)
+        if self.process.is_alive():
+            logger.warning(f"Shard {self.shard_id} did not exit within {timeout}s. Terminating it...")
+            self.process.terminate()
+            await asyncio.to_thread(self.process.join, 5)
+        self.exited = True
+        self.conn.close()
+
+
+class ShardedPoolConfig(FrozenConfig):
+    nb_shards: int = Field(default_factory=lambda: os.cpu_count() or 1)
+    # split between the shards (see `BrowserPoolConfig.shard`)
+    pool: BrowserPoolConfig = BrowserPoolConfig()
+    # seconds for a worker process to start its browser pool
+    start_timeout: float = 60.0
+    # seconds for a worker process to close its sessions and exit
+    stop_timeout: float = 30.0
+
+    def set_nb_shards(self: Self, value: int) -> Self:
+        if value <= 0:
+            raise ValueError("Number of shards must be greater than 0")
+        return self._copy_and_validate(nb_shards=value)
+
+    def set_pool(self: Self, value: BrowserPoolConfig) -> Self:
+        return self._copy_and_validate(pool=value)
+
+
+class ShardedBrowserPool:
+    """
+    Dispatcher of a sharded browser pool: each of the `config.nb_shards` worker processes owns a `LocalBrowserPool`
+    and runs the `NotteEnv` of its sessions. New sessions go to the least loaded shard and the calls of a session
+    are proxied to its shard (see `ShardedEnv`).
+
+    Crashed workers are restarted when the next session is created (their sessions are lost).
+    """
+
+    def __init__(
+        self,
+        config: ShardedPoolConfig | None = None,
+        pool_factory: PoolFactory = local_pool_factory,
+        env_factory: EnvFactory = notte_env_factory,
+    ) -> None:
+        self.config: ShardedPoolConfig = config or ShardedPoolConfig()
+        # factories are sent to the worker processes: they must be importable (module level) functions
+        self.pool_factory: PoolFactory = pool_factory
+        self.env_factory: EnvFactory = env_factory
+        self.shards: list[Shard] = [Shard(shard_id) for shard_id in range(self.config.nb_shards)]
+        # forking a process with a running event loop (and threads) is unsafe
+        self._context: SpawnContext = multiprocessing.get_context("spawn")
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    async def _start_shard(self, shard: Shard) -> None:
+        if self.config.pool.verbose:
+            logger.info(f"Starting shard {shard.shard_id}/{self.config.nb_shards}...")
+        await shard.start(
+            self._context,
+            self.config.pool.shard(shard.shard_id, self.config.nb_shards),
+            self.pool_factory,
+            self.env_factory,
+            timeout=self.config.start_timeout,
+        )
+
+    async def start(self) -> None:
+        _ = await asyncio.gather(*(self._start_shard(shard) for shard in self.shards if not shard.alive))
+
+    async def stop(self) -> None:
+        _ = await asyncio.gather(*(shard.stop(self.config.stop_timeout) for shard in self.shards))
+
+    async def __aenter__(self) -> Self:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.stop()
+
+    def loads(self) -> list[ShardLoad]:
+        return [shard.load() for shard in self.shards]
+
+    def least_loaded(self) -> Shard:
+        shards = [shard for shard in self.shards if shard.alive]
+        if len(shards) == 0:
+            raise BrowserPoolNotStartedError()
+        return min(shards, key=lambda shard: (len(shard.sessions), shard.inflight))
+
+    async def new_env(self, config: "NotteEnvConfig | None" = None) -> "ShardedEnv":
+        """Start a new session (i.e. `NotteEnv`) on the least loaded shard."""
+        async with self._lock:
+            for shard in self.shards:
+                if shard.started and not shard.alive:
+                    logger.warning(f"Shard {shard.shard_id} is not running. Restarting it...")
+                    await shard.stop(timeout=0)
+                    await self._start_shard(shard)
+            shard = self.least_loaded()
+            session_id = str(uuid.uuid4())
+            # counted right away so that concurrent sessions are spread over the shards
+            shard.sessions.add(session_id)
+        try:
+            _ = await shard.request("open", session_id, config)
+        except BaseException:
+            shard.sessions.discard(session_id)
+            raise
+        return ShardedEnv(shard, session_id)
+
+
+class ShardedEnv:
+    """Proxy of a `NotteEnv` running in a worker process of a `ShardedBrowserPool`."""
+
+    def __init__(self, shard: Shard, session_id: str) -> None:
+        self.shard: Shard = shard
+        self.session_id: str = session_id
+
+    async def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        return await self.shard.request(method, self.session_id, *args, **kwargs)
+
+    async def goto(self, url: str | None) -> Observation:
+        return await self._call("goto", url)
+
+    async def observe(self, url: str | None = None, **pagination: Unpack[PaginationParamsDict]) -> Observation:
+        return await self._call("observe", url, **pagination)
+
+    async def execute(
+        self, action_id: str, params: dict[str, str] | str | None = None, enter: bool | None = None
+    ) -> Observation:
+        return await self._call("execute", action_id, params, enter=enter)
+
+    async def act(self, action: BaseAction) -> Observation:
+        return await self._call("act", action)
+
+    async def step(
+        self,
+        action_id: str,
+        params: dict[str, str] | str | None = None,
+        enter: bool | None = None,
+        **pagination: Unpack[PaginationParamsDict],
+    ) -> Observation:
+        return await self._call("step", action_id, params, enter=enter, **pagination)
+
+    async def scrape(self, url: str | None = None, **scrape_params: Unpack[ScrapeParamsDict]) -> Observation:
+        return await self._call("scrape", url, **scrape_params)
+
+    async def god(self, url: str | None = None, **params: Unpack["ScrapeAndObserveParamsDict"]) -> Observation:
+        return await self._call("god", url, **params)
+
+    async def reset(self) -> None:
+        _ = await self._call("reset")
+
+    async def close(self) -> None:
+        try:
+            if self.shard.alive:
+                _ = await self._call("close")
+        finally:
+            self.shard.sessions.discard(self.session_id)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
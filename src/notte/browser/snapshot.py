@@ -1,14 +1,19 @@
+import asyncio
 import datetime as dt
+import math
 from base64 import b64encode
-from collections.abc import Sequence
+from collections.abc import Awaitable, Callable, Iterable, Sequence
 from dataclasses import field
+from enum import StrEnum
+from typing import Any
 
 from loguru import logger
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from notte.actions.base import Action
 from notte.browser.dom_tree import A11yTree, DomNode, InteractionDomNode
 from notte.errors.base import AccessibilityTreeMissingError
+from notte.errors.processing import SnapshotComponentNotLoadedError
 from notte.pipe.preprocessing.a11y.traversal import set_of_interactive_nodes
 from notte.utils.url import clean_url
 
@@ -35,6 +40,20 @@ class ViewportData(BaseModel):
     def pixels_below(self) -> int:
         return self.total_height - self.scroll_y - self.viewport_height
 
+    @property
+    def nb_pages(self) -> int:
+        """Number of viewport-sized pages of the document (see `DomParsingConfig.viewport_page`)."""
+        if self.viewport_height <= 0:
+            return 1
+        return max(1, math.ceil(self.total_height / self.viewport_height))
+
+    @property
+    def page_index(self) -> int:
+        """Index of the page currently displayed in the viewport."""
+        if self.viewport_height <= 0:
+            return 0
+        return min(self.nb_pages - 1, self.scroll_y // self.viewport_height)
+
 
 class SnapshotMetadata(BaseModel):
     title: str
@@ -44,24 +63,152 @@ class SnapshotMetadata(BaseModel):
     timestamp: dt.datetime = field(default_factory=dt.datetime.now)
 
 
+class SnapshotTimings(BaseModel):
+    """Wall-clock time (in seconds) spent capturing each snapshot component.
+
+    Components are captured concurrently, so `total` is usually smaller than the sum of the components.
+    """
+
+    components: dict[str, float] = Field(default_factory=dict)
+    total: float = 0.0
+
+    def slowest(self) -> str | None:
+        if len(self.components) == 0:
+            return None
+        return max(self.components, key=lambda name: self.components[name])
+
+
+class SnapshotComponent(StrEnum):
+    HTML_CONTENT = "html_content"
+    A11Y_TREE = "a11y_tree"
+    DOM_NODE = "dom_node"
+    SCREENSHOT = "screenshot"
+
+
+class SnapshotComponentLoader:
+    """Fetches snapshot components from the live page on demand.
+
+    Results are memoized so that every snapshot sharing this loader (e.g. the raw snapshot
+    and its preprocessed copies) fetches each component at most once, even under concurrent access.
+    """
+
+    def __init__(self, fetch: Callable[[SnapshotComponent], Awaitable[Any]]) -> None:
+        self._fetch: Callable[[SnapshotComponent], Awaitable[Any]] = fetch
+        self._tasks: dict[SnapshotComponent, asyncio.Task[Any]] = {}
+
+    async def load(self, component: SnapshotComponent) -> Any:
+        task = self._tasks.get(component)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(component))
+            self._tasks[component] = task
+        try:
+            return await task
+        except Exception:
+            # do not memoize failures: the next access should try again
+            _ = self._tasks.pop(component, None)
+            raise
+
+
 class BrowserSnapshot(BaseModel):
+    """Snapshot of a browser page.
+
+    In lazy mode (see `BrowserWindowConfig.lazy_snapshot`), some components are not captured with the snapshot
+    but listed in `pending`. They have to be fetched with `await snapshot.load(...)` (or `prefetch`) before being
+    accessed, otherwise a `SnapshotComponentNotLoadedError` is raised.
+    """
+
     metadata: SnapshotMetadata
-    html_content: str
-    a11y_tree: A11yTree | None
-    dom_node: DomNode
-    screenshot: bytes | None = Field(repr=False)
+    html_content_: str | None = Field(default=None, alias="html_content")
+    a11y_tree_: A11yTree | None = Field(default=None, alias="a11y_tree")
+    dom_node_: DomNode | None = Field(default=None, alias="dom_node")
+    screenshot_: bytes | None = Field(default=None, alias="screenshot", repr=False)
+    timings: SnapshotTimings | None = Field(default=None, repr=False)
+    pending: frozenset[SnapshotComponent] = Field(default_factory=frozenset, repr=False)
+    _loader: SnapshotComponentLoader | None = PrivateAttr(default=None)
 
     model_config = {  # type: ignore[reportUnknownMemberType]
+        "populate_by_name": True,
         "json_encoders": {
             bytes: lambda v: b64encode(v).decode("utf-8") if v else None,
-        }
+        },
     }
 
+    def with_loader(self, loader: SnapshotComponentLoader | None) -> "BrowserSnapshot":
+        self._loader = loader
+        return self
+
     @property
     def clean_url(self) -> str:
         return clean_url(self.metadata.url)
 
+    def is_loaded(self, component: SnapshotComponent) -> bool:
+        return component not in self.pending
+
+    def _check_loaded(self, component: SnapshotComponent) -> None:
+        if not self.is_loaded(component):
+            raise SnapshotComponentNotLoadedError(url=self.metadata.url, component=component.value)
+
+    @property
+    def html_content(self) -> str:
+        self._check_loaded(SnapshotComponent.HTML_CONTENT)
+        return self.html_content_ or ""
+
+    @property
+    def a11y_tree(self) -> A11yTree | None:
+        self._check_loaded(SnapshotComponent.A11Y_TREE)
+        return self.a11y_tree_
+
+    @property
+    def dom_node(self) -> DomNode:
+        self._check_loaded(SnapshotComponent.DOM_NODE)
+        if self.dom_node_ is None:
+            raise SnapshotComponentNotLoadedError(url=self.metadata.url, component=SnapshotComponent.DOM_NODE.value)
+        return self.dom_node_
+
+    @property
+    def screenshot(self) -> bytes | None:
+        self._check_loaded(SnapshotComponent.SCREENSHOT)
+        return self.screenshot_
+
+    async def load(self, component: SnapshotComponent) -> None:
+        """Fetch `component` from the live page if it has not been loaded yet."""
+        if self.is_loaded(component):
+            return
+        if self._loader is None:
+            raise SnapshotComponentNotLoadedError(url=self.metadata.url, component=component.value)
+        value = await self._loader.load(component)
+        match component:
+            case SnapshotComponent.HTML_CONTENT:
+                self.html_content_ = value
+            case SnapshotComponent.A11Y_TREE:
+                self.a11y_tree_ = value
+            case SnapshotComponent.DOM_NODE:
+                self.dom_node_ = value
+            case SnapshotComponent.SCREENSHOT:
+                self.screenshot_ = value
+        self.pending = self.pending - {component}
+
+    async def prefetch(self, components: Iterable[SnapshotComponent]) -> None:
+        """Concurrently load all `components` that are still pending."""
+        missing = [component for component in set(components) if not self.is_loaded(component)]
+        if len(missing) > 0:
+            _ = await asyncio.gather(*[self.load(component) for component in missing])
+
+    def dom_fingerprint(self) -> frozenset[tuple[str, str, str]]:
+        """Interaction nodes of the DOM tree (i.e. `(id, role, text)`), used to detect page changes."""
+        return frozenset(
+            (node.id or "", node.get_role_str(), node.text) for node in self.dom_node.flatten(only_interaction=True)
+        )
+
     def compare_with(self, other: "BrowserSnapshot") -> bool:
+        if self.is_loaded(SnapshotComponent.DOM_NODE) and other.is_loaded(SnapshotComponent.DOM_NODE):
+            # cheaper than the a11y trees, which are only captured for the A11Y preprocessing
+            fingerprint, new_fingerprint = self.dom_fingerprint(), other.dom_fingerprint()
+            identical = fingerprint == new_fingerprint
+            if not identical:
+                logger.warning(f"Interactive nodes changed: {new_fingerprint.difference(fingerprint)}")
+            return identical
+
         if self.a11y_tree is None or other.a11y_tree is None:
             raise AccessibilityTreeMissingError()
 
@@ -78,11 +225,13 @@ class BrowserSnapshot(BaseModel):
     def with_dom_node(self, dom_node: DomNode) -> "BrowserSnapshot":
         return BrowserSnapshot(
             metadata=self.metadata,
-            html_content=self.html_content,
-            a11y_tree=self.a11y_tree,
+            html_content=self.html_content_,
+            a11y_tree=self.a11y_tree_,
             dom_node=dom_node,
-            screenshot=self.screenshot,
-        )
+            screenshot=self.screenshot_,
+            timings=self.timings,
+            pending=self.pending - {SnapshotComponent.DOM_NODE},
+        ).with_loader(self._loader)
 
     def subgraph_without(self, actions: Sequence[Action], roles: set[str] | None = None) -> "BrowserSnapshot | None":
         if len(actions) == 0 and roles is not None:
@@ -92,7 +241,7 @@ class BrowserSnapshot(BaseModel):
         failed_actions = {node.id for node in self.interaction_nodes() if node.id not in id_existing_actions}
 
         def only_failed_actions(node: DomNode) -> bool:
-            return len(set(node.subtree_ids).intersection(failed_actions)) > 0
+            return node.subtree_contains(*failed_actions)
 
         filtered_graph = self.dom_node.subtree_filter(only_failed_actions)
         if filtered_graph is None:
@@ -1,21 +1,28 @@
+import asyncio
 import time
-from typing import Any, ClassVar, Self
+from collections.abc import Awaitable
+from typing import Any, ClassVar, Self, TypeVar
 
 import httpx
 from loguru import logger
 from patchright.async_api import CDPSession, Page
 from patchright.async_api import TimeoutError as PlaywrightTimeoutError
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing_extensions import override
 
 from notte.browser import ProxySettings
 from notte.browser.dom_tree import A11yNode, A11yTree, DomNode
 from notte.browser.pool.base import BaseBrowserPool, BrowserResource, BrowserResourceOptions
 from notte.browser.pool.cdp_pool import SingleCDPBrowserPool
+from notte.browser.pool.connections import page_cdp_session, page_target_id
 from notte.browser.pool.local_pool import BrowserPoolConfig, SingleLocalBrowserPool
+from notte.browser.pool.network import NetworkProfile, NetworkProfileName, NetworkStats
 from notte.browser.snapshot import (
     BrowserSnapshot,
+    SnapshotComponent,
+    SnapshotComponentLoader,
     SnapshotMetadata,
+    SnapshotTimings,
     TabsData,
     ViewportData,
 )
@@ -23,16 +30,54 @@ from notte.common.config import FrozenConfig
 from notte.errors.browser import (
     BrowserExpiredError,
     BrowserNotStartedError,
+    BrowserResourceNotFoundError,
     EmptyPageContentError,
     InvalidURLError,
+    InvalidViewportPageError,
     PageLoadingError,
     RemoteDebuggingNotAvailableError,
     UnexpectedBrowserError,
 )
-from notte.errors.processing import SnapshotProcessingError
-from notte.pipe.preprocessing.dom.parsing import ParseDomTreePipe
+from notte.errors.processing import SnapshotComponentExpiredError, SnapshotProcessingError
+from notte.pipe.preprocessing.dom.incremental import IncrementalDomTreePipe
+from notte.pipe.preprocessing.dom.parsing import DomParsingConfig, PageMetadataDict, ParseDomTreePipe
+from notte.pipe.preprocessing.dom.scripts import call_dom_function
+from notte.pipe.preprocessing.dom.wait_for_page_update import (
+    SettleResult,
+    SettleStats,
+    wait_for_page_update,
+    watch_context_network_activity,
+    watch_network_activity,
+)
 from notte.utils.url import is_valid_url
 
+T = TypeVar("T")
+
+
+async def timed(name: str, coro: Awaitable[T], timings: dict[str, float]) -> T:
+    """Await `coro` and record its duration (in seconds) under `timings[name]`."""
+    start_time = time.time()
+    try:
+        return await coro
+    finally:
+        timings[name] = time.time() - start_time
+
+
+async def wait_all(*tasks: "asyncio.Task[Any] | None") -> None:
+    """Wait for all tasks to complete and re-raise the first exception (in argument order).
+
+    Unlike `asyncio.gather`, every task is awaited (and its exception retrieved)
+    before raising so that no capture keeps running in the background.
+    """
+    running = [task for task in tasks if task is not None]
+    if len(running) == 0:
+        return
+    _ = await asyncio.wait(running)
+    errors = [task.exception() for task in running]
+    for error in errors:
+        if error is not None:
+            raise error
+
 
 class BrowserWaitConfig(FrozenConfig):
     # need default values for frozen config
@@ -43,6 +88,8 @@ class BrowserWaitConfig(FrozenConfig):
     STEP: ClassVar[int] = 1_000
     SHORT_WAIT: ClassVar[int] = 500
     ACTION_TIMEOUT: ClassVar[int] = 1_000
+    SETTLE_QUIET: ClassVar[int] = 100
+    SETTLE_FRAMES: ClassVar[int] = 2
 
     goto: int = GOTO
     goto_retry: int = GOTO_RETRY
@@ -50,6 +97,11 @@ class BrowserWaitConfig(FrozenConfig):
     step: int = STEP
     short_wait: int = SHORT_WAIT
     action_timeout: int = ACTION_TIMEOUT
+    # adaptive waits return as soon as the page settles (see `wait_for_page_update`):
+    # `short_wait` and `goto` are then upper bounds instead of fixed sleeps / networkidle timeouts
+    adaptive: bool = True
+    settle_quiet: int = SETTLE_QUIET
+    settle_frames: int = SETTLE_FRAMES
 
     @classmethod
     def short(cls):
@@ -66,6 +118,12 @@ class BrowserWaitConfig(FrozenConfig):
     def long(cls):
         return cls(goto=10_000, goto_retry=1_000, retry=3_000, step=10_000, short_wait=500, action_timeout=5000)
 
+    def set_adaptive(self: Self, value: bool = True) -> Self:
+        return self._copy_and_validate(adaptive=value)
+
+    def set_settle_quiet(self: Self, value: int) -> Self:
+        return self._copy_and_validate(settle_quiet=value)
+
 
 class BrowserWindowConfig(FrozenConfig):
     headless: bool = False
@@ -77,6 +135,13 @@ class BrowserWindowConfig(FrozenConfig):
     screenshot: bool | None = True
     empty_page_max_retry: int = 5
     cdp_url: str | None = None
+    # only capture the components listed in `BrowserWindow.prefetch`, the others are fetched on demand
+    lazy_snapshot: bool = False
+    # only re-parse the DOM subtrees that changed since the previous snapshot of the same page
+    incremental_dom: bool = False
+    dom: DomParsingConfig = DomParsingConfig()
+    # requests blocked by the browser (e.g. `NetworkProfile.no_media()` when only the DOM text is needed)
+    network: NetworkProfile = NetworkProfile.full()
 
     def set_headless(self: Self, value: bool = True) -> Self:
         return self._copy_and_validate(headless=value)
@@ -93,6 +158,20 @@ class BrowserWindowConfig(FrozenConfig):
     def set_cdp_url(self: Self, value: str) -> Self:
         return self._copy_and_validate(cdp_url=value)
 
+    def set_lazy_snapshot(self: Self, value: bool = True) -> Self:
+        return self._copy_and_validate(lazy_snapshot=value)
+
+    def set_incremental_dom(self: Self, value: bool = True) -> Self:
+        return self._copy_and_validate(incremental_dom=value)
+
+    def set_dom(self: Self, value: DomParsingConfig) -> Self:
+        return self._copy_and_validate(dom=value)
+
+    def set_network_profile(self: Self, value: NetworkProfile | NetworkProfileName | str) -> Self:
+        if not isinstance(value, NetworkProfile):
+            value = NetworkProfile.from_name(value)
+        return self._copy_and_validate(network=value)
+
     def disable_web_security(self: Self) -> Self:
         return self._copy_and_validate(pool=self.pool.disable_web_security())
 
@@ -114,11 +193,20 @@ class BrowserWindow(BaseModel):
     config: BrowserWindowConfig = Field(default_factory=BrowserWindowConfig)
     pool: BaseBrowserPool | None = None
     resource: BrowserResource | None = None
+    # components captured eagerly when `config.lazy_snapshot` is enabled
+    # (the a11y tree is always loaded on demand when it is not listed, see `NotteEnv.required_components`)
+    prefetch: set[SnapshotComponent] = Field(default_factory=lambda: set(SnapshotComponent))
+    settle_stats: SettleStats = Field(default_factory=SettleStats)
+    _incremental_dom: IncrementalDomTreePipe | None = PrivateAttr(default=None)
+    # websocket url of the browser of the resource (by browser id)
+    _ws_url: tuple[str, str] | None = PrivateAttr(default=None)
 
     @override
     def model_post_init(cls, __context: Any) -> None:
         if cls.pool is None:
             cls.pool = create_browser_pool(cls.config)
+        if cls.config.incremental_dom:
+            cls._incremental_dom = IncrementalDomTreePipe(verbose=cls.config.pool.verbose)
 
     @property
     def browser_pool(self) -> BaseBrowserPool:
@@ -140,20 +228,34 @@ class BrowserWindow(BaseModel):
             raise RemoteDebuggingNotAvailableError()
         return self.resource.resource_options.debug_port
 
+    @property
+    def network_stats(self) -> NetworkStats | None:
+        """Requests blocked by `config.network` since the window was started (None if no request is blocked)."""
+        if self.resource is None:
+            raise BrowserNotStartedError()
+        return self.resource.network_stats
+
     async def get_ws_url(self) -> str:
+        if self.resource is None:
+            raise BrowserNotStartedError()
+        # the websocket url does not change for the lifetime of the browser
+        if self._ws_url is not None and self._ws_url[0] == self.resource.browser_id:
+            return self._ws_url[1]
         async with httpx.AsyncClient() as client:
             response = await client.get(f"http://localhost:{self.port}/json/version")
             data = response.json()
-            return data["webSocketDebuggerUrl"]
+            ws_url: str = data["webSocketDebuggerUrl"]
+        self._ws_url = (self.resource.browser_id, ws_url)
+        return ws_url
 
     async def get_cdp_session(self, tab_idx: int | None = None) -> CDPSession:
         cdp_page = self.tabs[tab_idx] if tab_idx is not None else self.page
-        return await cdp_page.context.new_cdp_session(cdp_page)
+        # one session per page, reused by all the calls
+        return await page_cdp_session(cdp_page)
 
     async def page_id(self, tab_idx: int | None = None) -> str:
-        session = await self.get_cdp_session(tab_idx)
-        target_id: Any = await session.send("Target.getTargetInfo")  # pyright: ignore[reportUnknownMemberType]
-        return target_id["targetInfo"]["targetId"]
+        cdp_page = self.tabs[tab_idx] if tab_idx is not None else self.page
+        return await page_target_id(cdp_page)
 
     async def ws_page_url(self, tab_idx: int | None = None) -> str:
         page_id = await self.page_id(tab_idx)
@@ -164,6 +266,7 @@ class BrowserWindow(BaseModel):
         if self.resource is None:
             raise BrowserNotStartedError()
         self.resource.page = page
+        _ = watch_network_activity(page)
 
     @property
     def tabs(self) -> list[Page]:
@@ -175,29 +278,67 @@ class BrowserWindow(BaseModel):
             proxy=self.config.proxy,
             user_agent=self.config.user_agent,
             debug=self.config.cdp_debug,
+            network=self.config.network,
         )
         self.resource = await self.browser_pool.get_browser_resource(resource_options)
+        # requests (of all tabs) are tracked from the start to know when the page settles after an action
+        watch_context_network_activity(self.resource.page.context)
         # Create and track a new context
         self.resource.page.set_default_timeout(self.config.wait.step)
 
     async def close(self) -> None:
         if self.resource is not None:
-            await self.browser_pool.release_browser_resource(self.resource)
+            try:
+                await self.browser_pool.release_browser_resource(self.resource)
+            except BrowserResourceNotFoundError as e:
+                # already released by the pool supervisor (idle session reaped or browser crashed)
+                logger.warning(f"Browser resource was already released: {e}")
             self.resource = None
+        if self._incremental_dom is not None:
+            self._incremental_dom.reset()
+
+    async def settle(self, timeout: int, label: str) -> SettleResult:
+        """Wait (at most `timeout` ms) for the page to settle and record the settle time under `label`."""
+        result = await wait_for_page_update(
+            self.page,
+            timeout=timeout,
+            quiet=self.config.wait.settle_quiet,
+            min_frames=self.config.wait.settle_frames,
+        )
+        self.settle_stats.record(label, result)
+        if self.config.pool.verbose:
+            logger.info(
+                (
+                    f"Page '{self.page.url}' settled after '{label}' in {result.elapsed:.2f}s "
+                    f"({result.reason}, {result.mutations} mutations, {result.pending_requests} pending requests)"
+                )
+            )
+        return result
 
-    async def long_wait(self) -> None:
+    async def long_wait(self, label: str = "long_wait") -> None:
         start_time = time.time()
+        if self.config.wait.adaptive:
+            try:
+                await self.page.wait_for_load_state("domcontentloaded", timeout=self.config.wait.goto)
+            except PlaywrightTimeoutError:
+                if self.config.pool.verbose:
+                    logger.warning(f"Timeout while waiting for domcontentloaded state for '{self.page.url}'")
+            _ = await self.settle(self.config.wait.goto, label)
+            return
         try:
             await self.page.wait_for_load_state("networkidle", timeout=self.config.wait.goto)
         except PlaywrightTimeoutError:
             if self.config.pool.verbose:
                 logger.warning(f"Timeout while waiting for networkidle state for '{self.page.url}'")
-        await self.short_wait()
+        await self.short_wait(label)
         # await self.page.wait_for_timeout(self._playwright.config.step_timeout)
         if self.config.pool.verbose:
             logger.info(f"Waited for networkidle state for '{self.page.url}' in {time.time() - start_time:.2f}s")
 
-    async def short_wait(self) -> None:
+    async def short_wait(self, label: str = "short_wait") -> None:
+        if self.config.wait.adaptive:
+            _ = await self.settle(self.config.wait.short_wait, label)
+            return
         await self.page.wait_for_timeout(self.config.wait.short_wait)
 
     async def tab_metadata(self, tab_idx: int | None = None) -> TabsData:
@@ -208,38 +349,145 @@ class BrowserWindow(BaseModel):
             url=page.url,
         )
 
-    async def snapshot_metadata(self) -> SnapshotMetadata:
+    async def tabs_metadata(self) -> list[TabsData]:
+        return list(await asyncio.gather(*[self.tab_metadata(i) for i, _ in enumerate(self.tabs)]))
+
+    def _build_metadata(self, page_metadata: PageMetadataDict, tabs: list[TabsData]) -> SnapshotMetadata:
         return SnapshotMetadata(
-            title=await self.page.title(),
+            title=page_metadata["title"],
             url=self.page.url,
             viewport=ViewportData(
-                scroll_x=int(await self.page.evaluate("window.scrollX")),
-                scroll_y=int(await self.page.evaluate("window.scrollY")),
-                viewport_width=int(await self.page.evaluate("window.innerWidth")),
-                viewport_height=int(await self.page.evaluate("window.innerHeight")),
-                total_width=int(await self.page.evaluate("document.documentElement.scrollWidth")),
-                total_height=int(await self.page.evaluate("document.documentElement.scrollHeight")),
+                scroll_x=int(page_metadata["scrollX"]),
+                scroll_y=int(page_metadata["scrollY"]),
+                viewport_width=int(page_metadata["viewportWidth"]),
+                viewport_height=int(page_metadata["viewportHeight"]),
+                total_width=int(page_metadata["totalWidth"]),
+                total_height=int(page_metadata["totalHeight"]),
             ),
-            tabs=[await self.tab_metadata(i) for i, _ in enumerate(self.tabs)],
+            tabs=tabs,
         )
 
+    async def snapshot_metadata(self) -> SnapshotMetadata:
+        page_metadata, tabs = await asyncio.gather(
+            call_dom_function(self.page, "metadata"),
+            self.tabs_metadata(),
+        )
+        return self._build_metadata(page_metadata, tabs)
+
+    async def a11y_snapshot(self, interesting_only: bool = True, page: Page | None = None) -> A11yNode | None:
+        page = page or self.page
+        return await page.accessibility.snapshot(interesting_only=interesting_only)  # type: ignore[attr-defined]
+
+    async def parse_dom(self, page: Page | None = None) -> tuple[DomNode, PageMetadataDict]:
+        page = page or self.page
+        if self._incremental_dom is not None:
+            return await self._incremental_dom.forward_with_metadata(page, self.config.dom)
+        return await ParseDomTreePipe.forward_with_metadata(page, self.config.dom)
+
+    async def snapshot_viewport_page(self, index: int) -> BrowserSnapshot:
+        """
+        Snapshot of the `index`-th viewport-sized page of the document (i.e. viewport N of M,
+        see `ViewportData.nb_pages`), extracted without scrolling.
+
+        Only the DOM tree of the page and the metadata are captured, the other components are loaded on demand.
+        """
+        # the index is checked against the (cheap) metadata before extracting the page
+        metadata = await self.snapshot_metadata()
+        if index < 0 or index >= metadata.viewport.nb_pages:
+            raise InvalidViewportPageError(url=metadata.url, page=index, nb_pages=metadata.viewport.nb_pages)
+        dom_node, page_metadata = await ParseDomTreePipe.forward_with_metadata(
+            self.page, self.config.dom.set_viewport_page(index)
+        )
+        metadata = self._build_metadata(page_metadata, metadata.tabs)
+        snapshot = BrowserSnapshot(
+            metadata=metadata,
+            html_content=None,
+            a11y_tree=None,
+            dom_node=dom_node,
+            screenshot=None,
+            pending=frozenset({SnapshotComponent.HTML_CONTENT, SnapshotComponent.A11Y_TREE}),
+        )
+        return snapshot.with_loader(self._component_loader(self.page, metadata.url))
+
+    def _build_a11y_tree(self, simple: A11yNode | None, raw: A11yNode | None) -> A11yTree | None:
+        if simple is None or raw is None or len(simple.get("children", [])) == 0:
+            logger.warning("A11y tree is empty, this might cause unforeseen issues")
+            return None
+        return A11yTree(simple=simple, raw=raw)
+
+    def _component_loader(self, page: Page, url: str) -> SnapshotComponentLoader:
+        async def fetch(component: SnapshotComponent) -> Any:
+            if page.url != url:
+                raise SnapshotComponentExpiredError(url=url, component=component.value, current_url=page.url)
+            start_time = time.time()
+            value: Any
+            match component:
+                case SnapshotComponent.HTML_CONTENT:
+                    value = await page.content()
+                case SnapshotComponent.A11Y_TREE:
+                    simple, raw = await asyncio.gather(
+                        self.a11y_snapshot(page=page),
+                        self.a11y_snapshot(interesting_only=False, page=page),
+                    )
+                    value = self._build_a11y_tree(simple, raw)
+                case SnapshotComponent.DOM_NODE:
+                    value, _ = await self.parse_dom(page)
+                case SnapshotComponent.SCREENSHOT:
+                    value = await page.screenshot()
+            if self.config.pool.verbose:
+                logger.info(f"Lazily loaded snapshot component '{component}' in {time.time() - start_time:.2f}s")
+            return value
+
+        return SnapshotComponentLoader(fetch)
+
+    def touch(self) -> None:
+        """Record activity of the session: keeps it from being reaped as idle by the pool supervisor."""
+        if self.resource is not None:
+            self.browser_pool.touch(self.resource)
+
     async def snapshot(self, screenshot: bool | None = None, retries: int | None = None) -> BrowserSnapshot:
         if retries is None:
             retries = self.config.empty_page_max_retry
         if retries <= 0:
             raise EmptyPageContentError(url=self.page.url, nb_retries=self.config.empty_page_max_retry)
-        html_content: str = ""
-        a11y_simple: A11yNode | None = None
-        a11y_raw: A11yNode | None = None
-        dom_node: DomNode | None = None
+        self.touch()
+        take_screenshot = screenshot if screenshot is not None else self.config.screenshot
+        # screenshots are driven by the `screenshot` flag and never deferred
+        components = {SnapshotComponent.HTML_CONTENT, SnapshotComponent.A11Y_TREE, SnapshotComponent.DOM_NODE}
+        if self.config.lazy_snapshot:
+            components &= self.prefetch
+        elif SnapshotComponent.A11Y_TREE not in self.prefetch:
+            # the (full) a11y tree is one of the most expensive captures: only needed by the A11Y preprocessing
+            components.discard(SnapshotComponent.A11Y_TREE)
+        timings: dict[str, float] = {}
+        start_time = time.time()
+        # DOM tree, viewport, scroll and title are collected in a single `page.evaluate` call
+        # all other (independent) components are captured concurrently
+        dom_task = metadata_task = html_task = a11y_simple_task = a11y_raw_task = screenshot_task = None
+        if SnapshotComponent.DOM_NODE in components:
+            dom_task = asyncio.create_task(timed("dom_node", self.parse_dom(), timings))
+        else:
+            metadata_task = asyncio.create_task(timed("metadata", call_dom_function(self.page, "metadata"), timings))
+        if SnapshotComponent.HTML_CONTENT in components:
+            html_task = asyncio.create_task(timed("html_content", self.page.content(), timings))
+        if SnapshotComponent.A11Y_TREE in components:
+            a11y_simple_task = asyncio.create_task(timed("a11y_simple", self.a11y_snapshot(), timings))
+            a11y_raw_task = asyncio.create_task(timed("a11y_raw", self.a11y_snapshot(interesting_only=False), timings))
+        tabs_task = asyncio.create_task(timed("tabs", self.tabs_metadata(), timings))
+        if take_screenshot:
+            screenshot_task = asyncio.create_task(timed("screenshot", self.page.screenshot(), timings))
         try:
-            html_content = await self.page.content()
-            a11y_simple = await self.page.accessibility.snapshot()  # type: ignore[attr-defined]
-            a11y_raw = await self.page.accessibility.snapshot(interesting_only=False)  # type: ignore[attr-defined]
-            dom_node = await ParseDomTreePipe.forward(self.page)
+            await wait_all(
+                dom_task, metadata_task, html_task, a11y_simple_task, a11y_raw_task, tabs_task, screenshot_task
+            )
 
         except SnapshotProcessingError:
-            await self.long_wait()
+            await self.long_wait("snapshot_retry")
+            return await self.snapshot(screenshot=screenshot, retries=retries - 1)
+
+        except PlaywrightTimeoutError:
+            if self.config.pool.verbose:
+                logger.warning(f"Timeout while taking snapshot for {self.page.url}. Retrying...")
             return await self.snapshot(screenshot=screenshot, retries=retries - 1)
 
         except Exception as e:
@@ -247,40 +495,44 @@ class BrowserWindow(BaseModel):
                 raise BrowserExpiredError() from e
             if "Unable to retrieve content because the page is navigating and changing the content" in str(e):
                 # Should retry after the page is loaded
-                await self.short_wait()
-            else:
-                raise UnexpectedBrowserError(url=self.page.url) from e
+                if self.config.pool.verbose:
+                    logger.warning(f"Page {self.page.url} is navigating. Retry in {self.config.wait.short_wait}ms")
+                await self.short_wait("snapshot_retry")
+                return await self.snapshot(screenshot=screenshot, retries=retries - 1)
+            raise UnexpectedBrowserError(url=self.page.url) from e
+
+        dom_node = None
+        if dom_task is not None:
+            dom_node, page_metadata = dom_task.result()
+        else:
+            assert metadata_task is not None
+            page_metadata: PageMetadataDict = metadata_task.result()
 
         a11y_tree = None
-        if a11y_simple is None or a11y_raw is None or len(a11y_simple.get("children", [])) == 0:
-            logger.warning("A11y tree is empty, this might cause unforeseen issues")
+        if a11y_simple_task is not None and a11y_raw_task is not None:
+            a11y_tree = self._build_a11y_tree(a11y_simple_task.result(), a11y_raw_task.result())
 
-        else:
-            a11y_tree = A11yTree(
-                simple=a11y_simple,
-                raw=a11y_raw,
-            )
-
-        if dom_node is None:
-            if self.config.pool.verbose:
-                logger.warning(f"Empty page content for {self.page.url}. Retry in {self.config.wait.short_wait}ms")
-            await self.page.wait_for_timeout(self.config.wait.short_wait)
-            return await self.snapshot(screenshot=screenshot, retries=retries - 1)
-        take_screenshot = screenshot if screenshot is not None else self.config.screenshot
-        try:
-            snapshot_screenshot = await self.page.screenshot() if take_screenshot else None
-        except PlaywrightTimeoutError:
-            if self.config.pool.verbose:
-                logger.warning(f"Timeout while taking screenshot for {self.page.url}. Retrying...")
-            return await self.snapshot(screenshot=screenshot, retries=retries - 1)
+        snapshot_timings = SnapshotTimings(components=timings, total=time.time() - start_time)
+        self.browser_pool.metrics.snapshot_latency.observe(snapshot_timings.total)
+        if self.config.pool.verbose:
+            captured = ", ".join(f"{name}={duration:.2f}s" for name, duration in timings.items())
+            logger.info(f"Snapshot of {self.page.url} took {snapshot_timings.total:.2f}s ({captured})")
 
-        return BrowserSnapshot(
-            metadata=await self.snapshot_metadata(),
-            html_content=html_content,
+        pending = frozenset(
+            {SnapshotComponent.HTML_CONTENT, SnapshotComponent.A11Y_TREE, SnapshotComponent.DOM_NODE} - components
+        )
+        snapshot = BrowserSnapshot(
+            metadata=self._build_metadata(page_metadata, tabs_task.result()),
+            html_content=html_task.result() if html_task is not None else None,
             a11y_tree=a11y_tree,
             dom_node=dom_node,
-            screenshot=snapshot_screenshot,
+            screenshot=screenshot_task.result() if screenshot_task is not None else None,
+            timings=snapshot_timings,
+            pending=pending,
         )
+        if len(pending) > 0:
+            return snapshot.with_loader(self._component_loader(self.page, snapshot.metadata.url))
+        return snapshot
 
     async def goto(
         self,
@@ -293,10 +545,10 @@ class BrowserWindow(BaseModel):
         try:
             _ = await self.page.goto(url, timeout=self.config.wait.goto)
         except PlaywrightTimeoutError:
-            await self.long_wait()
+            await self.long_wait("goto")
         except Exception as e:
             raise PageLoadingError(url=url) from e
         # extra wait to make sure that css animations can start
         # to make extra element visible
-        await self.short_wait()
+        await self.short_wait("goto")
         return await self.snapshot()
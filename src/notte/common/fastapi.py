@@ -3,10 +3,12 @@ from __future__ import annotations
 from typing import Annotated
 
 try:
-    from fastapi import APIRouter, HTTPException  # type: ignore[reportMissingModuleSource]
+    from fastapi import APIRouter, HTTPException, Response  # type: ignore[reportMissingModuleSource]
 except ImportError:
     raise ImportError("fastapi is required to use the FastAPI router. Install it with 'uv sync --extra api'")
 
+from notte.browser.pool.base import BaseBrowserPool
+from notte.browser.pool.metrics import PROMETHEUS_CONTENT_TYPE
 from notte.common.agent.base import BaseAgent
 from notte.common.agent.types import AgentResponse
 from notte.sdk.types import AgentRequest
@@ -36,3 +38,26 @@ def create_agent_router(agent: BaseAgent, prefix: str = "agent") -> APIRouter:
             raise HTTPException(status_code=500, detail=str(e))
 
     return router  # type: ignore[reportUnknownReturn]
+
+
+def create_metrics_router(  # type: ignore[reportUnknownParameterType]
+    pool: BaseBrowserPool, prefix: str = "", labels: dict[str, str] | None = None
+) -> APIRouter:
+    """
+    Creates a FastAPI router exposing the metrics of a browser pool in the Prometheus text format.
+
+    Args:
+        pool: The browser pool to monitor
+        prefix: Optional URL prefix of the `/metrics` endpoint
+        labels: Optional labels added to every sample (e.g. `{"instance": "worker-1"}`)
+
+    Returns:
+        APIRouter instance with a `GET /metrics` endpoint
+    """
+    router = APIRouter(prefix=prefix, tags=["metrics"])  # type: ignore[reportUnknownMemberType]
+
+    @router.get("/metrics")  # type: ignore[reportUntypedFunctionDecorator]
+    async def metrics() -> Response:  # type: ignore[unused-function]
+        return Response(content=pool.export_prometheus(labels=labels), media_type=PROMETHEUS_CONTENT_TYPE)  # type: ignore[reportUnknownVariableType]
+
+    return router  # type: ignore[reportUnknownReturn]
@@ -1,5 +1,6 @@
 import base64
 import json
+from collections import deque
 from dataclasses import dataclass, field
 from typing import TypeVar
 
@@ -15,12 +16,12 @@ from litellm import (
     ModelResponse,  # type: ignore[reportPrivateImportUsage]
     OpenAIMessageContent,
 )
-from litellm.utils import token_counter  # type: ignore[reportUnknownVariableType]
 from loguru import logger
 from pydantic import BaseModel
 
 from notte.errors.llm import LLMParsingError
 from notte.llms.engine import LlmModel, StructuredContent
+from notte.llms.tokens import TokenCounter, default_token_counter
 
 # Define valid message roles
 
@@ -31,6 +32,8 @@ class CachedMessage:
 
     message: AllMessageValues
     token_count: int
+    # trimmed messages are compacted out of the stored history lazily (see `Conversation.trim_history_to_fit`)
+    trimmed: bool = False
 
 
 T = TypeVar("T", bound=BaseModel)
@@ -40,16 +43,29 @@ T = TypeVar("T", bound=BaseModel)
 class Conversation:
     """Manages conversation history and message extraction"""
 
-    history: list[CachedMessage] = field(default_factory=list)
     json_extractor: StructuredContent = field(default_factory=lambda: StructuredContent(inner_tag="json"))
     autosize: bool = False
     max_tokens: int = 16000
     model: str = LlmModel.default()
     conservative_factor: float = 0.8
+    # count the tokens from the number of characters (without tokenizing the messages)
+    approximate_tokens: bool = False
+    token_counter: TokenCounter = field(default_factory=default_token_counter)
 
+    # messages in order, trimmed ones included until the next compaction (see `history` for the live ones)
+    _history: list[CachedMessage] = field(default_factory=list, init=False)
     _total_tokens: int = field(default=0, init=False)
+    _system_tokens: int = field(default=0, init=False)
+    # non-system messages of the history, oldest first (i.e. in trimming order)
+    _trimmable: deque[CachedMessage] = field(default_factory=deque, init=False)
+    _nb_trimmed: int = field(default=0, init=False)
     convert_tools_to_assistant: bool = False
 
+    @property
+    def history(self) -> list[CachedMessage]:
+        """Messages of the conversation that were not trimmed"""
+        return [msg for msg in self._history if not msg.trimmed]
+
     @property
     def conservative_max_tokens(self) -> int:
         """Since token count isn't 100% accurate, allow to be
@@ -58,47 +74,49 @@ class Conversation:
 
     def count_tokens(self, content: AllMessageValues) -> int:
         """Count the number of tokens in a list of messages"""
-        return token_counter(model=self.model, messages=[content])
+        return self.token_counter.count_message(content, model=self.model, approximate=self.approximate_tokens)
 
     def total_tokens(self) -> int:
         """Get total tokens in conversation history"""
         return self._total_tokens
 
-    def trim_history_to_fit(self, new_content: AllMessageValues) -> None:
+    def trim_history_to_fit(self, new_content: AllMessageValues, new_content_tokens: int | None = None) -> None:
         """Trim history to make room for new content while preserving system messages"""
         if not self.autosize:
             return
 
-        # Always keep system messages
-        system_messages = [msg for msg in self.history if msg.message["role"] == "system"]
-        other_messages = [msg for msg in self.history if msg.message["role"] != "system"]
-
-        new_content_tokens = self.count_tokens(new_content)
-        system_tokens = sum(msg.token_count for msg in system_messages)
-        available_tokens = self.conservative_max_tokens - system_tokens - new_content_tokens
+        if new_content_tokens is None:
+            new_content_tokens = self.count_tokens(new_content)
+        available_tokens = self.conservative_max_tokens - self._system_tokens - new_content_tokens
 
         # Remove oldest non-system messages until we have room
-        current_tokens = sum(msg.token_count for msg in other_messages)
         has_trimmed = 0
-        while other_messages and current_tokens > available_tokens:
-            removed = other_messages.pop(0)
-            current_tokens -= removed.token_count
+        while self._trimmable and self._total_tokens - self._system_tokens > available_tokens:
+            removed = self._trimmable.popleft()
+            removed.trimmed = True
+            self._total_tokens -= removed.token_count
             has_trimmed += 1
 
         if has_trimmed > 0:
             logger.info(f"Trimmed {has_trimmed} message(s) to stay under max token limit")
-
-        self.history = system_messages + other_messages
-        self._total_tokens = sum(msg.token_count for msg in self.history)
+            self._nb_trimmed += has_trimmed
+            # compact once most of the history is trimmed, i.e. amortized O(1) per trimmed message
+            if 2 * self._nb_trimmed > len(self._history):
+                self._history = self.history
+                self._nb_trimmed = 0
 
     def _add_message(self, msg: AllMessageValues) -> None:
         """Internal helper to add a message with token counting"""
         token_count = self.count_tokens(msg)
         if self.autosize:
-            self.trim_history_to_fit(msg)
+            self.trim_history_to_fit(msg, token_count)
         cached_msg = CachedMessage(message=msg, token_count=token_count)
-        self.history.append(cached_msg)
+        self._history.append(cached_msg)
         self._total_tokens += token_count
+        if msg["role"] == "system":
+            self._system_tokens += token_count
+        else:
+            self._trimmable.append(cached_msg)
 
     def add_system_message(self, content: str) -> None:
         """Add a system message to the conversation"""
@@ -220,5 +238,8 @@ class Conversation:
 
     def reset(self) -> None:
         """Clear all messages from the conversation"""
-        self.history.clear()
+        self._history.clear()
+        self._trimmable.clear()
         self._total_tokens = 0
+        self._system_tokens = 0
+        self._nb_trimmed = 0
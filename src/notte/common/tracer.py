@@ -50,6 +50,16 @@ class LlmUsageDictTracer(LlmTracer):
     def __init__(self) -> None:
         self.usage: list[LlmUsageDictTracer.LlmUsage] = []
 
+    def cache_stats(self) -> dict[str, int]:
+        """Number of calls served by the LLM cache (hits) or by the provider (misses), for engines with a cache."""
+        flags = [
+            bool(usage.metadata["cache_hit"])
+            for usage in self.usage
+            if usage.metadata is not None and "cache_hit" in usage.metadata
+        ]
+        hits = sum(flags)
+        return {"hits": hits, "misses": len(flags) - hits}
+
     @override
     def trace(
         self,
@@ -95,18 +105,20 @@ class LlmUsageFileTracer(LlmTracer):
         metadata: dict[str, Any] | None = None,
     ) -> None:
         """Log LLM usage to a file."""
+        # serialized before opening the file: a message that cannot be serialized must not leave half a record
+        record = json.dumps(
+            {
+                "timestamp": timestamp,
+                "model": model,
+                "messages": messages,
+                "completion": completion,
+                "usage": usage,
+                "metadata": metadata,
+            },
+            default=str,
+        )
         with open(self.file_path, "a") as f:
-            json.dump(
-                {
-                    "timestamp": timestamp,
-                    "model": model,
-                    "messages": messages,
-                    "completion": completion,
-                    "usage": usage,
-                },
-                f,
-            )
-            _ = f.write("\n")
+            _ = f.write(record + "\n")
 
 
 class LlmParsingErrorFileTracer(Tracer):
@@ -128,17 +140,14 @@ class LlmParsingErrorFileTracer(Tracer):
         error_msgs: list[str],
     ) -> None:
         """Log LLM parsing errors to a file."""
+        record = LlmParsingErrorFileTracer.LLmParsingError(
+            status=status,
+            pipe_name=pipe_name,
+            nb_retries=nb_retries,
+            error_msgs=error_msgs,
+        ).model_dump_json()
         with open(self.file_path, "a") as f:
-            json.dump(
-                LlmParsingErrorFileTracer.LLmParsingError(
-                    status=status,
-                    pipe_name=pipe_name,
-                    nb_retries=nb_retries,
-                    error_msgs=error_msgs,
-                ).model_dump(),
-                f,
-            )
-            _ = f.write("\n")
+            _ = f.write(record + "\n")
 
 
 TStepAgentOutput = TypeVar("TStepAgentOutput", bound=BaseModel)
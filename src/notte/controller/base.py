@@ -47,7 +47,7 @@ class BrowserController:
         tab_page = context.pages[tab_index]
         await tab_page.bring_to_front()
         self.window.page = tab_page
-        await self.window.long_wait()
+        await self.window.long_wait("switch_tab")
         if self.verbose:
             logger.info(
                 f"🪦 Switched to tab {tab_index} with url: {tab_page.url} ({len(context.pages)} tabs in context)"
@@ -71,7 +71,7 @@ class BrowserController:
                 _ = await self.window.page.go_forward()
             case ReloadAction():
                 _ = await self.window.page.reload()
-                await self.window.long_wait()
+                await self.window.long_wait(action.name())
             case PressKeyAction(key=key):
                 await self.window.page.keyboard.press(key)
             case ScrollUpAction(amount=amount):
@@ -118,9 +118,9 @@ class BrowserController:
 
                     if action.clear_before_fill:
                         await self.window.page.keyboard.press(key=f"{platform_control_key()}+A")
-                        await self.window.short_wait()
+                        await self.window.short_wait(action.name())
                         await self.window.page.keyboard.press(key="Backspace")
-                        await self.window.short_wait()
+                        await self.window.short_wait(action.name())
 
                     # Use isolated clipboard variable instead of system clipboard
                     await self.window.page.evaluate(
@@ -139,10 +139,10 @@ class BrowserController:
                         value,
                     )
 
-                    await self.window.short_wait()
+                    await self.window.short_wait(action.name())
                 else:
                     await locator.fill(value, timeout=action_timeout, force=action.clear_before_fill)
-                    await self.window.short_wait()
+                    await self.window.short_wait(action.name())
             case CheckAction(value=value):
                 if value:
                     await locator.check()
@@ -171,17 +171,19 @@ class BrowserController:
         if press_enter:
             if self.verbose:
                 logger.info(f"🪦 Pressing enter for action {action.id}")
-            await self.window.short_wait()
+            await self.window.short_wait(action.name())
             await self.window.page.keyboard.press("Enter")
         if original_url != self.window.page.url:
             if self.verbose:
-                logger.info(f"🪦 Page navigation detected for action {action.id} waiting for networkidle")
-            await self.window.long_wait()
+                logger.info(f"🪦 Page navigation detected for action {action.id} waiting for the page to settle")
+            await self.window.long_wait(action.name())
 
         # perform snapshot in execute
         return None
 
     async def execute(self, action: BaseAction) -> BrowserSnapshot:
+        # long actions (e.g. waits) must not get the session reaped as idle
+        self.window.touch()
         context = self.window.page.context
         num_pages = len(context.pages)
         match action:
@@ -197,9 +199,9 @@ class BrowserController:
                 return snapshot
             case _:
                 retval = await self.execute_browser_action(action)
-        # add short wait before we check for new tabs to make sure that
+        # wait for the page to settle before we check for new tabs to make sure that
         # the page has time to be created
-        await self.window.short_wait()
+        await self.window.short_wait(action.name())
         if len(context.pages) != num_pages:
             if self.verbose:
                 logger.info(f"🪦 Action {action.id} resulted in a new tab, switched to it...")
@@ -12,7 +12,7 @@ from notte.actions.base import ExecutableAction
 from notte.browser import ProxySettings
 from notte.browser.observation import Observation, TrajectoryProgress
 from notte.browser.pool.base import BaseBrowserPool
-from notte.browser.snapshot import BrowserSnapshot
+from notte.browser.snapshot import BrowserSnapshot, SnapshotComponent
 from notte.browser.window import BrowserWindow, BrowserWindowConfig
 from notte.common.config import FrozenConfig
 from notte.common.logging import timeit
@@ -28,6 +28,8 @@ from notte.controller.actions import (
 from notte.controller.base import BrowserController
 from notte.errors.env import MaxStepsReachedError, NoSnapshotObservedError
 from notte.errors.processing import InvalidInternalCheckError
+from notte.llms.cache import LLMCache, LLMCacheConfig
+from notte.llms.clients import LLMClientConfig, LLMClients
 from notte.llms.engine import LlmModel
 from notte.llms.service import LLMService
 from notte.pipe.action.pipe import (
@@ -65,6 +67,10 @@ class NotteEnvConfig(FrozenConfig):
     perception_model: str | None = None
     verbose: bool = False
     structured_output_retries: int = 3
+    # opt-in cache of the LLM responses (see `notte.llms.cache`)
+    llm_cache: LLMCacheConfig = LLMCacheConfig()
+    # connection pools of the LLM providers, None to let litellm manage its clients (see `notte.llms.clients`)
+    llm_clients: LLMClientConfig | None = None
 
     def dev_mode(self: Self) -> Self:
         format = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
@@ -98,6 +104,20 @@ class NotteEnvConfig(FrozenConfig):
     def model(self: Self, model: str) -> Self:
         return self._copy_and_validate(perception_model=model)
 
+    def cache_llm(self: Self, path: str | None = None, ttl: float | None = None, value: bool = True) -> Self:
+        """Cache the LLM responses in memory (and in the sqlite file `path` if provided) for `ttl` seconds."""
+        return self._copy_and_validate(llm_cache=self.llm_cache.set_enabled(value).set_path(path).set_ttl(ttl))
+
+    def llm_connection_pool(
+        self: Self,
+        max_connections: int = 100,
+        max_keepalive_connections: int | None = None,
+        http2: bool = False,
+    ) -> Self:
+        """Reuse the connections to the LLM providers across requests and sessions."""
+        config = (self.llm_clients or LLMClientConfig()).set_pool_size(max_connections, max_keepalive_connections)
+        return self._copy_and_validate(llm_clients=config.set_http2(http2))
+
     def a11y(self: Self) -> Self:
         return self._copy_and_validate(preprocessing=self.preprocessing.accessibility())
 
@@ -119,6 +139,12 @@ class NotteEnvConfig(FrozenConfig):
     def set_cdp_debug(self: Self, value: bool) -> Self:
         return self._copy_and_validate(window=self.window.set_cdp_debug(value))
 
+    def lazy_snapshot(self: Self, value: bool = True) -> Self:
+        return self._copy_and_validate(window=self.window.set_lazy_snapshot(value))
+
+    def incremental_dom(self: Self, value: bool = True) -> Self:
+        return self._copy_and_validate(window=self.window.set_incremental_dom(value))
+
     def not_headless(self: Self) -> Self:
         return self._copy_and_validate(window=self.window.set_headless(False))
 
@@ -181,7 +207,10 @@ class NotteEnv(AsyncResource):
         self.config: NotteEnvConfig = config or NotteEnvConfig().use_llm()
         if llmserve is None:
             llmserve = LLMService(
-                base_model=self.config.perception_model, structured_output_retries=self.config.structured_output_retries
+                base_model=self.config.perception_model,
+                structured_output_retries=self.config.structured_output_retries,
+                cache=LLMCache(self.config.llm_cache) if self.config.llm_cache.enabled else None,
+                clients=LLMClients.shared(self.config.llm_clients) if self.config.llm_clients is not None else None,
             )
         self._window: BrowserWindow = window or BrowserWindow(pool=pool, config=self.config.window)
         super().__init__(self._window)
@@ -189,6 +218,8 @@ class NotteEnv(AsyncResource):
 
         self.trajectory: list[TrajectoryStep] = []
         self._snapshot: BrowserSnapshot | None = None
+        # snapshot captured by the window (before preprocessing), compared with a new capture to detect page changes
+        self._raw_snapshot: BrowserSnapshot | None = None
         self._action_space_pipe: MainActionSpacePipe = MainActionSpacePipe(llmserve=llmserve, config=self.config.action)
         self._data_scraping_pipe: DataScrapingPipe = DataScrapingPipe(
             llmserve=llmserve, window=self._window, config=self.config.scraping
@@ -197,6 +228,8 @@ class NotteEnv(AsyncResource):
             window=self._window, type=self.config.preprocessing.type, verbose=self.config.verbose
         )
         self.act_callback: Callable[[BaseAction, Observation], None] | None = act_callback
+        # lazy snapshots only capture what the pipes need, the rest is fetched on demand
+        self._window.prefetch = self.required_components()
 
         # Track initialization
         capture_event(
@@ -211,6 +244,14 @@ class NotteEnv(AsyncResource):
             },
         )
 
+    def required_components(self) -> set[SnapshotComponent]:
+        components = self._action_space_pipe.required_components() | self._node_resolution_pipe.required_components()
+        if self.config.auto_scrape:
+            components |= self._data_scraping_pipe.required_components(ScrapeParams())
+        if self._window.config.screenshot:
+            components.add(SnapshotComponent.SCREENSHOT)
+        return ProcessedSnapshotPipe.required_components(self.config.preprocessing, components)
+
     @property
     def snapshot(self) -> BrowserSnapshot:
         if self._snapshot is None:
@@ -256,6 +297,7 @@ class NotteEnv(AsyncResource):
     def _preobserve(self, snapshot: BrowserSnapshot, action: BaseAction) -> Observation:
         if len(self.trajectory) >= self.config.max_steps:
             raise MaxStepsReachedError(max_steps=self.config.max_steps)
+        self._raw_snapshot = snapshot
         self._snapshot = ProcessedSnapshotPipe.forward(snapshot, self.config.preprocessing)
         preobs = Observation.from_snapshot(snapshot, progress=self.progress())
         self.trajectory.append(TrajectoryStep(obs=preobs, action=action))
@@ -270,7 +312,7 @@ class NotteEnv(AsyncResource):
     ) -> Observation:
         if self.config.verbose:
             logger.info(f"🧿 observing page {self.snapshot.metadata.url}")
-        self.obs.space = self._action_space_pipe.forward(
+        self.obs.space = await self._action_space_pipe.forward_async(
             self.snapshot,
             self.previous_actions,
             pagination=pagination,
@@ -288,7 +330,9 @@ class NotteEnv(AsyncResource):
                     )
                 )
             check_snapshot = await self._window.snapshot(screenshot=False)
-            if not self.snapshot.compare_with(check_snapshot) and retry > 0:
+            # compare trees of the same kind: the DOM tree of `self.snapshot` is rebuilt by the preprocessing
+            raw_snapshot = self._raw_snapshot or self.snapshot
+            if not raw_snapshot.compare_with(check_snapshot) and retry > 0:
                 if self.config.verbose:
                     logger.warning(
                         "Snapshot changed since the beginning of the action listing, retrying to observe again"
@@ -430,5 +474,6 @@ class NotteEnv(AsyncResource):
             logger.info("🌊 Resetting environment...")
         self.trajectory = []
         self._snapshot = None
+        self._raw_snapshot = None
         # reset the window
         await super().reset()
@@ -1,5 +1,7 @@
 from enum import Enum
-from typing import Literal
+from typing import Any, Literal
+
+from typing_extensions import override
 
 
 class ErrorMessageMode(Enum):
@@ -60,6 +62,19 @@ class NotteBaseError(ValueError):
 
         super().__init__(message)
 
+    @override
+    def __reduce__(self) -> tuple[Any, ...]:
+        # subclasses have their own constructor arguments: rebuild from the state instead
+        # (errors are sent across processes by `ShardedBrowserPool`)
+        return (_rebuild_error, (type(self), self.args, self.__dict__))
+
+
+def _rebuild_error(cls: type[NotteBaseError], args: tuple[Any, ...], state: dict[str, Any]) -> NotteBaseError:
+    error = cls.__new__(cls)
+    error.args = args
+    error.__dict__.update(state)
+    return error
+
 
 class NotteTimeoutError(NotteBaseError):
     def __init__(self, message: str) -> None:
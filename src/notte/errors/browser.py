@@ -138,3 +138,39 @@ class BrowserResourceLimitError(BrowserError):
             ),
             should_retry_later=False,
         )
+
+
+class BrowserPoolTimeoutError(BrowserError):
+    def __init__(self, timeout: float, nb_waiting: int) -> None:
+        super().__init__(
+            dev_message=(
+                f"No browser resource became available within {timeout}s ({nb_waiting} other sessions waiting). "
+                "Increase the pool capacity or the acquisition timeout."
+            ),
+            user_message="Sorry, we are experiencing high traffic at the moment. Try again later with a new session.",
+            agent_message=(
+                "The browser is currently experiencing high traffic. Wait 30 seconds before retrying to create a new"
+                " session."
+            ),
+            should_retry_later=True,
+        )
+
+
+class BrowserShardError(BrowserError):
+    def __init__(self, shard_id: int, reason: str) -> None:
+        super().__init__(
+            dev_message=f"Browser pool shard {shard_id} failed: {reason}",
+            user_message="The browser session was lost because of an internal error.",
+            agent_message="The browser session was lost. Start a new session and retry.",
+            should_retry_later=True,
+        )
+
+
+class InvalidViewportPageError(BrowserError):
+    def __init__(self, url: str, page: int, nb_pages: int) -> None:
+        super().__init__(
+            dev_message=f"Invalid viewport page {page} for {url}: the page only has {nb_pages} viewport pages.",
+            user_message=f"Invalid viewport page {page}: the page only has {nb_pages} viewport pages.",
+            agent_message=(f"Viewport page {page} does not exist. Hint: pages are numbered from 0 to {nb_pages - 1}."),
+            should_retry_later=False,
+        )
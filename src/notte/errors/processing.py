@@ -83,3 +83,30 @@ class InvalidA11yChildrenError(InvalidInternalCheckError):
             dev_advice="Some assupmtions are not met. You should check the code to see why this is happening.",
             url=None,
         )
+
+
+class SnapshotComponentNotLoadedError(InvalidInternalCheckError):
+    def __init__(self, url: str | None, component: str) -> None:
+        super().__init__(
+            check=f"Snapshot component '{component}' was accessed before being loaded (lazy snapshot mode).",
+            dev_advice=(
+                f"Either `await snapshot.load('{component}')` before accessing it or declare '{component}' in the "
+                "`required_components` of the pipe that reads it so that it gets prefetched by the environment."
+            ),
+            url=url,
+        )
+
+
+class SnapshotComponentExpiredError(InvalidInternalCheckError):
+    def __init__(self, url: str | None, component: str, current_url: str) -> None:
+        super().__init__(
+            check=(
+                f"Cannot lazily load snapshot component '{component}': the page has navigated to '{current_url}' "
+                "since the snapshot was taken."
+            ),
+            dev_advice=(
+                "Lazy snapshot components are fetched from the live page. Prefetch every component you need "
+                "before performing an action on the page."
+            ),
+            url=url,
+        )
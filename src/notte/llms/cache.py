@@ -0,0 +1,307 @@
+# Content-addressed cache of the LLM responses (opt-in, see `NotteEnvConfig.cache_llm`):
+# identical requests (same model, messages, temperature and response format) are answered without calling the provider.
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Self
+
+from litellm import AllMessageValues, ModelResponse
+from loguru import logger
+from pydantic import BaseModel
+
+from notte.common.config import FrozenConfig
+
+
+class LLMCacheConfig(FrozenConfig):
+    enabled: bool = False
+    # number of responses kept in memory (least recently used responses are evicted first)
+    max_memory_entries: int = 1024
+    # sqlite file of the on-disk tier (shared by the processes using the same path), None to only cache in memory
+    path: str | None = None
+    # number of responses kept on disk (least recently used responses are evicted first)
+    max_disk_entries: int | None = 100_000
+    # in seconds, None to never expire the responses
+    ttl: float | None = None
+
+    def set_enabled(self: Self, value: bool = True) -> Self:
+        return self._copy_and_validate(enabled=value)
+
+    def set_path(self: Self, value: str | None) -> Self:
+        return self._copy_and_validate(path=value)
+
+    def set_ttl(self: Self, value: float | None) -> Self:
+        return self._copy_and_validate(ttl=value)
+
+    def set_max_memory_entries(self: Self, value: int) -> Self:
+        return self._copy_and_validate(max_memory_entries=value)
+
+    def set_max_disk_entries(self: Self, value: int | None) -> Self:
+        return self._copy_and_validate(max_disk_entries=value)
+
+
+class CacheStats(BaseModel):
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    # responses dropped because they expired or the cache was full
+    evictions: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+def cache_key(
+    model: str,
+    messages: list[AllMessageValues],
+    temperature: float,
+    response_format: dict[str, str] | None,
+    n: int = 1,
+) -> str:
+    """Hash of everything that determines the response of the provider."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "response_format": response_format,
+            "n": n,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+_bypass_cache: ContextVar[bool] = ContextVar("notte_llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_llm_cache() -> Generator[None, None, None]:
+    """
+    Send the requests made in this context (and in the tasks it starts) to the provider.
+
+    Their responses replace the cached ones, e.g. when retrying a response that could not be parsed.
+    """
+    token = _bypass_cache.set(True)
+    try:
+        yield
+    finally:
+        _bypass_cache.reset(token)
+
+
+def llm_cache_bypassed() -> bool:
+    return _bypass_cache.get()
+
+
+def mark_cache_hit(response: ModelResponse, hit: bool) -> ModelResponse:
+    # same flag as the litellm cache, reported to the tracers (see `notte.llms.logging.trace_llm_usage`)
+    hidden_params: dict[str, Any] = response._hidden_params  # pyright: ignore[reportPrivateUsage, reportUnknownMemberType, reportUnknownVariableType]
+    hidden_params["cache_hit"] = hit
+    return response
+
+
+class LLMCache:
+    """
+    Two tiers cache of the LLM responses: an in-memory LRU in front of an (optional) sqlite file.
+
+    Responses are stored serialized, so callers never share (and mutate) the same response object.
+    """
+
+    def __init__(self, config: LLMCacheConfig | None = None) -> None:
+        self.config: LLMCacheConfig = config or LLMCacheConfig().set_enabled()
+        self.stats: CacheStats = CacheStats()
+        # key -> (creation time, serialized response)
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+        # the on-disk tier is trimmed every `eviction_interval` writes (it can exceed its size in between)
+        self.eviction_interval: int = 64
+        self._db: sqlite3.Connection | None = None
+        if self.config.path is not None:
+            self._db = self._open(self.config.path)
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # concurrent readers and writers (e.g. the processes of a sharded pool)
+        _ = db.execute("PRAGMA journal_mode=WAL")
+        _ = db.execute(
+            (
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+        )
+        _ = db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        return db
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.config.ttl is not None and now - created_at > self.config.ttl
+
+    def get(self, key: str) -> ModelResponse | None:
+        response = self._memory_get(key)
+        if response is not None:
+            return response
+        return self._disk_lookup(key)
+
+    async def aget(self, key: str) -> ModelResponse | None:
+        """Same as `get`: the on-disk tier is read in a worker thread (not on the event loop)."""
+        response = self._memory_get(key)
+        if response is not None or self._db is None:
+            return response if response is not None else self._disk_lookup(key)
+        return await asyncio.to_thread(self._disk_lookup, key)
+
+    def set(self, key: str, response: ModelResponse) -> None:
+        entry, evict = self._memory_store(key, response)
+        self._disk_store(key, entry, evict)
+
+    async def aset(self, key: str, response: ModelResponse) -> None:
+        """Same as `set`: the on-disk tier is written in a worker thread (not on the event loop)."""
+        entry, evict = self._memory_store(key, response)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_store, key, entry, evict)
+
+    def delete(self, key: str) -> None:
+        """Drop the response of `key`, e.g. a response rejected by the caller."""
+        with self._lock:
+            _ = self._memory.pop(key, None)
+        self._disk_delete(key)
+
+    async def adelete(self, key: str) -> None:
+        with self._lock:
+            _ = self._memory.pop(key, None)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_delete, key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                _ = self._db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        """Number of responses in the in-memory tier (the on-disk tier is not counted)."""
+        return len(self._memory)
+
+    @staticmethod
+    def _load(serialized: str) -> ModelResponse:
+        data: dict[str, Any] = json.loads(serialized)
+        return ModelResponse(**data)
+
+    def _memory_get(self, key: str) -> ModelResponse | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._expired(entry[0], time.time()):
+                del self._memory[key]
+                self.stats.evictions += 1
+                entry = None
+            if entry is None:
+                return None
+            self._memory.move_to_end(key)
+            self.stats.memory_hits += 1
+        return mark_cache_hit(self._load(entry[1]), True)
+
+    def _memory_set(self, key: str, entry: tuple[float, str]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.max_memory_entries:
+            _ = self._memory.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _memory_store(self, key: str, response: ModelResponse) -> tuple[tuple[float, str], bool]:
+        """Store the response in memory. Returns the entry and whether the disk tier should be trimmed."""
+        entry = (time.time(), response.model_dump_json())
+        with self._lock:
+            self._memory_set(key, entry)
+            # counted before the check: the first write of a process does not trim the disk tier
+            self.stats.writes += 1
+            return entry, self.stats.writes % self.eviction_interval == 0
+
+    def _disk_lookup(self, key: str) -> ModelResponse | None:
+        with self._lock:
+            entry = self._disk_get(key, time.time())
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self.stats.disk_hits += 1
+            self._memory_set(key, entry)
+        return mark_cache_hit(self._load(entry[1]), True)
+
+    def _disk_get(self, key: str, now: float) -> tuple[float, str] | None:
+        if self._db is None:
+            return None
+        try:
+            row: tuple[str, float] | None = self._db.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, created_at = row
+            if self._expired(created_at, now):
+                _ = self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.stats.evictions += 1
+                return None
+            _ = self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return created_at, response
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read the LLM cache {self.config.path}: {e}")
+            return None
+
+    def _disk_store(self, key: str, entry: tuple[float, str], evict: bool) -> None:
+        with self._lock:
+            if self._db is None:
+                return
+            created_at, response = entry
+            try:
+                _ = self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, response, created_at, created_at),
+                )
+                if evict:
+                    self._disk_evict(created_at)
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to write the LLM cache {self.config.path}: {e}")
+
+    def _disk_delete(self, key: str) -> None:
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                _ = self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to write the LLM cache {self.config.path}: {e}")
+
+    def _disk_evict(self, now: float) -> None:
+        assert self._db is not None
+        if self.config.ttl is not None:
+            cursor = self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.config.ttl,))
+            self.stats.evictions += max(cursor.rowcount, 0)
+        if self.config.max_disk_entries is not None:
+            cursor = self._db.execute(
+                (
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)"
+                ),
+                (self.config.max_disk_entries,),
+            )
+            self.stats.evictions += max(cursor.rowcount, 0)
@@ -0,0 +1,202 @@
+# Long-lived HTTP clients of the LLM providers: connections (and their TLS handshakes) are reused across requests.
+import asyncio
+import threading
+from typing import Any, Self
+from weakref import WeakKeyDictionary
+
+import httpx
+import litellm
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler, HTTPHandler  # type: ignore[reportMissingTypeStubs]
+from openai import AsyncOpenAI, OpenAI, OpenAIError
+
+from notte.common.config import FrozenConfig
+
+try:
+    import h2  # type: ignore[import]  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False  # type: ignore
+
+
+def check_http2_imports():
+    if not HTTP2_AVAILABLE:
+        raise ImportError(
+            (
+                "The 'h2' package is required for HTTP/2 connections to the LLM providers."
+                " Install it with 'uv pip install httpx[http2]'"
+            )
+        )
+
+
+class LLMClientConfig(FrozenConfig):
+    # maximum number of concurrent connections (per client, i.e. per event loop for async requests)
+    max_connections: int = 100
+    # idle connections kept open for the next requests
+    max_keepalive_connections: int = 20
+    # in seconds, idle connections are closed after this delay
+    keepalive_expiry: float = 30.0
+    # HTTP/2 multiplexes the requests over a single connection (ALPN falls back to HTTP/1.1 if unsupported)
+    http2: bool = False
+    # in seconds
+    timeout: float = 600.0
+    connect_timeout: float = 10.0
+
+    def set_pool_size(self: Self, max_connections: int, max_keepalive_connections: int | None = None) -> Self:
+        return self._copy_and_validate(
+            max_connections=max_connections,
+            max_keepalive_connections=(
+                max_keepalive_connections
+                if max_keepalive_connections is not None
+                else min(self.max_keepalive_connections, max_connections)
+            ),
+        )
+
+    def set_keepalive_expiry(self: Self, value: float) -> Self:
+        return self._copy_and_validate(keepalive_expiry=value)
+
+    def set_http2(self: Self, value: bool = True) -> Self:
+        if value:
+            check_http2_imports()
+        return self._copy_and_validate(http2=value)
+
+    def set_timeout(self: Self, value: float) -> Self:
+        return self._copy_and_validate(timeout=value)
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeouts(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+
+_shared_clients: dict[str, "LLMClients"] = {}
+
+# the `client` argument of litellm depends on the provider: providers served through the OpenAI SDK take an
+# (Async)OpenAI client, the ones served by litellm's HTTP handler take an (Async)HTTPHandler.
+# Requests to the other providers go through the clients managed by litellm.
+OPENAI_SDK_PROVIDERS: frozenset[str] = frozenset({"openai", "cerebras"})
+HTTP_HANDLER_PROVIDERS: frozenset[str] = frozenset({"anthropic", "gemini", "groq"})
+
+
+class LLMClients:
+    """
+    Connection pools used by litellm for the LLM requests (see `LLMEngine`).
+
+    A single sync client serves all the threads. Async clients are created per event loop:
+    their connections cannot be reused from another loop.
+
+    The clients are passed with each request (see `request_client`), i.e. the global sessions of litellm
+    are left untouched: engines with different clients (or none) can run side by side.
+    """
+
+    def __init__(self, config: LLMClientConfig | None = None) -> None:
+        self.config: LLMClientConfig = config or LLMClientConfig()
+        if self.config.http2:
+            check_http2_imports()
+        self._client: httpx.Client | None = None
+        self._async_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = WeakKeyDictionary()
+        # `client` arguments of litellm built on top of the httpx clients (by provider and credentials)
+        self._request_clients: dict[tuple[str | None, ...], Any] = {}
+        self._async_request_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple[str | None, ...], Any]] = (
+            WeakKeyDictionary()
+        )
+        self._lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def shared(config: LLMClientConfig) -> "LLMClients":
+        """Clients with `config` shared by the whole process (e.g. by the services of all the sessions)."""
+        key = config.model_dump_json()
+        clients = _shared_clients.get(key)
+        if clients is None:
+            clients = LLMClients(config)
+            _shared_clients[key] = clients
+        return clients
+
+    def client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.Client(
+                    limits=self.config.limits(), timeout=self.config.timeouts(), http2=self.config.http2
+                )
+                self._request_clients = {}
+            return self._client
+
+    def async_client(self) -> httpx.AsyncClient:
+        """Client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.get(loop)
+            if client is None or client.is_closed:
+                client = httpx.AsyncClient(
+                    limits=self.config.limits(), timeout=self.config.timeouts(), http2=self.config.http2
+                )
+                self._async_clients[loop] = client
+                self._async_request_clients[loop] = {}
+            return client
+
+    def request_client(self, model: str) -> OpenAI | HTTPHandler | None:
+        """`client` argument of `litellm.completion` for `model` (None if its provider is not supported)."""
+        client = self.client()
+        with self._lock:
+            return self._cached_request_client(self._request_clients, model, client)
+
+    def arequest_client(self, model: str) -> AsyncOpenAI | AsyncHTTPHandler | None:
+        """`client` argument of `litellm.acompletion` for `model` on the running event loop."""
+        client = self.async_client()
+        with self._lock:
+            return self._cached_request_client(self._async_request_clients[asyncio.get_running_loop()], model, client)
+
+    @staticmethod
+    def _cached_request_client(
+        cache: dict[tuple[str | None, ...], Any], model: str, client: httpx.Client | httpx.AsyncClient
+    ) -> Any:
+        _, provider, api_key, api_base = litellm.get_llm_provider(model)
+        if provider in HTTP_HANDLER_PROVIDERS:
+            key: tuple[str | None, ...] = ("http_handler",)
+        elif provider in OPENAI_SDK_PROVIDERS:
+            # OpenAI clients carry the credentials of the provider (None: read from the environment by the SDK)
+            key = ("openai", api_key, api_base)
+        else:
+            return None
+        if key in cache:
+            return cache[key]
+        request_client: Any
+        if isinstance(client, httpx.Client):
+            if provider in HTTP_HANDLER_PROVIDERS:
+                request_client = HTTPHandler(client=client)
+            else:
+                try:
+                    request_client = OpenAI(api_key=api_key, base_url=api_base, http_client=client)
+                except OpenAIError:
+                    # e.g. missing api key: litellm reports it
+                    return None
+        elif provider in HTTP_HANDLER_PROVIDERS:
+            request_client = AsyncHTTPHandler()
+            request_client.client = client
+        else:
+            try:
+                request_client = AsyncOpenAI(api_key=api_key, base_url=api_base, http_client=client)
+            except OpenAIError:
+                return None
+        cache[key] = request_client
+        return request_client
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            self._request_clients = {}
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._async_clients.pop(loop, None)
+            _ = self._async_request_clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
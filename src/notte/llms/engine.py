@@ -32,7 +32,9 @@ from notte.errors.provider import (
     ModelDoesNotSupportImageError,
 )
 from notte.errors.provider import RateLimitError as NotteRateLimitError
-from notte.llms.logging import trace_llm_usage
+from notte.llms.cache import LLMCache, cache_key, llm_cache_bypassed, mark_cache_hit
+from notte.llms.clients import LLMClients
+from notte.llms.logging import atrace_llm_usage, trace_llm_usage
 
 
 class LlmModel(StrEnum):
@@ -48,6 +50,9 @@ class LlmModel(StrEnum):
 
 TResponseFormat = TypeVar("TResponseFormat", bound=BaseModel)
 
+# response format of the structured completions
+JSON_OBJECT_FORMAT: dict[str, str] = {"type": "json_object"}
+
 
 class LLMEngine:
     def __init__(
@@ -56,6 +61,8 @@ class LLMEngine:
         tracer: LlmTracer | None = None,
         structured_output_retries: int = 0,
         verbose: bool = False,
+        cache: LLMCache | None = None,
+        clients: LLMClients | None = None,
     ):
         self.model: str = model or LlmModel.default()
         self.sc: StructuredContent = StructuredContent(inner_tag="json", fail_if_inner_tag=False)
@@ -65,8 +72,13 @@ class LLMEngine:
 
         self.tracer: LlmTracer = tracer
         self.completion = trace_llm_usage(tracer=self.tracer)(self.completion)
+        self.acompletion = atrace_llm_usage(tracer=self.tracer)(self.acompletion)
         self.structured_output_retries: int = structured_output_retries
         self.verbose: bool = verbose
+        # opt-in cache of the responses (see `notte.llms.cache`)
+        self.cache: LLMCache | None = cache
+        # connection pools of the providers, None to let litellm manage its clients (see `notte.llms.clients`)
+        self.clients: LLMClients | None = clients
 
     def structured_completion(
         self,
@@ -78,36 +90,68 @@ class LLMEngine:
         content = None
         while tries > 0:
             tries -= 1
-            content = self.single_completion(messages, model, response_format=dict(type="json_object")).strip()
-            content = self.sc.extract(content).strip()
+            key = self._cache_key(messages, model or self.model, 0.0, JSON_OBJECT_FORMAT, 1)
+            content = self.single_completion(messages, model, response_format=JSON_OBJECT_FORMAT)
+            parsed = self._parse_structured(content, messages, response_format)
+            if parsed is not None:
+                return parsed
+            self._cache_delete(key)
 
-            if self.verbose:
-                logger.info(f"LLM response: \n{content}")
-
-            if "```json" in content:
-                # extract content from JSON code blocks
-                content = self.sc.extract(content).strip()
-            elif not content.startswith("{") or not content.endswith("}"):
-                messages.append(
-                    ChatCompletionUserMessage(
-                        role="user",
-                        content=f"Invalid LLM response. JSON code blocks or JSON object expected, got: {content}. Retrying",
-                    )
-                )
-                continue
-            try:
-                return response_format.model_validate_json(content)
-            except ValidationError as e:
-                messages.append(
-                    ChatCompletionUserMessage(
-                        role="user",
-                        content=f"Error parsing LLM response: {e}, retrying",
-                    )
-                )
-                continue
+        raise LLMParsingError(f"Error parsing LLM response: \n\n{content}\n\n")
+
+    async def astructured_completion(
+        self,
+        messages: list[AllMessageValues],
+        response_format: type[TResponseFormat],
+        model: str | None = None,
+    ) -> TResponseFormat:
+        tries = self.structured_output_retries + 1
+        content = None
+        while tries > 0:
+            tries -= 1
+            key = self._cache_key(messages, model or self.model, 0.0, JSON_OBJECT_FORMAT, 1)
+            content = await self.asingle_completion(messages, model, response_format=JSON_OBJECT_FORMAT)
+            parsed = self._parse_structured(content, messages, response_format)
+            if parsed is not None:
+                return parsed
+            await self._acache_delete(key)
 
         raise LLMParsingError(f"Error parsing LLM response: \n\n{content}\n\n")
 
+    def _parse_structured(
+        self,
+        content: str,
+        messages: list[AllMessageValues],
+        response_format: type[TResponseFormat],
+    ) -> TResponseFormat | None:
+        """Parse `content` into `response_format`, or append the error to `messages` (for a retry) and return None."""
+        content = self.sc.extract(content.strip()).strip()
+
+        if self.verbose:
+            logger.info(f"LLM response: \n{content}")
+
+        if "```json" in content:
+            # extract content from JSON code blocks
+            content = self.sc.extract(content).strip()
+        elif not content.startswith("{") or not content.endswith("}"):
+            messages.append(
+                ChatCompletionUserMessage(
+                    role="user",
+                    content=f"Invalid LLM response. JSON code blocks or JSON object expected, got: {content}. Retrying",
+                )
+            )
+            return None
+        try:
+            return response_format.model_validate_json(content)
+        except ValidationError as e:
+            messages.append(
+                ChatCompletionUserMessage(
+                    role="user",
+                    content=f"Error parsing LLM response: {e}, retrying",
+                )
+            )
+            return None
+
     def single_completion(
         self,
         messages: list[AllMessageValues],
@@ -125,6 +169,23 @@ class LLMEngine:
         )
         return response.choices[0].message.content  # type: ignore
 
+    async def asingle_completion(
+        self,
+        messages: list[AllMessageValues],
+        model: str | None = None,
+        temperature: float = 0.0,
+        response_format: dict[str, str] | None = None,
+    ) -> str:
+        model = model or self.model
+        response = await self.acompletion(
+            messages,
+            model=model,
+            temperature=temperature,
+            n=1,
+            response_format=response_format,
+        )
+        return response.choices[0].message.content  # type: ignore
+
     def completion(
         self,
         messages: list[AllMessageValues],
@@ -134,6 +195,10 @@ class LLMEngine:
         n: int = 1,
     ) -> ModelResponse:
         model = model or self.model
+        key = self._cache_key(messages, model, temperature, response_format, n)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
         try:
             response = litellm.completion(  # type: ignore[arg-type]
                 model,
@@ -141,57 +206,141 @@ class LLMEngine:
                 temperature=temperature,
                 n=n,
                 response_format=response_format,
+                client=self.clients.request_client(model) if self.clients is not None else None,
             )
-            # Cast to ModelResponse since we know it's not streaming in this case
-            return cast(ModelResponse, response)
-
-        except RateLimitError:
-            raise NotteRateLimitError(provider=model)
-        except AuthenticationError:
-            raise InvalidAPIKeyError(provider=model)
-        except LiteLLMContextWindowExceededError as e:
-            # Try to extract size information from error message
-            current_size = None
-            max_size = None
-            pattern = r"Current length is (\d+) while limit is (\d+)"
-            match = re.search(pattern, str(e))
-            if match:
-                current_size = int(match.group(1))
-                max_size = int(match.group(2))
-            raise ContextWindowExceededError(
-                provider=model,
-                current_size=current_size,
-                max_size=max_size,
-            ) from e
-        except BadRequestError as e:
-            if "Missing API Key" in str(e):
-                raise MissingAPIKeyForModel(model) from e
-            if "Input should be a valid string" in str(e):
-                raise ModelDoesNotSupportImageError(model) from e
-            raise LLMProviderError(
-                dev_message=f"Bad request to provider {model}. {str(e)}",
-                user_message="Invalid request parameters to LLM provider.",
-                agent_message=None,
-                should_retry_later=False,
-            ) from e
-        except APIError as e:
-            raise LLMProviderError(
-                dev_message=f"API error from provider {model}. {str(e)}",
-                user_message="An unexpected error occurred while processing your request.",
-                agent_message=None,
-                should_retry_later=True,
-            ) from e
         except Exception as e:
-            logger.error(f"Error generating response: {str(e)}")
-            logger.exception("Full traceback:")
-            if "credit balance is too low" in str(e):
-                raise InsufficentCreditsError() from e
-            raise LLMProviderError(
-                dev_message=f"Unexpected error from LLM provider: {str(e)}",
-                user_message="An unexpected error occurred while processing your request.",
-                should_retry_later=True,
-                agent_message=None,
-            ) from e
+            raise self._provider_error(model, e) from e
+        # Cast to ModelResponse since we know it's not streaming in this case
+        return self._cache_set(key, cast(ModelResponse, response))
+
+    async def acompletion(
+        self,
+        messages: list[AllMessageValues],
+        model: str | None = None,
+        temperature: float = 0.0,
+        response_format: dict[str, str] | None = None,
+        n: int = 1,
+    ) -> ModelResponse:
+        """Same as `completion` without blocking the event loop while waiting for the provider."""
+        model = model or self.model
+        key = self._cache_key(messages, model, temperature, response_format, n)
+        cached = await self._acache_get(key)
+        if cached is not None:
+            return cached
+        try:
+            response = await litellm.acompletion(
+                model,
+                messages,
+                temperature=temperature,
+                n=n,
+                response_format=response_format,
+                client=self.clients.arequest_client(model) if self.clients is not None else None,
+            )
+        except Exception as e:
+            raise self._provider_error(model, e) from e
+        # Cast to ModelResponse since we know it's not streaming in this case
+        return await self._acache_set(key, cast(ModelResponse, response))
+
+    def _cache_key(
+        self,
+        messages: list[AllMessageValues],
+        model: str,
+        temperature: float,
+        response_format: dict[str, str] | None,
+        n: int,
+    ) -> str | None:
+        if self.cache is None:
+            return None
+        return cache_key(model, messages, temperature, response_format, n)
+
+    def _cache_get(self, key: str | None) -> ModelResponse | None:
+        if self.cache is None or key is None or llm_cache_bypassed():
+            return None
+        response = self.cache.get(key)
+        if response is not None and self.verbose:
+            logger.info(f"LLM cache hit (hit rate: {self.cache.stats.hit_rate:.0%})")
+        return response
+
+    async def _acache_get(self, key: str | None) -> ModelResponse | None:
+        # the on-disk tier of the cache must not block the event loop
+        if self.cache is None or key is None or llm_cache_bypassed():
+            return None
+        response = await self.cache.aget(key)
+        if response is not None and self.verbose:
+            logger.info(f"LLM cache hit (hit rate: {self.cache.stats.hit_rate:.0%})")
+        return response
+
+    def _cache_set(self, key: str | None, response: ModelResponse) -> ModelResponse:
+        if self.cache is None or key is None:
+            return response
+        self.cache.set(key, response)
+        return mark_cache_hit(response, False)
+
+    def _cache_delete(self, key: str | None) -> None:
+        # the response could not be parsed: it must not be served again
+        if self.cache is not None and key is not None:
+            self.cache.delete(key)
+
+    async def _acache_set(self, key: str | None, response: ModelResponse) -> ModelResponse:
+        if self.cache is None or key is None:
+            return response
+        await self.cache.aset(key, response)
+        return mark_cache_hit(response, False)
+
+    async def _acache_delete(self, key: str | None) -> None:
+        if self.cache is not None and key is not None:
+            await self.cache.adelete(key)
+
+    def _provider_error(self, model: str, e: Exception) -> Exception:
+        """Notte error raised for an exception `e` of the provider of `model`."""
+        match e:
+            case RateLimitError():
+                return NotteRateLimitError(provider=model)
+            case AuthenticationError():
+                return InvalidAPIKeyError(provider=model)
+            case LiteLLMContextWindowExceededError():
+                # Try to extract size information from error message
+                current_size = None
+                max_size = None
+                pattern = r"Current length is (\d+) while limit is (\d+)"
+                size_match = re.search(pattern, str(e))
+                if size_match:
+                    current_size = int(size_match.group(1))
+                    max_size = int(size_match.group(2))
+                return ContextWindowExceededError(
+                    provider=model,
+                    current_size=current_size,
+                    max_size=max_size,
+                )
+            case BadRequestError():
+                if "Missing API Key" in str(e):
+                    return MissingAPIKeyForModel(model)
+                if "Input should be a valid string" in str(e):
+                    return ModelDoesNotSupportImageError(model)
+                return LLMProviderError(
+                    dev_message=f"Bad request to provider {model}. {str(e)}",
+                    user_message="Invalid request parameters to LLM provider.",
+                    agent_message=None,
+                    should_retry_later=False,
+                )
+            case APIError():
+                return LLMProviderError(
+                    dev_message=f"API error from provider {model}. {str(e)}",
+                    user_message="An unexpected error occurred while processing your request.",
+                    agent_message=None,
+                    should_retry_later=True,
+                )
+            case _:
+                logger.error(f"Error generating response: {str(e)}")
+                logger.exception("Full traceback:")
+                if "credit balance is too low" in str(e):
+                    return InsufficentCreditsError()
+                return LLMProviderError(
+                    dev_message=f"Unexpected error from LLM provider: {str(e)}",
+                    user_message="An unexpected error occurred while processing your request.",
+                    should_retry_later=True,
+                    agent_message=None,
+                )
 
 
 @dataclass
@@ -1,8 +1,9 @@
 import inspect
 import typing
+from collections.abc import Coroutine
 from datetime import datetime
 from functools import wraps
-from typing import TYPE_CHECKING, Any, Callable
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
 
 from litellm import ModelResponse  # type: ignore[import]
 from loguru import logger
@@ -12,6 +13,8 @@ from notte.common.tracer import LlmTracer
 if TYPE_CHECKING:
     pass
 
+TAsyncCompletion = TypeVar("TAsyncCompletion", bound=Callable[..., Coroutine[Any, Any, ModelResponse]])
+
 
 def recover_args(func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[str, Any]) -> dict[str, Any]:
     sig = inspect.signature(func)
@@ -27,6 +30,52 @@ def recover_args(func: Callable[..., Any], args: tuple[Any, ...], kwargs: dict[s
     return all_params
 
 
+def _trace_metadata(metadata: dict[str, Any] | None, response: ModelResponse) -> dict[str, Any] | None:
+    # responses served by the LLM cache are flagged so that the tracers can count the hits and misses
+    hidden_params: dict[str, Any] = getattr(response, "_hidden_params", None) or {}
+    cache_hit = hidden_params.get("cache_hit")
+    if cache_hit is None:
+        return metadata
+    return {**(metadata or {}), "cache_hit": bool(cache_hit)}
+
+
+def _trace_response(
+    tracer: LlmTracer,
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    response: ModelResponse,
+) -> None:
+    recovered_args = recover_args(func, args, kwargs)
+    model = typing.cast(str, recovered_args.get("model"))
+    messages = typing.cast(list[Any], recovered_args.get("messages"))
+    try:
+        _completion: str | None = response.choices[0].message.content  # type: ignore[attr-defined]
+        completion: str = _completion or ""  # type: ignore[attr-defined]
+
+        usage = getattr(response, "usage", None)
+        usage_dict = (
+            {
+                "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+                "completion_tokens": getattr(usage, "completion_tokens", 0),
+                "total_tokens": getattr(usage, "total_tokens", 0),
+            }
+            if usage
+            else {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        )
+
+        tracer.trace(
+            timestamp=datetime.now().isoformat(),
+            model=model,
+            messages=messages,
+            completion=completion,  # type: ignore[arg-type]
+            usage=usage_dict,
+            metadata=_trace_metadata(kwargs.get("metadata"), response),
+        )
+    except Exception as e:
+        logger.error(f"Error logging LLM usage: {str(e)}")
+
+
 def trace_llm_usage(
     tracer: LlmTracer | None = None,
 ) -> Callable[[Callable[..., ModelResponse]], Callable[..., ModelResponse]]:
@@ -37,43 +86,35 @@ def trace_llm_usage(
             **kwargs: Any,
         ) -> ModelResponse:
             # Call the original function
-
-            recovered_args = recover_args(func, args, kwargs)
-            model = typing.cast(str, recovered_args.get("model"))
-
-            messages = typing.cast(list[Any], recovered_args.get("messages"))
             response: ModelResponse = func(*args, **kwargs)
 
             # Only trace if tracer is provided
             if tracer is not None:
-                try:
-                    _completion: str | None = response.choices[0].message.content  # type: ignore[attr-defined]
-                    completion: str = _completion or ""  # type: ignore[attr-defined]
-
-                    usage = getattr(response, "usage", None)
-                    usage_dict = (
-                        {
-                            "prompt_tokens": getattr(usage, "prompt_tokens", 0),
-                            "completion_tokens": getattr(usage, "completion_tokens", 0),
-                            "total_tokens": getattr(usage, "total_tokens", 0),
-                        }
-                        if usage
-                        else {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
-                    )
-
-                    tracer.trace(
-                        timestamp=datetime.now().isoformat(),
-                        model=model,
-                        messages=messages,
-                        completion=completion,  # type: ignore[arg-type]
-                        usage=usage_dict,
-                        metadata=kwargs.get("metadata"),
-                    )
-                except Exception as e:
-                    logger.error(f"Error logging LLM usage: {str(e)}")
+                _trace_response(tracer, func, args, kwargs, response)
 
             return response
 
         return wrapper
 
     return decorator
+
+
+def atrace_llm_usage(
+    tracer: LlmTracer | None = None,
+) -> Callable[[TAsyncCompletion], TAsyncCompletion]:
+    """Same as `trace_llm_usage` for coroutine functions (e.g. `LLMEngine.acompletion`)."""
+
+    def decorator(func: TAsyncCompletion) -> TAsyncCompletion:
+        @wraps(func)
+        async def wrapper(
+            *args: Any,
+            **kwargs: Any,
+        ) -> ModelResponse:
+            response: ModelResponse = await func(*args, **kwargs)
+            if tracer is not None:
+                _trace_response(tracer, func, args, kwargs, response)
+            return response
+
+        return typing.cast(TAsyncCompletion, wrapper)
+
+    return decorator
@@ -1,60 +1,142 @@
+import os
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, ClassVar
 
 import chevron
+from chevron.tokenizer import tokenize
 from litellm import Message
 
 from notte.errors.llm import InvalidPromptTemplateError
 
+VALID_ROLES: list[str] = ["assistant", "user", "system", "tool", "function"]
+
+
+def prompts_dev_mode() -> bool:
+    # reload the prompt templates when they are edited (costs a `stat` of the prompt files per call)
+    return os.getenv("NOTTE_PROMPTS_DEV_MODE", "false").lower() in ("1", "true")
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """Message of a prompt, with its mustache template parsed once."""
+
+    role: str
+    content: str
+    tokens: tuple[tuple[str, str], ...]
+
+    @staticmethod
+    def parse(role: str, content: str) -> "PromptTemplate":
+        return PromptTemplate(role=role, content=content, tokens=tuple(tokenize(content)))
+
+    def render(self, variables: dict[str, Any]) -> str:
+        # chevron renders token lists as is (instead of tokenizing the template again)
+        return chevron.render(list(self.tokens), variables, warn=True)
+
+
+@dataclass(frozen=True)
+class _LoadedPrompt:
+    templates: list[PromptTemplate]
+    # (path, modification time) of the prompt files, to detect changes in dev mode
+    signature: tuple[tuple[str, int], ...]
+
 
 class PromptLibrary:
-    def __init__(self, prompts_dir: str | Path) -> None:
+    """
+    Prompt templates of a directory (one sub-directory per prompt id, one `<role>.md` file per message).
+
+    Templates are read and parsed once (on first use or with `warm_up`). In dev mode, the prompt files are
+    checked on each call and reloaded when they change.
+    """
+
+    _shared: ClassVar[dict[Path, "PromptLibrary"]] = {}
+
+    def __init__(self, prompts_dir: str | Path, dev_mode: bool | None = None) -> None:
         self.prompts_dir: Path = Path(prompts_dir)
         if not self.prompts_dir.exists():
             raise NotADirectoryError(f"Prompts directory not found: {prompts_dir}")
+        self.dev_mode: bool = prompts_dev_mode() if dev_mode is None else dev_mode
+        self._prompts: dict[str, _LoadedPrompt] = {}
 
-    def get(self, prompt_id: str) -> list[Message]:
-        prompt_path: Path = self.prompts_dir / prompt_id
-        prompt_files: list[Path] = list(prompt_path.glob("*.md"))
+    @classmethod
+    def shared(cls, prompts_dir: str | Path) -> "PromptLibrary":
+        """Library of `prompts_dir` shared by the whole process (e.g. by all the `LLMService` instances)."""
+        path = Path(prompts_dir).resolve()
+        library = cls._shared.get(path)
+        if library is None:
+            library = cls(path)
+            cls._shared[path] = library
+        return library
+
+    def prompt_ids(self) -> list[str]:
+        return sorted({path.parent.relative_to(self.prompts_dir).as_posix() for path in self.prompts_dir.rglob("*.md")})
+
+    def warm_up(self) -> None:
+        """Load and parse all the prompts of the library."""
+        for prompt_id in self.prompt_ids():
+            _ = self.templates(prompt_id)
+
+    def _files(self, prompt_id: str) -> list[Path]:
+        prompt_files: list[Path] = list((self.prompts_dir / prompt_id).glob("*.md"))
         if len(prompt_files) == 0:
             raise FileNotFoundError(f"Prompt template not found: {prompt_id}")
-        messages: list[Message] = []
+        return prompt_files
+
+    @staticmethod
+    def _signature(prompt_files: list[Path]) -> tuple[tuple[str, int], ...]:
+        return tuple((str(path), path.stat().st_mtime_ns) for path in prompt_files)
+
+    def templates(self, prompt_id: str) -> list[PromptTemplate]:
+        prompt = self._prompts.get(prompt_id)
+        if prompt is not None and not self.dev_mode:
+            return prompt.templates
+        prompt_files = self._files(prompt_id)
+        signature = self._signature(prompt_files)
+        if prompt is not None and prompt.signature == signature:
+            return prompt.templates
+        prompt = _LoadedPrompt(templates=self._load(prompt_id, prompt_files), signature=signature)
+        self._prompts[prompt_id] = prompt
+        return prompt.templates
+
+    def _load(self, prompt_id: str, prompt_files: list[Path]) -> list[PromptTemplate]:
+        templates: list[PromptTemplate] = []
         for prompt_file in prompt_files:
             with open(prompt_file, "r") as file:
                 content: str = file.read()
-                role: str = prompt_file.name.split(".")[0]
-                if role not in ["assistant", "user", "system", "tool", "function"]:
-                    raise InvalidPromptTemplateError(
-                        prompt_id=prompt_id,
-                        message=(
-                            f"invalid role: {role} in prompt template. "
-                            "Valid roles are: assistant, user, system, tool, function"
-                        ),
-                    )
-                messages.append(Message(role=role, content=content))  # type: ignore
-        return messages
+            role: str = prompt_file.name.split(".")[0]
+            if role not in VALID_ROLES:
+                raise InvalidPromptTemplateError(
+                    prompt_id=prompt_id,
+                    message=(
+                        f"invalid role: {role} in prompt template. "
+                        "Valid roles are: assistant, user, system, tool, function"
+                    ),
+                )
+            try:
+                templates.append(PromptTemplate.parse(role, content))
+            except Exception as e:
+                raise InvalidPromptTemplateError(
+                    prompt_id=prompt_id,
+                    message=f"Error parsing prompt template {prompt_file.name}: {str(e)}",
+                ) from e
+        return templates
+
+    def get(self, prompt_id: str) -> list[Message]:
+        return [
+            Message(role=template.role, content=template.content)  # type: ignore
+            for template in self.templates(prompt_id)
+        ]
 
     def materialize(self, prompt_id: str, variables: dict[str, str] | None = None) -> list[dict[str, str]]:
         # TODO. You cant pass variables that are not in the prompt template
         # But you can fewer variables than in the prompt template
-        _messages: list[Message] = self.get(prompt_id)
-        messages: list[dict[str, str]] = []
-        for message in _messages:
-            if message.content is None:
-                raise InvalidPromptTemplateError(
-                    prompt_id=prompt_id,
-                    message=f"Message content is none: {message.role}",
-                )
-            messages.append({"role": message.role, "content": message.content})
+        templates: list[PromptTemplate] = self.templates(prompt_id)
 
         if variables is None:
-            return messages
+            return [{"role": template.role, "content": template.content} for template in templates]
 
         try:
-            materialized_messages: list[dict[str, str]] = []
-            for message in messages:
-                formatted_content: str = chevron.render(message["content"], variables, warn=True)
-                materialized_messages.append({"role": message["role"], "content": formatted_content})
-            return materialized_messages
+            return [{"role": template.role, "content": template.render(variables)} for template in templates]
         except KeyError as e:
             raise InvalidPromptTemplateError(
                 prompt_id=prompt_id,
@@ -7,9 +7,13 @@ from litellm import ModelResponse  # type: ignore[import]
 from llamux import Router  # type: ignore[import]
 from loguru import logger
 
+from notte.common.tracer import LlmTracer, LlmUsageFileTracer
 from notte.errors.llm import InvalidPromptTemplateError
+from notte.llms.cache import LLMCache
+from notte.llms.clients import LLMClients
 from notte.llms.engine import LLMEngine, TResponseFormat
 from notte.llms.prompt import PromptLibrary
+from notte.llms.tokens import TokenCounter
 
 PROMPT_DIR = Path(__file__).parent.parent / "llms" / "prompts"
 LLAMUX_CONFIG = Path(__file__).parent.parent / "llms" / "config" / "endpoints.csv"
@@ -33,18 +37,53 @@ class LLMService:
     DEFAULT_MODEL: ClassVar[str] = "groq/llama-3.3-70b-versatile"
 
     def __init__(
-        self, base_model: str | None = None, verbose: bool = False, structured_output_retries: int = 0
+        self,
+        base_model: str | None = None,
+        verbose: bool = False,
+        structured_output_retries: int = 0,
+        cache: LLMCache | None = None,
+        clients: LLMClients | None = None,
+        tracer: LlmTracer | None = None,
     ) -> None:
-        self.lib: PromptLibrary = PromptLibrary(str(PROMPT_DIR))
+        self.lib: PromptLibrary = PromptLibrary.shared(PROMPT_DIR)
         llamux_config = get_llamux_config(verbose)
         path = Path(llamux_config)
         if not path.exists():
             raise FileNotFoundError(f"LLAMUX config file not found at {path}")
         self.router: Router = Router.from_csv(llamux_config)
         self.base_model: str | None = base_model or self.DEFAULT_MODEL
-        self.tokenizer: tiktoken.Encoding = tiktoken.get_encoding("cl100k_base")
+        # the tokenizer is only loaded on the first exact count
+        self.tokens: TokenCounter = TokenCounter("cl100k_base")
         self.verbose: bool = verbose
         self.structured_output_retries: int = structured_output_retries
+        # shared by the engines of the service
+        self.cache: LLMCache | None = cache
+        self.clients: LLMClients | None = clients
+        self.tracer: LlmTracer = tracer or LlmUsageFileTracer()
+        # engines are created once per model (instead of once per request)
+        self._engines: dict[str, LLMEngine] = {}
+
+    def engine(self, model: str) -> LLMEngine:
+        engine = self._engines.get(model)
+        if engine is None:
+            engine = LLMEngine(
+                model=model,
+                tracer=self.tracer,
+                structured_output_retries=self.structured_output_retries,
+                verbose=self.verbose,
+                cache=self.cache,
+                clients=self.clients,
+            )
+            self._engines[model] = engine
+        return engine
+
+    @property
+    def tokenizer(self) -> tiktoken.Encoding:
+        return self.tokens.encoding
+
+    @tokenizer.setter
+    def tokenizer(self, encoding: tiktoken.Encoding) -> None:
+        self.tokens = TokenCounter(encoding)
 
     def get_base_model(self, messages: list[dict[str, Any]]) -> tuple[str, str | None]:
         eid: str | None = None
@@ -55,20 +94,26 @@ class LLMService:
             base_model = f"{provider}/{model}"
         else:
             base_model = self.base_model
-        token_len = self.estimate_tokens(text="\n".join([m["content"] for m in messages]))
         if self.verbose:
+            # only logged: approximate count (without tokenizing the prompt)
+            token_len = self.estimate_tokens(text="\n".join([m["content"] for m in messages]), approximate=True)
             logger.debug(f"llm router '{router}' selected '{base_model}' for approx {token_len} tokens")
         return base_model, eid
 
     def clip_tokens(self, document: str, max_tokens: int) -> str:
-        tokens = self.tokenizer.encode(document)
-        if len(tokens) > max_tokens:
-            logger.info(f"Cannot process document, exceeds max tokens: {len(tokens)} > {max_tokens}. Clipping...")
-            return self.tokenizer.decode(tokens[:max_tokens])
-        return document
+        clipped = self.tokens.clip(document, max_tokens)
+        if len(clipped) < len(document):
+            logger.info(
+                f"Cannot process document, exceeds max tokens: {max_tokens}. Clipping to {len(clipped)} characters..."
+            )
+        return clipped
 
     def estimate_tokens(
-        self, text: str | None = None, prompt_id: str | None = None, variables: dict[str, Any] | None = None
+        self,
+        text: str | None = None,
+        prompt_id: str | None = None,
+        variables: dict[str, Any] | None = None,
+        approximate: bool = False,
     ) -> int:
         if text is None:
             if prompt_id is None or variables is None:
@@ -78,7 +123,7 @@ class LLMService:
                 )
             messages = self.lib.materialize(prompt_id, variables)
             text = "\n".join([m["content"] for m in messages])
-        return len(self.tokenizer.encode(text))
+        return self.tokens.count(text, approximate=approximate)
 
     def structured_completion(
         self,
@@ -88,9 +133,21 @@ class LLMService:
     ) -> TResponseFormat:
         messages = self.lib.materialize(prompt_id, variables)
         base_model, _ = self.get_base_model(messages)
-        return LLMEngine(
-            structured_output_retries=self.structured_output_retries, verbose=self.verbose
-        ).structured_completion(
+        return self.engine(base_model).structured_completion(
+            messages=messages,  # type: ignore[arg-type]
+            response_format=response_format,
+            model=base_model,
+        )
+
+    async def astructured_completion(
+        self,
+        prompt_id: str,
+        response_format: type[TResponseFormat],
+        variables: dict[str, Any] | None = None,
+    ) -> TResponseFormat:
+        messages = self.lib.materialize(prompt_id, variables)
+        base_model, _ = self.get_base_model(messages)
+        return await self.engine(base_model).astructured_completion(
             messages=messages,  # type: ignore[arg-type]
             response_format=response_format,
             model=base_model,
@@ -103,12 +160,29 @@ class LLMService:
     ) -> ModelResponse:
         messages = self.lib.materialize(prompt_id, variables)
         base_model, eid = self.get_base_model(messages)
-        response = LLMEngine(verbose=self.verbose).completion(
+        response = self.engine(base_model).completion(
+            messages=messages,  # type: ignore[arg-type]
+            model=base_model,
+        )
+        self.log_usage(response, eid)
+        return response
+
+    async def acompletion(
+        self,
+        prompt_id: str,
+        variables: dict[str, Any] | None = None,
+    ) -> ModelResponse:
+        messages = self.lib.materialize(prompt_id, variables)
+        base_model, eid = self.get_base_model(messages)
+        response = await self.engine(base_model).acompletion(
             messages=messages,  # type: ignore[arg-type]
             model=base_model,
         )
+        self.log_usage(response, eid)
+        return response
+
+    def log_usage(self, response: ModelResponse, eid: str | None) -> None:
         if eid is not None:
             # log usage to LLAMUX router if eid is provided
             tokens: int = response.usage.total_tokens  # type: ignore[attr-defined]
             self.router.log(tokens=tokens, endpoint_id=eid)  # type: ignore[arg-type]
-        return response
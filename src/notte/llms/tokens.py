@@ -0,0 +1,136 @@
+# Token accounting of the LLM inputs: counts are cached, and an approximate mode avoids tokenizing at all
+# (e.g. for logging). The tokenizer is only loaded on the first exact count.
+import functools
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any
+
+import tiktoken
+from litellm import AllMessageValues
+from litellm.utils import token_counter  # type: ignore[reportUnknownVariableType]
+
+# average number of characters per token of the OpenAI encodings on english text / html
+CHARS_PER_TOKEN: int = 4
+# tokens added by the chat template to each message (role, separators)
+MESSAGE_OVERHEAD_TOKENS: int = 4
+# a 1024x1024 image at high detail with the OpenAI formula
+APPROX_IMAGE_TOKENS: int = 765
+# extra tokens encoded past the clipping point: the tokenization of the last words can depend on what follows them
+CLIP_MARGIN_TOKENS: int = 16
+
+
+def approximate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode(errors="surrogatepass"), digest_size=16).digest()
+
+
+class TokenCounter:
+    """
+    Counts (and clips) tokens with a tiktoken encoding.
+
+    Counts are cached by content (LRU of `cache_size` texts and messages), so the same document or message is
+    only tokenized once.
+    """
+
+    def __init__(
+        self,
+        encoding: str | tiktoken.Encoding = "cl100k_base",
+        approximate: bool = False,
+        cache_size: int = 1024,
+    ) -> None:
+        self._encoding: tiktoken.Encoding | None = encoding if isinstance(encoding, tiktoken.Encoding) else None
+        self.encoding_name: str = encoding if isinstance(encoding, str) else encoding.name
+        # default mode of `count` and `count_message`
+        self.approximate: bool = approximate
+        self.cache_size: int = cache_size
+        self._counts: OrderedDict[bytes, int] = OrderedDict()
+        self._message_counts: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+
+    @property
+    def encoding(self) -> tiktoken.Encoding:
+        if self._encoding is None:
+            self._encoding = tiktoken.get_encoding(self.encoding_name)
+        return self._encoding
+
+    def _cached(self, cache: "OrderedDict[Any, int]", key: Any) -> int | None:
+        count = cache.get(key)
+        if count is not None:
+            cache.move_to_end(key)
+        return count
+
+    def _store(self, cache: "OrderedDict[Any, int]", key: Any, count: int) -> int:
+        cache[key] = count
+        if len(cache) > self.cache_size:
+            _ = cache.popitem(last=False)
+        return count
+
+    def count(self, text: str, approximate: bool | None = None) -> int:
+        if self.approximate if approximate is None else approximate:
+            return approximate_tokens(text)
+        key = _digest(text)
+        count = self._cached(self._counts, key)
+        if count is None:
+            count = self._store(self._counts, key, len(self.encoding.encode_ordinary(text)))
+        return count
+
+    def count_message(self, message: AllMessageValues, model: str, approximate: bool | None = None) -> int:
+        """Tokens of `message` in a request to `model` (including the images and the chat template)."""
+        if self.approximate if approximate is None else approximate:
+            return approximate_message_tokens(message)
+        key = (model, _digest(json.dumps(message, sort_keys=True, default=str)))
+        count = self._cached(self._message_counts, key)
+        if count is None:
+            count = self._store(self._message_counts, key, token_counter(model=model, messages=[message]))
+        return count
+
+    def clip(self, text: str, max_tokens: int) -> str:
+        """
+        Longest prefix of `text` with at most `max_tokens` tokens.
+
+        Only a prefix of the text is tokenized: the window of characters to tokenize is found with an
+        exponential search on the character offsets, starting from the average token length.
+        """
+        if max_tokens <= 0:
+            return ""
+        # every token encodes at least one byte
+        if len(text) <= max_tokens and len(text.encode(errors="surrogatepass")) <= max_tokens:
+            return text
+        window = min(len(text), max_tokens * CHARS_PER_TOKEN)
+        while True:
+            tokens = self.encoding.encode_ordinary(text[:window])
+            if window == len(text):
+                if len(tokens) <= max_tokens:
+                    return text
+                break
+            if len(tokens) > max_tokens + CLIP_MARGIN_TOKENS:
+                break
+            window = min(len(text), window * 2)
+        return self.encoding.decode(tokens[:max_tokens])
+
+
+def approximate_message_tokens(message: AllMessageValues) -> int:
+    fields: dict[str, Any] = dict(message)
+    content: str | list[dict[str, Any]] | None = fields.get("content")
+    tokens = MESSAGE_OVERHEAD_TOKENS
+    if isinstance(content, str):
+        return tokens + approximate_tokens(content)
+    for part in content or []:
+        if part.get("type") == "image_url":
+            tokens += APPROX_IMAGE_TOKENS
+        else:
+            tokens += approximate_tokens(str(part.get("text", "")))
+    # e.g. the arguments of the tool calls
+    tool_calls: list[Any] = fields.get("tool_calls") or []
+    for tool_call in tool_calls:
+        tokens += approximate_tokens(json.dumps(tool_call, default=str))
+    return tokens
+
+
+@functools.cache
+def default_token_counter() -> TokenCounter:
+    """Counter shared by the whole process (e.g. by all the conversations)."""
+    return TokenCounter()
@@ -1,13 +1,16 @@
 from abc import ABC, abstractmethod
 from collections.abc import Sequence
 
-from notte.browser.snapshot import BrowserSnapshot
+from notte.browser.snapshot import BrowserSnapshot, SnapshotComponent
 from notte.controller.actions import BaseAction
 from notte.controller.space import BaseActionSpace
 from notte.sdk.types import PaginationParams
 
 
 class BaseActionSpacePipe(ABC):
+    def required_components(self) -> set[SnapshotComponent]:
+        return {SnapshotComponent.DOM_NODE}
+
     @abstractmethod
     def forward(
         self,
@@ -1,7 +1,9 @@
 import re
 from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager, nullcontext
 from typing import Any, ClassVar
 
+from litellm import ModelResponse
 from loguru import logger
 from typing_extensions import override
 
@@ -14,6 +16,7 @@ from notte.errors.llm import (
     LLMnoOutputCompletionError,
     LLMParsingError,
 )
+from notte.llms.cache import bypass_llm_cache
 from notte.llms.service import LLMService
 
 
@@ -29,10 +32,24 @@ class BaseActionListingPipe(ABC):
 
     def llm_completion(self, prompt_id: str, variables: dict[str, Any]) -> str:
         response = self.llmserve.completion(prompt_id, variables)
+        return self.response_content(response)
+
+    async def allm_completion(self, prompt_id: str, variables: dict[str, Any]) -> str:
+        response = await self.llmserve.acompletion(prompt_id, variables)
+        return self.response_content(response)
+
+    @staticmethod
+    def response_content(response: ModelResponse) -> str:
         if response.choices[0].message.content is None:  # type: ignore
             raise LLMnoOutputCompletionError()
         return response.choices[0].message.content  # type: ignore
 
+    async def forward_async(
+        self, snapshot: BrowserSnapshot, previous_action_list: list[Action] | None = None
+    ) -> PossibleActionSpace:
+        # pipes without a native async path block the loop in `forward` (the LLM pipes override this)
+        return self.forward(snapshot, previous_action_list)
+
     @abstractmethod
     def forward_incremental(
         self,
@@ -46,6 +63,13 @@ class BaseActionListingPipe(ABC):
         """
         raise NotImplementedError("forward_incremental")
 
+    async def forward_incremental_async(
+        self,
+        snapshot: BrowserSnapshot,
+        previous_action_list: list[Action],
+    ) -> PossibleActionSpace:
+        return self.forward_incremental(snapshot, previous_action_list)
+
 
 class RetryPipeWrapper(BaseActionListingPipe):
     tracer: ClassVar[LlmParsingErrorFileTracer] = LlmParsingErrorFileTracer()
@@ -62,46 +86,69 @@ class RetryPipeWrapper(BaseActionListingPipe):
     ) -> PossibleActionSpace:
         errors: list[str] = []
         last_error: Exception | None = None
-        for _ in range(self.max_tries):
+        for attempt in range(self.max_tries):
             try:
-                out = self.pipe.forward(snapshot, previous_action_list)
-                self.tracer.trace(
-                    status="success",
-                    pipe_name=self.pipe.__class__.__name__,
-                    nb_retries=len(errors),
-                    error_msgs=errors,
-                )
+                with self.attempt(attempt):
+                    out = self.pipe.forward(snapshot, previous_action_list)
+                self.trace(status="success", errors=errors)
                 return out
             except Exception as e:
                 last_error = e
-                if "Please reduce the length of the messages or completions" in str(e):
-                    # this is a known error that happens when the context is too long
-                    # we should not retry in this case (nothing is going to change)
-                    pattern = r"Current length is (\d+) while limit is (\d+)"
-                    size: int | None = None
-                    max_size: int | None = None
-                    match = re.search(pattern, str(e))
-                    if match:
-                        size = int(match.group(1))
-                        max_size = int(match.group(2))
-                    else:
-                        if self.verbose:
-                            logger.error(
-                                f"Failed to parse context size from error message: {str(e)}. Please fix this ASAP."
-                            )
-                        raise ContextSizeTooLargeError(size=size, max_size=max_size) from e
-                if self.verbose:
-                    logger.warning(f"failed to parse action list but retrying. Start of error msg: {str(e)[:200]}...")
-                errors.append(str(e))
+                self.handle_error(e, errors)
+        raise self.failure(errors) from last_error
+
+    @override
+    async def forward_async(
+        self, snapshot: BrowserSnapshot, previous_action_list: list[Action] | None = None
+    ) -> PossibleActionSpace:
+        errors: list[str] = []
+        last_error: Exception | None = None
+        for attempt in range(self.max_tries):
+            try:
+                with self.attempt(attempt):
+                    out = await self.pipe.forward_async(snapshot, previous_action_list)
+                self.trace(status="success", errors=errors)
+                return out
+            except Exception as e:
+                last_error = e
+                self.handle_error(e, errors)
+        raise self.failure(errors) from last_error
+
+    def attempt(self, attempt: int) -> AbstractContextManager[None]:
+        # the same prompt is sent again: a cached response would fail the same way
+        return bypass_llm_cache() if attempt > 0 else nullcontext()
+
+    def trace(self, status: str, errors: list[str]) -> None:
         self.tracer.trace(
-            status="failure",
+            status=status,
             pipe_name=self.pipe.__class__.__name__,
             nb_retries=len(errors),
             error_msgs=errors,
         )
-        raise LLMParsingError(
-            context=f"Action listing failed after {self.max_tries} tries with errors: {errors}"
-        ) from last_error
+
+    def handle_error(self, e: Exception, errors: list[str]) -> None:
+        """Record `e` in `errors` if the listing can be retried, raise otherwise."""
+        if "Please reduce the length of the messages or completions" in str(e):
+            # this is a known error that happens when the context is too long
+            # we should not retry in this case (nothing is going to change)
+            pattern = r"Current length is (\d+) while limit is (\d+)"
+            size: int | None = None
+            max_size: int | None = None
+            match = re.search(pattern, str(e))
+            if match:
+                size = int(match.group(1))
+                max_size = int(match.group(2))
+            else:
+                if self.verbose:
+                    logger.error(f"Failed to parse context size from error message: {str(e)}. Please fix this ASAP.")
+                raise ContextSizeTooLargeError(size=size, max_size=max_size) from e
+        if self.verbose:
+            logger.warning(f"failed to parse action list but retrying. Start of error msg: {str(e)[:200]}...")
+        errors.append(str(e))
+
+    def failure(self, errors: list[str]) -> LLMParsingError:
+        self.trace(status="failure", errors=errors)
+        return LLMParsingError(context=f"Action listing failed after {self.max_tries} tries with errors: {errors}")
 
     @override
     def forward_incremental(
@@ -109,11 +156,29 @@ class RetryPipeWrapper(BaseActionListingPipe):
         snapshot: BrowserSnapshot,
         previous_action_list: list[Action],
     ) -> PossibleActionSpace:
-        for _ in range(self.max_tries):
+        for attempt in range(self.max_tries):
             try:
-                return self.pipe.forward_incremental(snapshot, previous_action_list)
+                with self.attempt(attempt):
+                    return self.pipe.forward_incremental(snapshot, previous_action_list)
             except Exception:
                 pass
+        return self.previous_space(previous_action_list)
+
+    @override
+    async def forward_incremental_async(
+        self,
+        snapshot: BrowserSnapshot,
+        previous_action_list: list[Action],
+    ) -> PossibleActionSpace:
+        for attempt in range(self.max_tries):
+            try:
+                with self.attempt(attempt):
+                    return await self.pipe.forward_incremental_async(snapshot, previous_action_list)
+            except Exception:
+                pass
+        return self.previous_space(previous_action_list)
+
+    def previous_space(self, previous_action_list: list[Action]) -> PossibleActionSpace:
         if self.verbose:
             logger.error("Failed to get action list after max tries => returning previous action list")
         return PossibleActionSpace(
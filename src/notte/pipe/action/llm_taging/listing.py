@@ -69,14 +69,18 @@ class ActionListingPipe(BaseActionListingPipe):
         text = sc.extract(response)
         return text
 
-    @override
-    def forward(
+    def parse_response(self, response: str) -> PossibleActionSpace:
+        return PossibleActionSpace(
+            description=self.parse_webpage_description(response),
+            actions=self.parse_action_listing(response),
+        )
+
+    def prepare(
         self,
         snapshot: BrowserSnapshot,
         previous_action_list: Sequence[Action] | None = None,
-    ) -> PossibleActionSpace:
-        if previous_action_list is not None and len(previous_action_list) > 0:
-            return self.forward_incremental(snapshot, previous_action_list)
+    ) -> dict[str, str] | PossibleActionSpace:
+        """Prompt variables of the listing of `snapshot`, or the action space if no LLM call is needed."""
         if len(snapshot.interaction_nodes()) == 0:
             if self.config.verbose:
                 logger.error("No interaction nodes found in context. Returning empty action list.")
@@ -84,19 +88,39 @@ class ActionListingPipe(BaseActionListingPipe):
                 description="Description not available because no interaction actions found",
                 actions=[],
             )
-        variables = self.get_prompt_variables(snapshot, previous_action_list)
-        response = self.llm_completion(self.config.prompt_id, variables)
-        return PossibleActionSpace(
-            description=self.parse_webpage_description(response),
-            actions=self.parse_action_listing(response),
-        )
+        return self.get_prompt_variables(snapshot, previous_action_list)
 
     @override
-    def forward_incremental(
+    def forward(
         self,
         snapshot: BrowserSnapshot,
-        previous_action_list: Sequence[Action],
+        previous_action_list: Sequence[Action] | None = None,
+    ) -> PossibleActionSpace:
+        if previous_action_list is not None and len(previous_action_list) > 0:
+            return self.forward_incremental(snapshot, previous_action_list)
+        variables = self.prepare(snapshot, previous_action_list)
+        if isinstance(variables, PossibleActionSpace):
+            return variables
+        return self.parse_response(self.llm_completion(self.config.prompt_id, variables))
+
+    @override
+    async def forward_async(
+        self,
+        snapshot: BrowserSnapshot,
+        previous_action_list: Sequence[Action] | None = None,
     ) -> PossibleActionSpace:
+        if previous_action_list is not None and len(previous_action_list) > 0:
+            return await self.forward_incremental_async(snapshot, previous_action_list)
+        variables = self.prepare(snapshot, previous_action_list)
+        if isinstance(variables, PossibleActionSpace):
+            return variables
+        return self.parse_response(await self.allm_completion(self.config.prompt_id, variables))
+
+    def prepare_incremental(
+        self,
+        snapshot: BrowserSnapshot,
+        previous_action_list: Sequence[Action],
+    ) -> dict[str, str] | PossibleActionSpace:
         incremental_snapshot = snapshot.subgraph_without(previous_action_list)
         if incremental_snapshot is None:
             if self.config.verbose:
@@ -125,12 +149,29 @@ class ActionListingPipe(BaseActionListingPipe):
         reduction_perc = (total_length - incremental_length) / total_length * 100
         if self.config.verbose:
             logger.info(f"🚀 Forward incremental reduces context length by {reduction_perc:.2f}%")
-        variables = self.get_prompt_variables(incremental_snapshot, previous_action_list)
-        response = self.llm_completion(self.config.incremental_prompt_id, variables)
-        return PossibleActionSpace(
-            description=self.parse_webpage_description(response),
-            actions=self.parse_action_listing(response),
-        )
+        return self.get_prompt_variables(incremental_snapshot, previous_action_list)
+
+    @override
+    def forward_incremental(
+        self,
+        snapshot: BrowserSnapshot,
+        previous_action_list: Sequence[Action],
+    ) -> PossibleActionSpace:
+        variables = self.prepare_incremental(snapshot, previous_action_list)
+        if isinstance(variables, PossibleActionSpace):
+            return variables
+        return self.parse_response(self.llm_completion(self.config.incremental_prompt_id, variables))
+
+    @override
+    async def forward_incremental_async(
+        self,
+        snapshot: BrowserSnapshot,
+        previous_action_list: Sequence[Action],
+    ) -> PossibleActionSpace:
+        variables = self.prepare_incremental(snapshot, previous_action_list)
+        if isinstance(variables, PossibleActionSpace):
+            return variables
+        return self.parse_response(await self.allm_completion(self.config.incremental_prompt_id, variables))
 
 
 def MainActionListingPipe(
@@ -4,7 +4,7 @@ from loguru import logger
 from typing_extensions import override
 
 from notte.actions.base import Action, PossibleAction
-from notte.actions.space import ActionSpace
+from notte.actions.space import ActionSpace, PossibleActionSpace
 from notte.browser.node_type import NodeCategory
 from notte.browser.snapshot import BrowserSnapshot
 from notte.common.config import FrozenConfig
@@ -114,20 +114,24 @@ class LlmActionSpacePipe(BaseActionSpacePipe):
             )
         return False
 
-    def forward_unfiltered(
-        self,
-        snapshot: BrowserSnapshot,
-        previous_action_list: Sequence[Action] | None,
-        pagination: PaginationParams,
-        n_trials: int,
-    ) -> ActionSpace:
+    def listed_previous_actions(
+        self, snapshot: BrowserSnapshot, previous_action_list: Sequence[Action] | None
+    ) -> tuple[list[str], list[Action]]:
         # this function assumes tld(previous_actions_list) == tld(context)!
         inodes_ids = [inode.id for inode in snapshot.interaction_nodes()]
         previous_action_list = previous_action_list or []
         # we keep only intersection of current context inodes and previous actions!
-        previous_action_list = [action for action in previous_action_list if action.id in inodes_ids]
-        # TODO: question, can we already perform a `check_enough_actions` here ?
-        possible_space = self.action_listing_pipe.forward(snapshot, previous_action_list)
+        return inodes_ids, [action for action in previous_action_list if action.id in inodes_ids]
+
+    def merge_and_check(
+        self,
+        inodes_ids: list[str],
+        possible_space: PossibleActionSpace,
+        previous_action_list: Sequence[Action],
+        pagination: PaginationParams,
+        n_trials: int,
+    ) -> tuple[Sequence[Action], bool]:
+        """Merge the listed actions with the previous ones and check if enough actions were listed."""
         merged_actions = self.merge_action_lists(inodes_ids, possible_space.actions, previous_action_list)
         # check if we have enough actions to proceed.
         completed = self.check_enough_actions(inodes_ids, merged_actions, pagination)
@@ -137,10 +141,24 @@ class LlmActionSpacePipe(BaseActionSpacePipe):
                 n_actions=len(inodes_ids),
                 threshold=self.config.required_action_coverage,
             )
+        if not completed and self.config.verbose:
+            logger.info(f"[ActionListing] Retry listing actions with {n_trials} trials left.")
+        return merged_actions, completed
 
-        if not completed and n_trials > 0:
-            if self.config.verbose:
-                logger.info(f"[ActionListing] Retry listing actions with {n_trials} trials left.")
+    def forward_unfiltered(
+        self,
+        snapshot: BrowserSnapshot,
+        previous_action_list: Sequence[Action] | None,
+        pagination: PaginationParams,
+        n_trials: int,
+    ) -> ActionSpace:
+        inodes_ids, previous_action_list = self.listed_previous_actions(snapshot, previous_action_list)
+        # TODO: question, can we already perform a `check_enough_actions` here ?
+        possible_space = self.action_listing_pipe.forward(snapshot, previous_action_list)
+        merged_actions, completed = self.merge_and_check(
+            inodes_ids, possible_space, previous_action_list, pagination, n_trials
+        )
+        if not completed:
             return self.forward_unfiltered(
                 snapshot,
                 merged_actions,
@@ -157,6 +175,34 @@ class LlmActionSpacePipe(BaseActionSpacePipe):
             space.category = self.doc_categoriser_pipe.forward(snapshot, space)
         return space
 
+    async def forward_unfiltered_async(
+        self,
+        snapshot: BrowserSnapshot,
+        previous_action_list: Sequence[Action] | None,
+        pagination: PaginationParams,
+        n_trials: int,
+    ) -> ActionSpace:
+        inodes_ids, previous_action_list = self.listed_previous_actions(snapshot, previous_action_list)
+        possible_space = await self.action_listing_pipe.forward_async(snapshot, previous_action_list)
+        merged_actions, completed = self.merge_and_check(
+            inodes_ids, possible_space, previous_action_list, pagination, n_trials
+        )
+        if not completed:
+            return await self.forward_unfiltered_async(
+                snapshot,
+                merged_actions,
+                n_trials=n_trials - 1,
+                pagination=pagination,
+            )
+
+        space = ActionSpace(
+            description=possible_space.description,
+            raw_actions=merged_actions,
+        )
+        if self.doc_categoriser_pipe:
+            space.category = await self.doc_categoriser_pipe.forward_async(snapshot, space)
+        return space
+
     def tagging_context(self, snapshot: BrowserSnapshot) -> BrowserSnapshot:
         if self.config.include_images:
             return snapshot
@@ -190,7 +236,31 @@ class LlmActionSpacePipe(BaseActionSpacePipe):
                 max_nb_actions=pagination.max_nb_actions,
             ),
         )
-        filtered_actions = ActionFilteringPipe.forward(_snapshot, space.raw_actions)
+        return self.filter_space(_snapshot, space)
+
+    @override
+    async def forward_async(
+        self,
+        snapshot: BrowserSnapshot,
+        previous_action_list: Sequence[BaseAction] | None,
+        pagination: PaginationParams,
+    ) -> ActionSpace:
+        cast_previous_action_list: Sequence[Action] | None = previous_action_list  # type: ignore
+        _snapshot = self.tagging_context(snapshot)
+
+        space = await self.forward_unfiltered_async(
+            _snapshot,
+            cast_previous_action_list,
+            pagination=pagination,
+            n_trials=self.get_n_trials(
+                nb_nodes=len(snapshot.interaction_nodes()),
+                max_nb_actions=pagination.max_nb_actions,
+            ),
+        )
+        return self.filter_space(_snapshot, space)
+
+    def filter_space(self, snapshot: BrowserSnapshot, space: ActionSpace) -> ActionSpace:
+        filtered_actions = ActionFilteringPipe.forward(snapshot, space.raw_actions)
         return ActionSpace(
             description=space.description,
             raw_actions=filtered_actions,
@@ -64,3 +64,20 @@ class MainActionSpacePipe(BaseActionSpacePipe):
                 if self.config.verbose:
                     logger.info("📋 Running simple action listing")
                 return self.simple_pipe.forward(snapshot, previous_action_list, pagination)
+
+    @override
+    async def forward_async(
+        self,
+        snapshot: BrowserSnapshot,
+        previous_action_list: Sequence[BaseAction] | None,
+        pagination: PaginationParams,
+    ) -> BaseActionSpace:
+        match self.config.type:
+            case ActionSpaceType.LLM_TAGGING:
+                if self.config.verbose:
+                    logger.info("🏷️ Running LLM tagging action listing")
+                return await self.llm_pipe.forward_async(snapshot, previous_action_list, pagination)
+            case ActionSpaceType.SIMPLE:
+                if self.config.verbose:
+                    logger.info("📋 Running simple action listing")
+                return await self.simple_pipe.forward_async(snapshot, previous_action_list, pagination)
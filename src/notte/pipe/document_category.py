@@ -1,5 +1,6 @@
 import time
 
+from litellm import ModelResponse
 from loguru import logger
 
 from notte.actions.space import ActionSpace
@@ -14,23 +15,35 @@ class DocumentCategoryPipe:
         self.llmserve: LLMService = llmserve
         self.verbose: bool = verbose
 
-    def forward(self, snapshot: BrowserSnapshot, space: ActionSpace) -> SpaceCategory:
+    def get_variables(self, snapshot: BrowserSnapshot, space: ActionSpace) -> dict[str, str]:
         description = f"""
 - URL: {snapshot.metadata.url}
 - Title: {snapshot.metadata.title}
 - Description: {space.description or "No description available"}
 """.strip()
+        return {"document": description}
 
-        start_time = time.time()
-        response = self.llmserve.completion(
-            prompt_id="document-category/optim",
-            variables={"document": description},
-        )
+    def parse_category(self, response: ModelResponse, start_time: float) -> SpaceCategory:
         end_time = time.time()
-
         sc = StructuredContent(outer_tag="document-category")
         category = sc.extract(response.choices[0].message.content)  # type: ignore
 
         if self.verbose:
             logger.info(f"🏷️ Page categorisation: {category} (took {end_time - start_time:.2f} seconds)")
         return SpaceCategory(category)
+
+    def forward(self, snapshot: BrowserSnapshot, space: ActionSpace) -> SpaceCategory:
+        start_time = time.time()
+        response = self.llmserve.completion(
+            prompt_id="document-category/optim",
+            variables=self.get_variables(snapshot, space),
+        )
+        return self.parse_category(response, start_time)
+
+    async def forward_async(self, snapshot: BrowserSnapshot, space: ActionSpace) -> SpaceCategory:
+        start_time = time.time()
+        response = await self.llmserve.acompletion(
+            prompt_id="document-category/optim",
+            variables=self.get_variables(snapshot, space),
+        )
+        return self.parse_category(response, start_time)
@@ -3,7 +3,24 @@
 	args = { doHighlightElements: true, focusHighlightIndex: -1, viewportExpansion: 0 }
 ) => {
 	const { doHighlightElements, focusHighlightIndex, viewportExpansion } = args;
-	let highlightIndex = 0; // Reset highlight index
+	// optional incremental capture state (see domJournal.js): element keys, highlight counter and observer registration
+	const { state, root } = args;
+	let highlightIndex = state ? state.highlightIndex : 0; // Reset highlight index
+	// pruning and paging options (see `DomParsingConfig`)
+	const {
+		prune_hidden_subtrees: pruneHiddenSubtrees = false,
+		prune_empty_elements: pruneEmptyElements = false,
+		viewport_page: viewportPage = null,
+	} = args;
+	// paged extraction: only the `viewportPage`-th viewport-sized slice of the document (in document coordinates)
+	const pageWindow = viewportPage === null || viewportPage === undefined ? null : {
+		top: viewportPage * window.innerHeight,
+		bottom: (viewportPage + 1) * window.innerHeight,
+	};
+	// attributes from which a name can be computed for a node (see `DOMElementNode.name`)
+	const NAME_ATTRIBUTES = ['aria-label', 'name', 'title', 'alt', 'placeholder', 'value', 'src', 'href', 'type'];
+	// elements that are never rendered but still relevant to interact with their parent
+	const HIDDEN_PRUNING_EXCEPTIONS = new Set(['option', 'optgroup']);
 
 	// Quick check to confirm the script receives focusHighlightIndex
 	console.log('focusHighlightIndex:', focusHighlightIndex);
@@ -297,6 +314,10 @@
 	}
 
 	// Helper function to check if element is the top element at its position
+	function isInPageWindow(rect) {
+		return rect.bottom + window.scrollY >= pageWindow.top && rect.top + window.scrollY <= pageWindow.bottom;
+	}
+
 	function isTopElement(element) {
 		// Find the correct document context and root element
 		let doc = element.ownerDocument;
@@ -306,6 +327,11 @@
 			return true;
 		}
 
+		// Paged extraction: the page slice is not necessarily displayed, every element within it is considered on top
+		if (pageWindow) {
+			return isInPageWindow(element.getBoundingClientRect());
+		}
+
 		// For shadow DOM, we need to check within its own root context
 		const shadowRoot = element.getRootNode();
 		if (shadowRoot instanceof ShadowRoot) {
@@ -395,10 +421,13 @@
 		range.selectNodeContents(textNode);
 		const rect = range.getBoundingClientRect();
 
+		const inViewport = pageWindow && textNode.ownerDocument === window.document
+			? isInPageWindow(rect)
+			: rect.top >= 0 && rect.top <= window.innerHeight;
+
 		return rect.width !== 0 &&
 			rect.height !== 0 &&
-			rect.top >= 0 &&
-			rect.top <= window.innerHeight &&
+			inViewport &&
 			textNode.parentElement?.checkVisibility({
 				checkOpacity: true,
 				checkVisibilityCSS: true
@@ -406,86 +435,149 @@
 	}
 
 
-	// Function to traverse the DOM and create nested JSON
-	function buildDomTree(node, parentIframe = null) {
-		if (!node) return null;
+	// Compact payload: a flat node table in DFS pre-order (a node always comes after its parent) with one column
+	// per field and interned strings, returned as a single JSON string (see `ParseDomTreePipe.parse_dom_payload`).
+	const FLAGS = { TEXT: 1, VISIBLE: 2, INTERACTIVE: 4, TOP: 8, EDITABLE: 16, SHADOW_ROOT: 32 };
+	const table = {
+		strings: [],
+		parent: [],
+		flags: [],
+		tag: [],
+		text: [],
+		xpath: [],
+		attributes: [],
+		highlightIndex: [],
+		key: [],
+	};
+	const stringIds = new Map();
+
+	function intern(value) {
+		let id = stringIds.get(value);
+		if (id === undefined) {
+			id = table.strings.length;
+			table.strings.push(value);
+			stringIds.set(value, id);
+		}
+		return id;
+	}
+
+	// Subtrees that are not rendered (`display: none`) cannot contain visible text or interactive elements
+	function isHiddenSubtree(element) {
+		if (HIDDEN_PRUNING_EXCEPTIONS.has(element.tagName.toLowerCase())) return false;
+		return window.getComputedStyle(element).display === 'none';
+	}
+
+	// Elements without ID, children nor name are dropped by the python pruning (see `prune_dom_tree`)
+	function isPrunableLeaf(element, row) {
+		if (row === 0 || table.parent.length !== row + 1 || table.highlightIndex[row] >= 0) return false;
+		if (pageWindow && element.ownerDocument === window.document &&
+			!isInPageWindow(element.getBoundingClientRect())) {
+			return true;
+		}
+		return NAME_ATTRIBUTES.every(name => !element.getAttribute(name));
+	}
+
+	function removeLastRow(element) {
+		table.parent.pop();
+		table.flags.pop();
+		table.tag.pop();
+		table.text.pop();
+		table.xpath.pop();
+		table.attributes.pop();
+		table.highlightIndex.pop();
+		table.key.pop();
+		// patches of uncaptured elements are applied to their closest captured ancestor (see domJournal.js)
+		if (state) state.keys.delete(element);
+	}
+
+	function addRow(parentRow, flags) {
+		const row = table.parent.length;
+		table.parent.push(parentRow);
+		table.flags.push(flags);
+		table.tag.push(-1);
+		table.text.push(-1);
+		table.xpath.push(-1);
+		table.attributes.push([]);
+		table.highlightIndex.push(-1);
+		table.key.push(-1);
+		return row;
+	}
+
+	// Function to traverse the DOM and append its nodes to the table
+	function buildDomTree(node, parentIframe = null, parentRow = -1) {
+		if (!node) return;
 
 		// Special case for text nodes
 		if (node.nodeType === Node.TEXT_NODE) {
 			const textContent = node.textContent.trim();
 			if (textContent && isTextNodeVisible(node)) {
-				return {
-					type: "TEXT_NODE",
-					text: textContent,
-					isVisible: true,
-				};
+				const row = addRow(parentRow, FLAGS.TEXT | FLAGS.VISIBLE);
+				table.text[row] = intern(textContent);
 			}
-			return null;
+			return;
 		}
 
+		// Comments, processing instructions, etc. are not part of the tree
+		if (node.nodeType !== Node.ELEMENT_NODE) return;
+
 		// Check if element is accepted
-		if (node.nodeType === Node.ELEMENT_NODE && !isElementAccepted(node)) {
-			return null;
+		if (!isElementAccepted(node)) return;
+		if (pruneHiddenSubtrees && parentRow >= 0 && isHiddenSubtree(node)) return;
+
+		const isInteractive = isInteractiveElement(node);
+		const isVisible = isElementVisible(node);
+		const isTop = isTopElement(node);
+		const isEditable = isEditableElement(node);
+		const row = addRow(
+			parentRow,
+			(isInteractive ? FLAGS.INTERACTIVE : 0) |
+			(isVisible ? FLAGS.VISIBLE : 0) |
+			(isTop ? FLAGS.TOP : 0) |
+			(isEditable ? FLAGS.EDITABLE : 0) |
+			(node.shadowRoot ? FLAGS.SHADOW_ROOT : 0)
+		);
+		table.tag[row] = intern(node.tagName.toLowerCase());
+		table.xpath[row] = intern(getXPathTree(node, true));
+
+		// Stable element keys used to splice re-serialized subtrees into a previous capture
+		if (state) {
+			let key = state.keys.get(node);
+			if (key === undefined) {
+				key = state.nextKey++;
+				state.keys.set(node, key);
+			}
+			table.key[row] = key;
 		}
 
-		const nodeData = {
-			tagName: node.tagName ? node.tagName.toLowerCase() : null,
-			attributes: {},
-			xpath: node.nodeType === Node.ELEMENT_NODE ? getXPathTree(node, true) : null,
-			children: [],
-		};
-
-		// Copy all attributes if the node is an element
-		if (node.nodeType === Node.ELEMENT_NODE && node.attributes) {
-			// Use getAttributeNames() instead of directly iterating attributes
-			const attributeNames = node.getAttributeNames?.() || [];
-			for (const name of attributeNames) {
-				nodeData.attributes[name] = node.getAttribute(name);
-			}
+		// Copy all attributes as interned [name, value, name, value, ...] pairs
+		// Use getAttributeNames() instead of directly iterating attributes
+		const attributeNames = node.getAttributeNames?.() || [];
+		const attributes = table.attributes[row];
+		for (const name of attributeNames) {
+			attributes.push(intern(name), intern(node.getAttribute(name)));
 		}
 
-		if (node.nodeType === Node.ELEMENT_NODE) {
-			const isInteractive = isInteractiveElement(node);
-			const isVisible = isElementVisible(node);
-			const isTop = isTopElement(node);
-            const isEditable = isEditableElement(node);
-
-			nodeData.isInteractive = isInteractive;
-			nodeData.isVisible = isVisible;
-			nodeData.isTopElement = isTop;
-			nodeData.isEditable = isEditable;
-
-			// Highlight if element meets all criteria and highlighting is enabled
-			if (isInteractive && isVisible && isTop) {
-				nodeData.highlightIndex = highlightIndex++;
-				if (doHighlightElements) {
-					if (focusHighlightIndex >= 0) {
-						if (focusHighlightIndex === nodeData.highlightIndex) {
-							highlightElement(node, nodeData.highlightIndex, parentIframe);
-						}
-					} else {
-						highlightElement(node, nodeData.highlightIndex, parentIframe);
+		// Highlight if element meets all criteria and highlighting is enabled
+		if (isInteractive && isVisible && isTop) {
+			const index = highlightIndex++;
+			table.highlightIndex[row] = index;
+			if (doHighlightElements) {
+				if (focusHighlightIndex >= 0) {
+					if (focusHighlightIndex === index) {
+						highlightElement(node, index, parentIframe);
 					}
+				} else {
+					highlightElement(node, index, parentIframe);
 				}
 			}
 		}
 
-		// Only add iframeContext if we're inside an iframe
-		// if (parentIframe) {
-		//     nodeData.iframeContext = `iframe[src="${parentIframe.src || ''}"]`;
-		// }
-
-		// Only add shadowRoot field if it exists
-		if (node.shadowRoot) {
-			nodeData.shadowRoot = true;
-		}
-
 		// Handle shadow DOM
 		if (node.shadowRoot) {
-			const shadowChildren = Array.from(node.shadowRoot.childNodes).map(child =>
-				buildDomTree(child, parentIframe)
-			);
-			nodeData.children.push(...shadowChildren);
+			if (state) state.observe(node.shadowRoot);
+			for (const child of node.shadowRoot.childNodes) {
+				buildDomTree(child, parentIframe, row);
+			}
 		}
 
 		// Handle iframes
@@ -493,24 +585,27 @@
 			try {
 				const iframeDoc = node.contentDocument || node.contentWindow.document;
 				if (iframeDoc) {
-					const iframeChildren = Array.from(iframeDoc.body.childNodes).map(child =>
-						buildDomTree(child, node)
-					);
-					nodeData.children.push(...iframeChildren);
+					if (state) state.observe(iframeDoc);
+					for (const child of iframeDoc.body.childNodes) {
+						buildDomTree(child, node, row);
+					}
 				}
 			} catch (e) {
 				console.warn('Unable to access iframe:', node);
 			}
 		} else {
-			const children = Array.from(node.childNodes).map(child =>
-				buildDomTree(child, parentIframe)
-			);
-			nodeData.children.push(...children);
+			for (const child of node.childNodes) {
+				buildDomTree(child, parentIframe, row);
+			}
 		}
 
-		return nodeData;
+		if (pruneEmptyElements && isPrunableLeaf(node, row)) {
+			removeLastRow(node);
+		}
 	}
 
 
-	return buildDomTree(document.body);
+	buildDomTree(root || document.body);
+	if (state) state.highlightIndex = highlightIndex;
+	return table.parent.length > 0 ? JSON.stringify(table) : null;
 }
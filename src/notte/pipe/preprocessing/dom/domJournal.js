@@ -0,0 +1,171 @@
+// Incremental DOM capture (see `IncrementalDomTreePipe`).
+// The first capture of a page installs a MutationObserver journal and serializes the whole tree. Subsequent
+// captures only re-serialize the smallest (already captured) elements containing the mutated nodes.
+(
+	args = { token: null, previousToken: null },
+	buildDomNode
+) => {
+	const HIGHLIGHT_CONTAINER_ID = 'playwright-highlight-container';
+	const HIGHLIGHT_ATTRIBUTE = 'browser-user-highlight-id';
+
+	// Mutations produced by the highlighting of elements are not part of the page
+	function isIgnored(record) {
+		if (record.type === 'attributes' && record.attributeName === HIGHLIGHT_ATTRIBUTE) {
+			return true;
+		}
+		const target = record.target;
+		const element = target.nodeType === Node.ELEMENT_NODE ? target : target.parentElement;
+		if (element && element.closest(`#${HIGHLIGHT_CONTAINER_ID}`)) {
+			return true;
+		}
+		if (record.type === 'childList') {
+			const changed = [...record.addedNodes, ...record.removedNodes];
+			return changed.length > 0 && changed.every(node => node.id === HIGHLIGHT_CONTAINER_ID);
+		}
+		return false;
+	}
+
+	function journal(state, records) {
+		for (const record of records) {
+			if (isIgnored(record)) continue;
+			state.dirty.add(record.target);
+			// candidates for overlays: added elements and elements whose attributes (class, style...) changed
+			const changed = record.type === 'childList' ? record.addedNodes : [record.target];
+			for (const node of changed) {
+				if (node.nodeType === Node.ELEMENT_NODE) state.changed.add(node);
+			}
+		}
+	}
+
+	// Visible element positioned on top of the page flow (modal, popup, overlay...) or covering the viewport
+	function isOverlayElement(element) {
+		const style = window.getComputedStyle(element);
+		if (style.display === 'none' || style.visibility === 'hidden') return false;
+		const rect = element.getBoundingClientRect();
+		if (rect.width === 0 || rect.height === 0) return false;
+		if (rect.right <= 0 || rect.bottom <= 0 || rect.left >= window.innerWidth || rect.top >= window.innerHeight) {
+			return false;
+		}
+		if (style.position === 'fixed' || style.position === 'absolute') return true;
+		return rect.left <= 0 && rect.top <= 0 && rect.right >= window.innerWidth && rect.bottom >= window.innerHeight;
+	}
+
+	function containsOverlay(element) {
+		if (isOverlayElement(element)) return true;
+		const walker = document.createTreeWalker(element, NodeFilter.SHOW_ELEMENT);
+		while (walker.nextNode()) {
+			if (isOverlayElement(walker.currentNode)) return true;
+		}
+		return false;
+	}
+
+	// Parent in the captured tree: crosses shadow root and (same-origin) iframe boundaries
+	function parentOf(node) {
+		if (node instanceof ShadowRoot) return node.host;
+		if (node.nodeType === Node.DOCUMENT_NODE) {
+			return node.defaultView ? node.defaultView.frameElement : null;
+		}
+		return node.parentNode;
+	}
+
+	function capturedAncestor(state, node) {
+		let current = node;
+		while (current) {
+			if (current.nodeType === Node.ELEMENT_NODE && state.keys.has(current)) return current;
+			current = parentOf(current);
+		}
+		return null;
+	}
+
+	function hasAncestorIn(node, elements) {
+		let current = parentOf(node);
+		while (current) {
+			if (elements.has(current)) return true;
+			current = parentOf(current);
+		}
+		return false;
+	}
+
+	function fullCapture() {
+		const previous = window.__notteDomJournal;
+		if (previous) previous.observer.disconnect();
+
+		const state = {
+			token: args.token,
+			keys: new WeakMap(),
+			nextKey: 1,
+			highlightIndex: 0,
+			dirty: new Set(),
+			changed: new Set(),
+			viewportChanged: false,
+		};
+		state.observer = new MutationObserver(records => journal(state, records));
+		state.observe = root => state.observer.observe(root, {
+			subtree: true,
+			childList: true,
+			attributes: true,
+			characterData: true,
+		});
+		state.observe(document);
+
+		// visibility and top-element checks depend on the viewport: any scroll / resize requires a full capture
+		if (!window.__notteDomJournalListening) {
+			const onViewportChange = () => {
+				if (window.__notteDomJournal) window.__notteDomJournal.viewportChanged = true;
+			};
+			window.addEventListener('scroll', onViewportChange, { capture: true, passive: true });
+			window.addEventListener('resize', onViewportChange, { passive: true });
+			window.__notteDomJournalListening = true;
+		}
+		window.__notteDomJournal = state;
+
+		const dom = buildDomNode({ ...args, state });
+		// discard the mutations made by the capture itself (e.g. highlights)
+		state.observer.takeRecords();
+		state.dirty.clear();
+		state.changed.clear();
+		return { mode: 'full', dom, patches: [], overlay: false };
+	}
+
+	const state = window.__notteDomJournal;
+	// no journal (i.e. new document), journal from another capture session or viewport change
+	if (!state || state.token !== args.previousToken || state.viewportChanged) {
+		return fullCapture();
+	}
+
+	journal(state, state.observer.takeRecords());
+	const roots = new Set();
+	for (const node of state.dirty) {
+		// removals are journaled on the (still connected) parent
+		if (!node.isConnected) continue;
+		const element = capturedAncestor(state, node);
+		if (element === null) {
+			// mutations outside of <body> (e.g. <head> scripts or styles) are not part of the captured tree
+			if (document.body && state.keys.has(document.body)) continue;
+			return fullCapture();
+		}
+		roots.add(element);
+	}
+	state.dirty.clear();
+
+	// visibility and top-element flags of the elements outside of the patches depend on what is displayed
+	// on top of them: the caller rebuilds the whole tree, no need to serialize the patches
+	const changed = [...state.changed];
+	state.changed.clear();
+	if (changed.some(element => element.isConnected && containsOverlay(element))) {
+		state.observer.takeRecords();
+		return { mode: 'incremental', dom: null, patches: [], overlay: true };
+	}
+
+	const patches = [];
+	for (const element of roots) {
+		if (hasAncestorIn(element, roots)) continue;
+		if (element === document.body) return fullCapture();
+		patches.push({
+			key: state.keys.get(element),
+			dom: buildDomNode({ ...args, state, root: element }),
+		});
+	}
+	state.observer.takeRecords();
+	return { mode: 'incremental', dom: null, patches, overlay: false };
+}
@@ -0,0 +1,202 @@
+import re
+import uuid
+from collections import defaultdict
+from collections.abc import Iterator
+from typing import Literal
+
+from loguru import logger
+from patchright.async_api import Page
+from typing_extensions import TypedDict
+
+from notte.browser.dom_tree import DomErrorBuffer
+from notte.browser.dom_tree import DomNode as NotteDomNode
+from notte.browser.node_type import NodeRole
+from notte.pipe.preprocessing.a11y.id_generation import simple_generate_sequential_ids
+from notte.pipe.preprocessing.dom.parsing import (
+    DomParsingConfig,
+    PageMetadataDict,
+    ParseDomTreePipe,
+)
+from notte.pipe.preprocessing.dom.scripts import call_dom_function
+from notte.pipe.preprocessing.dom.types import DOMBaseNode, DOMElementNode
+
+NOTTE_ID_PATTERN = re.compile(r"^(\D+)(\d+)$")
+
+
+class DomPatchDict(TypedDict):
+    key: int
+    # JSON encoded `CompactDomTreeDict` (`None` if the element is no longer captured)
+    dom: str | None
+
+
+class IncrementalDomCaptureDict(TypedDict):
+    metadata: PageMetadataDict
+    mode: Literal["full", "incremental"]
+    dom: str | None
+    patches: list[DomPatchDict]
+    # an overlay (modal, popup...) was added or displayed: flags of unchanged subtrees may be stale
+    overlay: bool
+
+
+def iter_elements(node: DOMBaseNode) -> Iterator[DOMElementNode]:
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, DOMElementNode):
+            yield current
+        stack.extend(reversed(current.children))
+
+
+class IncrementalDomTreePipe:
+    """
+    Stateful alternative to `ParseDomTreePipe` that only re-parses the parts of the DOM
+    that changed since the previous capture of the same page.
+
+    The first capture installs a `MutationObserver` journal in the page (see `domJournal.js`).
+    Later captures only serialize the smallest captured elements containing mutated nodes and splice them
+    into the previous tree: unchanged subtrees (and their converted `DomNode`) are reused and elements
+    that are re-serialized keep their ID. A full rebuild happens on navigation, after a scroll or resize
+    of the viewport, when an overlay is displayed (it changes which elements are visible and on top, outside
+    of the mutated subtrees) or whenever a patch cannot be applied.
+    """
+
+    def __init__(self, verbose: bool = False) -> None:
+        self.verbose: bool = verbose
+        self.nb_full_captures: int = 0
+        self.nb_incremental_captures: int = 0
+        self._page: Page | None = None
+        self._url: str | None = None
+        self._token: str | None = None
+        self._root: DOMBaseNode | None = None
+        self._nodes: dict[int, DOMElementNode] = {}
+        self._id_counter: defaultdict[str, int] = defaultdict(lambda: 1)
+
+    def reset(self) -> None:
+        self._page = None
+        self._url = None
+        self._token = None
+        self._root = None
+        self._nodes = {}
+        self._id_counter = defaultdict(lambda: 1)
+
+    async def forward_with_metadata(
+        self, page: Page, config: DomParsingConfig | None = None
+    ) -> tuple[NotteDomNode, PageMetadataDict]:
+        config = config or DomParsingConfig()
+        same_document = page is self._page and page.url == self._url and self._root is not None
+        token = uuid.uuid4().hex
+        capture: IncrementalDomCaptureDict = await call_dom_function(
+            page,
+            "captureIncremental",
+            {**config.model_dump(), "token": token, "previousToken": self._token if same_document else None},
+        )
+        try:
+            root = self.update(page.url, token, capture)
+        except Exception:
+            self.reset()
+            raise
+        if root is None:
+            # a patch could not be applied: start over from a full capture
+            self.reset()
+            return await self.forward_with_metadata(page, config)
+        self._page = page
+        notte_dom_tree = root.to_notte_domnode()
+        DomErrorBuffer.flush()
+        return notte_dom_tree, capture["metadata"]
+
+    def update(self, url: str, token: str, capture: IncrementalDomCaptureDict) -> DOMBaseNode | None:
+        """Apply a capture to the current tree. Returns `None` if the capture could not be applied."""
+        match capture["mode"]:
+            case "full":
+                root = ParseDomTreePipe.parse_dom_payload(url, capture["dom"])
+                root = simple_generate_sequential_ids(root)
+                self._url, self._token, self._root = url, token, root
+                self._nodes = {node.key: node for node in iter_elements(root) if node.key is not None}
+                self._id_counter = self.next_id_counter(root)
+                self.nb_full_captures += 1
+                if self.verbose:
+                    logger.info(f"Full DOM capture for {url} ({len(self._nodes)} elements)")
+                return root
+            case "incremental":
+                if self._root is None:
+                    return None
+                if capture["overlay"]:
+                    if self.verbose:
+                        logger.info(
+                            f"Overlay displayed on {url}: visibility flags are stale, full DOM capture required"
+                        )
+                    return None
+                for patch in capture["patches"]:
+                    if not self.splice(patch):
+                        return None
+                self._url = url
+                self.nb_incremental_captures += 1
+                if self.verbose:
+                    logger.info(f"Incremental DOM capture for {url} ({len(capture['patches'])} patched subtrees)")
+                return self._root
+
+    def splice(self, patch: DomPatchDict) -> bool:
+        previous = self._nodes.get(patch["key"])
+        if previous is None or previous.parent is None:
+            if self.verbose:
+                logger.warning(f"Unable to apply DOM patch: element with key {patch['key']} is not in the tree")
+            return False
+        parent = previous.parent
+        node = ParseDomTreePipe.parse_dom_subtree(patch["dom"], parent) if patch["dom"] is not None else None
+        previous_ids: dict[int, str] = {}
+        for element in iter_elements(previous):
+            if element.key is not None:
+                _ = self._nodes.pop(element.key, None)
+                if element.notte_id is not None:
+                    previous_ids[element.key] = element.notte_id
+        index = next(i for i, child in enumerate(parent.children) if child is previous)
+        if node is None:
+            del parent.children[index]
+        else:
+            parent.children[index] = node
+            self.assign_ids(node, previous_ids)
+            for element in iter_elements(node):
+                if element.key is not None:
+                    self._nodes[element.key] = element
+        parent.invalidate()
+        return True
+
+    def assign_ids(self, root: DOMBaseNode, previous_ids: dict[int, str]) -> None:
+        """
+        Same as `simple_generate_sequential_ids` for a re-serialized subtree: elements that were already
+        captured keep their ID, new elements get the next available ID.
+        """
+        for node in iter_elements(root):
+            if node.highlight_index is None:
+                continue
+            role = NodeRole.from_value(node.role)
+            if isinstance(role, str):
+                logger.debug(
+                    f"Unsupported role to convert to ID: {node}. Please add this role to the NodeRole e logic ASAP."
+                )
+                continue
+            prefix = role.short_id(force_id=True)
+            if prefix is None:
+                raise ValueError(
+                    (
+                        f"Role {role} was incorrectly converted from raw Dom Node."
+                        " It is an interaction node. It should have a short ID but is currently None"
+                    )
+                )
+            previous_id = previous_ids.get(node.key) if node.key is not None else None
+            match = NOTTE_ID_PATTERN.match(previous_id) if previous_id is not None else None
+            if match is not None and match.group(1) == prefix:
+                node.notte_id = previous_id
+            else:
+                node.notte_id = f"{prefix}{self._id_counter[prefix]}"
+                self._id_counter[prefix] += 1
+
+    @staticmethod
+    def next_id_counter(root: DOMBaseNode) -> defaultdict[str, int]:
+        counter: defaultdict[str, int] = defaultdict(lambda: 1)
+        for node in iter_elements(root):
+            match = NOTTE_ID_PATTERN.match(node.notte_id) if node.notte_id is not None else None
+            if match is not None:
+                prefix, index = match.group(1), int(match.group(2))
+                counter[prefix] = max(counter[prefix], index + 1)
+        return counter
@@ -0,0 +1,59 @@
+// DOM half of the page settle detector (see `wait_for_page_update`).
+// Resolves once no DOM mutation happened for `quiet_ms` and (for visible documents) at least `min_frames`
+// animation frames were rendered since the last mutation, or after `timeout_ms`.
+(
+	args = { quiet_ms: 100, min_frames: 2, timeout_ms: 500 }
+) => new Promise(resolve => {
+	const HIGHLIGHT_CONTAINER_ID = 'playwright-highlight-container';
+	const HIGHLIGHT_ATTRIBUTE = 'browser-user-highlight-id';
+	// checking more often than once per frame is pointless
+	const POLL_INTERVAL = 16;
+
+	const start = performance.now();
+	let lastMutation = start;
+	let mutations = 0;
+	let frames = 0;
+	let done = false;
+
+	function isIgnored(record) {
+		if (record.type === 'attributes' && record.attributeName === HIGHLIGHT_ATTRIBUTE) return true;
+		const target = record.target;
+		const element = target.nodeType === Node.ELEMENT_NODE ? target : target.parentElement;
+		return element !== null && element.closest(`#${HIGHLIGHT_CONTAINER_ID}`) !== null;
+	}
+
+	const observer = new MutationObserver(records => {
+		for (const record of records) {
+			if (isIgnored(record)) continue;
+			mutations++;
+			lastMutation = performance.now();
+			frames = 0;
+		}
+	});
+	observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+
+	function finish(reason) {
+		done = true;
+		observer.disconnect();
+		resolve({ reason, mutations, frames });
+	}
+
+	function onFrame() {
+		if (done) return;
+		frames++;
+		requestAnimationFrame(onFrame);
+	}
+
+	function check() {
+		if (done) return;
+		const now = performance.now();
+		// hidden documents do not render animation frames
+		const minFrames = document.visibilityState === 'visible' ? args.min_frames : 0;
+		if (now - lastMutation >= args.quiet_ms && frames >= minFrames) return finish('quiet');
+		if (now - start >= args.timeout_ms) return finish('timeout');
+		setTimeout(check, POLL_INTERVAL);
+	}
+
+	requestAnimationFrame(onFrame);
+	setTimeout(check, POLL_INTERVAL);
+})
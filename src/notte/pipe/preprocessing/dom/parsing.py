@@ -1,4 +1,6 @@
-from pathlib import Path
+import json
+from enum import IntFlag
+from typing import Self
 
 from loguru import logger
 from patchright.async_api import Page
@@ -9,25 +11,53 @@ from notte.browser.dom_tree import DomNode as NotteDomNode
 from notte.common.config import FrozenConfig
 from notte.errors.processing import SnapshotProcessingError
 from notte.pipe.preprocessing.a11y.id_generation import simple_generate_sequential_ids
-from notte.pipe.preprocessing.dom.csspaths import build_csspath
+from notte.pipe.preprocessing.dom.scripts import call_dom_function
 from notte.pipe.preprocessing.dom.types import DOMBaseNode, DOMElementNode, DOMTextNode
 
-DOM_TREE_JS_PATH = Path(__file__).parent / "buildDomNode.js"
 
+class DomNodeFlag(IntFlag):
+    TEXT = 1
+    VISIBLE = 2
+    INTERACTIVE = 4
+    TOP = 8
+    EDITABLE = 16
+    SHADOW_ROOT = 32
 
-class DomTreeDict(TypedDict):
-    type: str
-    text: str
-    tagName: str | None
-    xpath: str | None
-    attributes: dict[str, str]
-    isVisible: bool
-    isInteractive: bool
-    isTopElement: bool
-    isEditable: bool
-    highlightIndex: int | None
-    shadowRoot: bool
-    children: list["DomTreeDict"]
+
+class CompactDomTreeDict(TypedDict):
+    """
+    Flat, columnar encoding of the DOM tree produced by `buildDomNode.js`.
+
+    Nodes are stored in DFS pre-order (i.e. a node always comes after its parent) with one list per field.
+    Strings are interned in `strings` and referenced by index, `-1` stands for a missing value.
+    """
+
+    strings: list[str]
+    parent: list[int]
+    flags: list[int]
+    tag: list[int]
+    text: list[int]
+    xpath: list[int]
+    # interned [name, value, name, value, ...] pairs
+    attributes: list[list[int]]
+    highlightIndex: list[int]
+    key: list[int]
+
+
+class PageMetadataDict(TypedDict):
+    title: str
+    scrollX: float
+    scrollY: float
+    viewportWidth: float
+    viewportHeight: float
+    totalWidth: float
+    totalHeight: float
+
+
+class DomCaptureDict(TypedDict):
+    metadata: PageMetadataDict
+    # JSON encoded `CompactDomTreeDict`
+    dom: str | None
 
 
 class DomParsingConfig(FrozenConfig):
@@ -37,11 +67,32 @@ class DomParsingConfig(FrozenConfig):
     - If set to -1, all elements will be included (this leads to high token usage).
     - If set to 0, only the elements which are visible in the viewport will be included.
 
+    Opt-in pruning rules applied by the extraction script (i.e. before the tree is sent to python):
+    - `prune_hidden_subtrees`: skip elements that are not rendered (`display: none`) and their subtree.
+    - `prune_empty_elements`: drop elements without ID, children nor name, which are pruned
+      anyway before rendering (see `prune_dom_tree`).
+
+    Paged extraction: if `viewport_page` is set, only the `viewport_page`-th viewport-sized slice of
+    the document is extracted (without scrolling). See `ViewportData.nb_pages` for the number of pages.
     """
 
     highlight_elements: bool = True
     focus_element: int = -1
     viewport_expansion: int = 500  # update from 0
+    prune_hidden_subtrees: bool = False
+    prune_empty_elements: bool = False
+    viewport_page: int | None = None
+
+    def set_prune_hidden_subtrees(self: Self, value: bool = True) -> Self:
+        return self._copy_and_validate(prune_hidden_subtrees=value)
+
+    def set_prune_empty_elements(self: Self, value: bool = True) -> Self:
+        return self._copy_and_validate(prune_empty_elements=value)
+
+    def set_viewport_page(self: Self, value: int | None) -> Self:
+        if value is not None and value < 0:
+            raise ValueError(f"Viewport page should be positive, got {value}")
+        return self._copy_and_validate(viewport_page=value)
 
 
 class ParseDomTreePipe:
@@ -54,105 +105,110 @@ class ParseDomTreePipe:
         DomErrorBuffer.flush()
         return notte_dom_tree
 
+    @staticmethod
+    async def forward_with_metadata(
+        page: Page, config: DomParsingConfig | None = None
+    ) -> tuple[NotteDomNode, PageMetadataDict]:
+        """
+        Same as `forward` but also collects the page title, scroll position and viewport size
+        within the same `page.evaluate` call (i.e. a single CDP round trip).
+        """
+        config = config or DomParsingConfig()
+        if config.verbose:
+            logger.info(f"Capturing DOM tree and metadata for {page.url} with config: {config.model_dump()}")
+        capture: DomCaptureDict = await call_dom_function(page, "capture", config.model_dump())
+        dom_tree = ParseDomTreePipe.parse_dom_payload(page.url, capture["dom"])
+        dom_tree = simple_generate_sequential_ids(dom_tree)
+        notte_dom_tree = dom_tree.to_notte_domnode()
+        DomErrorBuffer.flush()
+        return notte_dom_tree, capture["metadata"]
+
     @staticmethod
     async def parse_dom_tree(page: Page, config: DomParsingConfig) -> DOMBaseNode:
-        js_code = DOM_TREE_JS_PATH.read_text()
         if config.verbose:
             logger.info(f"Parsing DOM tree for {page.url} with config: {config.model_dump()}")
-        node: DomTreeDict | None = await page.evaluate(js_code, config.model_dump())
-        if node is None:
-            raise SnapshotProcessingError(page.url, "Failed to parse HTML to dictionary")
-        parsed = ParseDomTreePipe._parse_node(
-            node,
-            parent=None,
-            in_iframe=False,
-            in_shadow_root=False,
-            iframe_parent_css_paths=[],
-            notte_selector=page.url,
-        )
+        payload: str | None = await call_dom_function(page, "buildDomNode", config.model_dump())
+        return ParseDomTreePipe.parse_dom_payload(page.url, payload)
+
+    @staticmethod
+    def parse_dom_payload(url: str, payload: str | None) -> DOMBaseNode:
+        if payload is None:
+            raise SnapshotProcessingError(url, "Failed to parse HTML to dictionary")
+        parsed = ParseDomTreePipe.parse_dom_table(json.loads(payload), parent=None, selector_prefix=url)
         if parsed is None:
-            raise SnapshotProcessingError(page.url, f"Failed to parse DOM tree. Dom Tree is empty. {node}")
+            raise SnapshotProcessingError(url, "Failed to parse DOM tree. Dom Tree is empty.")
         return parsed
 
     @staticmethod
-    def _parse_node(
-        node: DomTreeDict,
-        parent: "DOMElementNode | None",
-        in_iframe: bool,
-        in_shadow_root: bool,
-        iframe_parent_css_paths: list[str],
-        notte_selector: str,
-    ) -> DOMBaseNode | None:
-        if node.get("type") == "TEXT_NODE":
-            text_node = DOMTextNode(
-                text=node["text"],
-                is_visible=node["isVisible"],
-                parent=parent,
-            )
-
-            return text_node
-
-        tag_name = node["tagName"]
-        attrs = node.get("attributes", {})
-        xpath = node["xpath"]
-
-        if tag_name is None:
-            if xpath is None and len(attrs) == 0 and len(node.get("children", [])) == 0:
-                return None
-            raise ValueError(f"Tag name is None for node: {node}")
-
-        highlight_index = node.get("highlightIndex")
-        shadow_root = node.get("shadowRoot", False)
-        if xpath is None:
-            raise ValueError(f"XPath is None for node: {node}")
-        css_path = build_csspath(
-            tag_name=tag_name,
-            xpath=xpath,
-            attributes=attrs,
-            highlight_index=highlight_index,
-        )
-        _iframe_parent_css_paths = iframe_parent_css_paths
-        notte_selector = ":".join([notte_selector, str(hash(xpath)), str(hash(css_path))])
-
-        if shadow_root:
-            in_shadow_root = True
+    def parse_dom_subtree(payload: str, parent: DOMElementNode) -> DOMBaseNode | None:
+        """Parse `payload` as a child of `parent`, inheriting its iframe / shadow root context."""
+        return ParseDomTreePipe.parse_dom_table(json.loads(payload), parent=parent)
 
-        if tag_name.lower() == "iframe":
-            in_iframe = True
-            _iframe_parent_css_paths = _iframe_parent_css_paths + [css_path]
+    @staticmethod
+    def parse_dom_table(
+        table: CompactDomTreeDict, parent: DOMElementNode | None, selector_prefix: str = ""
+    ) -> DOMBaseNode | None:
+        """
+        Rebuild the tree from its flat encoding in a single pass (no recursion, i.e. no depth limit).
+
+        `parent` is the parent of the root node and `selector_prefix` the notte selector of a root without parent
+        (i.e. the page URL for a full tree).
+        """
+        strings = table["strings"]
+        nodes: list[DOMBaseNode] = []
+        for row, parent_row in enumerate(table["parent"]):
+            node_parent = parent if parent_row < 0 else nodes[parent_row]
+            if node_parent is not None and not isinstance(node_parent, DOMElementNode):
+                raise ValueError(f"Invalid DOM payload: parent of node {row} is a text node")
+            flags = DomNodeFlag(table["flags"][row])
+            node: DOMBaseNode
+            if DomNodeFlag.TEXT in flags:
+                node = DOMTextNode(
+                    text=strings[table["text"][row]],
+                    is_visible=DomNodeFlag.VISIBLE in flags,
+                    parent=node_parent,
+                )
+            else:
+                node = ParseDomTreePipe._parse_element(table, row, flags, node_parent, selector_prefix)
+            nodes.append(node)
+            if parent_row >= 0 and node_parent is not None:
+                node_parent.children.append(node)
+        return nodes[0] if len(nodes) > 0 else None
 
-        element_node = DOMElementNode(
+    @staticmethod
+    def _parse_element(
+        table: CompactDomTreeDict,
+        row: int,
+        flags: DomNodeFlag,
+        parent: DOMElementNode | None,
+        selector_prefix: str,
+    ) -> DOMElementNode:
+        strings = table["strings"]
+        tag_name = strings[table["tag"][row]]
+        xpath = strings[table["xpath"][row]]
+        pairs = table["attributes"][row]
+        attrs = {strings[pairs[i]]: strings[pairs[i + 1]] for i in range(0, len(pairs), 2)}
+        highlight_index = table["highlightIndex"][row] if table["highlightIndex"][row] >= 0 else None
+        key = table["key"][row] if table["key"][row] >= 0 else None
+        shadow_root = DomNodeFlag.SHADOW_ROOT in flags
+
+        # iframe / shadow root context inherited from the parent element
+        # (selectors are computed lazily from the parent chain, see `DOMElementNode`)
+        in_iframe = parent is not None and parent.in_iframe
+        in_shadow_root = parent is not None and parent.in_shadow_root
+        return DOMElementNode(
             tag_name=tag_name,
-            in_iframe=in_iframe,
+            in_iframe=in_iframe or tag_name.lower() == "iframe",
             xpath=xpath,
-            css_path=css_path,
-            notte_selector=notte_selector,
-            iframe_parent_css_selectors=iframe_parent_css_paths,
             attributes=attrs,
-            is_visible=node.get("isVisible", False),
-            is_interactive=node.get("isInteractive", False),
-            is_top_element=node.get("isTopElement", False),
-            is_editable=node.get("isEditable", False),
-            highlight_index=node.get("highlightIndex"),
+            is_visible=DomNodeFlag.VISIBLE in flags,
+            is_interactive=DomNodeFlag.INTERACTIVE in flags,
+            is_top_element=DomNodeFlag.TOP in flags,
+            is_editable=DomNodeFlag.EDITABLE in flags,
+            highlight_index=highlight_index,
             shadow_root=shadow_root,
-            in_shadow_root=in_shadow_root,
+            in_shadow_root=in_shadow_root or shadow_root,
+            key=key,
+            selector_prefix=selector_prefix if parent is None else "",
             parent=parent,
         )
-
-        children: list[DOMBaseNode] = []
-        for child in node.get("children", []):
-            if child is not None:
-                child_node = ParseDomTreePipe._parse_node(
-                    node=child,
-                    parent=element_node,
-                    in_iframe=in_iframe,
-                    iframe_parent_css_paths=_iframe_parent_css_paths,
-                    notte_selector=notte_selector,
-                    in_shadow_root=in_shadow_root,
-                )
-                if child_node is not None:
-                    children.append(child_node)
-
-        element_node.children = children
-
-        return element_node
@@ -0,0 +1,84 @@
+from functools import cache
+from pathlib import Path
+from typing import Any, Literal
+
+from patchright.async_api import Page
+
+DOM_TREE_JS_PATH = Path(__file__).parent / "buildDomNode.js"
+DOM_JOURNAL_JS_PATH = Path(__file__).parent / "domJournal.js"
+PAGE_SETTLE_JS_PATH = Path(__file__).parent / "pageSettle.js"
+
+PAGE_METADATA_JS = """
+() => ({
+    title: document.title,
+    scrollX: window.scrollX,
+    scrollY: window.scrollY,
+    viewportWidth: window.innerWidth,
+    viewportHeight: window.innerHeight,
+    totalWidth: document.documentElement.scrollWidth,
+    totalHeight: document.documentElement.scrollHeight,
+})
+"""
+
+# name of the (non-enumerable) global exposing the DOM extraction functions. It only exists in the isolated world
+# of patchright's `page.evaluate`: the scripts of the page cannot see it.
+DOM_SCRIPTS_GLOBAL = "__notteDom"
+
+DomFunction = Literal["metadata", "buildDomNode", "capture", "captureIncremental", "settle"]
+
+# tiny script sent on each call: the extraction functions are compiled once per document
+# (asynchronous functions are awaited in the page)
+CALL_DOM_FUNCTION_JS = f"""async ([name, args]) => {{
+    const scripts = window.{DOM_SCRIPTS_GLOBAL};
+    if (scripts === undefined) return {{ installed: false, result: null }};
+    return {{ installed: true, result: await scripts[name](args) }};
+}}"""
+
+
+@cache
+def install_dom_scripts_js() -> str:
+    """
+    JS function exposing the DOM extraction functions as `window.__notteDom` in the current document.
+
+    The JS files are read once per process.
+    """
+    build_dom_node = DOM_TREE_JS_PATH.read_text()
+    dom_journal = DOM_JOURNAL_JS_PATH.read_text()
+    page_settle = PAGE_SETTLE_JS_PATH.read_text()
+    return f"""() => {{
+    if (window.{DOM_SCRIPTS_GLOBAL} !== undefined) return;
+    const metadata = {PAGE_METADATA_JS};
+    const buildDomNode = {build_dom_node};
+    const domJournal = {dom_journal};
+    const pageSettle = {page_settle};
+    const scripts = Object.freeze({{
+        metadata: () => metadata(),
+        buildDomNode: (args) => buildDomNode(args),
+        capture: (args) => ({{ metadata: metadata(), dom: buildDomNode(args) }}),
+        captureIncremental: (args) => ({{ metadata: metadata(), ...domJournal(args, buildDomNode) }}),
+        settle: (args) => pageSettle(args),
+    }});
+    Object.defineProperty(window, '{DOM_SCRIPTS_GLOBAL}', {{ value: scripts, enumerable: false }});
+}}"""
+
+
+@cache
+def install_and_call_dom_function_js() -> str:
+    """Same as `CALL_DOM_FUNCTION_JS`, installing the DOM extraction functions in the document first."""
+    return f"""async ([name, args]) => {{
+    ({install_dom_scripts_js()})();
+    return {{ installed: true, result: await window.{DOM_SCRIPTS_GLOBAL}[name](args) }};
+}}"""
+
+
+async def call_dom_function(page: Page, name: DomFunction, args: dict[str, Any] | None = None) -> Any:
+    """
+    Call one of the DOM extraction functions.
+
+    The functions are installed lazily, on the first call in each document (in the same round-trip as the call).
+    Both scripts run in the isolated world of `page.evaluate`, i.e. where the functions were installed.
+    """
+    response = await page.evaluate(CALL_DOM_FUNCTION_JS, [name, args or {}])
+    if not response["installed"]:
+        response = await page.evaluate(install_and_call_dom_function_js(), [name, args or {}])
+    return response["result"]
@@ -1,4 +1,5 @@
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Any
 
 from loguru import logger
@@ -7,6 +8,7 @@ from typing_extensions import override
 from notte.browser.dom_tree import ComputedDomAttributes, DomAttributes, NodeSelectors
 from notte.browser.dom_tree import DomNode as NotteDomNode
 from notte.browser.node_type import NodeRole, NodeType
+from notte.pipe.preprocessing.dom.csspaths import build_csspath
 
 VERBOSE = False
 
@@ -41,6 +43,8 @@ class DOMBaseNode:
     notte_id: str | None = field(init=False, default=None)
     children: list["DOMBaseNode"] = field(init=False, default_factory=list)
     # Use None as default and set parent later to avoid circular reference issues
+    # cached `to_notte_domnode` result (reused by incremental parsing for unchanged subtrees)
+    notte_node: NotteDomNode | None = field(init=False, default=None, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         self.children = [] if getattr(self, "children", None) is None else self.children
@@ -49,8 +53,45 @@ class DOMBaseNode:
     def to_dict(self) -> dict[str, str]:
         raise NotImplementedError("to_dict method not implemented for DOMBaseNode")
 
+    def cache_notte_node(self, node: NotteDomNode) -> NotteDomNode:
+        self.notte_node = node
+        return node
+
+    def cached_notte_node(self) -> NotteDomNode | None:
+        # the cached subtree belongs to the tree of a previous snapshot: it is copied (not re-converted)
+        # so that setting the parents of the new tree does not rewrite the previous one
+        if self.notte_node is None:
+            return None
+        return self.notte_node.copy_subtree()
+
+    def invalidate(self) -> None:
+        """Drop the cached `DomNode` conversion of this node and of all its ancestors."""
+        node: DOMBaseNode | None = self
+        while node is not None:
+            node.notte_node = None
+            node = node.parent
+
     def to_notte_domnode(self) -> NotteDomNode:
-        raise NotImplementedError("to_notte_domnode method not implemented for DOMBaseNode")
+        # post-order walk with an explicit stack: pages can be deeper than the recursion limit
+        converted: dict[int, NotteDomNode] = {}
+        stack: list[tuple[DOMBaseNode, bool]] = [(self, False)]
+        while len(stack) > 0:
+            node, expanded = stack.pop()
+            if expanded:
+                children = [converted.pop(id(child)) for child in node.children]
+                converted[id(node)] = node.cache_notte_node(node.build_notte_domnode(children))
+                continue
+            cached = node.cached_notte_node()
+            if cached is not None:
+                converted[id(node)] = cached
+                continue
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.children)
+        return converted[id(self)]
+
+    def build_notte_domnode(self, children: list[NotteDomNode]) -> NotteDomNode:  # type: ignore[reportUnusedParameter]
+        """`DomNode` of this node alone, given the conversions of its children."""
+        raise NotImplementedError("build_notte_domnode method not implemented for DOMBaseNode")
 
     @property
     def name(self) -> str:
@@ -93,7 +134,7 @@ class DOMTextNode(DOMBaseNode):
         return self.text
 
     @override
-    def to_notte_domnode(self) -> NotteDomNode:
+    def build_notte_domnode(self, children: list[NotteDomNode]) -> NotteDomNode:
         return NotteDomNode(
             id=self.notte_id,
             role=NodeRole.from_value(self.role),
@@ -114,6 +155,9 @@ class DOMElementNode(DOMBaseNode):
     (shadow root or iframe OR document if no shadow root or iframe).
     To properly reference the element we need to recursively switch the root node
     until we find the element (work you way up the tree with `.parent`)
+
+    Selectors (`css_path`, `iframe_parent_css_selectors` and `notte_selector`) are computed on first access
+    from the parent chain: most elements never reach action resolution or image scraping.
     """
 
     tag_name: str
@@ -121,16 +165,19 @@ class DOMElementNode(DOMBaseNode):
     # iframe resolution
     in_iframe: bool
     in_shadow_root: bool
-    css_path: str
-    iframe_parent_css_selectors: list[str]
-    notte_selector: str
     # html attributes
     attributes: dict[str, str]
+    # notte selector of the element context (i.e. the page URL), only used for root elements
+    selector_prefix: str = ""
     # computed attributes
     is_interactive: bool = False
     is_top_element: bool = False
     shadow_root: bool = False
     is_editable: bool = False
+    # stable key of the element in the page (only set by incremental captures)
+    key: int | None = None
+    # selectors of the `DomNode` conversions (see `lazy_selectors`)
+    _lazy_selectors: "LazyNodeSelectors | None" = field(init=False, default=None, repr=False, compare=False)
 
     @override
     def __post_init__(self) -> None:
@@ -139,6 +186,65 @@ class DOMElementNode(DOMBaseNode):
         # replace also in the attributes
         self.attributes = cleanup_aria_attributes(self.attributes)
 
+    @cached_property
+    def css_path(self) -> str:
+        return build_csspath(
+            tag_name=self.tag_name,
+            xpath=self.xpath,
+            attributes=self.attributes,
+            highlight_index=self.highlight_index,
+        )
+
+    @cached_property
+    def iframe_parent_css_selectors(self) -> list[str]:
+        if self.parent is None:
+            return []
+        # elements share the list of their parent unless the parent is an iframe
+        if self.parent.tag_name.lower() == "iframe":
+            return self.parent.iframe_parent_css_selectors + [self.parent.css_path]
+        return self.parent.iframe_parent_css_selectors
+
+    @cached_property
+    def selector_segment(self) -> str:
+        return f"{hash(self.xpath)}:{hash(self.css_path)}"
+
+    @property
+    def notte_selector(self) -> str:
+        # only the segment of each element is stored: prefixes are shared through the parent chain
+        segments: list[str] = []
+        node: DOMElementNode = self
+        while True:
+            segments.append(node.selector_segment)
+            if node.parent is None:
+                break
+            node = node.parent
+        return ":".join([node.selector_prefix, *reversed(segments)])
+
+    @property
+    def lazy_selectors(self) -> "LazyNodeSelectors":
+        # shared by the `DomNode` conversions of the element and by the selectors of its children
+        # (built top-down without recursion: trees can be deeper than the recursion limit)
+        chain: list[DOMElementNode] = []
+        node: DOMElementNode | None = self
+        while node is not None and node._lazy_selectors is None:
+            chain.append(node)
+            node = node.parent
+        selectors = node._lazy_selectors if node is not None else None
+        for element in reversed(chain):
+            selectors = element._lazy_selectors = LazyNodeSelectors(element, selectors)
+        assert selectors is not None
+        return selectors
+
+    def selectors(self) -> NodeSelectors:
+        return NodeSelectors(
+            css_selector=self.css_path,
+            xpath_selector=self.xpath,
+            notte_selector=self.notte_selector,
+            in_iframe=self.in_iframe,
+            iframe_parent_css_selectors=self.iframe_parent_css_selectors,
+            in_shadow_root=self.in_shadow_root,
+        )
+
     @override
     def __repr__(self) -> str:
         tag_str = f"<{self.tag_name}"
@@ -432,13 +538,13 @@ class DOMElementNode(DOMBaseNode):
         return base
 
     @override
-    def to_notte_domnode(self) -> NotteDomNode:
+    def build_notte_domnode(self, children: list[NotteDomNode]) -> NotteDomNode:
         node = NotteDomNode(
             id=self.notte_id,
             type=NodeType.INTERACTION if self.is_interactive else NodeType.OTHER,
             role=NodeRole.from_value(self.role),
             text=self.name,
-            children=[child.to_notte_domnode() for child in self.children],
+            children=children,
             attributes=DomAttributes.safe_init(
                 tag_name=self.tag_name,
                 **self.attributes,
@@ -450,17 +556,78 @@ class DOMElementNode(DOMBaseNode):
                 is_editable=self.is_editable,
                 shadow_root=self.shadow_root,
                 highlight_index=self.highlight_index,
-                selectors=NodeSelectors(
-                    css_selector=self.css_path,
-                    xpath_selector=self.xpath,
-                    notte_selector=self.notte_selector,
-                    in_iframe=self.in_iframe,
-                    iframe_parent_css_selectors=self.iframe_parent_css_selectors,
-                    in_shadow_root=self.in_shadow_root,
-                ),
+                selectors=self.lazy_selectors,
             ),
         )
         # second path to set the parent
         for child in node.children:
             child.set_parent(node)
         return node
+
+
+class LazyNodeSelectors(NodeSelectors):
+    """
+    `NodeSelectors` of a DOM element, computed on first access of any of its fields.
+
+    Only the data the selectors are computed from is kept (e.g. the xpath and attributes of the element and the
+    selectors of its parent), not the `DOMElementNode`: the `DomNode` tree must not keep the raw DOM tree alive.
+    """
+
+    def __init__(self, element: DOMElementNode, parent: "LazyNodeSelectors | None") -> None:  # pyright: ignore[reportMissingSuperCall]
+        # fields are only set by `__getattr__` (i.e. when they are first accessed)
+        object.__setattr__(self, "_tag_name", element.tag_name)
+        object.__setattr__(self, "_xpath", element.xpath)
+        object.__setattr__(self, "_attributes", element.attributes)
+        object.__setattr__(self, "_highlight_index", element.highlight_index)
+        object.__setattr__(self, "_in_iframe", element.in_iframe)
+        object.__setattr__(self, "_in_shadow_root", element.in_shadow_root)
+        object.__setattr__(self, "_selector_prefix", element.selector_prefix)
+        object.__setattr__(self, "_parent", parent)
+        object.__setattr__(self, "_css_path", None)
+
+    def css_path(self) -> str:
+        css_path: str | None = object.__getattribute__(self, "_css_path")
+        if css_path is None:
+            css_path = build_csspath(
+                tag_name=object.__getattribute__(self, "_tag_name"),
+                xpath=object.__getattribute__(self, "_xpath"),
+                attributes=object.__getattribute__(self, "_attributes"),
+                highlight_index=object.__getattribute__(self, "_highlight_index"),
+            )
+            object.__setattr__(self, "_css_path", css_path)
+        return css_path
+
+    def _compute(self) -> NodeSelectors:
+        # same selectors as `DOMElementNode.selectors`, walking up the parent selectors
+        segments: list[str] = []
+        iframe_parent_css_selectors: list[str] = []
+        node: LazyNodeSelectors = self
+        while True:
+            segments.append(f"{hash(object.__getattribute__(node, '_xpath'))}:{hash(node.css_path())}")
+            parent: LazyNodeSelectors | None = object.__getattribute__(node, "_parent")
+            if parent is None:
+                break
+            if object.__getattribute__(parent, "_tag_name").lower() == "iframe":
+                iframe_parent_css_selectors.append(parent.css_path())
+            node = parent
+        return NodeSelectors(
+            css_selector=self.css_path(),
+            xpath_selector=object.__getattribute__(self, "_xpath"),
+            notte_selector=":".join([object.__getattribute__(node, "_selector_prefix"), *reversed(segments)]),
+            in_iframe=object.__getattribute__(self, "_in_iframe"),
+            iframe_parent_css_selectors=iframe_parent_css_selectors[::-1],
+            in_shadow_root=object.__getattribute__(self, "_in_shadow_root"),
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in NodeSelectors.__dataclass_fields__:
+            raise AttributeError(name)
+        selectors = self._compute()
+        for field_name in NodeSelectors.__dataclass_fields__:
+            object.__setattr__(self, field_name, getattr(selectors, field_name))
+        return getattr(selectors, name)
+
+    @override
+    def __reduce__(self) -> tuple[type[NodeSelectors], tuple[Any, ...]]:
+        # copies and pickles are plain `NodeSelectors` (i.e. without a reference to the DOM tree)
+        return NodeSelectors, tuple(getattr(self, field_name) for field_name in NodeSelectors.__dataclass_fields__)
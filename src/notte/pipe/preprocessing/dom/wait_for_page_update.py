@@ -1,132 +1,168 @@
-# from collections.abc import AsyncGenerator, Awaitable
-# from contextlib import asynccontextmanager
-# import time
-# from patchright.async_api import Page, TimeoutError as PlaywrightTimeoutError
-# import asyncio
-# from loguru import logger
-
-# # @asynccontextmanager
-# # async def wait_for_page_update_2(
-# #     page: Page,
-# #     timeout: int = 1000,
-# #     wait_until: str = "domcontentloaded"
-# # ) -> AsyncGenerator[None, None]:
-# #     """Context manager that waits for navigation or response if they occur after an action.
-
-# #     Args:
-# #         page: Playwright page object
-# #         timeout: Maximum time to wait in milliseconds
-# #         wait_until: Navigation wait condition ('domcontentloaded', 'load', 'networkidle')
-
-# #     Example:
-# #         async with wait_for_page_update(page):
-# #             success = await element.click()
-# #     """
-# #     try:
-# #         navigation_task = None
-# #         response_task = None
-
-# #         async with page.expect_navigation(wait_until=wait_until, timeout=timeout) as navigation, \
-# #                   page.expect_response("**/*", timeout=timeout) as response:
-
-# #             yield
-
-# #             try:
-# #                 # Create tasks but don't await them yet
-# #                 navigation_task = asyncio.create_task(navigation.value)
-# #                 response_task = asyncio.create_task(response.value)
-
-# #                 # Wait for first completion
-# #                 _, pending = await asyncio.wait(
-# #                     [navigation_task, response_task],
-# #                     return_when=asyncio.FIRST_COMPLETED
-# #                 )
-
-# #                 # Properly cancel pending tasks
-# #                 for task in pending:
-# #                     _ = task.cancel()
-# #                     try:
-# #                         await task
-# #                     except asyncio.CancelledError:
-# #                         pass
-
-# #                 # Wait for network to be idle
-# #                 try:
-# #                     await page.wait_for_load_state("networkidle", timeout=timeout)
-# #                 except PlaywrightTimeoutError:
-# #                     logger.debug("Network did not reach idle state within timeout")
-
-# #             except Exception as e:
-# #                 logger.error(f"Error waiting for navigation/response: {e}")
-# #                 raise
-# #             finally:
-# #                 # Clean up tasks if they weren't handled
-# #                 if navigation_task and not navigation_task.done():
-# #                     navigation_task.cancel()
-# #                 if response_task and not response_task.done():
-# #                     response_task.cancel()
-
-# #     except PlaywrightTimeoutError:
-# #         logger.debug("No navigation or response detected within timeout")
-# #     except Exception as e:
-# #         logger.error(f"Unexpected error in wait_for_page_update: {e}")
-# #         raise
-
-
-# @asynccontextmanager
-# async def wait_for_page_update(
-#     page: Page,
-#     timeout: int = 500,
-#     wait_until: str = "domcontentloaded"
-# ) -> AsyncGenerator[None, None]:
-#     """Context manager that waits for navigation or response if they occur after an action.
-
-#     Args:
-#         page: Playwright page object
-#         timeout: Maximum time to wait in milliseconds
-#         wait_until: Navigation wait condition ('domcontentloaded', 'load', 'networkidle')
-
-#     Example:
-#         async with wait_for_page_update(page):
-#             success = await element.click()
-#     """
-#     try:
-#         # Start listening but don't await yet
-#         # event = 'popup'
-#         page_promise: Awaitable[Page] = page.context.wait_for_event("page", timeout=timeout)
-#         navigation_promise = page.wait_for_navigation(wait_until=wait_until, timeout=timeout)
-#         response_promise = page.wait_for_response("**/*", timeout=timeout)
-
-#         # Execute the action
-#         yield
-#         wait_time = time.time()
-#         # Now check if a new page was created
-#         try:
-#             done, _ = await asyncio.wait(
-#                 [
-#                     asyncio.create_task(navigation_promise.value),
-#                     asyncio.create_task(response_promise.value),
-#                     asyncio.create_task(page_promise),
-#                 ],
-#                 timeout=timeout/1000,  # convert to seconds for asyncio.wait
-#                 return_when=asyncio.FIRST_COMPLETED
-#             )
-#             if done:
-#                 try:
-#                     # Try less strict load states first
-#                     await page.wait_for_load_state("networkidle", timeout=10000)
-#                 except PlaywrightTimeoutError:
-#                     logger.warning("Page didn't reach domcontentloaded state, continuing anyway")
-
-#             # Store the page even if load state isn't complete
-#             logger.info(f"Navitation event detected for {page.url}. Took {time.time() - wait_time} seconds.")
-#             # self._pages.append(new_page)
-#             # self._current_page_url = new_page.url
-#         except PlaywrightTimeoutError:
-#             # No new page was created, which is the common case
-#             pass
-#     except PlaywrightTimeoutError:
-#         logger.debug("No navigation or response detected within timeout")
-#     except Exception as e:
-#         logger.error(f"Unexpected error in wait_for_page_update: {e}")
-#         raise
+import asyncio
+import time
+from typing import ClassVar, Literal
+from weakref import WeakKeyDictionary, WeakSet
+
+from patchright.async_api import BrowserContext, Page, Request
+from patchright.async_api import Error as PlaywrightError
+from patchright.async_api import TimeoutError as PlaywrightTimeoutError
+from pydantic import BaseModel, Field
+
+from notte.pipe.preprocessing.dom.scripts import call_dom_function
+
+SettleReason = Literal["quiet", "timeout"]
+
+
+class NetworkActivity:
+    """Pending requests of a page that can update its DOM (static resources such as images or fonts are ignored)."""
+
+    TRACKED_RESOURCE_TYPES: ClassVar[frozenset[str]] = frozenset({"document", "fetch", "xhr"})
+
+    def __init__(self, page: Page) -> None:
+        self.pending: set[Request] = set()
+        self.last_activity: float = time.monotonic()
+        self._idle: asyncio.Event = asyncio.Event()
+        self._idle.set()
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_request_done)
+        page.on("requestfailed", self._on_request_done)
+
+    def _on_request(self, request: Request) -> None:
+        if request.resource_type not in self.TRACKED_RESOURCE_TYPES:
+            return
+        self.pending.add(request)
+        self.last_activity = time.monotonic()
+        self._idle.clear()
+
+    def _on_request_done(self, request: Request) -> None:
+        if request not in self.pending:
+            return
+        self.pending.discard(request)
+        self.last_activity = time.monotonic()
+        if len(self.pending) == 0:
+            self._idle.set()
+
+    @property
+    def idle(self) -> bool:
+        return len(self.pending) == 0
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait (at most `timeout` seconds) until no request is pending. Returns whether the page is idle."""
+        try:
+            _ = await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+            return True
+        except TimeoutError:
+            return False
+
+
+# requests are tracked with page events: no script is injected in the main world of the page
+_network_activity: WeakKeyDictionary[Page, NetworkActivity] = WeakKeyDictionary()
+# contexts listening for their new pages (contexts recycled by the pool are watched by every session)
+_watched_contexts: WeakSet[BrowserContext] = WeakSet()
+
+
+def watch_network_activity(page: Page) -> NetworkActivity:
+    """Start tracking the requests of `page`. Requests started before the first call are not tracked."""
+    activity = _network_activity.get(page)
+    if activity is None:
+        activity = NetworkActivity(page)
+        _network_activity[page] = activity
+    return activity
+
+
+def _watch_new_page(page: Page) -> None:
+    _ = watch_network_activity(page)
+
+
+def watch_context_network_activity(context: BrowserContext) -> None:
+    """Track the requests of all current and future pages of `context` (i.e. including new tabs)."""
+    for page in context.pages:
+        _watch_new_page(page)
+    if context not in _watched_contexts:
+        _watched_contexts.add(context)
+        context.on("page", _watch_new_page)
+
+
+class SettleResult(BaseModel):
+    # 'quiet' if the page settled, 'timeout' if the wait was capped
+    reason: SettleReason
+    # seconds
+    elapsed: float
+    mutations: int = 0
+    pending_requests: int = 0
+
+
+class SettleSummary(BaseModel):
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    timeouts: int = 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+
+class SettleStats(BaseModel):
+    """Time (in seconds) spent waiting for the page to settle, aggregated per action. Used to tune `BrowserWaitConfig`."""
+
+    actions: dict[str, SettleSummary] = Field(default_factory=dict)
+
+    def record(self, label: str, result: SettleResult) -> None:
+        summary = self.actions.setdefault(label, SettleSummary())
+        summary.count += 1
+        summary.total += result.elapsed
+        summary.max = max(summary.max, result.elapsed)
+        if result.reason == "timeout":
+            summary.timeouts += 1
+
+    def reset(self) -> None:
+        self.actions.clear()
+
+
+async def wait_for_page_update(page: Page, timeout: int, quiet: int = 100, min_frames: int = 2) -> SettleResult:
+    """
+    Wait until `page` settles, i.e. no DOM mutation and no pending document / fetch / XHR request
+    for `quiet` ms (with at least `min_frames` animation frames rendered), or at most `timeout` ms.
+
+    Navigations started during the wait are followed: the new document is awaited and checked in turn.
+    """
+    network = watch_network_activity(page)
+    start = time.monotonic()
+    deadline = start + timeout / 1000
+    mutations = 0
+    reason: SettleReason = "timeout"
+    while (remaining := deadline - time.monotonic()) > 0:
+        if not await network.wait_idle(remaining):
+            break
+        remaining = deadline - time.monotonic()
+        try:
+            dom = await call_dom_function(
+                page,
+                "settle",
+                {"quiet_ms": quiet, "min_frames": min_frames, "timeout_ms": int(remaining * 1000)},
+            )
+        except PlaywrightTimeoutError:
+            break
+        except PlaywrightError as e:
+            if "has been closed" in str(e):
+                raise
+            # the document was replaced during the wait (e.g. 'Execution context was destroyed')
+            try:
+                await page.wait_for_load_state("domcontentloaded", timeout=max(remaining * 1000, 1))
+            except PlaywrightTimeoutError:
+                break
+            continue
+        mutations += dom["mutations"]
+        if dom["reason"] == "timeout":
+            break
+        # requests started while the DOM was quiet (e.g. debounced searches) can still update it
+        if network.idle:
+            reason = "quiet"
+            break
+    return SettleResult(
+        reason=reason,
+        elapsed=time.monotonic() - start,
+        mutations=mutations,
+        pending_requests=len(network.pending),
+    )
@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Self, final
 
-from notte.browser.snapshot import BrowserSnapshot
+from notte.browser.snapshot import BrowserSnapshot, SnapshotComponent
 from notte.common.config import FrozenConfig
 from notte.pipe.preprocessing.a11y.pipe import (
     A11yPreprocessingConfig,
@@ -28,6 +28,19 @@ class PreprocessingConfig(FrozenConfig):
 
 @final
 class ProcessedSnapshotPipe:
+    @staticmethod
+    def required_components(
+        config: PreprocessingConfig, downstream: set[SnapshotComponent] | None = None
+    ) -> set[SnapshotComponent]:
+        """Components to capture from the page so that `downstream` pipes can run on the processed snapshot."""
+        components = set(downstream or set())
+        match config.type:
+            case PreprocessingType.A11Y:
+                # the dom node of the processed snapshot is built from the a11y tree
+                return (components - {SnapshotComponent.DOM_NODE}) | {SnapshotComponent.A11Y_TREE}
+            case PreprocessingType.DOM:
+                return components | {SnapshotComponent.DOM_NODE}
+
     @staticmethod
     def forward(snapshot: BrowserSnapshot, config: PreprocessingConfig) -> BrowserSnapshot:
         match config.type:
@@ -54,7 +54,7 @@ class MarkdownDomNodeRenderingPipe:
         if len(node.children) > 0:
             result += " {\n"
             for child in node.children:
-                if len(child.subtree_ids) == 0 and not expand_non_interaction_subtree:
+                if child.nb_subtree_ids() == 0 and not expand_non_interaction_subtree:
                     inner_text = child.inner_text().strip()
                     if len(inner_text) > 0:
                         result += f"{indent} inner_text: {inner_text}\n"
@@ -2,7 +2,7 @@ from loguru import logger
 from typing_extensions import final
 
 from notte.actions.base import ExecutableAction
-from notte.browser.snapshot import BrowserSnapshot
+from notte.browser.snapshot import BrowserSnapshot, SnapshotComponent
 from notte.browser.window import BrowserWindow
 from notte.controller.actions import BaseAction, BrowserAction, InteractionAction
 from notte.controller.proxy import NotteActionProxy
@@ -19,6 +19,14 @@ class NodeResolutionPipe:
         self.type = type
         self.verbose = verbose
 
+    def required_components(self) -> set[SnapshotComponent]:
+        match self.type:
+            case PreprocessingType.A11Y:
+                # complex resolution locates nodes in the raw a11y tree
+                return {SnapshotComponent.A11Y_TREE, SnapshotComponent.DOM_NODE}
+            case PreprocessingType.DOM:
+                return {SnapshotComponent.DOM_NODE}
+
     async def forward(
         self,
         action: BaseAction,
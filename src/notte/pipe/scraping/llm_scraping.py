@@ -1,5 +1,6 @@
 from typing import Required, Unpack
 
+from litellm import ModelResponse
 from typing_extensions import TypedDict
 
 from notte.browser.snapshot import BrowserSnapshot
@@ -41,8 +42,27 @@ class LlmDataScrapingPipe:
     ) -> DataSpace:
         document = self._render_node(snapshot, params["max_tokens"])
         # make LLM call
-        prompt = "only_main_content" if params["only_main_content"] else "all_data"
-        response = self.llmserve.completion(prompt_id=f"data-extraction/{prompt}", variables={"document": document})
+        response = self.llmserve.completion(
+            prompt_id=self._prompt_id(params["only_main_content"]), variables={"document": document}
+        )
+        return self._parse(response)
+
+    async def forward_async(
+        self,
+        snapshot: BrowserSnapshot,
+        **params: Unpack[LlmDataScrapingDict],
+    ) -> DataSpace:
+        document = self._render_node(snapshot, params["max_tokens"])
+        response = await self.llmserve.acompletion(
+            prompt_id=self._prompt_id(params["only_main_content"]), variables={"document": document}
+        )
+        return self._parse(response)
+
+    def _prompt_id(self, only_main_content: bool) -> str:
+        prompt = "only_main_content" if only_main_content else "all_data"
+        return f"data-extraction/{prompt}"
+
+    def _parse(self, response: ModelResponse) -> DataSpace:
         if response.choices[0].message.content is None:  # type: ignore[arg-type]
             raise LLMnoOutputCompletionError()
         response_text = str(response.choices[0].message.content)  # type: ignore[arg-type]
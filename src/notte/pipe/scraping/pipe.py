@@ -5,7 +5,7 @@ from html2text import config
 from loguru import logger
 from typing_extensions import override
 
-from notte.browser.snapshot import BrowserSnapshot
+from notte.browser.snapshot import BrowserSnapshot, SnapshotComponent
 from notte.browser.window import BrowserWindow
 from notte.common.config import FrozenConfig
 from notte.data.space import DataSpace
@@ -83,12 +83,28 @@ class DataScrapingPipe:
             return ScrapingType.SIMPLE
         return self.config.type
 
+    def required_components(self, params: ScrapeParams) -> set[SnapshotComponent]:
+        return self._required_components(self.get_scraping_type(params), params)
+
+    def _required_components(self, scraping_type: ScrapingType, params: ScrapeParams) -> set[SnapshotComponent]:
+        match scraping_type:
+            case ScrapingType.SIMPLE:
+                components = {SnapshotComponent.HTML_CONTENT}
+            case ScrapingType.LLM_EXTRACT:
+                components = {SnapshotComponent.DOM_NODE}
+        if params.scrape_images:
+            components.add(SnapshotComponent.DOM_NODE)
+        return components
+
     async def forward(
         self,
         snapshot: BrowserSnapshot,
         params: ScrapeParams,
     ) -> DataSpace:
-        match self.get_scraping_type(params):
+        scraping_type = self.get_scraping_type(params)
+        # no-op unless the snapshot was captured lazily
+        await snapshot.prefetch(self._required_components(scraping_type, params))
+        match scraping_type:
             case ScrapingType.SIMPLE:
                 if self.config.rendering.verbose:
                     logger.info("📀 Scraping page with simple scraping pipe")
@@ -103,7 +119,7 @@ class DataScrapingPipe:
             case ScrapingType.LLM_EXTRACT:
                 if self.config.rendering.verbose:
                     logger.info("📀 Scraping page with complex/LLM-based scraping pipe")
-                data = self.llm_pipe.forward(
+                data = await self.llm_pipe.forward_async(
                     snapshot,
                     only_main_content=params.only_main_content,
                     max_tokens=self.config.long_max_tokens,
@@ -120,7 +136,7 @@ class DataScrapingPipe:
         if params.requires_schema() and data.markdown is not None:
             if self.config.rendering.verbose:
                 logger.info("🎞️ Structuring data with schema pipe")
-            data.structured = self.schema_pipe.forward(
+            data.structured = await self.schema_pipe.forward_async(
                 url=snapshot.metadata.url,
                 document=data.markdown,
                 response_format=params.response_format,
@@ -1,4 +1,5 @@
 import datetime as dt
+from typing import Any
 
 from litellm import json
 from loguru import logger
@@ -64,6 +65,39 @@ class SchemaScrapingPipe:
             success=False, error="The user requested information about a cat but the document is about a dog", data=None
         )
 
+    def get_prompt(
+        self,
+        url: str,
+        document: str,
+        response_format: type[BaseModel] | None,
+        instructions: str | None,
+    ) -> tuple[str, dict[str, Any]]:
+        match (response_format, instructions):
+            case (None, None):
+                raise ValueError("response_format and instructions cannot be both None")
+            case (None, _):
+                return "extract-without-json-schema", {
+                    "document": document,
+                    "instructions": instructions,
+                    "success_example": self.success_example().model_dump_json(),
+                    "failure_example": self.failure_example().model_dump_json(),
+                    "timestamp": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                }
+            case (_response_format, _):
+                return "extract-json-schema/multi-entity", {
+                    "url": url,
+                    "failure_example": StructuredData(
+                        success=False,
+                        error="<REASONING ABOUT WHY YOU CANNOT ANSWER THE USER REQUEST>",
+                        data=None,
+                    ).model_dump_json(),
+                    "success_example": self.success_example().model_dump_json(),
+                    "schema": json.dumps(_response_format.model_json_schema(), indent=2),
+                    "content": document,
+                    "timestamp": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "instructions": instructions or "no additional instructions",
+                }
+
     def forward(
         self,
         url: str,
@@ -73,74 +107,72 @@ class SchemaScrapingPipe:
         max_tokens: int,
         verbose: bool = False,
     ) -> StructuredData[BaseModel]:
+        document = self.llmserve.clip_tokens(document, max_tokens)
+        prompt_id, variables = self.get_prompt(url, document, response_format, instructions)
         # make LLM call
+        response: StructuredData[DictBaseModel] = self.llmserve.structured_completion(
+            prompt_id=prompt_id,
+            response_format=StructuredData[DictBaseModel],
+            variables=variables,
+        )
+        return self.validate(response, response_format, verbose)
+
+    async def forward_async(
+        self,
+        url: str,
+        document: str,
+        response_format: type[TResponseFormat] | None,
+        instructions: str | None,
+        max_tokens: int,
+        verbose: bool = False,
+    ) -> StructuredData[BaseModel]:
         document = self.llmserve.clip_tokens(document, max_tokens)
-        match (response_format, instructions):
-            case (None, None):
-                raise ValueError("response_format and instructions cannot be both None")
-            case (None, _):
-                structured = self.llmserve.structured_completion(
-                    prompt_id="extract-without-json-schema",
-                    variables={
-                        "document": document,
-                        "instructions": instructions,
-                        "success_example": self.success_example().model_dump_json(),
-                        "failure_example": self.failure_example().model_dump_json(),
-                        "timestamp": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    },
-                    response_format=StructuredData[DictBaseModel],
-                )
-                if verbose:
-                    logger.info(f"LLM Structured Response with no schema:\n{structured}")
-                return structured
-            case (_response_format, _):
-                assert _response_format is not None
+        prompt_id, variables = self.get_prompt(url, document, response_format, instructions)
+        response: StructuredData[DictBaseModel] = await self.llmserve.astructured_completion(
+            prompt_id=prompt_id,
+            response_format=StructuredData[DictBaseModel],
+            variables=variables,
+        )
+        return self.validate(response, response_format, verbose)
 
-                response: StructuredData[DictBaseModel] = self.llmserve.structured_completion(
-                    prompt_id="extract-json-schema/multi-entity",
-                    response_format=StructuredData[DictBaseModel],
-                    variables={
-                        "url": url,
-                        "failure_example": StructuredData(
-                            success=False,
-                            error="<REASONING ABOUT WHY YOU CANNOT ANSWER THE USER REQUEST>",
-                            data=None,
-                        ).model_dump_json(),
-                        "success_example": self.success_example().model_dump_json(),
-                        "schema": json.dumps(_response_format.model_json_schema(), indent=2),
-                        "content": document,
-                        "timestamp": dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "instructions": instructions or "no additional instructions",
-                    },
+    def validate(
+        self,
+        response: StructuredData[DictBaseModel],
+        response_format: type[BaseModel] | None,
+        verbose: bool = False,
+    ) -> StructuredData[BaseModel]:
+        if response_format is None:
+            if verbose:
+                logger.info(f"LLM Structured Response with no schema:\n{response}")
+            return response
+        if verbose:
+            logger.info(f"LLM Structured Response with user provided schema:\n{response}")
+        # try model_validate
+        if not response.success or response.data is None:
+            return response
+        try:
+            if isinstance(response.data.root, list):
+                return StructuredData(
+                    success=False,
+                    error="The response is a list, but the schema is not a list",
+                    data=response.data,
                 )
-                if verbose:
-                    logger.info(f"LLM Structured Response with user provided schema:\n{response}")
-                # try model_validate
-                if not response.success or response.data is None:
-                    return response
-                try:
-                    if isinstance(response.data.root, list):
-                        return StructuredData(
-                            success=False,
-                            error="The response is a list, but the schema is not a list",
-                            data=response.data,
-                        )
-                    data: BaseModel = _response_format.model_validate(response.data.root)
-                    return StructuredData[BaseModel](
-                        success=response.success,
-                        error=response.error,
-                        data=data,
-                    )
-                except Exception as e:
-                    if verbose:
-                        logger.info(
-                            (
-                                "LLM Response cannot be validated into the provided"
-                                f" schema:\n{_response_format.model_json_schema()}"
-                            )
-                        )
-                    return StructuredData(
-                        success=False,
-                        error=f"Cannot validate response into the provided schema. Error: {e}",
-                        data=response.data,
+            data: BaseModel = response_format.model_validate(response.data.root)
+            return StructuredData[BaseModel](
+                success=response.success,
+                error=response.error,
+                data=data,
+            )
+        except Exception as e:
+            if verbose:
+                logger.info(
+                    (
+                        "LLM Response cannot be validated into the provided"
+                        f" schema:\n{response_format.model_json_schema()}"
                     )
+                )
+            return StructuredData(
+                success=False,
+                error=f"Cannot validate response into the provided schema. Error: {e}",
+                data=response.data,
+            )
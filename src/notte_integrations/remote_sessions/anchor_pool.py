@@ -60,6 +60,6 @@ class AnchorBrowserPool(CDPBrowserPool):
     async def close_playwright_browser(self, browser: BrowserWithContexts, force: bool = True) -> bool:
         if self.config.verbose:
             logger.info(f"Closing CDP session for URL {browser.cdp_url}")
-        await browser.browser.close()
+        await self.disconnect_browser(browser)
         del self.sessions[browser.browser_id]
         return True
@@ -85,6 +85,6 @@ class BrowserBasePool(CDPBrowserPool):
     async def close_playwright_browser(self, browser: BrowserWithContexts, force: bool = True) -> bool:
         if self.verbose:
             logger.info(f"Closing CDP session for URL {browser.cdp_url}")
-        await browser.browser.close()
+        await self.disconnect_browser(browser)
         del self.sessions[browser.browser_id]
         return True
@@ -47,6 +47,7 @@ class SteelBrowserPool(CDPBrowserPool):
         if self.config.verbose:
             logger.info(f"Closing CDP session for URL {browser.cdp_url}")
         steel_session = self.sessions[browser.browser_id]
+        await self.disconnect_browser(browser)
 
         url = f"https://{self.steel_base_url}/v1/sessions/{steel_session.session_id}/release"
 
@@ -0,0 +1,110 @@
+from typing import cast
+
+import pytest
+from patchright.async_api import Browser
+
+from notte.browser.pool.base import BrowserResourceOptions
+from notte.browser.pool.connections import CDPConnectionManager, page_cdp_session, page_target_id
+from tests.mock.mock_pool import MockBrowser, MockCDPBrowserPool, MockContext, MockPage
+
+CDP_URL = "ws://remote-browser:9222"
+
+
+class Opener:
+    def __init__(self, failures: int = 0) -> None:
+        self.failures: int = failures
+        self.calls: int = 0
+        self.browsers: list[MockBrowser] = []
+
+    async def __call__(self) -> Browser:
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("handshake failed")
+        browser = MockBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+@pytest.mark.asyncio
+async def test_connection_is_reused():
+    manager = CDPConnectionManager()
+    opener = Opener()
+    first = await manager.connect(CDP_URL, opener)
+    second = await manager.connect(CDP_URL, opener)
+    assert first is second
+    assert opener.calls == 1
+    assert manager.stats.connects == 1
+    assert manager.stats.reuses == 1
+
+
+@pytest.mark.asyncio
+async def test_connection_is_retried_with_backoff():
+    manager = CDPConnectionManager(max_retries=2, backoff=0.0)
+    opener = Opener(failures=2)
+    _ = await manager.connect(CDP_URL, opener)
+    assert opener.calls == 3
+    assert manager.stats.failures == 2
+
+    manager = CDPConnectionManager(max_retries=1, backoff=0.0)
+    with pytest.raises(ConnectionError):
+        _ = await manager.connect(CDP_URL, Opener(failures=2))
+
+
+@pytest.mark.asyncio
+async def test_dropped_connection_is_reopened():
+    manager = CDPConnectionManager(backoff=0.0)
+    opener = Opener()
+    browser = cast(MockBrowser, await manager.connect(CDP_URL, opener))
+    browser.drop()
+    assert manager.stats.drops == 1
+    task = manager._reconnect_tasks[CDP_URL]  # pyright: ignore[reportPrivateUsage]
+    await task
+    assert manager.stats.reconnects == 1
+    assert manager.is_connected(CDP_URL)
+    assert await manager.connect(CDP_URL, opener) is opener.browsers[1]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_stops_reconnecting():
+    manager = CDPConnectionManager(backoff=0.0)
+    browser = cast(MockBrowser, await manager.connect(CDP_URL, Opener()))
+    await manager.disconnect(CDP_URL)
+    assert browser.closed
+    # the close event of a connection closed on purpose does not reconnect
+    browser.drop()
+    assert manager.stats.drops == 0
+    assert not manager.is_connected(CDP_URL)
+
+
+@pytest.mark.asyncio
+async def test_page_cdp_session_is_cached():
+    context = await MockBrowser().new_context()
+    page = await context.new_page()
+    session = await page_cdp_session(page)
+    assert await page_cdp_session(page) is session
+    assert await page_target_id(page) == await page_target_id(page)
+    assert context.cdp_sessions_created == 1
+    # a closed page gets a new session if it is ever reused
+    await page.close()
+    _ = await page_cdp_session(page)
+    assert context.cdp_sessions_created == 2
+
+
+@pytest.mark.asyncio
+async def test_cdp_pool_reuses_the_connection_across_sessions():
+    pool = MockCDPBrowserPool(cdp_url=CDP_URL)
+    options = BrowserResourceOptions(headless=True)
+    resource = await pool.get_browser_resource(options)
+    connection = cast(MockContext, resource.page.context).mock_browser
+    await pool.release_browser_resource(resource)
+    assert not connection.closed
+
+    # e.g. after a reset of the window
+    resource = await pool.get_browser_resource(options)
+    assert cast(MockPage, resource.page).context.mock_browser is connection
+    assert pool.connections.stats.connects == 1
+    assert pool.connections.stats.reuses == 1
+
+    await pool.release_browser_resource(resource)
+    await pool.stop()
+    assert connection.closed
@@ -0,0 +1,82 @@
+import asyncio
+from typing import Any, cast
+
+import pytest
+
+from notte.browser.pool.base import BaseBrowserPoolConfig, BrowserResourceOptions
+from notte.pipe.preprocessing.dom.wait_for_page_update import watch_context_network_activity
+from tests.mock.mock_pool import MockBrowser, MockBrowserPool, MockContext, MockPage
+
+
+class FakeRequest:
+    def __init__(self, url: str) -> None:
+        self.url: str = url
+
+
+def recycling_pool(**kwargs: Any) -> MockBrowserPool:
+    return MockBrowserPool(config=BaseBrowserPoolConfig(recycle_contexts=True, **kwargs))
+
+
+@pytest.mark.asyncio
+async def test_released_context_is_reset_and_reused():
+    pool = recycling_pool()
+    options = BrowserResourceOptions(headless=True)
+    resource = await pool.get_browser_resource(options)
+    context = cast(MockContext, resource.page.context)
+    context.emit("request", FakeRequest("https://example.com/login"))
+    cast(MockPage, resource.page).mock_url = "https://example.com/login"
+    previous_pages = [resource.page, await context.new_page()]
+
+    await pool.release_browser_resource(resource)
+    assert not context.closed
+    # the pages (and their history) of the previous session are not handed out again
+    assert len(context.pages) == 1
+    assert context.pages[0] not in previous_pages
+    assert all(page.is_closed() for page in previous_pages)
+    assert context.pages[0].url == "about:blank"
+    assert context.cookies_cleared == 1
+    assert context.permissions == ["clipboard-read", "clipboard-write"]
+    assert context.cdp.commands == [
+        ("Storage.clearDataForOrigin", {"origin": "https://example.com", "storageTypes": "all"})
+    ]
+
+    reused = await pool.get_browser_resource(options)
+    assert reused.context_id == resource.context_id
+    assert pool.warm_stats.hits == 1
+    assert len(pool.available_browsers()) == 1
+
+
+@pytest.mark.asyncio
+async def test_context_is_closed_after_max_reuse():
+    pool = recycling_pool(max_context_reuse=2)
+    options = BrowserResourceOptions(headless=True)
+    resource = await pool.get_browser_resource(options)
+    context = cast(MockContext, resource.page.context)
+    await pool.release_browser_resource(resource)
+    resource = await pool.get_browser_resource(options)
+    await pool.release_browser_resource(resource)
+    assert context.closed
+    # the browser had no context left
+    assert len(pool.available_browsers()) == 0
+
+
+@pytest.mark.asyncio
+async def test_idle_browser_is_kept_alive_until_ttl():
+    pool = MockBrowserPool(config=BaseBrowserPoolConfig(browser_idle_ttl=0.05))
+    options = BrowserResourceOptions(headless=True)
+    resource = await pool.get_browser_resource(options)
+    await pool.release_browser_resource(resource)
+    assert len(pool.available_browsers()) == 1
+    # a new session reuses the idle browser
+    resource = await pool.get_browser_resource(options)
+    await pool.release_browser_resource(resource)
+    await asyncio.sleep(0.1)
+    assert len(pool.available_browsers()) == 0
+
+
+def test_recycled_context_is_watched_once():
+    context = MockContext(MockBrowser())
+    # e.g. one `BrowserWindow.start` per session served by the context
+    for _ in range(3):
+        watch_context_network_activity(context)
+    assert len(context.handlers["page"]) == 1
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from notte.browser.dom_tree import ComputedDomAttributes, DomNode
+from notte.browser.node_type import NodeRole, NodeType
+from notte.browser.snapshot import (
+    BrowserSnapshot,
+    SnapshotComponent,
+    SnapshotComponentLoader,
+    SnapshotMetadata,
+    ViewportData,
+)
+from notte.errors.processing import SnapshotComponentNotLoadedError
+from notte.pipe.preprocessing.pipe import PreprocessingConfig, ProcessedSnapshotPipe
+
+
+def make_dom_node(text: str = "button") -> DomNode:
+    return DomNode(
+        id="B1",
+        role=NodeRole.BUTTON,
+        text=text,
+        type=NodeType.INTERACTION,
+        children=[],
+        attributes=None,
+        computed_attributes=ComputedDomAttributes(),
+    )
+
+
+def make_lazy_snapshot(calls: list[SnapshotComponent]) -> BrowserSnapshot:
+    async def fetch(component: SnapshotComponent) -> str | None:
+        calls.append(component)
+        await asyncio.sleep(0.01)
+        if component == SnapshotComponent.HTML_CONTENT:
+            return "<html>lazy</html>"
+        return None
+
+    return BrowserSnapshot(
+        metadata=SnapshotMetadata(
+            url="https://example.com",
+            title="example",
+            viewport=ViewportData(
+                scroll_x=0,
+                scroll_y=0,
+                viewport_width=1000,
+                viewport_height=1000,
+                total_width=1000,
+                total_height=1000,
+            ),
+            tabs=[],
+        ),
+        dom_node=make_dom_node(),
+        pending=frozenset({SnapshotComponent.HTML_CONTENT, SnapshotComponent.A11Y_TREE}),
+    ).with_loader(SnapshotComponentLoader(fetch))
+
+
+def test_pending_component_access_raises():
+    snapshot = make_lazy_snapshot([])
+    assert snapshot.dom_node.id == "B1"
+    with pytest.raises(SnapshotComponentNotLoadedError):
+        _ = snapshot.html_content
+
+
+@pytest.mark.asyncio
+async def test_lazy_component_is_loaded_once_and_shared_with_copies():
+    calls: list[SnapshotComponent] = []
+    snapshot = make_lazy_snapshot(calls)
+    processed = snapshot.with_dom_node(make_dom_node())
+    await asyncio.gather(
+        snapshot.load(SnapshotComponent.HTML_CONTENT),
+        processed.prefetch([SnapshotComponent.HTML_CONTENT, SnapshotComponent.DOM_NODE]),
+    )
+    assert snapshot.html_content == "<html>lazy</html>"
+    assert processed.html_content == "<html>lazy</html>"
+    assert calls == [SnapshotComponent.HTML_CONTENT]
+    assert not processed.is_loaded(SnapshotComponent.A11Y_TREE)
+
+
+def test_compare_with_falls_back_to_dom_without_a11y():
+    snapshot = make_lazy_snapshot([])
+    assert snapshot.compare_with(make_lazy_snapshot([]))
+
+
+def test_compare_with_detects_changed_interaction_nodes():
+    snapshot = make_lazy_snapshot([])
+    changed = snapshot.with_dom_node(make_dom_node(text="submit"))
+    assert snapshot.dom_fingerprint() == {("B1", "button", "button")}
+    assert not snapshot.compare_with(changed)
+
+
+def test_preprocessing_required_components():
+    downstream = {SnapshotComponent.DOM_NODE, SnapshotComponent.HTML_CONTENT}
+    assert ProcessedSnapshotPipe.required_components(PreprocessingConfig().dom(), downstream) == downstream
+    assert ProcessedSnapshotPipe.required_components(PreprocessingConfig().accessibility(), downstream) == {
+        SnapshotComponent.A11Y_TREE,
+        SnapshotComponent.HTML_CONTENT,
+    }
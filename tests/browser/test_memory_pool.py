@@ -0,0 +1,126 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from notte.browser.pool import local_pool
+from notte.browser.pool.base import BrowserResourceOptions
+from notte.browser.pool.local_pool import BrowserPoolConfig, LocalBrowserPool, MemoryBrowserPoolConfig
+from notte.browser.pool.memory import (
+    descendants,
+    kill_process_tree,
+    proc_available,
+    process_memory_mb,
+    process_tree_memory_mb,
+)
+from notte.errors.browser import BrowserResourceLimitError
+from tests.mock.mock_pool import MockBrowser, MockLocalBrowserPool
+
+pytestmark = pytest.mark.skipif(not proc_available(), reason="/proc is not available")
+
+
+@pytest.fixture
+def child_process() -> Iterator[subprocess.Popen[bytes]]:
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        yield process
+    finally:
+        process.kill()
+        _ = process.wait()
+
+
+def memory_config(**kwargs: float | int | None) -> BrowserPoolConfig:
+    memory = MemoryBrowserPoolConfig(container_memory=4096, system_reserved=1024, **kwargs)  # pyright: ignore[reportArgumentType]
+    return BrowserPoolConfig(memory=memory)
+
+
+def test_process_tree_memory(child_process: subprocess.Popen[bytes]):
+    assert child_process.pid in descendants(os.getpid())
+    assert process_memory_mb(child_process.pid) > 0
+    assert process_tree_memory_mb(os.getpid()) > process_memory_mb(os.getpid())
+
+
+@pytest.mark.asyncio
+async def test_new_contexts_go_to_the_least_loaded_browser(child_process: subprocess.Popen[bytes]):
+    pool = MockLocalBrowserPool(local_config=memory_config())
+    options = BrowserResourceOptions(headless=True)
+    first = await pool.create_browser(options)
+    second = await pool.create_browser(options)
+    # the process tree of the first browser includes the one of the second browser
+    first.pid = os.getpid()
+    second.pid = child_process.pid
+    assert pool.measure_memory(refresh=True)[first.browser_id] > pool.measure_memory()[second.browser_id]
+    resource = await pool.get_browser_resource(options)
+    assert resource.browser_id == second.browser_id
+
+
+@pytest.mark.asyncio
+async def test_admission_is_refused_above_high_water_mark():
+    # the estimate of a browser with one context (225MB) is above 5% of the available memory
+    pool = MockLocalBrowserPool(local_config=memory_config(high_water_mark=0.05))
+    options = BrowserResourceOptions(headless=True)
+    _ = await pool.get_browser_resource(options)
+    with pytest.raises(BrowserResourceLimitError):
+        _ = await pool.get_browser_resource(options)
+
+
+@pytest.mark.asyncio
+async def test_oversized_browser_is_drained(child_process: subprocess.Popen[bytes]):
+    pool = MockLocalBrowserPool(local_config=memory_config(max_browser_memory=1))
+    options = BrowserResourceOptions(headless=True)
+    resource = await pool.get_browser_resource(options)
+    browser = pool.available_browsers()[resource.browser_id]
+    browser.pid = child_process.pid
+    _ = pool.measure_memory(refresh=True)
+    other = await pool.get_browser_resource(options)
+    assert browser.draining
+    assert other.browser_id != resource.browser_id
+    # the drained browser is closed with its last context
+    await pool.release_browser_resource(resource)
+    assert resource.browser_id not in pool.available_browsers()
+
+
+def test_kill_process_tree():
+    # a parent (e.g. the browser process) with a child (e.g. a renderer)
+    script = "import subprocess, sys, time; subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)']); time.sleep(30)"
+    process = subprocess.Popen([sys.executable, "-c", script])
+    try:
+        deadline = time.time() + 10
+        while len(descendants(process.pid)) < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        tree = descendants(process.pid)
+        assert len(tree) == 2
+        assert sorted(kill_process_tree(process.pid)) == sorted(tree)
+        assert process.wait(timeout=5) < 0
+    finally:
+        process.kill()
+        _ = process.wait()
+
+
+@pytest.mark.asyncio
+async def test_hung_browser_is_killed(monkeypatch: pytest.MonkeyPatch, child_process: subprocess.Popen[bytes]):
+    pool = MockLocalBrowserPool()
+    resource = await pool.get_browser_resource(BrowserResourceOptions(headless=True))
+    browser = pool.available_browsers()[resource.browser_id]
+    browser.pid = child_process.pid
+
+    async def hung_close(**kwargs: object) -> None:
+        await asyncio.sleep(3600)
+
+    assert isinstance(browser.browser, MockBrowser)
+    monkeypatch.setattr(browser.browser, "close", hung_close)
+    monkeypatch.setattr(MockLocalBrowserPool, "BROWSER_OPERATION_TIMEOUT_SECONDS", 0.1)
+    killed: list[int] = []
+    monkeypatch.setattr(local_pool, "is_chromium_browser_process", lambda pid: pid == child_process.pid)
+    monkeypatch.setattr(local_pool, "kill_process_tree", lambda pid: killed.append(pid) or [pid])
+    assert await LocalBrowserPool.close_playwright_browser(pool, browser)
+    assert killed == [child_process.pid]
+
+    # unknown (or reused) pids are never killed
+    browser.pid = os.getpid()
+    assert not await LocalBrowserPool.close_playwright_browser(pool, browser)
+    assert killed == [child_process.pid]
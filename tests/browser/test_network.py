@@ -0,0 +1,110 @@
+import pytest
+
+from notte.browser.pool.network import NetworkInterceptor, NetworkProfile, NetworkProfileName, NetworkStats
+from notte.browser.window import BrowserWindowConfig
+
+
+class FakeRequest:
+    def __init__(self, url: str, resource_type: str) -> None:
+        self.url: str = url
+        self.resource_type: str = resource_type
+
+
+class FakeResponse:
+    def __init__(self, resource_type: str, headers: dict[str, str]) -> None:
+        self.request: FakeRequest = FakeRequest("https://example.com/", resource_type)
+        self.headers: dict[str, str] = headers
+
+
+class FakeRoute:
+    def __init__(self, url: str, resource_type: str) -> None:
+        self.request: FakeRequest = FakeRequest(url, resource_type)
+        self.outcome: str | None = None
+
+    async def abort(self, error_code: str) -> None:
+        self.outcome = error_code
+
+    async def continue_(self) -> None:
+        self.outcome = "continued"
+
+
+def test_full_profile_does_not_route_requests():
+    profile = NetworkProfile.from_name("full")
+    assert not profile.blocks_requests
+    assert not profile.should_block("https://example.com/logo.png", "image")
+
+
+def test_profiles_block_by_resource_type_and_trackers():
+    no_media = NetworkProfile.from_name(NetworkProfileName.NO_MEDIA)
+    assert no_media.should_block("https://example.com/logo.png", "image")
+    assert not no_media.should_block("https://example.com/style.css", "stylesheet")
+    assert not no_media.should_block("https://www.google-analytics.com/analytics.js", "script")
+
+    trackers = NetworkProfile.from_name("block-trackers")
+    assert trackers.should_block("https://www.google-analytics.com/analytics.js", "script")
+    assert trackers.should_block("https://stats.g.doubleclick.net/collect", "xhr")
+    assert not trackers.should_block("https://example.com/app.js", "script")
+    # not a subdomain of a tracker
+    assert not trackers.should_block("https://notdoubleclick.net/app.js", "script")
+
+    text_only = NetworkProfile.text_only()
+    assert text_only.should_block("https://example.com/font.woff2", "font")
+    assert not text_only.should_block("https://example.com/", "document")
+    assert not text_only.should_block("data:image/png;base64,AAAA", "image")
+
+
+def test_allow_and_deny_domains_take_precedence():
+    profile = NetworkProfile.no_media().set_allow_domains("cdn.example.com").set_deny_domains("Ads.Example.com")
+    assert profile.blocks_requests
+    assert not profile.should_block("https://img.cdn.example.com/logo.png", "image")
+    assert profile.should_block("https://ads.example.com/", "document")
+    assert profile.should_block("https://example.com/logo.png", "image")
+
+
+def test_window_config_accepts_profile_names():
+    config = BrowserWindowConfig().set_network_profile("no-media")
+    assert config.network == NetworkProfile.no_media()
+    with pytest.raises(ValueError):
+        _ = BrowserWindowConfig().set_network_profile("unknown")
+
+
+@pytest.mark.asyncio
+async def test_interceptor_aborts_blocked_requests_and_counts_them():
+    context_stats, pool_stats = NetworkStats(), NetworkStats()
+    interceptor = NetworkInterceptor(NetworkProfile.no_media(), context_stats, pool_stats)
+    routes = [
+        FakeRoute("https://example.com/", "document"),
+        FakeRoute("https://example.com/a.png", "image"),
+        FakeRoute("https://example.com/b.png", "image"),
+        FakeRoute("https://example.com/intro.mp4", "media"),
+    ]
+    for route in routes:
+        await interceptor.handle(route)  # type: ignore[arg-type]
+    assert [route.outcome for route in routes] == ["continued", "blockedbyclient", "blockedbyclient", "blockedbyclient"]
+    for stats in (context_stats, pool_stats):
+        assert stats.requests_allowed == 1
+        assert stats.requests_blocked == 3
+        assert stats.blocked_by_type == {"image": 2, "media": 1}
+        assert (
+            stats.estimated_bytes_saved
+            == 2 * NetworkStats.ESTIMATED_RESOURCE_BYTES["image"] + (NetworkStats.ESTIMATED_RESOURCE_BYTES["media"])
+        )
+    # allowed responses calibrate the estimates of their resource type
+    interceptor.on_response(FakeResponse("document", {"content-length": "12000"}))  # type: ignore[arg-type]
+    interceptor.on_response(FakeResponse("image", {}))  # type: ignore[arg-type]
+    assert pool_stats.measured_responses_by_type == {"document": 1}
+    assert pool_stats.estimated_bytes_per_request("document") == 12_000
+
+
+def test_saved_bytes_are_estimated_from_the_allowed_responses():
+    stats = NetworkStats()
+    stats.record("image", blocked=True)
+    stats.record("script", blocked=True)
+    assert stats.estimated_bytes_saved == (
+        NetworkStats.ESTIMATED_RESOURCE_BYTES["image"] + NetworkStats.ESTIMATED_RESOURCE_BYTES["script"]
+    )
+    # e.g. first party scripts allowed while the trackers are blocked
+    stats.record_response("script", 1_000)
+    stats.record_response("script", 3_000)
+    assert stats.estimated_bytes_saved == NetworkStats.ESTIMATED_RESOURCE_BYTES["image"] + 2_000
+    assert stats.model_dump()["estimated_bytes_saved"] == stats.estimated_bytes_saved
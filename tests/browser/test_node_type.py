@@ -435,3 +435,94 @@ def test_non_intersecting_category_roles():
         _all = all_except(category)
         cat_roles = category.roles()
         assert len(cat_roles.intersection(_all)) == 0, f"Category {category.value} has intersecting roles"
+
+
+def test_tree_index_ranges(nested_graph: DomNode):
+    tree, position = nested_graph.tree_index()
+    assert position == 0 and tree.nodes[0] is nested_graph
+    group = nested_graph.children[3]
+    group_tree, group_position = group.tree_index()
+    assert group_tree is tree
+    assert tree.nodes[group_position : tree.subtree_end[group_position]] == group.flatten()
+    assert tree.first_child[group_position] == group_position + 1
+    assert tree.nodes[tree.next_sibling[group_position]] is nested_graph.children[4]
+    assert tree.parent[group_position] == 0
+    assert group.subtree_ids == ["B3"] and group.nb_subtree_ids() == 1
+    assert group.subtree_contains("B3") and not group.subtree_contains("B1", "B4")
+    assert nested_graph.subtree_ids == [node.id for node in nested_graph.flatten() if node.id is not None]
+    assert nested_graph.nb_subtree_ids() == len(nested_graph.subtree_ids)
+
+
+def test_tree_index_lookups(nested_graph: DomNode):
+    inode = nested_graph.find("B3")
+    assert inode is not None and inode.id == "B3"
+    # interaction nodes are converted once per tree
+    assert nested_graph.find("B3") is inode
+    assert nested_graph.children[3].find("B3") is inode
+    assert nested_graph.children[3].find("B1") is None
+    assert [node.id for node in nested_graph.children[3].interaction_nodes()] == ["B3"]
+    assert [node.id for node in nested_graph.interaction_nodes()] == [
+        node.id for node in nested_graph.flatten(only_interaction=True)
+    ]
+
+
+def test_tree_index_shared_subtree(nested_graph: DomNode):
+    group = nested_graph.children[3]
+    # index built for the subtree first, then for a tree that contains it
+    assert group.subtree_ids == ["B3"]
+    wrapper = DomNode(
+        id="B0",
+        role=NodeRole.BUTTON,
+        text="Wrapper",
+        type=NodeType.INTERACTION,
+        children=[group],
+        attributes=None,
+        computed_attributes=ComputedDomAttributes(),
+    )
+    assert wrapper.subtree_ids == ["B0", "B3"]
+    assert group.subtree_ids == ["B3"]
+    assert nested_graph.find("B3") is not None and wrapper.find("B4") is None
+
+
+def test_subtree_filter_shares_unchanged_subtrees(nested_graph: DomNode):
+    assert nested_graph.subtree_filter(lambda _: True) is nested_graph
+
+    filtered_graph = nested_graph.subtree_filter(lambda node: node.id != "B2")
+    assert filtered_graph is not None and filtered_graph is not nested_graph
+    assert filtered_graph.find("B2") is None
+    # untouched siblings are reused as is
+    assert [child for child in filtered_graph.children] == [
+        child for child in nested_graph.children if child.id != "B2"
+    ]
+    assert all(any(child is original for original in nested_graph.children) for child in filtered_graph.children)
+
+
+def test_subtree_filter_keeps_the_index_of_shared_subtrees(nested_graph: DomNode):
+    tree, _ = nested_graph.tree_index()
+    group = nested_graph.children[3]
+    _, group_position = group.tree_index()
+
+    filtered_graph = nested_graph.subtree_filter(lambda node: node.id != "B2")
+    assert filtered_graph is not None and any(child is group for child in filtered_graph.children)
+    filtered_tree, _ = filtered_graph.tree_index()
+    assert filtered_tree is not tree
+    # indexing the filtered tree does not rebind the shared subtree to it
+    assert group.tree_index() == (tree, group_position)
+    assert nested_graph.find("B2") is not None and filtered_graph.find("B2") is None
+    assert filtered_graph.find("B3") is not None and group.find("B3") is not None
+    assert group.subtree_ids == ["B3"]
+    assert nested_graph.subtree_ids == [node.id for node in nested_graph.flatten() if node.id is not None]
+    assert filtered_graph.subtree_ids == [node.id for node in filtered_graph.flatten() if node.id is not None]
+
+
+def test_subtree_filter_skips_rejected_subtrees(nested_graph: DomNode):
+    visited: list[str] = []
+
+    def reject_groups(node: DomNode) -> bool:
+        visited.append(node.text)
+        return node.role != NodeRole.GROUP
+
+    filtered_graph = nested_graph.subtree_filter(reject_groups)
+    assert filtered_graph is not None
+    assert "Button 3" not in visited and "Link 1" not in visited
+    assert all(child.role != NodeRole.GROUP for child in filtered_graph.children)
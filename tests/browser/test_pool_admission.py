@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any
+
+import pytest
+from patchright.async_api import Browser
+from typing_extensions import override
+
+from notte.browser.pool.admission import AdmissionQueue
+from notte.browser.pool.base import BaseBrowserPoolConfig, BrowserResourceOptions
+from notte.errors.browser import BrowserPoolTimeoutError, BrowserResourceLimitError
+from tests.mock.mock_pool import MockBrowserPool
+
+
+class SlowLaunchPool(MockBrowserPool):
+    @override
+    async def create_playwright_browser(self, resource_options: BrowserResourceOptions) -> Browser:
+        await asyncio.sleep(0.02)
+        return await super().create_playwright_browser(resource_options)
+
+
+def make_pool(**kwargs: Any) -> MockBrowserPool:
+    return SlowLaunchPool(config=BaseBrowserPoolConfig(contexts_per_browser=2, **kwargs))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sessions_do_not_over_launch_browsers():
+    pool = make_pool()
+    resources = await asyncio.gather(
+        *[pool.get_browser_resource(BrowserResourceOptions(headless=True)) for _ in range(6)]
+    )
+    assert len(pool.available_browsers()) == 3
+    assert all(len(browser.contexts) == 2 for browser in pool.available_browsers().values())
+    assert len({resource.context_id for resource in resources}) == 6
+
+
+@pytest.mark.asyncio
+async def test_sessions_wait_for_a_released_resource_and_time_out():
+    pool = make_pool(max_sessions=1, acquisition_timeout=0.1)
+    options = BrowserResourceOptions(headless=True)
+    first = await pool.get_browser_resource(options)
+    waiting = asyncio.create_task(pool.get_browser_resource(options))
+    await asyncio.sleep(0.01)
+    assert pool.pressure().waiting == 1
+    assert not waiting.done()
+    await pool.release_browser_resource(first)
+    second = await waiting
+    assert pool.pressure().active == 1
+
+    with pytest.raises(BrowserPoolTimeoutError):
+        _ = await pool.get_browser_resource(options)
+    assert pool.pressure().waiting == 0
+    await pool.release_browser_resource(second)
+    assert pool.pressure().active == 0
+
+
+@pytest.mark.asyncio
+async def test_tenant_limit_does_not_block_other_tenants():
+    queue = AdmissionQueue(max_active=3, max_per_tenant=1)
+    await queue.acquire("a")
+    blocked = asyncio.create_task(queue.acquire("a"))
+    await asyncio.sleep(0)
+    # "b" is not blocked by the waiter of "a"
+    await asyncio.wait_for(queue.acquire("b"), timeout=1)
+    assert not blocked.done()
+    queue.release("a")
+    await asyncio.wait_for(blocked, timeout=1)
+    assert queue.active == 2
+
+
+@pytest.mark.asyncio
+async def test_waiting_queue_is_bounded():
+    queue = AdmissionQueue(max_active=1, max_waiting=1)
+    await queue.acquire()
+    waiter = asyncio.create_task(queue.acquire())
+    await asyncio.sleep(0)
+    assert queue.pressure().saturated
+    with pytest.raises(BrowserResourceLimitError):
+        await queue.acquire()
+    _ = waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert queue.nb_waiting == 0
+    assert queue.active == 1
@@ -0,0 +1,99 @@
+import pytest
+
+from notte.browser.pool.base import BaseBrowserPoolConfig, BrowserResourceOptions
+from notte.browser.pool.local_pool import BrowserPoolConfig
+from notte.browser.pool.metrics import Histogram, MetricFamily, Sample, quantile, render_prometheus
+from notte.errors.browser import BrowserPoolTimeoutError
+from tests.mock.mock_pool import MockBrowserPool, MockLocalBrowserPool
+
+
+def sample_lines(text: str, name: str) -> list[str]:
+    return [line for line in text.splitlines() if line.startswith(name)]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value)
+    assert histogram.cumulative_counts() == [(0.1, 1), (1.0, 3), (float("inf"), 4)]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(4.25)
+
+
+def test_render_prometheus_text_format():
+    families = [
+        MetricFamily(
+            name="requests_total",
+            type="counter",
+            help="Requests.",
+            samples=[Sample(value=3, labels={"path": 'a"b'})],
+        )
+    ]
+    assert render_prometheus(families, labels={"instance": "w1"}) == (
+        '# HELP requests_total Requests.\n# TYPE requests_total counter\nrequests_total{instance="w1",path="a\\"b"} 3\n'
+    )
+
+
+@pytest.mark.asyncio
+async def test_pool_metrics_are_exported():
+    pool = MockBrowserPool(config=BaseBrowserPoolConfig(max_sessions=1, acquisition_timeout=0.01))
+    options = BrowserResourceOptions(headless=True)
+    resource = await pool.get_browser_resource(options)
+    with pytest.raises(BrowserPoolTimeoutError):
+        _ = await pool.get_browser_resource(options)
+    pool.metrics.snapshot_latency.observe(0.3)
+
+    text = pool.export_prometheus()
+    assert 'notte_pool_browsers{headless="true"} 1' in text
+    assert 'notte_pool_contexts{state="in_use"} 1' in text
+    assert 'notte_pool_sessions{state="active"} 1' in text
+    assert "notte_pool_sessions_capacity 1" in text
+    assert "notte_pool_acquisition_wait_seconds_count 1" in text
+    assert 'notte_pool_acquisition_wait_seconds_bucket{le="+Inf"} 1' in text
+    assert "notte_pool_acquisition_failures_total 1" in text
+    assert 'notte_pool_snapshot_latency_seconds_bucket{le="0.25"} 0' in text
+    assert 'notte_pool_snapshot_latency_seconds_bucket{le="0.5"} 1' in text
+    assert "# TYPE notte_pool_acquisition_wait_seconds histogram" in text
+
+    await pool.release_browser_resource(resource)
+    text = pool.export_prometheus()
+    assert 'notte_pool_browser_events_total{event="launched"} 1' in text
+    assert 'notte_pool_browser_events_total{event="closed"} 1' in text
+    assert 'notte_pool_context_events_total{event="created"} 1' in text
+
+
+@pytest.mark.asyncio
+async def test_local_pool_exports_browser_memory_distribution():
+    pool = MockLocalBrowserPool(local_config=BrowserPoolConfig())
+    resource = await pool.get_browser_resource(BrowserResourceOptions(headless=True))
+    text = pool.export_prometheus()
+    usage = f"{pool.estimate_browser_memory(pool.available_browsers()[resource.browser_id]):g}"
+    # one series per statistic (not per browser id)
+    assert sample_lines(text, "notte_pool_browser_memory_mb{") == [
+        f'notte_pool_browser_memory_mb{{stat="{stat}"}} {usage}' for stat in ("min", "p50", "p95", "max")
+    ]
+    assert resource.browser_id not in text
+    assert len(sample_lines(text, 'notte_pool_memory_mb{kind="available"}')) == 1
+    await pool.release_browser_resource(resource)
+
+
+def test_quantile():
+    values = [float(i) for i in range(1, 101)]
+    assert quantile(values, 0.5) == 50 and quantile(values, 0.95) == 95 and quantile(values, 1.0) == 100
+    assert quantile([3.0], 0.95) == 3 and quantile([], 0.5) == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_router():
+    _ = pytest.importorskip("fastapi")
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from notte.common.fastapi import create_metrics_router
+
+    app = FastAPI()
+    app.include_router(create_metrics_router(MockBrowserPool(), labels={"instance": "test"}))
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'notte_pool_browsers{instance="test",headless="true"} 0' in response.text
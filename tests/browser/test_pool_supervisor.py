@@ -0,0 +1,122 @@
+import asyncio
+import datetime as dt
+from typing import Any, cast
+
+import pytest
+
+from notte.browser.pool.base import BaseBrowserPoolConfig, BrowserResourceOptions
+from tests.mock.mock_pool import MockBrowser, MockBrowserPool, MockContext
+
+
+class FakeRequest:
+    def __init__(self, url: str) -> None:
+        self.url: str = url
+
+
+def supervised_pool(**kwargs: Any) -> MockBrowserPool:
+    return MockBrowserPool(config=BaseBrowserPoolConfig(context_idle_ttl=60, health_check_timeout=0.05, **kwargs))
+
+
+def make_idle(pool: MockBrowserPool, context_id: str, seconds: float) -> None:
+    for browser in pool.available_browsers().values():
+        if context_id in browser.contexts:
+            browser.contexts[context_id].last_activity = dt.datetime.now() - dt.timedelta(seconds=seconds)
+
+
+@pytest.mark.asyncio
+async def test_idle_context_is_reaped():
+    pool = supervised_pool()
+    options = BrowserResourceOptions(headless=True, tenant="a")
+    leaked = await pool.get_browser_resource(options)
+    active = await pool.get_browser_resource(options)
+    make_idle(pool, leaked.context_id, 120)
+    make_idle(pool, active.context_id, 120)
+    # requests of the page (e.g. polling or analytics beacons of a leaked session) are not activity
+    cast(MockContext, leaked.page.context).emit("request", FakeRequest("https://example.com"))
+    # API calls are (e.g. a snapshot or an action)
+    pool.touch(active)
+
+    await pool.supervise()
+    assert cast(MockContext, leaked.page.context).closed
+    assert not cast(MockContext, active.page.context).closed
+    assert pool.supervisor_stats.reaped_contexts == 1
+    # the session slot of the leaked session is freed
+    assert pool.pressure().active == 1
+
+
+@pytest.mark.asyncio
+async def test_touch_postpones_reaping():
+    pool = supervised_pool()
+    resource = await pool.get_browser_resource(BrowserResourceOptions(headless=True))
+    make_idle(pool, resource.context_id, 120)
+    pool.touch(resource)
+    assert await pool.reap_idle_contexts(60) == 0
+
+
+@pytest.mark.asyncio
+async def test_warm_contexts_are_not_reaped():
+    pool = supervised_pool(warm_contexts=1)
+    options = BrowserResourceOptions(headless=True)
+    await pool.warm_up(options)
+    ((_, warm),) = pool._warm  # pyright: ignore[reportPrivateUsage]
+    make_idle(pool, warm.context_id, 120)
+    assert await pool.reap_idle_contexts(60) == 0
+    assert pool.nb_warm_contexts == 1
+
+
+@pytest.mark.asyncio
+async def test_crashed_browser_is_removed_and_replaced():
+    pool = supervised_pool()
+    options = BrowserResourceOptions(headless=True)
+    resource = await pool.get_browser_resource(options)
+    crashed = cast(MockBrowser, cast(MockContext, resource.page.context).mock_browser)
+    crashed.closed = True
+
+    await pool.supervise()
+    assert pool.supervisor_stats.crashed_browsers == 1
+    assert len(pool.available_browsers()) == 0
+    assert pool.pressure().active == 0
+    # the next session transparently gets a new browser
+    replacement = await pool.get_browser_resource(options)
+    assert replacement.browser_id != resource.browser_id
+
+
+@pytest.mark.asyncio
+async def test_hung_browser_is_removed():
+    pool = supervised_pool()
+    resource = await pool.get_browser_resource(BrowserResourceOptions(headless=True))
+    hung = cast(MockBrowser, cast(MockContext, resource.page.context).mock_browser)
+    hung.hung = True
+    browser = pool.available_browsers()[resource.browser_id]
+    assert not await pool.is_alive(browser)
+    await pool.supervise()
+    assert pool.supervisor_stats.crashed_browsers == 1
+    # the unresponsive process is killed
+    assert hung.closed
+
+
+@pytest.mark.asyncio
+async def test_crashed_warm_browser_is_replenished():
+    pool = supervised_pool(warm_contexts=2)
+    options = BrowserResourceOptions(headless=True)
+    await pool.warm_up(options)
+    browser = next(iter(pool.available_browsers().values()))
+    cast(MockBrowser, browser.browser).closed = True
+
+    await pool.supervise()
+    assert pool._replenish_task is not None  # pyright: ignore[reportPrivateUsage]
+    await pool._replenish_task  # pyright: ignore[reportPrivateUsage]
+    assert pool.nb_warm_contexts == 2
+    assert browser.browser_id not in pool.available_browsers()
+
+
+@pytest.mark.asyncio
+async def test_supervisor_runs_in_background():
+    pool = supervised_pool(supervisor_interval=0.01)
+    resource = await pool.get_browser_resource(BrowserResourceOptions(headless=True))
+    make_idle(pool, resource.context_id, 120)
+    pool.start_supervisor()
+    await asyncio.sleep(0.1)
+    pool.stop_supervisor()
+    assert pool.supervisor_stats.checks >= 1
+    assert pool.supervisor_stats.reaped_contexts == 1
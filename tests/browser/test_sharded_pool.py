@@ -0,0 +1,93 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from notte.browser.pool.local_pool import BrowserPoolConfig
+from notte.browser.pool.sharded import ShardedBrowserPool, ShardedPoolConfig
+from notte.errors.browser import BrowserShardError, InvalidURLError
+from tests.mock.mock_shard import fake_env_factory, mock_pool_factory
+
+
+def sharded_pool(nb_shards: int = 2) -> ShardedBrowserPool:
+    return ShardedBrowserPool(
+        config=ShardedPoolConfig(nb_shards=nb_shards, pool=BrowserPoolConfig(max_browsers=4)),
+        pool_factory=mock_pool_factory,
+        env_factory=fake_env_factory,
+    )
+
+
+def test_shard_configs_split_resources():
+    config = BrowserPoolConfig(max_browsers=8, max_total_contexts=32, base_debug_port=9000)
+    shards = [config.shard(index, 4) for index in range(4)]
+    assert [shard.get_max_browsers() for shard in shards] == [2, 2, 2, 2]
+    assert [shard.get_contexts_per_browser() for shard in shards] == [4, 4, 4, 4]
+    assert [shard.base_debug_port for shard in shards] == [9000, 9002, 9004, 9006]
+    assert shards[0].memory.container_memory == config.memory.container_memory // 4
+    with pytest.raises(ValueError):
+        _ = config.shard(4, 4)
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_spread_over_shards():
+    async with sharded_pool() as pool:
+        envs = [await pool.new_env() for _ in range(4)]
+        assert [load.sessions for load in pool.loads()] == [2, 2]
+        results = await asyncio.gather(*(env.goto(f"https://example.com/{i}") for i, env in enumerate(envs)))
+        pids = {pid for pid, _, _ in results}  # pyright: ignore[reportGeneralTypeIssues]
+        assert len(pids) == 2
+        assert os.getpid() not in pids
+        # each shard serves its sessions from its own pool
+        assert {active for _, _, active in results} == {2}  # pyright: ignore[reportGeneralTypeIssues]
+        await envs[0].close()
+        assert sorted(load.sessions for load in pool.loads()) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_raised_in_the_dispatcher():
+    async with sharded_pool(nb_shards=1) as pool:
+        env = await pool.new_env()
+        with pytest.raises(InvalidURLError) as error:
+            _ = await env.goto("invalid")
+        assert "invalid" in error.value.dev_message
+
+
+@pytest.mark.asyncio
+async def test_crashed_shard_is_restarted():
+    async with sharded_pool(nb_shards=1) as pool:
+        env = await pool.new_env()
+        with pytest.raises(BrowserShardError):
+            _ = await env.goto("crash")
+        assert not pool.shards[0].alive
+        env = await pool.new_env()
+        _, url, _ = await env.goto("https://example.com")  # pyright: ignore[reportGeneralTypeIssues]
+        assert url == "https://example.com"
+
+
+def hold_port(lock_dir: Path) -> subprocess.Popen[str]:
+    script = (
+        "import sys, pathlib\n"
+        "from notte.browser.pool.ports import PortManager\n"
+        "manager = PortManager()\n"
+        f"manager.reset(start=20000, nb=2, lock_dir=pathlib.Path({str(lock_dir)!r}))\n"
+        "print(manager.acquire_port(), flush=True)\n"
+        "sys.stdin.readline()\n"
+    )
+    return subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+
+
+def test_port_manager_is_cross_process_safe(tmp_path: Path):
+    first = hold_port(tmp_path)
+    second = hold_port(tmp_path)
+    third = hold_port(tmp_path)
+    try:
+        assert first.stdout is not None and second.stdout is not None and third.stdout is not None
+        ports = {first.stdout.readline().strip(), second.stdout.readline().strip(), third.stdout.readline().strip()}
+        # the range only has 2 ports
+        assert ports == {"20000", "20001", "None"}
+    finally:
+        for process in (first, second, third):
+            _ = process.communicate("\n")
@@ -0,0 +1,59 @@
+import pytest
+
+from notte.browser.pool.base import BaseBrowserPoolConfig, BrowserResourceOptions
+from tests.mock.mock_pool import MockBrowserPool
+
+
+@pytest.mark.asyncio
+async def test_warm_contexts_are_handed_out_and_replenished():
+    pool = MockBrowserPool(config=BaseBrowserPoolConfig(contexts_per_browser=4, warm_contexts=2))
+    options = BrowserResourceOptions(headless=True)
+    await pool.warm_up(options)
+    assert pool.nb_warm_contexts == 2
+
+    resource = await pool.get_browser_resource(options)
+    assert pool.warm_stats.hits == 1
+    assert pool.warm_stats.misses == 0
+    assert pool._replenish_task is not None  # pyright: ignore[reportPrivateUsage]
+    await pool._replenish_task  # pyright: ignore[reportPrivateUsage]
+    assert pool.nb_warm_contexts == 2
+    assert pool.warm_stats.created == 3
+    # the resource handed out is not part of the warm pool anymore
+    await pool.release_browser_resource(resource)
+    assert pool.nb_warm_contexts == 2
+
+
+@pytest.mark.asyncio
+async def test_requests_with_other_options_are_misses():
+    pool = MockBrowserPool(config=BaseBrowserPoolConfig(contexts_per_browser=4, warm_contexts=1))
+    await pool.warm_up(BrowserResourceOptions(headless=True))
+    resource = await pool.get_browser_resource(BrowserResourceOptions(headless=True, user_agent="agent"))
+    assert pool.warm_stats.misses == 1
+    assert resource.resource_options.user_agent == "agent"
+    assert pool._replenish_task is not None  # pyright: ignore[reportPrivateUsage]
+    await pool._replenish_task  # pyright: ignore[reportPrivateUsage]
+    # the warm pool follows the latest requested options
+    assert pool.warm_stats.hit_rate == 0.0
+    hit = await pool.get_browser_resource(BrowserResourceOptions(headless=True, user_agent="agent"))
+    assert pool.warm_stats.hits == 1
+    assert hit.context_id != resource.context_id
+
+
+@pytest.mark.asyncio
+async def test_spare_browsers_are_launched_when_browsers_are_full():
+    pool = MockBrowserPool(config=BaseBrowserPoolConfig(contexts_per_browser=1, warm_contexts=1, warm_browsers=1))
+    await pool.warm_up(BrowserResourceOptions(headless=True))
+    # one browser for the warm context, one spare browser
+    assert len(pool.available_browsers()) == 2
+    _ = await pool.get_browser_resource(BrowserResourceOptions(headless=True))
+    assert pool._replenish_task is not None  # pyright: ignore[reportPrivateUsage]
+    await pool._replenish_task  # pyright: ignore[reportPrivateUsage]
+    assert len(pool.available_browsers()) == 3
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_is_disabled_by_default():
+    pool = MockBrowserPool()
+    _ = await pool.get_browser_resource(BrowserResourceOptions(headless=True))
+    assert pool.nb_warm_contexts == 0
+    assert pool.warm_stats.misses == 0
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from notte.browser.snapshot import SnapshotMetadata, SnapshotTimings, ViewportData
+from notte.browser.window import BrowserWindow, timed, wait_all
+from notte.errors.browser import InvalidViewportPageError
+from notte.pipe.preprocessing.dom.parsing import DomParsingConfig, ParseDomTreePipe
+from tests.mock.mock_pool import MockBrowserPool
+
+
+async def _sleep_and_return(delay: float, value: int) -> int:
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _fail(delay: float, message: str) -> None:
+    await asyncio.sleep(delay)
+    raise ValueError(message)
+
+
+@pytest.mark.asyncio
+async def test_timed_records_component_duration():
+    timings: dict[str, float] = {}
+    result = await timed("dom", _sleep_and_return(0.01, 42), timings)
+    assert result == 42
+    assert timings["dom"] >= 0.01
+
+
+@pytest.mark.asyncio
+async def test_wait_all_runs_components_concurrently():
+    timings: dict[str, float] = {}
+    tasks = [asyncio.create_task(timed(f"c{i}", _sleep_and_return(0.05, i), timings)) for i in range(4)]
+    start = asyncio.get_running_loop().time()
+    await wait_all(*tasks, None)
+    elapsed = asyncio.get_running_loop().time() - start
+    assert [task.result() for task in tasks] == [0, 1, 2, 3]
+    assert elapsed < 0.15
+    assert set(timings) == {"c0", "c1", "c2", "c3"}
+
+
+@pytest.mark.asyncio
+async def test_wait_all_raises_first_error_in_argument_order():
+    ok = asyncio.create_task(_sleep_and_return(0.0, 1))
+    first = asyncio.create_task(_fail(0.02, "first"))
+    second = asyncio.create_task(_fail(0.0, "second"))
+    with pytest.raises(ValueError, match="first"):
+        await wait_all(ok, first, second)
+    # every task is awaited so none is left pending or with an unretrieved exception
+    assert all(task.done() for task in (ok, first, second))
+
+
+def test_snapshot_timings_slowest():
+    timings = SnapshotTimings(components={"dom": 0.3, "screenshot": 0.5, "a11y": 0.1}, total=0.52)
+    assert timings.slowest() == "screenshot"
+    assert SnapshotTimings(components={}, total=0.0).slowest() is None
+
+
+def test_viewport_pages():
+    viewport = ViewportData(
+        scroll_x=0, scroll_y=1500, viewport_width=1280, viewport_height=720, total_width=1280, total_height=5000
+    )
+    assert viewport.nb_pages == 7
+    assert viewport.page_index == 2
+    empty = ViewportData(scroll_x=0, scroll_y=0, viewport_width=0, viewport_height=0, total_width=0, total_height=0)
+    assert empty.nb_pages == 1 and empty.page_index == 0
+
+
+def test_dom_parsing_config_viewport_page():
+    config = DomParsingConfig().set_viewport_page(3)
+    assert config.model_dump()["viewport_page"] == 3
+    assert config.set_viewport_page(None).viewport_page is None
+    with pytest.raises(ValueError):
+        _ = config.set_viewport_page(-1)
+
+
+@pytest.mark.asyncio
+async def test_viewport_page_is_validated_before_extraction(monkeypatch: pytest.MonkeyPatch):
+    window = BrowserWindow(pool=MockBrowserPool())
+    viewport = ViewportData(
+        scroll_x=0, scroll_y=0, viewport_width=1280, viewport_height=720, total_width=1280, total_height=1440
+    )
+
+    async def snapshot_metadata(self: BrowserWindow) -> SnapshotMetadata:
+        return SnapshotMetadata(title="", url="https://example.com", viewport=viewport, tabs=[])
+
+    async def forward_with_metadata(*args: object, **kwargs: object) -> None:
+        raise AssertionError("the page should not be extracted")
+
+    monkeypatch.setattr(BrowserWindow, "snapshot_metadata", snapshot_metadata)
+    monkeypatch.setattr(ParseDomTreePipe, "forward_with_metadata", forward_with_metadata)
+    for index in (-1, 2):
+        with pytest.raises(InvalidViewportPageError):
+            _ = await window.snapshot_viewport_page(index)
@@ -1,3 +1,17 @@
+from pathlib import Path
+
+import pytest
+
+from notte.common.tracer import LlmParsingErrorFileTracer, LlmUsageFileTracer
+
+
+@pytest.fixture(autouse=True)
+def trace_files(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    # the file tracers write into the `traces` directory of the repository by default
+    monkeypatch.setattr(LlmUsageFileTracer, "file_path", tmp_path / "llm_usage.jsonl")
+    monkeypatch.setattr(LlmParsingErrorFileTracer, "file_path", tmp_path / "llm_parsing_error.jsonl")
+
+
 def pytest_addoption(parser):
     parser.addoption(
         "--config",
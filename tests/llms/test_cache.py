@@ -0,0 +1,188 @@
+import json
+import threading
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from litellm import AllMessageValues, ChatCompletionUserMessage, Message, ModelResponse
+from pydantic import BaseModel
+
+from notte.common.tracer import LlmUsageDictTracer, LlmUsageFileTracer
+from notte.errors.llm import LLMParsingError
+from notte.llms.cache import LLMCache, LLMCacheConfig, bypass_llm_cache, cache_key, llm_cache_bypassed
+from notte.llms.engine import LLMEngine
+from notte.pipe.action.llm_taging.base import RetryPipeWrapper
+
+
+def model_response(content: str) -> ModelResponse:
+    return ModelResponse(
+        id="mock-id",
+        choices=[{"message": {"content": content, "role": "assistant"}, "index": 0, "finish_reason": "stop"}],
+        created=1234567890,
+        model="mock-model",
+        usage={"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    )
+
+
+def test_cache_key_depends_on_the_request():
+    messages = [Message(role="user", content="Hello")]
+    key = cache_key("m", messages, 0.0, None)  # type: ignore[arg-type]
+    assert key == cache_key("m", [Message(role="user", content="Hello")], 0.0, None)  # type: ignore[arg-type]
+    assert key != cache_key("m", messages, 0.5, None)  # type: ignore[arg-type]
+    assert key != cache_key("m", messages, 0.0, {"type": "json_object"})  # type: ignore[arg-type]
+    assert key != cache_key("other", messages, 0.0, None)  # type: ignore[arg-type]
+
+
+def test_memory_tier_is_lru():
+    cache = LLMCache(LLMCacheConfig().set_enabled().set_max_memory_entries(2))
+    cache.set("a", model_response("a"))
+    cache.set("b", model_response("b"))
+    assert cache.get("a") is not None
+    cache.set("c", model_response("c"))
+    # "b" is the least recently used
+    assert cache.get("b") is None
+    response = cache.get("a")
+    assert response is not None and response.choices[0].message.content == "a"  # type: ignore[union-attr]
+    assert cache.stats.memory_hits == 2
+    assert cache.stats.misses == 1
+    assert cache.stats.evictions == 1
+
+
+def test_disk_tier_is_shared_and_expires(tmp_path: Path):
+    config = LLMCacheConfig().set_enabled().set_path(str(tmp_path / "llm.sqlite")).set_ttl(60)
+    cache = LLMCache(config)
+    cache.set("a", model_response("a"))
+    cache.close()
+
+    # e.g. another process or a rerun of an eval
+    cache = LLMCache(config)
+    response = cache.get("a")
+    assert response is not None and response.usage.total_tokens == 15  # type: ignore[attr-defined]
+    assert cache.stats.disk_hits == 1
+
+    with patch("time.time", return_value=10**12):
+        assert LLMCache(config).get("a") is None
+
+
+def test_disk_tier_is_trimmed(tmp_path: Path):
+    config = LLMCacheConfig().set_enabled().set_path(str(tmp_path / "llm.sqlite")).set_max_disk_entries(2)
+    cache = LLMCache(config)
+    cache.eviction_interval = 1
+    for key in ("a", "b", "c"):
+        cache.set(key, model_response(key))
+    cache = LLMCache(config)
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+
+def test_disk_tier_is_trimmed_every_interval(tmp_path: Path):
+    cache = LLMCache(LLMCacheConfig().set_enabled().set_path(str(tmp_path / "llm.sqlite")))
+    cache.eviction_interval = 2
+    with patch.object(LLMCache, "_disk_evict") as evict:
+        cache.set("a", model_response("a"))
+        # not on the first write of the process
+        assert evict.call_count == 0
+        cache.set("b", model_response("b"))
+        assert evict.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_is_not_accessed_on_the_event_loop(tmp_path: Path):
+    config = LLMCacheConfig().set_enabled().set_path(str(tmp_path / "llm.sqlite"))
+    cache = LLMCache(config)
+    loop_thread = threading.get_ident()
+    threads: list[int] = []
+    disk_get = cache._disk_get  # pyright: ignore[reportPrivateUsage]
+
+    def tracked_disk_get(key: str, now: float) -> Any:
+        threads.append(threading.get_ident())
+        return disk_get(key, now)
+
+    cache._disk_get = tracked_disk_get  # pyright: ignore[reportPrivateUsage]
+    await cache.aset("a", model_response("a"))
+    assert len(cache) == 1
+    # memory hits are served on the loop, disk reads in a worker thread
+    assert await cache.aget("a") is not None and threads == []
+    cache._memory.clear()  # pyright: ignore[reportPrivateUsage]
+    assert await cache.aget("a") is not None
+    assert cache.stats.disk_hits == 1 and len(threads) == 1 and threads[0] != loop_thread
+    await cache.adelete("a")
+    assert LLMCache(config).get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_engine_serves_cached_responses():
+    tracer = LlmUsageDictTracer()
+    engine = LLMEngine(tracer=tracer, cache=LLMCache())
+    messages: list[AllMessageValues] = [ChatCompletionUserMessage(role="user", content="Hello")]
+
+    with patch("litellm.completion", return_value=model_response("Hello there!")) as completion:
+        first = engine.completion(messages=messages, model="gpt-4o")
+        second = engine.completion(messages=messages, model="gpt-4o")
+    assert completion.call_count == 1
+    assert first is not second
+    assert second.choices[0].message.content == "Hello there!"  # type: ignore[union-attr]
+
+    # the sync and async paths share the cache
+    with patch("litellm.acompletion", side_effect=AssertionError("should be cached")):
+        _ = await engine.acompletion(messages=messages, model="gpt-4o")
+    assert tracer.cache_stats() == {"hits": 2, "misses": 1}
+
+
+class _Answer(BaseModel):
+    answer: str
+
+
+def test_unparsable_responses_are_not_served_again():
+    engine = LLMEngine(cache=LLMCache())
+    messages: list[AllMessageValues] = [ChatCompletionUserMessage(role="user", content="Answer")]
+
+    with patch("litellm.completion", return_value=model_response("not json")):
+        with pytest.raises(LLMParsingError):
+            _ = engine.structured_completion(list(messages), response_format=_Answer, model="gpt-4o")
+    with patch("litellm.completion", return_value=model_response('{"answer": "42"}')) as completion:
+        assert engine.structured_completion(list(messages), response_format=_Answer, model="gpt-4o").answer == "42"
+        assert engine.structured_completion(list(messages), response_format=_Answer, model="gpt-4o").answer == "42"
+    assert completion.call_count == 1
+
+
+def test_bypassed_requests_replace_the_cached_response():
+    engine = LLMEngine(cache=LLMCache())
+    messages: list[AllMessageValues] = [ChatCompletionUserMessage(role="user", content="Hello")]
+    with patch("litellm.completion", return_value=model_response("bad")):
+        _ = engine.completion(messages=messages, model="gpt-4o")
+    with patch("litellm.completion", return_value=model_response("good")) as completion:
+        with bypass_llm_cache():
+            assert engine.completion(messages=messages, model="gpt-4o").choices[0].message.content == "good"  # type: ignore[union-attr]
+        assert engine.completion(messages=messages, model="gpt-4o").choices[0].message.content == "good"  # type: ignore[union-attr]
+    assert completion.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_retried_listings_bypass_the_cache(tmp_path: Path):
+    bypassed: list[bool] = []
+
+    class FailingPipe:
+        llmserve: Any = None
+
+        async def forward_async(self, *args: Any) -> Any:
+            bypassed.append(llm_cache_bypassed())
+            raise LLMParsingError("invalid listing")
+
+    with pytest.raises(LLMParsingError):
+        _ = await RetryPipeWrapper(FailingPipe(), max_tries=3).forward_async(None)  # type: ignore[arg-type]
+    assert bypassed == [False, True, True]
+    assert not llm_cache_bypassed()
+    # traced to the temporary file of the test (see `tests/conftest.py`)
+    assert RetryPipeWrapper.tracer.file_path.is_relative_to(tmp_path)
+    assert len(RetryPipeWrapper.tracer.file_path.read_text().splitlines()) == 1
+
+
+def test_usage_records_are_written_whole(tmp_path: Path):
+    tracer = LlmUsageFileTracer()
+    messages: list[Any] = [{"role": "user", "content": "Hello", "image": object()}]
+    tracer.trace(timestamp="now", model="gpt-4o", messages=messages, completion="Hi", usage={})
+    assert tracer.file_path.is_relative_to(tmp_path)
+    lines = tracer.file_path.read_text().splitlines()
+    assert len(lines) == 1 and json.loads(lines[0])["completion"] == "Hi"
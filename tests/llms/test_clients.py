@@ -0,0 +1,76 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import litellm
+import pytest
+from litellm import AllMessageValues, ChatCompletionUserMessage
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler, HTTPHandler  # type: ignore[reportMissingTypeStubs]
+from openai import AsyncOpenAI
+
+from notte.llms.clients import LLMClientConfig, LLMClients
+from notte.llms.engine import LLMEngine
+from notte.llms.service import LLMService
+from tests.mock.mock_service import model_response
+
+
+def test_client_config():
+    config = LLMClientConfig().set_pool_size(10)
+    assert config.max_connections == 10
+    assert config.max_keepalive_connections == 10
+    limits = config.limits()
+    assert limits.max_connections == 10
+    assert limits.keepalive_expiry == config.keepalive_expiry
+    assert LLMClients.shared(config) is LLMClients.shared(LLMClientConfig().set_pool_size(10))
+
+
+@pytest.mark.asyncio
+async def test_async_clients_are_reused_per_event_loop():
+    clients = LLMClients(LLMClientConfig())
+    client = clients.async_client()
+    assert clients.async_client() is client
+
+    async def client_in_loop() -> httpx.AsyncClient:
+        return clients.async_client()
+
+    # e.g. another worker thread with its own event loop
+    assert await asyncio.to_thread(asyncio.run, client_in_loop()) is not client
+    await clients.aclose()
+    assert client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_engine_routes_requests_through_the_clients(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    clients = LLMClients(LLMClientConfig())
+    engine = LLMEngine(clients=clients)
+    messages: list[AllMessageValues] = [ChatCompletionUserMessage(role="user", content="Hello")]
+    response = model_response("Hello there!")
+
+    with patch("litellm.acompletion", return_value=response) as acompletion:
+        _ = await engine.acompletion(messages=messages, model="groq/llama-3.3-70b-versatile")
+        _ = await engine.acompletion(messages=messages, model="openai/gpt-4o")
+    handler, openai_client = (call.kwargs["client"] for call in acompletion.call_args_list)
+    assert isinstance(handler, AsyncHTTPHandler) and handler.client is clients.async_client()
+    assert isinstance(openai_client, AsyncOpenAI) and openai_client._client is clients.async_client()  # pyright: ignore[reportPrivateUsage]
+    assert clients.arequest_client("groq/llama-3.3-70b-versatile") is handler
+    with patch("litellm.completion", return_value=response) as completion:
+        _ = engine.completion(messages=messages, model="groq/llama-3.3-70b-versatile")
+    sync_handler = completion.call_args.kwargs["client"]
+    assert isinstance(sync_handler, HTTPHandler) and sync_handler.client is clients.client()
+    # the clients are passed with each request: the global sessions of litellm are untouched
+    assert litellm.aclient_session is None and litellm.client_session is None
+    # other providers use the clients of litellm
+    assert clients.request_client("mistral/mistral-large-latest") is None
+
+    await clients.aclose()
+    clients.close()
+    assert sync_handler.client.is_closed and handler.client.is_closed
+
+
+def test_service_reuses_its_engines():
+    service = LLMService(base_model="openai/gpt-4o")
+    engine = service.engine("openai/gpt-4o")
+    assert service.engine("openai/gpt-4o") is engine
+    assert engine.tracer is service.tracer
+    assert service.engine("groq/llama-3.3-70b-versatile") is not engine
@@ -1,9 +1,13 @@
-from unittest.mock import Mock, patch
+import asyncio
+import time
+from unittest.mock import patch
 
 import pytest
-from litellm import Message
+from litellm import Message, ModelResponse
+from pydantic import BaseModel
 
 from notte.llms.engine import LLMEngine, StructuredContent
+from tests.mock.mock_service import model_response
 
 
 @pytest.fixture
@@ -17,8 +21,7 @@ def test_completion_success(llm_engine: LLMEngine) -> None:
     ]
     model = "gpt-3.5-turbo"
 
-    mock_response = Mock()
-    mock_response.choices = [Mock(message=Mock(content="Hello there!"))]
+    mock_response = model_response("Hello there!")
 
     with patch("litellm.completion", return_value=mock_response):
         response = llm_engine.completion(messages=messages, model=model)
@@ -40,6 +43,53 @@ def test_completion_error(llm_engine: LLMEngine) -> None:
         assert "API Error" in str(exc_info.value)
 
 
+@pytest.mark.asyncio
+async def test_acompletion_does_not_block_the_event_loop(llm_engine: LLMEngine) -> None:
+    messages = [Message(role="user", content="Hello")]
+
+    async def slow_acompletion(*args: object, **kwargs: object) -> ModelResponse:
+        await asyncio.sleep(0.2)
+        return model_response("Hello there!")
+
+    with patch("litellm.acompletion", side_effect=slow_acompletion):
+        start = time.time()
+        responses = await asyncio.gather(
+            *[llm_engine.acompletion(messages=messages, model="gpt-3.5-turbo") for _ in range(5)]  # type: ignore[arg-type]
+        )
+        # the five calls wait for the provider concurrently
+        assert time.time() - start < 0.5
+    assert all(response.choices[0].message.content == "Hello there!" for response in responses)
+
+
+@pytest.mark.asyncio
+async def test_acompletion_error(llm_engine: LLMEngine) -> None:
+    messages = [Message(role="user", content="Hello")]
+    with patch("litellm.acompletion", side_effect=Exception("API Error")):
+        with pytest.raises(ValueError) as exc_info:
+            _ = await llm_engine.acompletion(messages=messages, model="gpt-3.5-turbo")  # type: ignore[arg-type]
+        assert "API Error" in str(exc_info.value)
+
+
+class _Answer(BaseModel):
+    answer: str
+
+
+@pytest.mark.asyncio
+async def test_astructured_completion_retries() -> None:
+    llm_engine = LLMEngine(structured_output_retries=1)
+    contents = iter(["not json", '{"answer": "42"}'])
+
+    async def acompletion(*args: object, **kwargs: object) -> ModelResponse:
+        return model_response(next(contents))
+
+    with patch("litellm.acompletion", side_effect=acompletion):
+        answer = await llm_engine.astructured_completion(
+            [Message(role="user", content="Answer")],  # type: ignore[arg-type]
+            response_format=_Answer,
+        )
+    assert answer.answer == "42"
+
+
 class TestStructuredContent:
     def test_extract_with_outer_tag(self):
         structure = StructuredContent(outer_tag="response")
@@ -1,8 +1,10 @@
+import os
 from pathlib import Path
 
 import pytest
 
 from notte.llms.prompt import PromptLibrary
+from notte.llms.service import PROMPT_DIR
 
 
 @pytest.fixture
@@ -67,3 +69,30 @@ def test_materialize_prompt(temp_prompts_dir: Path) -> None:
     # TODO: Andrea check this
     # with pytest.raises(ValueError, match="Missing required variable"):
     #     prompt_lib.materialize("test-prompt", {"wrong_var": "value"})
+
+
+def test_prompts_are_loaded_once(temp_prompts_dir: Path) -> None:
+    prompt_lib: PromptLibrary = PromptLibrary(temp_prompts_dir, dev_mode=False)
+    prompt_lib.warm_up()
+    assert prompt_lib.prompt_ids() == ["test-prompt"]
+
+    _ = (temp_prompts_dir / "test-prompt" / "user.md").write_text("Bye {{name}}!")
+    messages = prompt_lib.materialize("test-prompt", {"name": "John"})
+    assert next(msg for msg in messages if msg["role"] == "user")["content"] == "Hello John!"
+
+
+def test_prompts_are_reloaded_in_dev_mode(temp_prompts_dir: Path) -> None:
+    prompt_lib: PromptLibrary = PromptLibrary(temp_prompts_dir, dev_mode=True)
+    templates = prompt_lib.templates("test-prompt")
+    # unchanged files are not parsed again
+    assert prompt_lib.templates("test-prompt") is templates
+
+    user_file = temp_prompts_dir / "test-prompt" / "user.md"
+    _ = user_file.write_text("Bye {{name}}!")
+    os.utime(user_file, ns=(user_file.stat().st_atime_ns, user_file.stat().st_mtime_ns + 1_000_000))
+    messages = prompt_lib.materialize("test-prompt", {"name": "John"})
+    assert next(msg for msg in messages if msg["role"] == "user")["content"] == "Bye John!"
+
+
+def test_shared_library() -> None:
+    assert PromptLibrary.shared(PROMPT_DIR) is PromptLibrary.shared(str(PROMPT_DIR))
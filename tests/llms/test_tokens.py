@@ -0,0 +1,52 @@
+import tiktoken
+
+from notte.common.tools.conversation import Conversation
+from notte.llms.tokens import TokenCounter, approximate_tokens
+
+
+def byte_encoding() -> tiktoken.Encoding:
+    # byte level vocabulary with a few merges (built locally, i.e. without downloading an encoding)
+    ranks = {bytes([i]): i for i in range(256)}
+    for merge in (b"th", b"he", b"the", b" t", b" the"):
+        ranks[merge] = len(ranks)
+    return tiktoken.Encoding(
+        name="test_bytes", pat_str=r"""\s?\w+|\s?[^\s\w]+|\s+""", mergeable_ranks=ranks, special_tokens={}
+    )
+
+
+def test_clip_matches_full_tokenization():
+    encoding = byte_encoding()
+    counter = TokenCounter(encoding)
+    text = "the theme of the thesis " * 200 + "é😀 end"
+    tokens = encoding.encode_ordinary(text)
+    for max_tokens in (0, 1, 7, 100, 1000, len(tokens) - 1, len(tokens), len(tokens) + 5):
+        expected = text if max_tokens >= len(tokens) else encoding.decode(tokens[:max_tokens])
+        assert counter.clip(text, max_tokens) == expected
+
+
+def test_count_is_cached():
+    counter = TokenCounter(byte_encoding(), cache_size=2)
+    assert counter.count("the end") == len(counter.encoding.encode_ordinary("the end"))
+    assert counter.count("the end", approximate=True) == approximate_tokens("the end") == 2
+    _ = counter.count("a")
+    _ = counter.count("b")
+    assert len(counter._counts) == 2  # pyright: ignore[reportPrivateUsage]
+
+
+def test_conversation_trims_oldest_messages():
+    conv = Conversation(autosize=True, max_tokens=100, conservative_factor=1.0, approximate_tokens=True)
+    conv.add_system_message("s" * 40)
+    for i in range(20):
+        conv.add_user_message(f"{i:02d}" + "u" * 38)
+    messages = conv.messages()
+    # each message is 14 tokens: the system message and the 6 last user messages fit in 100 tokens
+    assert messages[0]["role"] == "system"
+    assert [m["content"][:2] for m in messages[1:]] == [f"{i:02d}" for i in range(14, 20)]  # type: ignore[index]
+    assert conv.total_tokens() == sum(conv.count_tokens(m) for m in messages) == 98
+    # trimmed messages are no longer part of the history
+    assert [msg.message for msg in conv.history] == messages
+    assert all(not msg.trimmed for msg in conv.history)
+    # and are compacted away internally
+    assert len(conv._history) <= 2 * len(messages)  # type: ignore[reportPrivateUsage]
+    conv.reset()
+    assert conv.messages() == [] and conv.total_tokens() == 0
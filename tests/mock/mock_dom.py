@@ -0,0 +1,57 @@
+import json
+from typing import Any
+
+from notte.pipe.preprocessing.dom.parsing import CompactDomTreeDict, DomNodeFlag
+
+
+def encode_dom_tree(tree: dict[str, Any]) -> str:
+    """Encode a nested DOM tree the same way as `buildDomNode.js` (see `CompactDomTreeDict`)."""
+    table: CompactDomTreeDict = {
+        "strings": [],
+        "parent": [],
+        "flags": [],
+        "tag": [],
+        "text": [],
+        "xpath": [],
+        "attributes": [],
+        "highlightIndex": [],
+        "key": [],
+    }
+    string_ids: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        if value not in string_ids:
+            string_ids[value] = len(table["strings"])
+            table["strings"].append(value)
+        return string_ids[value]
+
+    stack: list[tuple[dict[str, Any], int]] = [(tree, -1)]
+    while stack:
+        node, parent = stack.pop()
+        row = len(table["parent"])
+        is_text = node.get("type") == "TEXT_NODE"
+        flags = DomNodeFlag(0)
+        for name, flag in [
+            ("isVisible", DomNodeFlag.VISIBLE),
+            ("isInteractive", DomNodeFlag.INTERACTIVE),
+            ("isTopElement", DomNodeFlag.TOP),
+            ("isEditable", DomNodeFlag.EDITABLE),
+            ("shadowRoot", DomNodeFlag.SHADOW_ROOT),
+        ]:
+            if node.get(name, False):
+                flags |= flag
+        if is_text:
+            flags |= DomNodeFlag.TEXT
+        table["parent"].append(parent)
+        table["flags"].append(int(flags))
+        table["tag"].append(-1 if is_text else intern(node["tagName"]))
+        table["text"].append(intern(node["text"]) if is_text else -1)
+        table["xpath"].append(-1 if is_text else intern(node["xpath"]))
+        table["attributes"].append(
+            [intern(part) for attribute in node.get("attributes", {}).items() for part in attribute]
+        )
+        highlight_index, key = node.get("highlightIndex"), node.get("key")
+        table["highlightIndex"].append(-1 if highlight_index is None else highlight_index)
+        table["key"].append(-1 if key is None else key)
+        stack.extend((child, row) for child in reversed(node.get("children", [])))
+    return json.dumps(table)
@@ -0,0 +1,198 @@
+import asyncio
+from typing import Any
+
+from patchright.async_api import Browser, BrowserContext, Page
+from typing_extensions import override
+
+from notte.browser.pool.base import BaseBrowserPool, BrowserResourceOptions, BrowserWithContexts
+from notte.browser.pool.cdp_pool import SingleCDPBrowserPool
+from notte.browser.pool.local_pool import LocalBrowserPool
+
+
+class MockPage(Page):
+    # playwright objects are never constructed directly: skip the channel setup
+    def __init__(self, context: "MockContext") -> None:  # pyright: ignore[reportMissingSuperCall]
+        self.mock_context: MockContext = context
+        self.closed: bool = False
+        self.mock_url: str = "about:blank"
+        self.handlers: dict[str, list[Any]] = {}
+
+    @property
+    @override
+    def url(self) -> str:
+        return self.mock_url
+
+    @property
+    @override
+    def context(self) -> "MockContext":
+        return self.mock_context
+
+    @override
+    async def goto(self, url: str, **kwargs: Any) -> None:
+        self.mock_url = url
+
+    @override
+    def on(self, event: str, f: Any) -> None:  # pyright: ignore[reportIncompatibleMethodOverride]
+        self.handlers.setdefault(event, []).append(f)
+
+    @override
+    def is_closed(self) -> bool:
+        return self.closed
+
+    @override
+    async def close(self, **kwargs: Any) -> None:
+        self.closed = True
+        self.mock_context.mock_pages.remove(self)
+        for handler in self.handlers.get("close", []):
+            handler(self)
+
+
+class MockCDPSession:
+    def __init__(self) -> None:
+        self.commands: list[tuple[str, dict[str, Any]]] = []
+
+    async def send(self, method: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        self.commands.append((method, params or {}))
+        if method == "Target.getTargetInfo":
+            return {"targetInfo": {"targetId": str(id(self))}}
+        return {}
+
+    async def detach(self) -> None:
+        pass
+
+
+class MockContext(BrowserContext):
+    def __init__(self, browser: "MockBrowser") -> None:  # pyright: ignore[reportMissingSuperCall]
+        self.mock_browser: MockBrowser = browser
+        self.mock_pages: list[MockPage] = []
+        self.closed: bool = False
+        self.routes: list[Any] = []
+        self.handlers: dict[str, list[Any]] = {}
+        self.cookies_cleared: int = 0
+        self.permissions: list[str] = []
+        self.cdp: MockCDPSession = MockCDPSession()
+        self.cdp_sessions_created: int = 0
+
+    @override
+    def on(self, event: str, f: Any) -> None:  # pyright: ignore[reportIncompatibleMethodOverride]
+        self.handlers.setdefault(event, []).append(f)
+
+    def emit(self, event: str, value: Any) -> None:
+        for handler in self.handlers.get(event, []):
+            handler(value)
+
+    @override
+    async def clear_cookies(self, **kwargs: Any) -> None:
+        self.cookies_cleared += 1
+
+    @override
+    async def clear_permissions(self) -> None:
+        self.permissions = []
+
+    @override
+    async def grant_permissions(self, permissions: Any, **kwargs: Any) -> None:
+        self.permissions.extend(permissions)
+
+    @override
+    async def new_cdp_session(self, page: Any) -> Any:
+        self.cdp_sessions_created += 1
+        return self.cdp
+
+    @property
+    @override
+    def pages(self) -> list[Page]:
+        return list(self.mock_pages)
+
+    @override
+    async def new_page(self) -> MockPage:
+        page = MockPage(self)
+        self.mock_pages.append(page)
+        return page
+
+    @override
+    async def route(self, url: Any, handler: Any, **kwargs: Any) -> None:
+        self.routes.append(handler)
+
+    @override
+    async def close(self, **kwargs: Any) -> None:
+        self.closed = True
+        self.mock_browser.mock_contexts.remove(self)
+
+
+class MockBrowser(Browser):
+    def __init__(self) -> None:  # pyright: ignore[reportMissingSuperCall]
+        self.mock_contexts: list[MockContext] = []
+        self.closed: bool = False
+        # simulates a browser that no longer answers (e.g. a hung renderer)
+        self.hung: bool = False
+        self.cdp: MockCDPSession = MockCDPSession()
+        self.handlers: dict[str, list[Any]] = {}
+
+    @override
+    async def new_context(self, **kwargs: Any) -> MockContext:
+        context = MockContext(self)
+        self.mock_contexts.append(context)
+        return context
+
+    @override
+    def is_connected(self) -> bool:
+        return not self.closed
+
+    @override
+    def on(self, event: str, f: Any) -> None:  # pyright: ignore[reportIncompatibleMethodOverride]
+        self.handlers.setdefault(event, []).append(f)
+
+    def drop(self) -> None:
+        """Simulates a connection dropped by the remote browser."""
+        self.closed = True
+        for handler in self.handlers.get("disconnected", []):
+            handler(self)
+
+    @override
+    async def new_browser_cdp_session(self) -> Any:
+        if self.hung:
+            await asyncio.sleep(3600)
+        return self.cdp
+
+    @override
+    async def close(self, **kwargs: Any) -> None:
+        self.closed = True
+
+
+class MockBrowserPool(BaseBrowserPool):
+    """Browser pool creating in-memory browsers (no chromium process)."""
+
+    @override
+    async def create_playwright_browser(self, resource_options: BrowserResourceOptions) -> Browser:
+        return MockBrowser()
+
+    @override
+    async def close_playwright_browser(self, browser: BrowserWithContexts, force: bool = True) -> bool:
+        await browser.browser.close()
+        return True
+
+
+class MockLocalBrowserPool(LocalBrowserPool):
+    """Local browser pool (with its memory accounting) creating in-memory browsers."""
+
+    @override
+    async def create_playwright_browser(self, resource_options: BrowserResourceOptions) -> Browser:
+        return MockBrowser()
+
+    @override
+    async def close_playwright_browser(self, browser: BrowserWithContexts, force: bool = True) -> bool:
+        await browser.browser.close()
+        return True
+
+
+class MockCDPBrowserPool(SingleCDPBrowserPool):
+    """CDP pool attached to in-memory remote browsers."""
+
+    @override
+    async def start(self) -> None:
+        # no playwright driver needed by the in-memory browsers
+        pass
+
+    @override
+    async def open_connection(self, cdp_url: str) -> Browser:
+        return MockBrowser()
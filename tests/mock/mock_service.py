@@ -7,12 +7,36 @@ from typing_extensions import override
 from notte.llms.service import LLMService
 
 
+def model_response(content: str) -> ModelResponse:
+    return ModelResponse(
+        id="mock-id",
+        choices=[
+            {
+                "message": {
+                    "content": content,
+                    "role": "assistant",
+                },
+                "index": 0,
+                "finish_reason": "stop",
+            }
+        ],
+        created=1234567890,
+        model="mock-model",
+        usage={
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+        },
+    )
+
+
 @final
 class MockLLMService(LLMService):
     def __init__(self, mock_response: str):  # noqa: B027
         self.mock_response: str = mock_response
         self.last_messages: list[Message] = []
         self.last_model: str | None = None
+        self.calls: int = 0
         self.tokenizer = tiktoken.encoding_for_model("gpt-4o")
 
     @override
@@ -21,24 +45,13 @@ class MockLLMService(LLMService):
         prompt_id: str,
         variables: dict[str, Any] | None = None,
     ) -> ModelResponse:
-        # create a mock ModelResponse
-        return ModelResponse(
-            id="mock-id",
-            choices=[
-                {
-                    "message": {
-                        "content": self.mock_response,
-                        "role": "assistant",
-                    },
-                    "index": 0,
-                    "finish_reason": "stop",
-                }
-            ],
-            created=1234567890,
-            model="mock-model",
-            usage={
-                "prompt_tokens": 0,
-                "completion_tokens": 0,
-                "total_tokens": 0,
-            },
-        )
+        self.calls += 1
+        return model_response(self.mock_response)
+
+    @override
+    async def acompletion(
+        self,
+        prompt_id: str,
+        variables: dict[str, Any] | None = None,
+    ) -> ModelResponse:
+        return self.completion(prompt_id, variables)
@@ -0,0 +1,47 @@
+import os
+from typing import Any
+
+from typing_extensions import override
+
+from notte.browser.pool.base import BaseBrowserPool, BaseBrowserPoolConfig, BrowserResource, BrowserResourceOptions
+from notte.browser.pool.local_pool import BrowserPoolConfig
+from notte.errors.browser import InvalidURLError
+from tests.mock.mock_pool import MockBrowserPool
+
+
+class ShardMockBrowserPool(MockBrowserPool):
+    @override
+    async def start(self) -> None:
+        # no playwright driver needed by the in-memory browsers
+        pass
+
+
+class FakeEnv:
+    """Environment holding a browser resource of the pool of its shard."""
+
+    def __init__(self, config: Any, pool: BaseBrowserPool) -> None:
+        self.pool: BaseBrowserPool = pool
+        self.resource: BrowserResource | None = None
+
+    async def start(self) -> None:
+        self.resource = await self.pool.get_browser_resource(BrowserResourceOptions(headless=True))
+
+    async def close(self) -> None:
+        if self.resource is not None:
+            await self.pool.release_browser_resource(self.resource)
+
+    async def goto(self, url: str | None) -> tuple[int, str | None, int]:
+        if url == "crash":
+            os._exit(1)
+        if url == "invalid":
+            raise InvalidURLError(url)
+        # pid of the shard, url and number of sessions of the shard
+        return os.getpid(), url, self.pool.pressure().active
+
+
+def mock_pool_factory(config: BrowserPoolConfig) -> BaseBrowserPool:
+    return ShardMockBrowserPool(config=BaseBrowserPoolConfig(contexts_per_browser=config.get_contexts_per_browser()))
+
+
+def fake_env_factory(config: Any, pool: BaseBrowserPool) -> Any:
+    return FakeEnv(config, pool)
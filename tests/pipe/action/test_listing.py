@@ -1,8 +1,12 @@
 import pytest
+from typing_extensions import override
 
+from notte.actions.base import Action
+from notte.actions.space import PossibleActionSpace
 from notte.browser.dom_tree import A11yNode, A11yTree, ComputedDomAttributes, DomNode
 from notte.browser.node_type import NodeType
 from notte.browser.snapshot import BrowserSnapshot, SnapshotMetadata, ViewportData
+from notte.pipe.action.llm_taging.base import BaseActionListingPipe
 from notte.pipe.action.llm_taging.listing import ActionListingConfig, ActionListingPipe
 from notte.pipe.action.llm_taging.parser import ActionListingParserConfig, ActionListingParserType
 from tests.mock.mock_service import MockLLMService
@@ -168,3 +172,30 @@ homepage
     assert actions[5].params[0].type == "date"
     assert actions[5].params[0].default is None
     assert actions[5].params[0].values == []
+
+
+@pytest.mark.asyncio
+async def test_listing_pipe_async(mock_snapshot: BrowserSnapshot, action_list_answer: str) -> None:
+    llm_service = MockLLMService(mock_response=f"<action-listing>\n{action_list_answer}\n</action-listing>")
+    pipe = ActionListingPipe(llmserve=llm_service, config=ActionListingConfig())
+    space = await pipe.forward_async(snapshot=mock_snapshot)
+    assert [action.id for action in space.actions] == [action.id for action in pipe.forward(mock_snapshot).actions]
+    assert llm_service.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_sync_listing_pipes_get_an_async_path():
+    space = PossibleActionSpace(description="sync", actions=[])
+
+    class SyncListingPipe(BaseActionListingPipe):
+        @override
+        def forward(self, snapshot: BrowserSnapshot, previous_action_list: list[Action] | None = None):
+            return space
+
+        @override
+        def forward_incremental(self, snapshot: BrowserSnapshot, previous_action_list: list[Action]):
+            return space
+
+    pipe = SyncListingPipe(llmserve=None)  # type: ignore[arg-type]
+    assert await pipe.forward_async(None) is space  # type: ignore[arg-type]
+    assert await pipe.forward_incremental_async(None, []) is space  # type: ignore[arg-type]
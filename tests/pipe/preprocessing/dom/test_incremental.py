@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+import notte.pipe.preprocessing.dom.incremental as incremental_module
+from notte.pipe.preprocessing.dom.incremental import IncrementalDomCaptureDict, IncrementalDomTreePipe
+from tests.mock.mock_dom import encode_dom_tree
+
+URL = "https://example.com"
+
+
+def element(key: int, tag: str, xpath: str, children: list[Any], highlight: int | None = None, **attrs: str) -> Any:
+    return {
+        "tagName": tag,
+        "xpath": xpath,
+        "attributes": attrs,
+        "isVisible": True,
+        "isInteractive": highlight is not None,
+        "isTopElement": True,
+        "isEditable": False,
+        "highlightIndex": highlight,
+        "key": key,
+        "children": children,
+    }
+
+
+def text(value: str) -> Any:
+    return {"type": "TEXT_NODE", "text": value, "isVisible": True}
+
+
+def menu(expanded: bool) -> Any:
+    options = [
+        element(5, "button", "html/body/div[2]/button[1]", [text("first")], highlight=3),
+        element(6, "button", "html/body/div[2]/button[2]", [text("second")], highlight=4),
+    ]
+    return element(4, "div", "html/body/div[2]", options if expanded else [], id="menu")
+
+
+def full_capture() -> IncrementalDomCaptureDict:
+    dom = element(
+        1,
+        "body",
+        "html/body",
+        [
+            element(
+                2,
+                "div",
+                "html/body/div[1]",
+                [
+                    element(3, "button", "html/body/div[1]/button", [text("open")], highlight=0),
+                    element(7, "a", "html/body/div[1]/a", [text("home")], highlight=1, href="/"),
+                ],
+            ),
+            menu(expanded=False),
+        ],
+    )
+    return {"metadata": {}, "mode": "full", "dom": encode_dom_tree(dom), "patches": [], "overlay": False}  # type: ignore[typeddict-item]
+
+
+def incremental(*patches: Any, overlay: bool = False) -> IncrementalDomCaptureDict:
+    return {"metadata": {}, "mode": "incremental", "dom": None, "patches": list(patches), "overlay": overlay}  # type: ignore[typeddict-item]
+
+
+def test_patch_reuses_unchanged_subtrees_and_ids():
+    pipe = IncrementalDomTreePipe()
+    root = pipe.update(URL, "token", full_capture())
+    assert root is not None
+    before = root.to_notte_domnode()
+    unchanged = before.children[0]
+    assert [node.id for node in before.interaction_nodes()] == ["B1", "L1"]
+
+    root = pipe.update(URL, "token", incremental({"key": 4, "dom": encode_dom_tree(menu(expanded=True))}))
+    assert root is not None
+    after = root.to_notte_domnode()
+    # unchanged subtree is reused (copied, not converted again), new interactive elements get fresh ids
+    assert after.children[0] is not unchanged
+    assert after.children[0].computed_attributes is unchanged.computed_attributes
+    assert [node.id for node in after.children[0].flatten()] == [node.id for node in unchanged.flatten()]
+    # the tree of the previous snapshot is left untouched
+    assert unchanged.parent is before and after.children[0].parent is after
+    assert unchanged.children[0].parent is unchanged
+    assert [node.id for node in after.interaction_nodes()] == ["B1", "L1", "B2", "B3"]
+    assert pipe.nb_full_captures == 1 and pipe.nb_incremental_captures == 1
+
+    # re-serialized elements keep their ids
+    root = pipe.update(URL, "token", incremental({"key": 4, "dom": encode_dom_tree(menu(expanded=True))}))
+    assert root is not None
+    assert [node.id for node in root.to_notte_domnode().interaction_nodes()] == ["B1", "L1", "B2", "B3"]
+
+
+def test_patch_for_unknown_element_requires_full_capture():
+    pipe = IncrementalDomTreePipe()
+    _ = pipe.update(URL, "token", full_capture())
+    assert pipe.update(URL, "token", incremental({"key": 42, "dom": encode_dom_tree(menu(expanded=True))})) is None
+
+
+def test_removed_element_is_dropped_from_tree():
+    pipe = IncrementalDomTreePipe()
+    _ = pipe.update(URL, "token", full_capture())
+    root = pipe.update(URL, "token", incremental({"key": 7, "dom": None}))
+    assert root is not None
+    assert [node.id for node in root.to_notte_domnode().interaction_nodes()] == ["B1"]
+
+
+def test_overlay_requires_full_capture(monkeypatch: pytest.MonkeyPatch):
+    # a modal displayed on top of the page hides elements outside of the mutated subtrees
+    captures = [full_capture(), incremental(overlay=True), full_capture()]
+    calls: list[dict[str, Any]] = []
+
+    async def fake_call_dom_function(page: Any, name: str, args: dict[str, Any]) -> IncrementalDomCaptureDict:
+        calls.append(args)
+        return captures[len(calls) - 1]
+
+    monkeypatch.setattr(incremental_module, "call_dom_function", fake_call_dom_function)
+    pipe = IncrementalDomTreePipe()
+    page = SimpleNamespace(url=URL)
+    _ = asyncio.run(pipe.forward_with_metadata(page))  # type: ignore[arg-type]
+    tree, _ = asyncio.run(pipe.forward_with_metadata(page))  # type: ignore[arg-type]
+    assert [node.id for node in tree.interaction_nodes()] == ["B1", "L1"]
+    # the overlay capture is discarded and a fresh journal is requested
+    assert calls[1]["previousToken"] == calls[0]["token"] and calls[2]["previousToken"] is None
+    assert pipe.nb_full_captures == 2 and pipe.nb_incremental_captures == 0
@@ -0,0 +1,108 @@
+import gc
+import pickle
+import sys
+import weakref
+from typing import Any
+
+from notte.browser.dom_tree import NodeSelectors
+from notte.pipe.preprocessing.a11y.id_generation import simple_generate_sequential_ids
+from notte.pipe.preprocessing.dom.parsing import ParseDomTreePipe
+from notte.pipe.preprocessing.dom.types import DOMElementNode, DOMTextNode
+from tests.mock.mock_dom import encode_dom_tree
+
+URL = "https://example.com"
+
+
+def element(tag: str, xpath: str, children: list[Any], **fields: Any) -> dict[str, Any]:
+    return {"tagName": tag, "xpath": xpath, "attributes": {}, "isVisible": True, "children": children, **fields}
+
+
+def test_parse_compact_payload():
+    button = element(
+        "button",
+        "button",
+        [{"type": "TEXT_NODE", "text": "ok", "isVisible": True}],
+        attributes={"aria-label": "ok", "class": "btn"},
+        isInteractive=True,
+        isTopElement=True,
+        highlightIndex=0,
+        key=3,
+    )
+    dom = element(
+        "body",
+        "html/body",
+        [element("iframe", "html/body/iframe", [element("div", "div", [button], shadowRoot=True)])],
+    )
+    root = ParseDomTreePipe.parse_dom_payload(URL, encode_dom_tree(dom))
+    assert isinstance(root, DOMElementNode) and root.parent is None and not root.in_iframe
+    iframe = root.children[0]
+    assert isinstance(iframe, DOMElementNode) and iframe.in_iframe and iframe.iframe_parent_css_selectors == []
+    div = iframe.children[0]
+    assert isinstance(div, DOMElementNode) and div.shadow_root and div.in_shadow_root
+    assert div.iframe_parent_css_selectors == [iframe.css_path]
+    node = div.children[0]
+    assert isinstance(node, DOMElementNode) and node.parent is div
+    assert node.in_iframe and node.in_shadow_root and not node.shadow_root
+    assert node.attributes == {"aria-label": "ok", "class": "btn"}
+    assert node.highlight_index == 0 and node.key == 3
+    assert node.is_interactive and node.is_top_element and not node.is_editable
+    assert node.notte_selector.startswith(div.notte_selector + ":")
+    text = node.children[0]
+    assert isinstance(text, DOMTextNode) and text.text == "ok" and text.parent is node
+
+
+def test_parse_deep_payload_without_recursion():
+    depth = sys.getrecursionlimit() * 2
+    dom = element("div", "div", [])
+    leaf = dom
+    for _ in range(depth):
+        child = element("div", "div", [])
+        leaf["children"].append(child)
+        leaf = child
+    root = simple_generate_sequential_ids(ParseDomTreePipe.parse_dom_payload(URL, encode_dom_tree(dom)))
+    node = root.to_notte_domnode()
+    for _ in range(depth):
+        node = node.children[0]
+    assert node.children == [] and node.parent is not None
+    # copies of the converted tree (see `DOMBaseNode.cached_notte_node`) are iterative as well
+    copy = root.to_notte_domnode()
+    for _ in range(depth):
+        copy = copy.children[0]
+    assert copy is not node and copy.computed_attributes is node.computed_attributes
+
+
+def test_selectors_are_computed_lazily():
+    link = element("a", "html/body/div/a", [], attributes={"href": "/"}, isInteractive=True, highlightIndex=0)
+    dom = element("body", "html/body", [element("div", "html/body/div", [link])])
+    root = ParseDomTreePipe.parse_dom_payload(URL, encode_dom_tree(dom))
+    notte_root = root.to_notte_domnode()
+    node = notte_root.children[0].children[0]
+    element_node = root.children[0].children[0]
+    assert isinstance(element_node, DOMElementNode)
+    assert "css_path" not in element_node.__dict__
+
+    selectors = node.computed_attributes.selectors
+    assert selectors is not None
+    assert selectors.xpath_selector == "html/body/div/a"
+    assert selectors.css_selector == element_node.css_path
+    # the notte selector of an element extends the one of its parent
+    assert selectors.notte_selector.startswith(f"{root.children[0].notte_selector}:")  # type: ignore[union-attr]
+    copied = pickle.loads(pickle.dumps(selectors))
+    assert type(copied) is NodeSelectors and copied == element_node.selectors()
+
+
+def test_selectors_do_not_keep_the_dom_tree_alive():
+    iframe = element("iframe", "html/body/iframe", [element("a", "html/body/a", [], highlightIndex=0)])
+    dom = element("body", "html/body", [element("div", "html/body/div", [iframe])])
+    root = ParseDomTreePipe.parse_dom_payload(URL, encode_dom_tree(dom))
+    link = root.children[0].children[0].children[0]
+    assert isinstance(link, DOMElementNode)
+    expected = link.selectors()
+    notte_root = root.to_notte_domnode()
+    root_ref = weakref.ref(root)
+    del root, link
+    _ = gc.collect()
+    assert root_ref() is None
+    selectors = notte_root.children[0].children[0].children[0].computed_attributes.selectors
+    assert selectors is not None and pickle.loads(pickle.dumps(selectors)) == expected
+    assert selectors.iframe_parent_css_selectors == ["html > body > iframe"]
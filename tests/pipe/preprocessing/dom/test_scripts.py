@@ -0,0 +1,56 @@
+from typing import Any
+
+import pytest
+
+from notte.pipe.preprocessing.dom.scripts import (
+    CALL_DOM_FUNCTION_JS,
+    call_dom_function,
+    install_and_call_dom_function_js,
+    install_dom_scripts_js,
+)
+
+
+class FakePage:
+    # globals of the main world (scripts of the page) and of the isolated world of patchright's `evaluate`
+    def __init__(self) -> None:
+        self.worlds: dict[bool, set[str]] = {False: set(), True: set()}
+        self.scripts: list[str] = []
+
+    def navigate(self) -> None:
+        self.worlds = {False: set(), True: set()}
+
+    async def evaluate(self, script: str, arg: Any = None, *, isolated_context: bool = True) -> Any:
+        self.scripts.append(script)
+        world = self.worlds[isolated_context]
+        if script == install_and_call_dom_function_js():
+            world.add("__notteDom")
+        else:
+            assert script == CALL_DOM_FUNCTION_JS
+        if "__notteDom" not in world:
+            return {"installed": False, "result": None}
+        return {"installed": True, "result": arg[0]}
+
+
+def test_scripts_are_read_once():
+    assert install_dom_scripts_js() is install_dom_scripts_js()
+    assert install_dom_scripts_js() in install_and_call_dom_function_js()
+
+
+@pytest.mark.asyncio
+async def test_scripts_are_installed_once_per_document():
+    page = FakePage()
+    assert await call_dom_function(page, "metadata") == "metadata"  # type: ignore[arg-type]
+    assert page.scripts == [CALL_DOM_FUNCTION_JS, install_and_call_dom_function_js()]
+
+    # fast path: the functions installed by the first call are found by the next ones
+    page.scripts.clear()
+    assert await call_dom_function(page, "capture") == "capture"  # type: ignore[arg-type]
+    assert page.scripts == [CALL_DOM_FUNCTION_JS]
+    assert len(CALL_DOM_FUNCTION_JS) < len(install_dom_scripts_js()) / 10
+    # nothing is exposed to the scripts of the page
+    assert page.worlds[False] == set()
+
+    page.navigate()
+    page.scripts.clear()
+    assert await call_dom_function(page, "capture") == "capture"  # type: ignore[arg-type]
+    assert page.scripts == [CALL_DOM_FUNCTION_JS, install_and_call_dom_function_js()]
@@ -0,0 +1,98 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from patchright.async_api import Error as PlaywrightError
+
+from notte.pipe.preprocessing.dom.scripts import CALL_DOM_FUNCTION_JS
+from notte.pipe.preprocessing.dom.wait_for_page_update import SettleResult, SettleStats, wait_for_page_update
+
+
+class FakeRequest:
+    def __init__(self, resource_type: str) -> None:
+        self.resource_type: str = resource_type
+
+
+class FakePage:
+    def __init__(self, dom_results: list[dict[str, Any] | Exception]) -> None:
+        self.dom_results: list[dict[str, Any] | Exception] = dom_results
+        self.handlers: dict[str, list[Callable[[Any], None]]] = {}
+        self.load_states: list[str] = []
+
+    def on(self, event: str, handler: Callable[[Any], None]) -> None:
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event: str, request: FakeRequest) -> None:
+        for handler in self.handlers.get(event, []):
+            handler(request)
+
+    async def evaluate(self, script: str, arg: Any = None) -> Any:
+        assert script == CALL_DOM_FUNCTION_JS
+        assert arg[0] == "settle"
+        result = self.dom_results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return {"installed": True, "result": result}
+
+    async def wait_for_load_state(self, state: str, timeout: float) -> None:
+        self.load_states.append(state)
+
+
+QUIET = {"reason": "quiet", "mutations": 3, "frames": 2}
+
+
+@pytest.mark.asyncio
+async def test_settles_as_soon_as_dom_and_network_are_quiet():
+    page = FakePage([QUIET])
+    result = await wait_for_page_update(page, timeout=5_000)  # type: ignore[arg-type]
+    assert result.reason == "quiet"
+    assert result.mutations == 3
+    assert result.elapsed < 1
+
+
+@pytest.mark.asyncio
+async def test_waits_for_pending_fetch_requests():
+    page = FakePage([QUIET])
+    # start tracking the page
+    _ = await wait_for_page_update(page, timeout=5_000)  # type: ignore[arg-type]
+    page.dom_results = [QUIET]
+    request = FakeRequest("fetch")
+    page.emit("request", request)
+    # images do not update the DOM
+    page.emit("request", FakeRequest("image"))
+    asyncio.get_running_loop().call_later(0.05, page.emit, "requestfinished", request)
+    result = await wait_for_page_update(page, timeout=5_000)  # type: ignore[arg-type]
+    assert result.reason == "quiet"
+    assert result.pending_requests == 0
+    assert result.elapsed >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_wait_is_capped_by_timeout():
+    page = FakePage([QUIET])
+    _ = await wait_for_page_update(page, timeout=5_000)  # type: ignore[arg-type]
+    page.emit("request", FakeRequest("xhr"))
+    result = await wait_for_page_update(page, timeout=50)  # type: ignore[arg-type]
+    assert result.reason == "timeout"
+    assert result.pending_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_navigation_during_wait_is_followed():
+    page = FakePage([PlaywrightError("Execution context was destroyed"), QUIET])
+    result = await wait_for_page_update(page, timeout=5_000)  # type: ignore[arg-type]
+    assert result.reason == "quiet"
+    assert page.load_states == ["domcontentloaded"]
+
+
+def test_settle_stats_are_aggregated_per_action():
+    stats = SettleStats()
+    stats.record("click", SettleResult(reason="quiet", elapsed=0.1))
+    stats.record("click", SettleResult(reason="timeout", elapsed=0.5))
+    stats.record("fill", SettleResult(reason="quiet", elapsed=0.2))
+    assert stats.actions["click"].count == 2
+    assert stats.actions["click"].mean == pytest.approx(0.3)
+    assert stats.actions["click"].max == 0.5
+    assert stats.actions["click"].timeouts == 1
+    assert stats.actions["fill"].timeouts == 0
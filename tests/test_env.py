@@ -1,10 +1,19 @@
+import datetime as dt
 from collections.abc import AsyncGenerator, Awaitable
+from typing import Any
 
 import pytest
 
 from notte.actions.base import Action
-from notte.browser.snapshot import BrowserSnapshot
-from notte.env import NotteEnv
+from notte.actions.space import ActionSpace
+from notte.browser.dom_tree import ComputedDomAttributes, DomNode
+from notte.browser.node_type import NodeRole, NodeType
+from notte.browser.snapshot import BrowserSnapshot, SnapshotComponent, SnapshotMetadata, ViewportData
+from notte.browser.window import BrowserWindow
+from notte.controller.actions import WaitAction
+from notte.env import NotteEnv, NotteEnvConfig
+from notte.pipe.action.pipe import MainActionSpacePipe
+from notte.sdk.types import PaginationParams
 from tests.mock.mock_browser import MockBrowserDriver
 from tests.mock.mock_service import MockLLMService
 
@@ -135,3 +144,50 @@ async def test_valid_observation_after_reset(aenv: Awaitable[NotteEnv]) -> None:
     # Verify the state was effectively reset
     assert env.snapshot.screenshot == obs.screenshot  # poor proxy but ok
     assert len(env.trajectory) == 1  # the trajectory should only contains a single obs (from reset)
+
+
+def make_snapshot(text: str, timestamp: dt.datetime) -> BrowserSnapshot:
+    viewport = ViewportData(
+        scroll_x=0, scroll_y=0, viewport_width=1000, viewport_height=1000, total_width=1000, total_height=1000
+    )
+    dom_node = DomNode(
+        id="B1",
+        role=NodeRole.BUTTON,
+        text=text,
+        type=NodeType.INTERACTION,
+        children=[],
+        attributes=None,
+        computed_attributes=ComputedDomAttributes(),
+    )
+    return BrowserSnapshot(
+        metadata=SnapshotMetadata(url="https://example.com", title="", viewport=viewport, tabs=[], timestamp=timestamp),
+        dom_node=dom_node,
+        pending=frozenset({SnapshotComponent.HTML_CONTENT, SnapshotComponent.A11Y_TREE}),
+    )
+
+
+@pytest.mark.asyncio
+async def test_page_change_check_compares_raw_snapshots(monkeypatch: pytest.MonkeyPatch) -> None:
+    """The preprocessed DOM tree must not be compared with the DOM tree of a new capture"""
+    env = NotteEnv(config=NotteEnvConfig().disable_auto_scrape())
+    start = dt.datetime.now() - dt.timedelta(seconds=env.config.nb_seconds_between_snapshots_check + 1)
+    raw = make_snapshot("button", timestamp=start)
+    _ = env._preobserve(raw, action=WaitAction(time_ms=0))  # pyright: ignore[reportPrivateUsage]
+    # e.g. the A11Y preprocessing rebuilds the DOM tree from the a11y tree
+    env._snapshot = raw.with_dom_node(make_snapshot("rebuilt", timestamp=start).dom_node)  # pyright: ignore[reportPrivateUsage]
+
+    captures: list[BrowserSnapshot] = []
+
+    async def snapshot(self: BrowserWindow, screenshot: bool | None = None) -> BrowserSnapshot:
+        captures.append(make_snapshot("button", timestamp=dt.datetime.now()))
+        return captures[-1]
+
+    async def forward_async(self: MainActionSpacePipe, *args: Any, **kwargs: Any) -> ActionSpace:
+        return ActionSpace(description="", raw_actions=[])
+
+    monkeypatch.setattr(BrowserWindow, "snapshot", snapshot)
+    monkeypatch.setattr(MainActionSpacePipe, "forward_async", forward_async)
+    _ = await env._observe(pagination=PaginationParams(), retry=1)  # pyright: ignore[reportPrivateUsage]
+    # the page did not change: no retry
+    assert len(captures) == 1
+    assert len(env.trajectory) == 1